@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
-from typing import List
+from typing import List, Optional
 import json
 from app.schemas.analysis import (
     Step1ExtractRequest, Step1ExtractResponse,
@@ -10,7 +10,7 @@ from app.schemas.analysis import (
     PillSearchByNameRequest, PillSearchByAppearanceRequest, PillSearchResponse
 )
 from app.services.analysis_step_service import StepByStepAnalysisService
-from app.services.prescription_service import PrescriptionService
+from app.services.prescription_service import PrescriptionService, BATCH_MAX_IMAGES
 from app.services.pill_id_service import PillIdService
 from app.services.faq_service import FAQService
 from app.services.naver_search_service import NaverSearchService
@@ -30,6 +30,14 @@ def get_pill_id_service():
 def get_naver_search_service():
     return NaverSearchService()
 
+
+def _deadline_seconds(deadline_ms) -> Optional[float]:
+    """deadline_ms 검증 (처방전 엔드포인트 공통) — 잘못된 값은 422"""
+    try:
+        return PrescriptionService.parse_deadline_ms(deadline_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 @router.post("/step1-extract", response_model=Step1ExtractResponse)
 async def analyze_step1_extract(
     req: Step1ExtractRequest,
@@ -59,8 +67,7 @@ async def analyze_step2_search(
     try:
         # Pydantic schema expects dict structure matching response model
         # The service returns {"candidates": {...}}
-        import asyncio
-        result = await asyncio.to_thread(service.step2_search, req.session_id, req.confirmed_keywords)
+        result = await service.step2_search(req.session_id, req.confirmed_keywords)
         return Step2SearchResponse(data=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search Error: {str(e)}")
@@ -85,23 +92,26 @@ async def analyze_step3_report(
 
 
 # 📌 중요: 구체적인 경로를 먼저 정의해야 FastAPI가 올바르게 라우팅합니다!
-# 순서: /prescription/stream → /prescription/sections → /prescription
+# 순서: /prescription/stream → /prescription/sections → /prescription/batch → /prescription
 
 @router.post("/prescription-stream")
 async def analyze_prescription_stream(
     file: UploadFile = File(..., description="처방전 이미지 파일 (jpg/png)"),
     sections: str = Form("1,2", description="분석할 섹션 번호 (예: '1,2' 또는 '1,2,3,4,5')"),
+    deadline_ms: Optional[int] = Form(None, description="응답 시간 예산(ms). 초과 단계는 pending 처리"),
     service: PrescriptionService = Depends(get_prescription_service),
 ):
     """
     [처방전 스트리밍 분석] SSE(Server-Sent Events) 방식으로 진행 상황을 실시간 전송.
     - sections="1,2"       → OCR + 약물정보만 (빠름)
     - sections="1,2,3,4,5" → 전체 분석 (학술근거·생활가이드·동의보감 포함)
+    - deadline_ms=8000     → 8초 안에 끝난 섹션만 반환, 나머지는 pendingSections + continuationToken
     """
     allowed_types = {"image/jpeg", "image/png", "image/jpg", "image/webp"}
     content_type = file.content_type or "image/jpeg"
     if content_type not in allowed_types:
         raise HTTPException(status_code=400, detail=f"지원하지 않는 파일 형식: {content_type}")
+    deadline_s = _deadline_seconds(deadline_ms)
 
     image_bytes = await file.read()
     selected_sections = set(sections.split(","))
@@ -109,7 +119,7 @@ async def analyze_prescription_stream(
     async def event_generator():
         try:
             async for event in service.analyze_prescription_streaming(
-                image_bytes, content_type, selected_sections
+                image_bytes, content_type, selected_sections, deadline_s=deadline_s
             ):
                 yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
         except Exception as e:
@@ -137,13 +147,22 @@ async def fetch_prescription_sections(
     [결과 화면 on-demand 섹션 분석]
     처음 분석 후 사용자가 개별 선택한 섹션(4·생활가이드, 5·동의보감)을 추가로 실행.
     request: { "drug_list": ["약물1", ...], "sections": ["4"] }
+          or { "continuation_token": "...", "deadline_ms": 5000 }  (시간 예산 초과로 누락된 섹션)
     """
-    drug_list: list = request.get("drug_list", [])
-    sections: set = set(request.get("sections", []))
+    token = request.get("continuation_token")
+    if token:
+        try:
+            drug_list, sections = PrescriptionService.decode_continuation_token(token)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        drug_list = request.get("drug_list", [])
+        sections = set(request.get("sections", []))
     if not sections:
         raise HTTPException(status_code=400, detail="sections 필드가 비어있습니다.")
+    deadline_s = _deadline_seconds(request.get("deadline_ms"))
     try:
-        result = await service.fetch_optional_sections(drug_list, sections)
+        result = await service.fetch_optional_sections(drug_list, sections, deadline_s=deadline_s)
         return result
     except Exception as e:
         import traceback
@@ -151,22 +170,66 @@ async def fetch_prescription_sections(
         raise HTTPException(status_code=500, detail=f"섹션 분석 오류: {str(e)}")
 
 
+@router.post("/prescription/batch")
+async def analyze_prescription_batch(
+    files: List[UploadFile] = File(..., description="처방전 이미지 파일 여러 장 (jpg/png)"),
+    deadline_ms: Optional[int] = Form(None, description="응답 시간 예산(ms). 초과 단계는 pending 처리"),
+    service: PrescriptionService = Depends(get_prescription_service),
+):
+    """
+    [처방전 일괄 분석] 여러 장을 한 번에 업로드 (약국·가족 계정)
+    - OCR은 동시 실행, 중복 약물은 약물 정보 조회 1회
+    - combinedDurWarnings: 전체 복용 약물 기준 병용금기
+    - crossPrescriptionWarnings: 서로 다른 처방전 약물 간 병용금기
+    - reports: 처방전별 5-섹션 리포트 (업로드 순서, index 포함)
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="처방전 이미지가 없습니다.")
+    deadline_s = _deadline_seconds(deadline_ms)
+    if len(files) > BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {BATCH_MAX_IMAGES}장까지 분석할 수 있습니다.",
+        )
+
+    allowed_types = {"image/jpeg", "image/png", "image/jpg", "image/webp"}
+    images = []
+    for file in files:
+        content_type = file.content_type or "image/jpeg"
+        if content_type not in allowed_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"지원하지 않는 파일 형식: {content_type} ({file.filename})",
+            )
+        images.append((await file.read(), content_type))
+
+    try:
+        return await service.analyze_prescription_batch(images, deadline_s=deadline_s)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"일괄 분석 오류: {str(e)}")
+
+
 @router.post("/prescription")
 async def analyze_prescription(
     file: UploadFile = File(..., description="처방전 이미지 파일 (jpg/png)"),
     sections: str = Form("1,2", description="분석할 섹션 번호 (예: '1,2' 또는 '1,2,3,4,5')"),
+    deadline_ms: Optional[int] = Form(None, description="응답 시간 예산(ms). 초과 단계는 pending 처리"),
     service: PrescriptionService = Depends(get_prescription_service),
 ):
     """
     [처방전 SSE 스트리밍] 실시간 진행 상황 전송
     - sections="1,2"       → OCR + 약물정보만 (빠름)
     - sections="1,2,3,4,5" → 전체 분석
+    - deadline_ms          → 응답 시간 예산 (초과 섹션은 continuationToken으로 재조회)
     """
     print("[DEBUG] Prescription streaming endpoint called")  # Force reload
     allowed_types = {"image/jpeg", "image/png", "image/jpg", "image/webp"}
     content_type = file.content_type or "image/jpeg"
     if content_type not in allowed_types:
         raise HTTPException(status_code=400, detail=f"지원하지 않는 파일 형식: {content_type}")
+    deadline_s = _deadline_seconds(deadline_ms)
 
     image_bytes = await file.read()
     selected_sections = set(sections.split(","))
@@ -174,7 +237,7 @@ async def analyze_prescription(
     async def event_generator():
         try:
             async for event in service.analyze_prescription_streaming(
-                image_bytes, content_type, selected_sections
+                image_bytes, content_type, selected_sections, deadline_s=deadline_s
             ):
                 yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
         except Exception as e:
@@ -5,6 +5,7 @@ PubMed RAG 챗봇 - 의학 논문 기반 질의응답 시스템
 
 import streamlit as st
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import datetime
 import time
@@ -30,6 +31,10 @@ except ImportError as e:
     """)
     st.stop()
 
+# 프로젝트 공용 유틸 (streamlit run app/app.py 실행 시 루트 경로 추가)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.context_builder import ContextSource, build_context
+
 # 페이지 설정
 st.set_page_config(
     page_title="🏥 PubMed RAG 챗봇",
@@ -191,6 +196,11 @@ def search_pubmed(query: str, email: str, max_results: int, start_year: int, end
         st.error(f"PubMed 검색 중 오류 발생: {str(e)}")
         return []
 
+def _short_authors(authors: str, limit: int = 3) -> str:
+    """저자 목록 축약 (앞 3명 + et al.)"""
+    names = [a.strip() for a in authors.split(",") if a.strip()]
+    return ", ".join(names[:limit]) + (" et al." if len(names) > limit else "")
+
 # PubMed 다이렉트 검색 기반 QA 함수
 def answer_with_pubmed_direct(
     question: str,
@@ -214,9 +224,22 @@ def answer_with_pubmed_direct(
     if not papers:
         return "관련 논문을 찾지 못했습니다.", []
 
-    # 2) 맥락 구성 (상위 3개)
+    # 2) 맥락 구성 (상위 3개) — 서지 정보는 유지, 초록은 질문 관련 문장만 모델 예산 안에서 선택
     top_papers = papers[:3]
-    context_text = "\n\n".join(p.get("full_text", "") for p in top_papers if p.get("full_text"))
+    built = build_context(
+        [
+            ContextSource(
+                f"제목: {p.get('title', '')} | 저자: {_short_authors(p.get('authors', ''))} | "
+                f"저널: {p.get('journal', '')} ({p.get('year', '')}) | PMID: {p.get('pmid', '')}",
+                p.get("abstract", ""),
+            )
+            for p in top_papers
+        ],
+        query=question,
+        model=model_name,
+    )
+    context_text = built.text
+    print(f"[Context] {built.original_tokens} → {built.tokens} tokens (중복 {built.duplicates}문장 제외)")
 
     # 3) 체인 구성 (LCEL)
     template = """
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import analysis
+from app.utils.warm_up import warm_up_shared_indexes
 
 app = FastAPI(
     title="HealthStack API",
@@ -28,6 +29,23 @@ app.add_middleware(
 # Router 등록
 app.include_router(analysis.router, prefix="/api/v1/analyze", tags=["Analysis"])
 
+@app.on_event("startup")
+async def warm_up_disease_index():
+    """disease_master 인덱스 · 증상→식재료/레시피 스냅샷 · 상호작용 그래프 · 번역 사전 · PubMed 코퍼스 사전 로드 (첫 분석 지연 방지)"""
+    await warm_up_shared_indexes()
+
+@app.on_event("shutdown")
+async def close_async_clients():
+    """비동기 Supabase / NCBI / YouTube 연결 풀 · 이미지 전처리 프로세스 풀 정리"""
+    from database.supabase_client import AsyncSupabaseClient
+    from app.utils.ncbi_scheduler import NCBIScheduler
+    from app.services.youtube_service import YouTubeService
+    from app.utils.image_preprocessor import shutdown_pool
+    await AsyncSupabaseClient.aclose()
+    await NCBIScheduler.shared().aclose()
+    await YouTubeService.aclose()
+    shutdown_pool()
+
 @app.get("/")
 def root():
     return {"message": "HealthStack API is running. Visit /docs for documentation."}
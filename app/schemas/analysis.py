@@ -95,6 +95,8 @@ class PrescriptionAnalysisResponse(BaseModel):
     academicEvidence: AcademicEvidence
     lifestyleGuide: LifestyleGuide
     donguibogam: DonguibogamSection
+    pendingSections: Optional[List[str]] = None    # 시간 예산 초과로 누락된 섹션 번호
+    continuationToken: Optional[str] = None        # /prescription/sections 재조회용
 
 
 # --- Pill Identification (낱알정보) ---
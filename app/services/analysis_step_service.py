@@ -1,8 +1,10 @@
+import asyncio
 from typing import Dict, List, Optional, Any
 from .naver_ocr_service import NaverOCRService
 from .medication_service import MedicationService
 from .analyze_service import AnalyzeService, AnalysisResult, Ingredient, Recipe # Import new service
 from .faq_service import FAQService
+from app.utils.keyword_extractor import KeywordExtractor
 
 class StepByStepAnalysisService:
     def __init__(self):
@@ -27,10 +29,14 @@ class StepByStepAnalysisService:
         if search_type == "symptom":
             # For symptom search, text is the input
             if text:
-                # Simple keyword extraction (can be enhanced with NLP)
-                # Here we just mock or split
-                keywords = [k.strip() for k in text.split() if len(k.strip()) > 1]
-                detected_keywords = [{"keyword": k, "confidence": 1.0} for k in keywords]
+                # AnalyzeService 와 같은 키워드 추출기 (증상명·동의어 매칭 + 조사 제거)
+                # step1_extract 는 엔드포인트에서 asyncio.to_thread 로 실행되므로 최초 로드도 워커 스레드에서
+                extractor = KeywordExtractor.shared()
+                extractor.ensure_loaded(self.analyze_service.db)
+                detected_keywords = [
+                    {"keyword": k.keyword, "confidence": k.confidence}
+                    for k in extractor.extract_detailed(text)
+                ]
                 ocr_text = text # Just echo for symptom
                 
         elif search_type == "prescription":
@@ -57,7 +63,7 @@ class StepByStepAnalysisService:
             "ocr_text": ocr_text
         }
 
-    def step2_search(self, session_id: str, confirmed_keywords: List[str]) -> Dict[str, Any]:
+    async def step2_search(self, session_id: str, confirmed_keywords: List[str]) -> Dict[str, Any]:
         """
         [Step 2] Confirmed Keywords -> Candidate Search (TKM Symptoms, Modern Drugs)
         """
@@ -65,23 +71,30 @@ class StepByStepAnalysisService:
         if session_id in self._sessions:
             self._sessions[session_id]["keywords"] = confirmed_keywords
         
-        # 1. Search DB for TKM Symptoms (disease_master)
-        # Using Supabase (via AnalyzeService's client or direct)
-        db = self.analyze_service.db
+        # 1. Search DB for TKM Symptoms (disease_master) and Modern Drugs (catalog_drugs)
+        # Lookups go through the async repositories concurrently (no event-loop blocking).
+        symptom_repo = self.analyze_service.symptom_repo
+        drug_repo = self.analyze_service.drug_repo
         
         tkm_candidates = []
         modern_candidates = []
         
         try:
-            for keyword in confirmed_keywords:
-                # A. Search TKM Symptoms
-                # Search by name or description
-                res_tkm = db.table("disease_master").select("id, modern_name_ko, disease_read, description").or_(
-                    f"modern_name_ko.ilike.%{keyword}%,"
-                    f"disease_read.ilike.%{keyword}%"
-                ).limit(5).execute()
-                
-                for item in res_tkm.data:
+            results = await asyncio.gather(*(
+                asyncio.gather(
+                    symptom_repo.search_diseases(
+                        keyword, ("modern_name_ko", "disease_read"),
+                        "id, modern_name_ko, disease_read, description", limit=5,
+                    ),
+                    drug_repo.search_catalog(
+                        keyword, "id, name_ko, name_en, manufacturer, description, category", limit=5,
+                    ),
+                )
+                for keyword in confirmed_keywords
+            ))
+            for tkm_rows, drug_rows in results:
+                # A. TKM Symptoms (name or reading match)
+                for item in tkm_rows:
                     c = {
                         "id": item["id"],
                         "name": item.get("modern_name_ko") or item.get("disease_read"),
@@ -92,15 +105,8 @@ class StepByStepAnalysisService:
                     if c not in tkm_candidates: # Deduplicate simple
                          tkm_candidates.append(c)
                 
-                # B. Search Modern Drugs (catalog_drugs)
-                # Ensure catalog_drugs table exists or use medication_service logic
-                # Let's assume catalog_drugs table
-                res_drug = db.table("catalog_drugs").select("id, name_ko, name_en, manufacturer, description, category").or_(
-                     f"name_ko.ilike.%{keyword}%,"
-                     f"name_en.ilike.%{keyword}%"
-                ).limit(5).execute()
-                
-                for item in res_drug.data:
+                # B. Modern Drugs (catalog_drugs)
+                for item in drug_rows:
                     c = {
                          "id": item["id"],
                          "name": f"{item.get('name_ko')} ({item.get('name_en')})",
@@ -131,24 +137,27 @@ class StepByStepAnalysisService:
         symptom_texts = []
         meds = []
         
+        # AnalyzeService mostly takes text, so fetch names for the selected IDs.
+        # Lookups go through the async repositories concurrently (no event-loop blocking).
+        symptom_repo = self.analyze_service.symptom_repo
+        drug_repo = self.analyze_service.drug_repo
+        lookups = []
         for cand in selected_candidates:
             c_type = cand.get("type", "")
             c_id = cand.get("id")
-            
-            # Fetch details if needed, or just rely on IDs if AnalyzeService supports it
-            # But AnalyzeService mostly takes text.
-            # Let's fetch names to pass to AnalyzeService
-            
             if c_type == "tkm_symptom":
-                 # Fetch name
-                 res = self.analyze_service.db.table("disease_master").select("modern_name_ko").eq("id", c_id).single().execute()
-                 if res.data:
-                     symptom_texts.append(res.data["modern_name_ko"])
+                lookups.append((c_type, symptom_repo.get_disease(c_id, "modern_name_ko")))
             elif c_type == 'modern_drug':
-                 # Fetch name
-                 res = self.analyze_service.db.table("catalog_drugs").select("name_ko, name_en").eq("id", c_id).single().execute()
-                 if res.data:
-                     meds.append(res.data["name_ko"] or res.data["name_en"])
+                lookups.append((c_type, drug_repo.get_catalog_drug(c_id, "name_ko, name_en")))
+        
+        rows = await asyncio.gather(*(coro for _, coro in lookups))
+        for (c_type, _), row in zip(lookups, rows):
+            if not row:
+                continue
+            if c_type == "tkm_symptom":
+                symptom_texts.append(row["modern_name_ko"])
+            else:
+                meds.append(row["name_ko"] or row["name_en"])
         
         # Combine symptom texts
         final_symptom_text = ", ".join(symptom_texts)
@@ -6,6 +6,7 @@
 import os
 import sys
 import json
+import asyncio
 from typing import Optional
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
@@ -14,11 +15,14 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from database.supabase_client import get_supabase_client
+from database.repositories import SymptomRepository, DrugRepository
 from app.utils.cache_manager import CacheManager
-try:
-    import google.genai as genai
-except ImportError:
-    import google.generativeai as genai
+from app.utils.disease_index import DiseaseIndex, EXACT_FIELDS, SIMILAR_FIELDS
+from app.utils.keyword_extractor import KeywordExtractor
+from app.utils.symptom_snapshot import SymptomDataSnapshot
+from app.utils.interaction_graph import InteractionGraph
+from app.services.recipe_backfill import RecipeBackfillQueue
+from app.utils.batch_llm import BatchLLMGenerator, LLMCall, gemini_json_call
 
 # DUR 서비스는 순환참조 방지를 위해 지연 임포트
 _dur_service = None
@@ -31,6 +35,27 @@ def _get_dur_service():
     return _dur_service
 
 
+# 레시피 묶음 생성 프롬프트 (증상 여러 개 → 증상별 레시피 2개)
+RECIPE_BATCH_INSTRUCTIONS = """
+Role: Culinary Therapist
+Task: For EACH symptom item below, create 2 healthy recipes helpful for that symptom.
+"""
+RECIPE_ITEM_SCHEMA = (
+    '"recipes": [{"title": "Recipe Title (Korean)", "description": "Brief description", '
+    '"meal_slot": "breakfast" | "lunch" | "dinner" | "tea" | "snack", '
+    '"rationale": "Why this helps (Korean)", "difficulty": "easy" | "medium" | "hard", '
+    '"tags": ["tag1", "tag2"]}]'
+)
+
+
+def _valid_recipe_entry(entry: dict) -> bool:
+    """증상별 출력에 제목 있는 레시피가 1개 이상인지"""
+    recipes = entry.get("recipes")
+    return isinstance(recipes, list) and any(
+        isinstance(r, dict) and r.get("title") for r in recipes
+    )
+
+
 @dataclass
 class Ingredient:
     """추천 식재료 정보"""
@@ -72,14 +97,46 @@ class AnalyzeService:
     """통합 분석 서비스"""
     
     def __init__(self):
-        self.db = get_supabase_client()
+        self.db = get_supabase_client()  # 인메모리 인덱스/스냅샷 로드용 (백그라운드 스레드)
         self.cache = CacheManager()  # ★ 캐시 매니저 추가
+        # 요청 경로 DB 조회는 비동기 저장소 사용 (이벤트 루프 차단 방지)
+        self.symptom_repo = SymptomRepository()
+        self.drug_repo = DrugRepository()
     
-    def _check_interactions(self, drug_names: list[str], ingredients: list[Ingredient]) -> list[str]:
+    def _start_dur_check(self, drug_names: Optional[list[str]]) -> Optional[asyncio.Task]:
+        """
+        DUR 병용금기 조회를 미리 시작 (증상 매칭·식재료·레시피 조회와 동시 진행)
+        이미 로드된 인메모리 그래프에 약물 관련 fact 가 하나도 없을 때만 시작합니다.
+        그래프가 답하는 약물이면 외부 API 를 호출하지 않고, 그래프가 아직 없으면
+        _check_interactions 에서 DB 결과를 본 뒤 필요할 때 조회합니다.
+        """
+        if not drug_names or len(drug_names) < 2:
+            return None
+        graph = InteractionGraph.shared()
+        if not graph.is_ready or any(graph.facts_for_drugs(drug_names).values()):
+            return None
+        return asyncio.create_task(self._dur_interactions(drug_names))
+
+    async def _dur_interactions(self, drug_names: list[str]) -> list[dict]:
+        """DUR API 약물-약물 병용금기 조회 (오류 시 빈 목록)"""
+        try:
+            return await _get_dur_service().check_interactions(drug_names)
+        except Exception as e:
+            print(f"Interaction check (DUR API) error: {e}")
+            return []
+
+    async def _check_interactions(
+        self,
+        drug_names: list[str],
+        ingredients: list[Ingredient],
+        dur_task: Optional[asyncio.Task] = None,
+    ) -> list[str]:
         """
         약물-식재료 상호작용 체크
         1차: Supabase interaction_facts 테이블
         2차: DUR API fallback (DB에 데이터 없을 때)
+
+        dur_task: _start_dur_check 로 미리 시작한 DUR 조회 (없으면 여기서 조회)
         """
         cautions = []
         if not drug_names or not ingredients:
@@ -96,41 +153,44 @@ class AnalyzeService:
         db_hit = False
 
         try:
-            for drug in drug_names:
-                result = self.db.table("interaction_facts").select("*").or_(
-                    f"a_ref.ilike.%{drug}%,"
-                    f"b_ref.ilike.%{drug}%"
-                ).execute()
-
-                if not result.data:
-                    continue
-
-                db_hit = True
-                for row in result.data:
-                    other = row['b_ref'] if drug in row['a_ref'] else row['a_ref']
-                    for ing in ing_names:
-                        if ing in other or other in ing:
-                            cautions.append(
-                                f"⚠️ [약물상호작용] '{drug}' + '{ing}' 주의: "
-                                f"{row.get('summary_ko', '')} ({row.get('severity', '주의')})"
-                            )
+            graph = await self._interaction_graph()
+            if graph is not None:
+                # 인메모리 그래프: 요청 약물·식재료 전체를 한 번에 매칭 (DB 호출 없음)
+                matches, db_hit = graph.check_drug_food(drug_names, list(ing_names))
+                for drug, ing, row in matches:
+                    cautions.append(
+                        f"⚠️ [약물상호작용] '{drug}' + '{ing}' 주의: "
+                        f"{row.get('summary_ko', '')} ({row.get('severity', '주의')})"
+                    )
+            else:
+                # 약물별 조회를 동시에 전송
+                rows_by_drug = await asyncio.gather(
+                    *(self.drug_repo.interaction_facts(drug) for drug in drug_names)
+                )
+                for drug, rows in zip(drug_names, rows_by_drug):
+                    if not rows:
+                        continue
+
+                    db_hit = True
+                    for row in rows:
+                        other = row['b_ref'] if drug in row['a_ref'] else row['a_ref']
+                        for ing in ing_names:
+                            if ing in other or other in ing:
+                                cautions.append(
+                                    f"⚠️ [약물상호작용] '{drug}' + '{ing}' 주의: "
+                                    f"{row.get('summary_ko', '')} ({row.get('severity', '주의')})"
+                                )
         except Exception as e:
             print(f"Interaction check (DB) error: {e}")
 
         # 2차: DB에 데이터 없으면 DUR API로 약물-약물 병용금기 확인
         if not db_hit and len(drug_names) >= 2:
+            own_task = dur_task is None
             try:
-                dur = _get_dur_service()
-                import asyncio
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # 이미 async 컨텍스트면 future 생성
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as pool:
-                        future = pool.submit(asyncio.run, dur.check_interactions(drug_names))
-                        dur_results = future.result(timeout=15)
-                else:
-                    dur_results = loop.run_until_complete(dur.check_interactions(drug_names))
+                if own_task:
+                    dur_task = asyncio.ensure_future(self._dur_interactions(drug_names))
+                # 15초 초과 시 경고 없이 진행 (미리 시작한 태스크는 analyze_symptom 종료 시 정리)
+                dur_results = await asyncio.wait_for(asyncio.shield(dur_task), timeout=15)
 
                 for item in dur_results:
                     icon = "🚫" if item["severity"] == "CONTRAINDICATED" else "⚠️"
@@ -140,6 +200,8 @@ class AnalyzeService:
                     )
             except Exception as e:
                 print(f"Interaction check (DUR API) error: {e}")
+                if own_task and not dur_task.done():
+                    dur_task.cancel()
 
         return list(set(cautions))
 
@@ -147,13 +209,15 @@ class AnalyzeService:
         """
         증상 텍스트를 분석하고 식재료를 추천합니다. (Wrapper with Global Error Handling)
         """
+        # DUR 병용금기 조회는 증상 매칭·식재료·레시피 조회와 동시에 진행
+        dur_task = self._start_dur_check(current_meds)
         try:
-            return await self._analyze_symptom_logic(symptom_text, current_meds)
+            return await self._analyze_symptom_logic(symptom_text, current_meds, dur_task)
         except Exception as e:
             print(f"CRITICAL ANALYZE ERROR: {e}")
             try:
                 # 최후의 수단: AI Fallback
-                return await self._analyze_with_ai(symptom_text, current_meds)
+                return await self._analyze_with_ai(symptom_text, current_meds, dur_task)
             except Exception as ai_e:
                 print(f"AI FALLBACK FAILED: {ai_e}")
                 import traceback
@@ -163,8 +227,16 @@ class AnalyzeService:
                     confidence_level="error",
                     source="error"
                 )
-
-    async def _analyze_symptom_logic(self, symptom_text: str, current_meds: list[str] = None) -> AnalysisResult:
+        finally:
+            if dur_task is not None and not dur_task.done():
+                dur_task.cancel()
+
+    async def _analyze_symptom_logic(
+        self,
+        symptom_text: str,
+        current_meds: list[str] = None,
+        dur_task: Optional[asyncio.Task] = None,
+    ) -> AnalysisResult:
         """
         증상 분석 핵심 로직
         """
@@ -222,25 +294,27 @@ class AnalyzeService:
                 print(f"⚠️ 캐시 복원 오류: {e}, 일반 분석 진행")
         
         # 1차: disease_master 정확 매칭
-        matched = self._search_exact_symptom(symptom_text)
+        matched = await self._search_exact_symptom(symptom_text)
         
         if matched:
-            ingredients = self._get_ingredients_from_db(matched["id"])
-            recipes = self._get_recipes_from_db(matched["id"])
+            ingredients, recipes = await asyncio.gather(
+                self._get_ingredients_from_db(matched["id"]),
+                self._get_recipes_from_db(matched["id"]),
+            )
             
             # 데이터 부족(식재료 없음) 시 AI Fallback
             if not ingredients and not recipes:
                 print(f"데이터 부족(정확매칭/식재료없음) -> AI 전환: {matched.get('modern_name_ko')}")
-                return await self._analyze_with_ai(symptom_text, current_meds)
+                return await self._analyze_with_ai(symptom_text, current_meds, dur_task)
 
-            # 레시피 부족 시 AI 자동 생성 및 저장
+            # 레시피 부족 시 AI 생성·저장을 백그라운드 예약 (응답은 식재료로 즉시 반환)
             if not recipes:
-                print(f"레시피 부족(정확매칭): {matched['modern_name_ko']} -> AI 생성 시도")
-                recipes = await self._generate_and_save_recipes(matched["id"], matched["modern_name_ko"])
+                print(f"레시피 부족(정확매칭): {matched['modern_name_ko']} -> AI 생성 예약")
+                self._queue_recipe_backfill(matched["id"], matched["modern_name_ko"])
                 
             cautions = []
             if current_meds:
-                cautions = self._check_interactions(current_meds, ingredients)
+                cautions = await self._check_interactions(current_meds, ingredients, dur_task)
 
             return AnalysisResult(
                 symptom_summary=f"{matched.get('modern_name_ko', matched.get('disease_read', ''))} 관련 증상입니다.",
@@ -254,25 +328,27 @@ class AnalyzeService:
             )
         
         # 2차: 유사 증상 검색 (aliases, 부분 매칭)
-        similar = self._search_similar_symptom(symptom_text)
+        similar = await self._search_similar_symptom(symptom_text)
         
         if similar:
-            ingredients = self._get_ingredients_from_db(similar["id"])
-            recipes = self._get_recipes_from_db(similar["id"])
+            ingredients, recipes = await asyncio.gather(
+                self._get_ingredients_from_db(similar["id"]),
+                self._get_recipes_from_db(similar["id"]),
+            )
             
             # 데이터 부족(식재료 없음) 시 AI Fallback
             if not ingredients and not recipes:
                 print(f"데이터 부족(유사매칭/식재료없음) -> AI 전환: {similar.get('modern_name_ko')}")
-                return await self._analyze_with_ai(symptom_text, current_meds)
+                return await self._analyze_with_ai(symptom_text, current_meds, dur_task)
 
-            # 레시피 부족 시 AI 자동 생성 및 저장
+            # 레시피 부족 시 AI 생성·저장을 백그라운드 예약 (응답은 식재료로 즉시 반환)
             if not recipes:
-                print(f"레시피 부족(유사매칭): {similar.get('modern_name_ko')} -> AI 생성 시도")
-                recipes = await self._generate_and_save_recipes(similar["id"], similar.get('modern_name_ko', symptom_text))
+                print(f"레시피 부족(유사매칭): {similar.get('modern_name_ko')} -> AI 생성 예약")
+                self._queue_recipe_backfill(similar["id"], similar.get('modern_name_ko', symptom_text))
 
             cautions = []
             if current_meds:
-                cautions = self._check_interactions(current_meds, ingredients)
+                cautions = await self._check_interactions(current_meds, ingredients, dur_task)
 
             return AnalysisResult(
                 symptom_summary=f"'{similar.get('modern_name_ko', '')}' 증상과 유사합니다.",
@@ -286,92 +362,129 @@ class AnalyzeService:
             )
         
         # 3차: AI Fallback (Gemini 호출)
-        return await self._analyze_with_ai(symptom_text, current_meds)
+        return await self._analyze_with_ai(symptom_text, current_meds, dur_task)
+
+    def _queue_recipe_backfill(self, symptom_id: int, symptom_name: str) -> bool:
+        """
+        레시피 생성을 RecipeBackfillQueue 에 예약 (symptom_id 단위 중복 제거)
+        생성된 레시피는 스냅샷에 반영되어 다음 요청부터 응답에 포함됩니다.
+        """
+        return RecipeBackfillQueue.shared().submit(symptom_id, symptom_name, self._generate_and_save_recipes)
 
     async def _generate_and_save_recipes(self, symptom_id: int, symptom_name: str) -> list[Recipe]:
         """
-        DB에 레시피가 없을 때 AI로 생성하여 DB에 저장하고 반환
+        DB에 레시피가 없을 때 AI로 생성하여 DB에 저장하고 반환 (RecipeBackfillQueue 에서 호출)
         """
-        try:
-            api_key = os.getenv("API_KEY")
-            if not api_key:
-                return []
+        generated = await self.generate_recipes_for_symptoms([(symptom_id, symptom_name)])
+        return generated.get(symptom_id, [])
+
+    async def generate_recipes_for_symptoms(
+        self,
+        symptoms: list[tuple[int, str]],
+        llm_call: Optional[LLMCall] = None,
+    ) -> dict[int, list[Recipe]]:
+        """
+        여러 증상의 레시피를 묶음 프롬프트로 생성하고 일괄 저장
 
-            client = genai.Client(api_key=api_key)
-            
-            prompt = f"""
-            Role: Culinary Therapist
-            Task: Create 2 healthy recipes helpful for the symptom: "{symptom_name}".
-            
-            Output Format: JSON string ONLY.
-            [
-                {{
-                    "title": "Recipe Title (Korean)",
-                    "description": "Brief description",
-                    "meal_slot": "breakfast" | "lunch" | "dinner" | "tea" | "snack",
-                    "rationale": "Why this helps (Korean)",
-                    "difficulty": "easy" | "medium" | "hard",
-                    "tags": ["tag1", "tag2"]
-                }}
-            ]
-            """
-            
-            response = await client.aio.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=prompt
+        - 토큰 예산 안에서 여러 증상을 한 번의 JSON 응답 호출로 생성 (BatchLLMGenerator)
+        - 누락·형식 오류 증상만 재시도
+        - recipes / symptom_recipe_map 각각 insert 1회, 스냅샷에 즉시 반영
+
+        Args:
+            symptoms: [(symptom_id, 증상명), ...]
+            llm_call: LLM 호출 함수 (없으면 Gemini JSON 모드)
+
+        Returns:
+            {symptom_id: [Recipe, ...]} (생성 실패 증상은 제외)
+        """
+        try:
+            llm_call = llm_call or gemini_json_call()
+            if llm_call is None or not symptoms:
+                return {}
+
+            batch = await BatchLLMGenerator(llm_call).run(
+                {symptom_id: f'"{name}"' for symptom_id, name in symptoms},
+                RECIPE_BATCH_INSTRUCTIONS,
+                RECIPE_ITEM_SCHEMA,
+                validate=_valid_recipe_entry,
             )
-            text_response = response.text.strip().replace("```json", "").replace("```", "")
-            data = json.loads(text_response)
-            
-            generated_recipes = []
-            
-            for item in data:
-                # 1. Insert into recipes table
-                recipe_data = {
-                    "title": item.get("title"),
-                    "description": item.get("description"),
-                    "difficulty": item.get("difficulty", "easy"),
-                    "tags": item.get("tags", []),
-                    "ingredients": [], # Placeholder
-                    "steps": []       # Placeholder
-                }
-                
-                # supabase insert and get id
-                # Note: supabase-py insert returns data if select() is chained or usually returns data by default in v2?
-                # Using execute() returns result.
-                res_recipe = self.db.table("recipes").insert(recipe_data).select("id").execute()
-                
-                if res_recipe.data:
-                    new_id = res_recipe.data[0]["id"]
-                    
-                    # 2. Insert into symptom_recipe_map
-                    map_data = {
-                        "symptom_id": symptom_id,
-                        "recipe_id": new_id,
-                        "rationale_ko": item.get("rationale"),
-                        "meal_slot": item.get("meal_slot", "anytime"),
-                        "priority": 80
+            if batch.failed:
+                print(f"레시피 생성 실패 증상: {batch.failed}")
+
+            # 1. recipes 일괄 저장
+            owners = []
+            recipe_rows = []
+            for symptom_id, _ in symptoms:
+                entry = batch.results.get(str(symptom_id))
+                if not entry:
+                    continue
+                titled = [r for r in entry["recipes"] if isinstance(r, dict) and r.get("title")]
+                for item in titled[:2]:
+                    owners.append((symptom_id, item))
+                    recipe_rows.append({
+                        "title": item.get("title"),
+                        "description": item.get("description"),
+                        "difficulty": item.get("difficulty", "easy"),
+                        "tags": item.get("tags", []),
+                        "ingredients": [],  # Placeholder
+                        "steps": []         # Placeholder
+                    })
+
+            inserted = await self.symptom_repo.insert_recipes(recipe_rows)
+            if len(inserted) != len(recipe_rows):
+                print(f"레시피 저장 결과 불일치: {len(inserted)}/{len(recipe_rows)}")
+                return {}
+
+            # 2. symptom_recipe_map 일괄 저장
+            generated: dict[int, list[Recipe]] = {}
+            map_rows = []
+            for (symptom_id, item), row in zip(owners, inserted):
+                map_rows.append({
+                    "symptom_id": symptom_id,
+                    "recipe_id": row["id"],
+                    "rationale_ko": item.get("rationale"),
+                    "meal_slot": item.get("meal_slot", "anytime"),
+                    "priority": 80
+                })
+                generated.setdefault(symptom_id, []).append(Recipe(
+                    id=row["id"],
+                    title=item.get("title"),
+                    description=item.get("description"),
+                    meal_slot=item.get("meal_slot", "anytime"),
+                    priority=80,
+                    rationale_ko=item.get("rationale"),
+                    tags=item.get("tags", [])
+                ))
+            await self.symptom_repo.insert_recipe_maps(map_rows)
+
+            # 스냅샷에 즉시 반영 (다음 요청에서 같은 증상 레시피 재생성 방지)
+            snapshot = SymptomDataSnapshot.shared()
+            for symptom_id, recipes in generated.items():
+                snapshot.add_recipes(symptom_id, [
+                    {
+                        "recipe_id": r.id,
+                        "title": r.title,
+                        "description": r.description,
+                        "tags": r.tags,
+                        "meal_slot": r.meal_slot,
+                        "priority": r.priority,
+                        "rationale_ko": r.rationale_ko,
                     }
-                    self.db.table("symptom_recipe_map").insert(map_data).execute()
-                    
-                    # Add to list
-                    generated_recipes.append(Recipe(
-                        id=new_id,
-                        title=item.get("title"),
-                        description=item.get("description"),
-                        meal_slot=item.get("meal_slot", "anytime"),
-                        priority=80,
-                        rationale_ko=item.get("rationale"),
-                        tags=item.get("tags", [])
-                    ))
-            
-            return generated_recipes
+                    for r in recipes
+                ])
+            print(f"레시피 생성/저장: {len(generated)}/{len(symptoms)} 증상, LLM 호출 {batch.calls}회")
+            return generated
 
         except Exception as e:
             print(f"레시피 생성/저장 실패: {e}")
-            return []
-
-    async def _analyze_with_ai(self, symptom_text: str, current_meds: list[str] = None) -> AnalysisResult:
+            return {}
+
+    async def _analyze_with_ai(
+        self,
+        symptom_text: str,
+        current_meds: list[str] = None,
+        dur_task: Optional[asyncio.Task] = None,
+    ) -> AnalysisResult:
         """Call Gemini to analyze symptom and recommend ingredients/recipes - 캐싱 적용"""
         import json
         
@@ -564,7 +677,7 @@ CRITICAL INSTRUCTION:
             
         cautions = []
         if current_meds:
-            cautions = self._check_interactions(current_meds, ingredients)
+            cautions = await self._check_interactions(current_meds, ingredients, dur_task)
 
         result = AnalysisResult(
             symptom_summary=data.get("summary", "AI 분석 결과입니다."),
@@ -592,124 +705,126 @@ CRITICAL INSTRUCTION:
         
         return result
     
-    def _search_exact_symptom(self, symptom_text: str) -> Optional[dict]:
+    async def _disease_index(self) -> Optional[DiseaseIndex]:
+        """disease_master 인메모리 인덱스 (로드 실패 시 None → DB ilike 검색)"""
+        index = DiseaseIndex.shared()
+        # 최초 로드(disease_master 전체 조회)는 이벤트 루프 밖에서
+        if not index.is_ready:
+            loaded = await asyncio.to_thread(index.ensure_loaded, self.db)
+        else:
+            loaded = index.ensure_loaded(self.db)
+        return index if loaded else None
+
+    async def _prefer_mapped(self, rows: list[dict]) -> dict:
+        """
+        여러 결과가 있으면 symptom_ingredient_map에 매핑이 있는 것 우선
+        인덱스의 매핑 집합으로 확인하고, 없으면 후보 전체를 한 번의 in_ 쿼리로 확인합니다.
+        """
+        mapped = DiseaseIndex.shared().mapped_ids
+        if mapped is None:
+            mapped = await self.symptom_repo.mapped_symptom_ids([row["id"] for row in rows])
+
+        for row in rows:
+            if row["id"] in mapped:
+                return row
+
+        # 매핑이 없으면 첫 번째 결과 반환
+        return rows[0]
+
+    async def _search_exact_symptom(self, symptom_text: str) -> Optional[dict]:
         """disease_master에서 정확 매칭 검색 (식재료 매핑이 있는 증상 우선)"""
         try:
-            # modern_name_ko 또는 disease_read로 검색
-            result = self.db.table("disease_master").select("*").or_(
-                f"modern_name_ko.ilike.%{symptom_text}%,"
-                f"disease_read.ilike.%{symptom_text}%,"
-                f"name_en.ilike.%{symptom_text}%"
-            ).limit(10).execute()
-            
-            if not result.data:
+            index = await self._disease_index()
+            if index is not None:
+                rows = index.search(symptom_text, EXACT_FIELDS, limit=10)
+            else:
+                # modern_name_ko / disease_read / name_en 으로 검색
+                rows = await self.symptom_repo.search_diseases(symptom_text, EXACT_FIELDS, limit=10)
+
+            if not rows:
                 return None
-            
-            # 여러 결과가 있으면 symptom_ingredient_map에 매핑이 있는 것 우선
-            for row in result.data:
-                map_check = self.db.table("symptom_ingredient_map").select(
-                    "id"
-                ).eq("symptom_id", row["id"]).limit(1).execute()
-                
-                if map_check.data:
-                    return row
-            
-            # 매핑이 없으면 첫 번째 결과 반환
-            return result.data[0]
+            return await self._prefer_mapped(rows)
         except Exception as e:
             print(f"정확 매칭 검색 오류: {e}")
             return None
     
-    def _search_similar_symptom(self, symptom_text: str) -> Optional[dict]:
+    async def _search_similar_symptom(self, symptom_text: str) -> Optional[dict]:
         """aliases 배열 또는 부분 매칭으로 유사 증상 검색 (식재료 매핑 있는 것 우선)"""
         try:
-            keywords = self._extract_keywords(symptom_text)
+            keywords = await self._extract_keywords(symptom_text)
+            index = await self._disease_index()
             
             for keyword in keywords:
-                # disease_read 필드도 검색에 추가
-                result = self.db.table("disease_master").select("*").or_(
-                    f"modern_name_ko.ilike.%{keyword}%,"
-                    f"disease_read.ilike.%{keyword}%,"
-                    f"disease_alias_read.ilike.%{keyword}%,"
-                    f"category.ilike.%{keyword}%"
-                ).limit(10).execute()
-                
-                if not result.data:
-                    continue
-                
-                # 여러 결과가 있으면 symptom_ingredient_map에 매핑이 있는 것 우선
-                for row in result.data:
-                    map_check = self.db.table("symptom_ingredient_map").select(
-                        "id"
-                    ).eq("symptom_id", row["id"]).limit(1).execute()
-                    
-                    if map_check.data:
-                        return row
+                if index is not None:
+                    rows = index.search(keyword, SIMILAR_FIELDS, limit=10)
+                else:
+                    # disease_read / disease_alias_read / category 도 검색
+                    rows = await self.symptom_repo.search_diseases(keyword, SIMILAR_FIELDS, limit=10)
                 
-                # 매핑이 없으면 첫 번째 결과 반환
-                return result.data[0]
+                if rows:
+                    return await self._prefer_mapped(rows)
+
+            # 부분 문자열 매칭 실패 시 n-gram 유사도 (오타·띄어쓰기 차이)
+            if index is not None:
+                for keyword in [k for k in keywords if len(k) >= 3]:
+                    fuzzy = index.fuzzy(keyword, SIMILAR_FIELDS, threshold=0.5, limit=10)
+                    if fuzzy:
+                        print(f"[AnalyzeService] 유사도 매칭: {keyword} → {fuzzy[0][0].get('modern_name_ko')} ({fuzzy[0][1]:.2f})")
+                        return await self._prefer_mapped([row for row, _ in fuzzy])
             
             return None
         except Exception as e:
             print(f"유사 검색 오류: {e}")
             return None
     
-    def _extract_keywords(self, text: str) -> list[str]:
-        """텍스트에서 핵심 키워드 추출"""
-        # 간단한 키워드 추출 (나중에 NLP로 개선 가능)
-        keywords = []
-        
-        # 흔한 증상 키워드 매핑 (사용자 입력 → DB 검색 키워드)
-        symptom_keywords = {
-            "불면": ["수면", "잠", "불면", "못 자", "안 자", "깨"],
-            "소화": ["소화", "위장", "더부룩", "체한", "소화불량", "속쓰림", "역류"],
-            "피로": ["피로", "지침", "기력", "힘이 없"],
-            "두통": ["두통", "머리", "편두통"],
-            "냉증": ["냉증", "손발", "차가", "냉한"],
-            "혈압": ["혈압", "고혈압", "저혈압"],
-            "당뇨": ["당뇨", "혈당"],
-            "호흡": ["호흡", "기침", "가래", "숨", "감기", "몸살", "비염"],
-            "변비": ["변비", "배변", "대변"],
-        }
-        
-        mapped_keywords = []
-        for db_keyword, input_patterns in symptom_keywords.items():
-            for pattern in input_patterns:
-                if pattern in text:
-                    mapped_keywords.append(db_keyword)
-                    break
-        
-        # 원본 텍스트 단어도 추가
-        words = text.replace("이", "").replace("가", "").replace("요", "").split()
-        other_keywords = [w for w in words if len(w) >= 2 and w not in mapped_keywords]
-        
-        # 중요 키워드 우선 검색
-        return list(dict.fromkeys(mapped_keywords + other_keywords))
-    
-    def _get_ingredients_from_db(self, symptom_id: int) -> list[Ingredient]:
+    async def _extract_keywords(self, text: str) -> list[str]:
+        """텍스트에서 핵심 키워드 추출 (증상명 > 동의어 대표어 > 조사 뗀 어절 순)"""
+        extractor = KeywordExtractor.shared()
+        # 최초 로드(DiseaseIndex 로드 + 오토마톤 구성)는 이벤트 루프 밖에서
+        if not extractor.is_ready:
+            await asyncio.to_thread(extractor.ensure_loaded, self.db)
+        else:
+            extractor.ensure_loaded(self.db)
+        return extractor.extract(text)
+
+    async def _symptom_snapshot(self) -> Optional[SymptomDataSnapshot]:
+        """증상→식재료/레시피 인메모리 스냅샷 (로드 실패 시 None → DB 조회)"""
+        snapshot = SymptomDataSnapshot.shared()
+        # 최초 로드(매핑·식재료·레시피 네 테이블 전체 조회)는 이벤트 루프 밖에서
+        if not snapshot.is_ready:
+            loaded = await asyncio.to_thread(snapshot.ensure_loaded, self.db)
+        else:
+            loaded = snapshot.ensure_loaded(self.db)
+        return snapshot if loaded else None
+
+    async def _get_ingredients_from_db(self, symptom_id: int) -> list[Ingredient]:
         """symptom_ingredient_map에서 추천 식재료 조회"""
+        snapshot = await self._symptom_snapshot()
+        if snapshot is not None:
+            return [
+                Ingredient(
+                    rep_code=row["rep_code"],
+                    modern_name=row["modern_name"],
+                    rationale_ko=row["rationale_ko"],
+                    direction=row["direction"],
+                    priority=row["priority"],
+                    evidence_level=row["evidence_level"],
+                )
+                for row in snapshot.ingredients(symptom_id, limit=3)
+            ]
+
         try:
             # 1. symptom_ingredient_map에서 식재료 매핑 조회
-            result = self.db.table("symptom_ingredient_map").select(
-                "rep_code, direction, rationale_ko, priority, evidence_level"
-            ).eq("symptom_id", symptom_id).order(
-                "priority", desc=True
-            ).limit(3).execute()
+            maps = await self.symptom_repo.ingredient_maps(symptom_id, limit=3)
             
-            if not result.data:
+            if not maps:
                 return []
             
-            # 2. rep_code들로 foods_master에서 이름 조회
-            rep_codes = [row["rep_code"] for row in result.data]
-            foods_result = self.db.table("foods_master").select(
-                "rep_code, modern_name"
-            ).in_("rep_code", rep_codes).execute()
-            
-            # rep_code -> modern_name 매핑
-            food_names = {f["rep_code"]: f["modern_name"] for f in foods_result.data}
+            # 2. rep_code들로 foods_master에서 이름 조회 (rep_code -> modern_name)
+            food_names = await self.symptom_repo.food_names([row["rep_code"] for row in maps])
             
             ingredients = []
-            for row in result.data:
+            for row in maps:
                 rep_code = row.get("rep_code", "")
                 ingredients.append(Ingredient(
                     rep_code=rep_code,
@@ -725,30 +840,35 @@ CRITICAL INSTRUCTION:
             print(f"식재료 조회 오류: {e}")
             return []
     
-    def _get_recipes_from_db(self, symptom_id: int) -> list[Recipe]:
+    async def _get_recipes_from_db(self, symptom_id: int) -> list[Recipe]:
         """symptom_recipe_map에서 추천 레시피 조회"""
+        snapshot = await self._symptom_snapshot()
+        if snapshot is not None:
+            return [
+                Recipe(
+                    id=row["recipe_id"],
+                    title=row["title"],
+                    description=row["description"],
+                    tags=row["tags"],
+                    meal_slot=row["meal_slot"],
+                    priority=row["priority"],
+                    rationale_ko=row["rationale_ko"],
+                )
+                for row in snapshot.recipes(symptom_id, limit=3)
+            ]
+
         try:
             # 1. 매핑 조회
-            result = self.db.table("symptom_recipe_map").select(
-                "recipe_id, meal_slot, priority, rationale_ko"
-            ).eq("symptom_id", symptom_id).order(
-                "priority", desc=True
-            ).limit(3).execute()
+            maps = await self.symptom_repo.recipe_maps(symptom_id, limit=3)
             
-            if not result.data:
+            if not maps:
                 return []
             
-            # 2. recipe_id로 recipes 테이블 조회
-            recipe_ids = [row["recipe_id"] for row in result.data]
-            recipes_result = self.db.table("recipes").select(
-                "id, title, description, tags"
-            ).in_("id", recipe_ids).execute()
-            
-            # id -> recipe info 매핑
-            recipe_map = {r["id"]: r for r in recipes_result.data}
+            # 2. recipe_id로 recipes 테이블 조회 (id -> recipe info)
+            recipe_map = await self.symptom_repo.recipes_by_ids([row["recipe_id"] for row in maps])
             
             recipes = []
-            for row in result.data:
+            for row in maps:
                 r_id = row["recipe_id"]
                 r_info = recipe_map.get(r_id, {})
                 
@@ -767,19 +887,33 @@ CRITICAL INSTRUCTION:
             print(f"레시피 조회 오류: {e}")
             return []
     
-    def get_cautions_for_drugs(self, drug_names: list[str]) -> list[str]:
+    async def _interaction_graph(self) -> Optional[InteractionGraph]:
+        """interaction_facts 인메모리 그래프 (로드 실패 시 None → DB 조회)"""
+        graph = InteractionGraph.shared()
+        # 최초 로드(interaction_facts 전체 조회 + 오토마톤 구성)는 이벤트 루프 밖에서
+        if not graph.is_ready:
+            loaded = await asyncio.to_thread(graph.ensure_loaded, self.db)
+        else:
+            loaded = graph.ensure_loaded(self.db)
+        return graph if loaded else None
+
+    async def get_cautions_for_drugs(self, drug_names: list[str]) -> list[str]:
         """약 이름으로 주의사항 조회"""
         cautions = []
         try:
-            for drug_name in drug_names:
-                result = self.db.table("interaction_facts").select(
-                    "summary_ko, action_ko, severity"
-                ).or_(
-                    f"a_ref.ilike.%{drug_name}%,"
-                    f"b_ref.ilike.%{drug_name}%"
-                ).limit(3).execute()
-                
-                for row in result.data:
+            graph = await self._interaction_graph()
+            if graph is not None:
+                for rows in graph.facts_for_drugs(drug_names).values():
+                    cautions.extend(row["summary_ko"] for row in rows[:3] if row.get("summary_ko"))
+                return cautions
+
+            # 약물별 조회를 동시에 전송 (비동기 저장소)
+            rows_by_drug = await asyncio.gather(*(
+                self.drug_repo.interaction_facts(drug_name, "summary_ko, action_ko, severity", limit=3)
+                for drug_name in drug_names
+            ))
+            for rows in rows_by_drug:
+                for row in rows:
                     if row.get("summary_ko"):
                         cautions.append(row["summary_ko"])
         except Exception as e:
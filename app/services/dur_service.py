@@ -17,6 +17,7 @@ Base URL: https://api.odcloud.kr/api/15089525/v1/uddi:3f2efdac-942b-494e-919f-8b
 """
 import os
 import asyncio
+import weakref
 import requests
 from typing import Optional
 from app.utils.cache_manager import CacheManager
@@ -37,6 +38,11 @@ SEVERITY_MAP = {
 }
 
 
+# 이벤트 루프별 진행 중인 약물 조회 (약물명 → Task)
+# 처방전 DUR 섹션과 AnalyzeService fallback 이 같은 약물을 동시에 조회해도 API 호출은 1회
+_inflight_drugs: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
 class DurService:
     """식약처 DUR 병용금기 조회 서비스"""
 
@@ -147,6 +153,17 @@ class DurService:
             print(f"[DurService] Cache HIT: {drug_name}")
             return cached
 
+        # 같은 약물을 동시에 조회하는 다른 호출과 결과 공유 (대기 측 취소는 조회를 멈추지 않음)
+        loop = asyncio.get_running_loop()
+        inflight = _inflight_drugs.setdefault(loop, {})
+        task = inflight.get(drug_name)
+        if task is None:
+            task = loop.create_task(self._fetch_and_cache(drug_name, cache_key))
+            inflight[drug_name] = task
+            task.add_done_callback(lambda _: inflight.pop(drug_name, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_cache(self, drug_name: str, cache_key: str) -> list[dict]:
         print(f"[DurService] API 조회: {drug_name}")
         # 동기 requests → asyncio thread executor
         result = await asyncio.to_thread(self._fetch_sync, drug_name)
@@ -6,7 +6,7 @@ import os
 import sys
 import asyncio
 import time
-from typing import Optional
+from typing import AsyncGenerator, Optional
 from dataclasses import dataclass, field, asdict
 from dotenv import load_dotenv
 
@@ -21,6 +21,9 @@ from app.utils.drug_validator import DrugValidator
 
 load_dotenv()
 
+# analyze 1회 안에서 동시에 진행하는 외부 조회(증상 분석 · 식재료 근거 · 약물 정보) 수 한도
+ANALYZE_CONCURRENCY = int(os.getenv("ANALYZE_CONCURRENCY", "8"))
+
 
 @dataclass
 class IngredientRecommendation:
@@ -88,11 +91,159 @@ class HealthStackAPI:
         Returns:
             HealthStackResponse: 통합 분석 결과
         """
+        combined_input, drug_names = self._prepare_input(
+            symptom_text, prescription_image_path, medications, user_id
+        )
+        
+        # 2~4. 증상 분석 → 식재료 근거 / 약물 상세 정보를 동시에 진행 (공유 동시 실행 한도)
+        # 약물 정보는 증상 분석 결과와 무관하므로 기다리지 않음 → 전체 지연 ≈ 가장 긴 갈래
+        limiter = asyncio.Semaphore(ANALYZE_CONCURRENCY)
+        real_drugs = self._rag_drugs(drug_names)
+
+        async def analyze_and_collect_evidence():
+            # ★ 개선: combined_input에는 OCR 원문이 포함되어 있음 (약물 정보 최대한 활용)
+            async with limiter:
+                analysis = await self.analyze_service.analyze_symptom(combined_input, drug_names)
+
+            # 각 식재료에 대해 PubMed 논문 + YouTube 영상 조회 (병렬 처리)
+            start_evidence = time.time()
+            recommendations = await self._fetch_evidence_parallel(
+                analysis.ingredients[:3],
+                analysis.matched_symptom_id,
+                limiter=limiter
+            )
+            elapsed_evidence = time.time() - start_evidence
+            print(f"[Evidence Collection] Completed in {elapsed_evidence:.2f}s (병렬 처리)")
+            return analysis, recommendations
+
+        start_analysis = time.time()
+        (analysis, ingredient_recommendations), medication_details = await asyncio.gather(
+            analyze_and_collect_evidence(),
+            self._fetch_drug_details(real_drugs, limiter=limiter),
+        )
+        print(f"[Analyze] Completed in {time.time() - start_analysis:.2f}s (증상·근거 / 약물 {len(real_drugs)}개 동시 진행)")
+        
+        return self._build_response(analysis, ingredient_recommendations, medication_details)
+
+    async def analyze_streaming(
+        self,
+        symptom_text: Optional[str] = None,
+        prescription_image_path: Optional[str] = None,
+        medications: list[str] = None,
+        user_id: Optional[str] = None
+    ) -> AsyncGenerator[dict, None]:
+        """
+        SSE 스트리밍용 2단계 분석 generator (이벤트 형식은 처방전 스트리밍과 동일)
+        1단계: 증상 분석이 끝나는 즉시 {"type":"analysis"} (요약·식재료·레시피·주의사항, 근거 없음)
+        2단계: 완료되는 순서대로 {"type":"evidence"} (식재료별 논문) / {"type":"video"} (식재료별 영상) /
+               {"type":"medication"} (약물별 상세 정보)
+        마지막에 {"type":"result","data": HealthStackResponse} — 엔드포인트가 기존 응답 형식으로 변환
+        """
+        yield {"type": "progress", "step": 1, "message": "증상 분석 중...", "progress": 15}
+        combined_input, drug_names = self._prepare_input(
+            symptom_text, prescription_image_path, medications, user_id
+        )
+
+        limiter = asyncio.Semaphore(ANALYZE_CONCURRENCY)
+        real_drugs = self._rag_drugs(drug_names)
+        # 약물 정보는 증상 분석을 기다리지 않고 바로 시작
+        drug_tasks = {
+            asyncio.create_task(self._drug_detail(drug, limiter)): ("medication", i)
+            for i, drug in enumerate(real_drugs)
+        }
+        pending = set(drug_tasks)
+
+        async def _analyze():
+            async with limiter:
+                return await self.analyze_service.analyze_symptom(combined_input, drug_names)
+
+        analysis_task = asyncio.create_task(_analyze())
+        try:
+            analysis = await analysis_task
+
+            # ── 1단계: 핵심 분석 결과 ─────────────────────────────
+            ingredients = analysis.ingredients[:3]
+            recommendations = [self._build_recommendation(ing, [], None) for ing in ingredients]
+            yield {
+                "type": "analysis",
+                "data": self._response_dict(self._build_response(analysis, [r for r in recommendations if r], [])),
+            }
+
+            # ── 2단계: 근거 · 영상 · 약물 정보 (완료 순) ─────────────
+            yield {"type": "progress", "step": 2, "message": "근거 논문·영상·약물 정보 조회 중...", "progress": 50}
+            paper_tasks = {
+                asyncio.create_task(
+                    self._ingredient_papers(ing, analysis.matched_symptom_id, limiter)
+                ): ("evidence", i)
+                for i, ing in enumerate(ingredients)
+            }
+            video_task = asyncio.create_task(
+                self._ingredient_videos(ingredients, analysis.matched_symptom_id, limiter)
+            )
+            labels = {**drug_tasks, **paper_tasks, video_task: ("video", None)}
+            pending |= set(paper_tasks) | {video_task}
+
+            papers_by_index: dict[int, list] = {}
+            videos: dict = {}
+            details: dict[int, dict] = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    kind, i = labels[task]
+                    if kind == "evidence":
+                        papers_by_index[i] = task.result()
+                        ing = ingredients[i]
+                        yield {"type": "evidence", "data": {
+                            "rep_code": ing.rep_code,
+                            "modern_name": ing.modern_name,
+                            "pubmed_papers": [self._paper_card(p) for p in papers_by_index[i][:2]],
+                        }}
+                    elif kind == "video":
+                        videos = task.result()
+                        for ing in ingredients:
+                            video = videos.get(ing.modern_name)
+                            yield {"type": "video", "data": {
+                                "rep_code": ing.rep_code,
+                                "modern_name": ing.modern_name,
+                                "youtube_video": self._video_card(video),
+                            }}
+                    else:
+                        detail = task.result()
+                        if detail is not None:
+                            details[i] = detail
+                            yield {"type": "medication", "data": detail}
+        finally:
+            # 클라이언트 연결 종료 시 남은 조회 정리
+            for task in [analysis_task, *pending]:
+                if not task.done():
+                    task.cancel()
+
+        recommendations = [
+            self._build_recommendation(ing, papers_by_index.get(i, []), videos.get(ing.modern_name))
+            for i, ing in enumerate(ingredients)
+        ]
+        yield {
+            "type": "result",
+            "data": self._build_response(
+                analysis,
+                [r for r in recommendations if r is not None],
+                [details[i] for i in sorted(details)],
+            ),
+        }
+
+    def _prepare_input(
+        self,
+        symptom_text: Optional[str],
+        prescription_image_path: Optional[str],
+        medications: Optional[list[str]],
+        user_id: Optional[str],
+    ) -> tuple[str, list[str]]:
+        """OCR 처리 후 (분석 입력 텍스트, 약물 목록)"""
         combined_input = symptom_text or ""
         drug_names = list(medications) if medications else []
         hospital_name = None
         ocr_full_text = ""
-        
+
         # 1. OCR 처리 (처방전 이미지가 있는 경우)
         if prescription_image_path:
             try:
@@ -142,42 +293,33 @@ class HealthStackAPI:
                 print(f"❌ OCR Processing Error: {e}")
                 import traceback
                 traceback.print_exc()
-        
-        # 2. 증상 분석 (약물 상호작용 포함)
-        # ★ 개선: combined_input에는 OCR 원문이 포함되어 있음 (약물 정보 최대한 활용)
-        analysis = await self.analyze_service.analyze_symptom(combined_input, drug_names)
-        
-        # 3. 각 식재료에 대해 PubMed 논문 + YouTube 영상 조회 (병렬 처리)
-        start_evidence = time.time()
-        ingredient_recommendations = await self._fetch_evidence_parallel(
-            analysis.ingredients[:3],
-            analysis.matched_symptom_id
-        )
-        elapsed_evidence = time.time() - start_evidence
-        print(f"[Evidence Collection] Completed in {elapsed_evidence:.2f}s (병렬 처리)")
-        
-        # 4. 약물 상세 정보 조회
-        medication_details = []
-        # OCR 원문이 아닌 실제 약물명만 RAG 검색
-        real_drugs = [d for d in drug_names if not d.startswith("[OCR")]
-        if real_drugs:
-            for drug in real_drugs[:5]:  # 최대 5개
-                try:
-                    info = await self.medication_service.get_drug_info(drug)
-                    medication_details.append(info)
-                except Exception as e:
-                    print(f"약물 정보 조회 실패: {drug} - {e}")
-        
+
+        return combined_input, drug_names
+
+    @staticmethod
+    def _rag_drugs(drug_names: list[str]) -> list[str]:
+        """OCR 원문이 아닌 실제 약물명만 RAG 검색 (최대 5개)"""
+        return [d for d in drug_names if not d.startswith("[OCR")][:5]
+
+    @staticmethod
+    def _build_response(
+        analysis: AnalysisResult, ingredients: list, medications: list[dict]
+    ) -> HealthStackResponse:
         return HealthStackResponse(
             symptom_summary=analysis.symptom_summary,
             confidence_level=analysis.confidence_level,
             source=analysis.source,
-            ingredients=ingredient_recommendations,
+            ingredients=ingredients,
             recipes=analysis.recipes,
             cautions=analysis.cautions,  # AnalyzeService에서 상호작용 체크 결과 반환
-            medications=medication_details,
+            medications=medications,
             matched_symptom_name=analysis.matched_symptom_name
         )
+
+    @staticmethod
+    def _response_dict(response: HealthStackResponse) -> dict:
+        """HealthStackResponse → JSON 직렬화 가능한 dict (Recipe · 식재료 dataclass 포함)"""
+        return asdict(response)
     
     def _extract_drug_names(self, texts: list[str]) -> list[str]:
         """OCR 텍스트에서 약 이름 추출 (강화 버전 - 한글 패턴 지원)"""
@@ -266,89 +408,123 @@ class HealthStackAPI:
         
         return normalized_results
     
-    async def _fetch_evidence_parallel(self, ingredients: list, matched_symptom_id: Optional[int]) -> list:
+    async def _drug_detail(self, drug: str, limiter: asyncio.Semaphore) -> Optional[dict]:
+        """약물 상세 정보(RAG) 1건 (실패 시 None)"""
+        async with limiter:
+            try:
+                return await self.medication_service.get_drug_info(drug)
+            except Exception as e:
+                print(f"약물 정보 조회 실패: {drug} - {e}")
+                return None
+
+    async def _fetch_drug_details(
+        self, drugs: list[str], limiter: Optional[asyncio.Semaphore] = None
+    ) -> list[dict]:
         """
-        ★ 병렬 처리 구현: PubMed + YouTube 동시 검색
-        각 식재료에 대해 논문과 영상을 동시에 검색하여 성능 최적화
+        약물 상세 정보(RAG) 동시 조회 — 입력 순서 유지, 실패한 약물은 제외
         """
-        async def fetch_ingredient_evidence(ing):
-            """단일 식재료에 대한 증거 자료 수집"""
-            try:
-                # 1. PubMed 논문 검색 (비동기)
+        limiter = limiter or asyncio.Semaphore(ANALYZE_CONCURRENCY)
+        results = await asyncio.gather(*[self._drug_detail(drug, limiter) for drug in drugs])
+        return [r for r in results if r is not None]
+
+    async def _ingredient_papers(
+        self, ing, matched_symptom_id: Optional[int], limiter: asyncio.Semaphore
+    ) -> list[PubMedPaper]:
+        """단일 식재료 PubMed 논문 검색 (실패 시 빈 목록)"""
+        try:
+            async with limiter:
                 papers = []
                 if matched_symptom_id:
                     papers = await self.pubmed_service.search_by_symptom_and_ingredient(
                         matched_symptom_id,
                         ing.rep_code
                     )
-                
+
                 if not papers:
                     query = f"{ing.modern_name} health benefit"
                     papers = await self.pubmed_service.search_papers(query, max_results=1)
-                
-                # 2. YouTube 영상 검색 (동기 → 논문 검색과 동시 실행)
-                video = None
-                if matched_symptom_id:
-                    video = self.youtube_service.get_video_for_symptom_ingredient(
-                        matched_symptom_id,
-                        ing.rep_code
-                    )
-                
-                if not video:
-                    videos = self.youtube_service.search_by_ingredient(ing.modern_name)
-                    video = videos[0] if videos else None
-                
-                # 3. 결과 조합
-                return IngredientRecommendation(
-                    rep_code=ing.rep_code,
-                    modern_name=ing.modern_name,
-                    rationale_ko=ing.rationale_ko,
-                    direction=ing.direction,
-                    evidence_level=ing.evidence_level,
-                    pubmed_papers=[
-                        {
-                            "pmid": p.pmid,
-                            "title": p.title,
-                            "journal": p.journal,
-                            "pub_year": p.pub_year,
-                            "url": p.url,
-                            "summary": p.abstract[:100] + "..." if p.abstract else ""
-                        }
-                        for p in papers[:2]
-                    ],
-                    youtube_video={
-                        "video_id": video.video_id,
-                        "title": video.title,
-                        "channel": video.channel,
-                        "thumbnail_url": video.thumbnail_url,
-                        "url": video.url
-                    } if video else None,
-                    tip=self._generate_tip(ing.modern_name)
+                return papers
+        except Exception as e:
+            print(f"[Evidence Fetch Error] {getattr(ing, 'modern_name', ing)} PubMed: {e}")
+            return []
+
+    async def _ingredient_videos(
+        self, ingredients: list, matched_symptom_id: Optional[int], limiter: asyncio.Semaphore
+    ) -> dict:
+        """전체 식재료 YouTube 영상 (매핑 영상 우선, 실패 시 빈 결과)"""
+        try:
+            async with limiter:
+                return await self.youtube_service.videos_for_ingredients(
+                    [ing.modern_name for ing in ingredients],
+                    matched_symptom_id
                 )
-            except Exception as e:
-                # 에러 발생 시에도 기본 정보는 반환
-                ing_name = ing.modern_name if hasattr(ing, 'modern_name') else str(ing)
-                print(f"[Evidence Fetch Error] {ing_name}: {e}")
-                
-                # 안전하게 기본값 반환
-                try:
-                    return IngredientRecommendation(
-                        rep_code=ing.rep_code,
-                        modern_name=ing.modern_name,
-                        rationale_ko=ing.rationale_ko,
-                        direction=ing.direction,
-                        evidence_level=ing.evidence_level,
-                        pubmed_papers=[],
-                        youtube_video=None,
-                        tip=self._generate_tip(ing.modern_name)
-                    )
-                except Exception as fallback_e:
-                    print(f"[Fallback Error] {fallback_e}")
-                    return None
+        except Exception as e:
+            print(f"[Evidence Fetch Error] YouTube: {e}")
+            return {}
+
+    @staticmethod
+    def _paper_card(p: PubMedPaper) -> dict:
+        return {
+            "pmid": p.pmid,
+            "title": p.title,
+            "journal": p.journal,
+            "pub_year": p.pub_year,
+            "url": p.url,
+            "summary": p.abstract[:100] + "..." if p.abstract else ""
+        }
+
+    @staticmethod
+    def _video_card(video: Optional[YouTubeVideo]) -> Optional[dict]:
+        return {
+            "video_id": video.video_id,
+            "title": video.title,
+            "channel": video.channel,
+            "thumbnail_url": video.thumbnail_url,
+            "url": video.url
+        } if video else None
+
+    def _build_recommendation(
+        self, ing, papers: list, video: Optional[YouTubeVideo]
+    ) -> Optional[IngredientRecommendation]:
+        """결과 조합 (실패 시 None)"""
+        try:
+            return IngredientRecommendation(
+                rep_code=ing.rep_code,
+                modern_name=ing.modern_name,
+                rationale_ko=ing.rationale_ko,
+                direction=ing.direction,
+                evidence_level=ing.evidence_level,
+                pubmed_papers=[self._paper_card(p) for p in papers[:2]],
+                youtube_video=self._video_card(video),
+                tip=self._generate_tip(ing.modern_name)
+            )
+        except Exception as e:
+            print(f"[Fallback Error] {e}")
+            return None
+
+    async def _fetch_evidence_parallel(
+        self,
+        ingredients: list,
+        matched_symptom_id: Optional[int],
+        limiter: Optional[asyncio.Semaphore] = None
+    ) -> list:
+        """
+        ★ 병렬 처리 구현: PubMed + YouTube 동시 검색
+        식재료별 PubMed 검색과 전체 식재료 YouTube 조회(캐시 in_ 쿼리 1회 + 미스만 API 동시 호출)를 함께 실행
+        (limiter: analyze 의 다른 갈래와 공유하는 동시 실행 한도)
+        """
+        limiter = limiter or asyncio.Semaphore(ANALYZE_CONCURRENCY)
         
-        # ★ 병렬 실행: 모든 식재료의 증거 자료를 동시에 수집
+        # ★ 병렬 실행: 식재료별 논문 검색과 YouTube 일괄 조회를 동시에 수집
         print(f"[Parallel Fetch] Starting evidence collection for {len(ingredients)} ingredients...")
-        results = await asyncio.gather(*[fetch_ingredient_evidence(ing) for ing in ingredients])
+        papers_list, videos = await asyncio.gather(
+            asyncio.gather(*[self._ingredient_papers(ing, matched_symptom_id, limiter) for ing in ingredients]),
+            self._ingredient_videos(ingredients, matched_symptom_id, limiter),
+        )
+        results = [
+            self._build_recommendation(ing, papers, videos.get(getattr(ing, "modern_name", None)))
+            for ing, papers in zip(ingredients, papers_list)
+        ]
         return [r for r in results if r is not None]  # None 값 필터링
     
     def _generate_tip(self, ingredient_name: str) -> str:
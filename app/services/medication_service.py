@@ -1,9 +1,14 @@
 import os
 import json
 import shutil
+import asyncio
+import hashlib
+import weakref
 from datetime import datetime
 from app.services.pubmed_service import PubMedService
 from app.utils.cache_manager import CacheManager
+from app.utils.context_builder import ContextSource, build_context
+from app.utils.drug_info_loader import drug_loader
 
 try:
     from google import genai
@@ -17,6 +22,16 @@ except Exception as e:
     genai = None
     print(f"Warning: Failed to configure GenAI: {e}")
 
+# 근거 검색 결과는 성분 단위, 요약은 입력 해시 단위라 내용이 바뀌면 키도 바뀜 → 요약은 길게 보관
+EVIDENCE_TTL_HOURS = 168
+SUMMARY_TTL_HOURS = 24 * 30
+
+# 요약 프롬프트 근거 문장 선택 기준 (효능 / 주의 / 팁 항목)
+DRUG_INFO_FOCUS = "mechanism efficacy indication treatment side effect adverse event warning interaction dose"
+
+# 이벤트 루프별 진행 중인 성분 검색 (성분 키 → Task)
+_inflight_evidence: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
 class MedicationService:
     def __init__(self):
         self.pubmed = PubMedService()
@@ -124,39 +139,30 @@ class MedicationService:
         return []
 
     async def get_drug_info(self, drug_name):
-        """약물 정보 RAG 검색 (PubMed + Gemini) - 캐싱 적용"""
+        """
+        약물 정보 RAG 검색 (PubMed + OpenAI) - 캐싱 적용
+        - 검색(PubMed) 결과: 대표 성분 기준 캐시 — 제품명이 달라도 성분이 같으면 공유
+        - 요약(LLM) 결과: 입력 프롬프트 해시 기준 캐시 — 근거 논문이 바뀔 때만 재생성
+        """
         print(f"[Drug Info] Searching: {drug_name}")
-        
-        # ★ 캐시 확인 (TTL: 7일)
-        cache_key = f"drug_info:{drug_name}"
-        cached_data = self.cache.get("drug_info", cache_key, ttl_hours=168)
-        if cached_data:
-            print(f"[Cache HIT] Returning cached drug info for: {drug_name}")
-            return cached_data
-        
-        print(f"[Cache MISS] Fetching fresh data for: {drug_name}")
-        
-        # 0. 영문 변환 (PubMed 검색용)
-        drug_name_en = await self.pubmed.translate_to_english(drug_name)
-        print(f"[Translation] {drug_name} -> {drug_name_en}")
 
-        # 1. PubMed 검색 (Retriever) - 영문명으로 검색 (최적화: max_results=1)
-        papers = await self.pubmed.search_papers(f"{drug_name_en} mechanism side effects", max_results=1)
+        # 1. PubMed 검색 (Retriever) - 성분 단위 캐시
+        ingredients = drug_loader.canonical_ingredients(drug_name)
+        papers = await self._retrieve_evidence(drug_name, ingredients)
 
+        model = "gpt-4o-mini"
         context = ""
         if papers:
-            context = "\n\n".join([f"Paper: {p.title}\nAbstract: {p.abstract}" for p in papers])
-
-        # 2. OpenAI 직접 사용 (Gemini 할당량 없음으로 스킵)
-        try:
-            import openai
-            openai_key = os.getenv("OPENAI_API_KEY")
-            if not openai_key:
-                raise ValueError("OPENAI_API_KEY not found")
-
-            client = openai.AsyncOpenAI(api_key=openai_key)
+            # 초록 전문 대신 효능·주의 관련 문장만 모델 예산 안에서 선택
+            built = build_context(
+                [ContextSource(f"Paper: {p['title']}", p.get("abstract") or "") for p in papers],
+                query=DRUG_INFO_FOCUS,
+                model=model,
+            )
+            context = built.text
+            print(f"[Drug Info] Context {built.original_tokens} → {built.tokens} tokens")
 
-            prompt = f"""약물명: {drug_name}
+        prompt = f"""약물명: {drug_name}
 
 아래 의학 논문을 참고하여 환자에게 약물 정보를 설명해주세요.
 
@@ -169,40 +175,103 @@ class MedicationService:
 3. 💡 팁: (복용 시 꿀팁)
 
 300자 이내로 핵심만 작성해주세요."""
+        request = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": "당신은 친절한 약사입니다. 환자에게 약물 정보를 쉽게 설명해주세요."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
 
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 친절한 약사입니다. 환자에게 약물 정보를 쉽게 설명해주세요."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+        # 2. 요약 캐시 (입력이 같으면 재생성하지 않음)
+        summary_key = hashlib.sha256(
+            json.dumps(request, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        info_text = self.cache.get("drug_summary", summary_key, ttl_hours=SUMMARY_TTL_HOURS)
+        if info_text:
+            print(f"[Cache HIT] Summary for: {drug_name}")
+        else:
+            # 3. OpenAI 직접 사용 (Gemini 할당량 없음으로 스킵)
+            try:
+                import openai
+                openai_key = os.getenv("OPENAI_API_KEY")
+                if not openai_key:
+                    raise ValueError("OPENAI_API_KEY not found")
 
-            info_text = response.choices[0].message.content
+                client = openai.AsyncOpenAI(api_key=openai_key)
+                response = await client.chat.completions.create(**request)
+                info_text = response.choices[0].message.content
 
-            result = {
-                "name": drug_name,
-                "info": info_text,
-                "papers": [{"title": p.title, "url": p.url} for p in papers]
-            }
+                self.cache.set(
+                    "drug_summary",
+                    summary_key,
+                    info_text,
+                    metadata={"drug_name": drug_name, "ingredients": ingredients,
+                              "pmids": [p["pmid"] for p in papers], "source": "openai"}
+                )
+                print(f"[OpenAI Direct Success] {drug_name}")
 
-            # 캐시에 저장
-            self.cache.set(
-                "drug_info",
-                cache_key,
-                result,
-                metadata={"drug_name_en": drug_name_en, "paper_count": len(papers), "source": "openai"}
-            )
+            except Exception as openai_error:
+                print(f"[OpenAI Direct Failed] {openai_error}")
+                return {
+                    "name": drug_name,
+                    "info": "정보를 불러오는 데 실패했습니다.",
+                    "papers": []
+                }
 
-            print(f"[OpenAI Direct Success] {drug_name}")
-            return result
+        return {
+            "name": drug_name,
+            "info": info_text,
+            "papers": [{"title": p["title"], "url": p["url"]} for p in papers]
+        }
 
-        except Exception as openai_error:
-            print(f"[OpenAI Direct Failed] {openai_error}")
-            return {
-                "name": drug_name,
-                "info": "정보를 불러오는 데 실패했습니다.",
-                "papers": []
-            }
+    async def _retrieve_evidence(self, drug_name: str, ingredients: list) -> list[dict]:
+        """
+        약물 근거 논문 검색 (대표 성분 기준 캐시, 동시 요청은 한 번만 검색)
+
+        Returns:
+            [{"pmid", "title", "abstract", "url"}, ...]
+        """
+        evidence_key = "+".join(ingredients) if ingredients else " ".join(drug_name.split())
+        cached = self.cache.get("drug_evidence", evidence_key, ttl_hours=EVIDENCE_TTL_HOURS)
+        if cached:
+            print(f"[Cache HIT] Evidence for: {drug_name} ({evidence_key})")
+            return cached
+
+        # 같은 성분을 동시에 조회하는 다른 요청(다른 제품명 포함)과 검색 공유
+        loop = asyncio.get_running_loop()
+        inflight = _inflight_evidence.setdefault(loop, {})
+        task = inflight.get(evidence_key)
+        if task is None:
+            task = loop.create_task(self._search_evidence(drug_name, ingredients, evidence_key))
+            inflight[evidence_key] = task
+            task.add_done_callback(lambda _: inflight.pop(evidence_key, None))
+        return await asyncio.shield(task)
+
+    async def _search_evidence(self, drug_name: str, ingredients: list, evidence_key: str) -> list[dict]:
+        print(f"[Cache MISS] Fetching evidence for: {evidence_key}")
+
+        # 0. 영문 변환 (PubMed 검색용) — 성분명 여러 개는 한 번에 번역
+        terms = ingredients or [drug_name]
+        translated = await self.pubmed.translate_terms(terms)
+        english = list(dict.fromkeys(translated[term] for term in terms))
+        print(f"[Translation] {evidence_key} -> {english}")
+
+        # 영문명으로 검색 (최적화: max_results=1)
+        subject = english[0] if len(english) == 1 else f"({' OR '.join(english)})"
+        papers = await self.pubmed.search_papers(f"{subject} mechanism side effects", max_results=1)
+
+        evidence = [
+            {"pmid": p.pmid, "title": p.title, "abstract": p.abstract, "url": p.url}
+            for p in papers
+        ]
+        if evidence:
+            self.cache.set(
+                "drug_evidence",
+                evidence_key,
+                evidence,
+                metadata={"drug_name": drug_name, "query_terms": english}
+            )
+        return evidence
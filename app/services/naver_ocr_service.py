@@ -11,6 +11,8 @@ import requests
 from typing import Optional
 from dotenv import load_dotenv
 
+from app.utils.ocr_cache import OcrResultCache
+
 load_dotenv()
 
 
@@ -23,6 +25,8 @@ class NaverOCRService:
         
         if not self.secret_key:
             raise ValueError("NAVER_OCR_SECRET_KEY 환경변수가 설정되지 않았습니다.")
+
+        self.ocr_cache = OcrResultCache()  # 이미지 해시 기반 OCR 캐시
     
     def _encode_image_to_base64(self, image_path: str) -> str:
         """이미지 파일을 Base64로 인코딩"""
@@ -165,6 +169,18 @@ class NaverOCRService:
         Returns:
             dict: 추출된 처방전 정보 (병원명, 약물 목록)
         """
+        # 같은 이미지(바이트·픽셀 정확 일치)는 캐시된 결과 재사용, 텍스트 없는 실패 결과는 캐시 안 함
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+        return self.ocr_cache.get_or_compute_sync(
+            "naver",
+            image_bytes,
+            lambda: self._extract_prescription_info_uncached(image_path),
+            cacheable=lambda result: bool(result.get("raw_texts")),
+        )
+
+    def _extract_prescription_info_uncached(self, image_path: str) -> dict:
+        """extract_prescription_info 본체 (Clova OCR 호출 + 파싱)"""
         # OCR 수행
         try:
             ocr_result = self.extract_text_from_image(image_path)
@@ -7,11 +7,22 @@
   Level A : DUR 병용금기 API (DurService) — 약물-약물 상호작용
   Level A : PubMed (MedicationService)   — 임상 논문 근거
   Fallback: Gemini AI                    — 위 데이터 없을 때
+
+응답 시간 예산 (deadline_s):
+  OCR 이후 단계(DUR / 약물정보 / 동의보감)는 남은 예산 안에서만 기다립니다.
+  시간 안에 끝나지 못한 단계는 취소되고 해당 섹션이 pendingSections에 기록되며,
+  continuationToken으로 /prescription/sections 에서 나중에 가져올 수 있습니다.
+
+배치 분석 (analyze_prescription_batch):
+  여러 장의 처방전을 동시에 OCR한 뒤 약물 합집합 기준으로 보강·DUR을 한 번만 수행합니다.
 """
 import os
 import json
+import time
+import math
 import base64
 import asyncio
+from dataclasses import dataclass, field
 from typing import Optional, AsyncGenerator
 
 from .medication_service import MedicationService
@@ -20,6 +31,9 @@ from .dur_service import DurService
 from .mfds_service import MfdsService, DrugLabel
 from .sim_pre_service import SimPreService
 from .tavily_service import TavilyService
+from app.utils.ocr_cache import OcrResultCache
+from app.utils.image_preprocessor import preprocess_for_vision
+from app.utils.stage_result_store import StageResultStore
 
 try:
     from google import genai
@@ -27,9 +41,65 @@ except ImportError:
     import google.generativeai as genai
 
 
+# 시간 예산 초과로 취소된 단계 표시용 sentinel
+_PENDING = object()
+
+# 배치 분석: 동시 OCR 호출 수 / 요청당 최대 이미지 수
+BATCH_OCR_CONCURRENCY = int(os.getenv("BATCH_OCR_CONCURRENCY", "3"))
+BATCH_MAX_IMAGES = 10
+
+# 약물정보(MFDS/PubMed/Tavily) 조회 대상: 처방 목록 앞쪽 약물 수
+EVIDENCE_DRUG_LIMIT = 3
+
+# 섹션 번호 (프론트 결과 화면 기준)
+SECTION_SUMMARY = "1"    # prescriptionSummary (DUR 경고 포함)
+SECTION_DRUGS = "2"      # drugDetails
+SECTION_ACADEMIC = "3"   # academicEvidence
+SECTION_LIFESTYLE = "4"  # lifestyleGuide
+SECTION_DONGUI = "5"     # donguibogam
+
+# 단계 결과 저장소 키 (on-demand 섹션 재사용)
+STAGE_DUR = "dur"             # list[str] DUR 경고
+STAGE_EVIDENCE = "evidence"   # DrugEvidence (약물별 by_drug 포함 — 조회 시 이번 목록의 대상으로 재조합)
+STAGE_ANALYSIS = "analysis"   # (AnalysisResult, SimPre 결과)
+
+
+@dataclass
+class DrugEvidence:
+    """Step 3 (MFDS → PubMed → Tavily) 조회 결과"""
+    details: list[dict] = field(default_factory=list)
+    papers: list[dict] = field(default_factory=list)
+    mfds_hit_count: int = 0
+    web_hit: bool = False
+    by_drug: dict[str, "DrugEvidence"] = field(default_factory=dict)  # 약물별 결과 (배치 분석용)
+
+    def add(self, drug: str, detail: dict, papers: list, mfds_hit: bool = False, web_hit: bool = False):
+        """약물 1건의 조회 결과를 누적"""
+        self.by_drug[drug] = DrugEvidence(
+            details=[detail], papers=list(papers),
+            mfds_hit_count=int(mfds_hit), web_hit=web_hit,
+        )
+        self.details.append(detail)
+        self.papers.extend(papers)
+        self.mfds_hit_count += int(mfds_hit)
+        self.web_hit = self.web_hit or web_hit
+
+    def subset(self, drug_list: list) -> "DrugEvidence":
+        """배치 분석에서 조회한 결과 중 처방전 1장에 해당하는 약물만 골라 재조합"""
+        result = DrugEvidence()
+        for drug in drug_list:
+            item = self.by_drug.get(drug)
+            if item:
+                result.add(drug, item.details[0], item.papers, bool(item.mfds_hit_count), item.web_hit)
+        return result
+
+
 class PrescriptionService:
     """처방전 이미지 분석 통합 서비스"""
 
+    # 요청마다 서비스가 새로 생성되므로 단계 결과는 클래스 수준에서 공유
+    stage_store = StageResultStore()
+
     def __init__(self):
         self.medication_service = MedicationService()   # PubMed RAG
         self.analyze_service = AnalyzeService()          # 동의보감/TKM
@@ -37,12 +107,18 @@ class PrescriptionService:
         self.mfds_service = MfdsService()                # 식약처 라벨 (Level A)
         self.sim_pre_service = SimPreService()           # 한국전통지식포털 유사처방 (Level TKM)
         self.tavily_service = TavilyService()            # 웹 검색 fallback (Level C)
+        self.ocr_cache = OcrResultCache()                # 이미지 해시 기반 OCR 캐시
 
-    async def analyze_prescription_image(self, image_bytes: bytes, mime_type: str) -> dict:
+    async def analyze_prescription_image(
+        self,
+        image_bytes: bytes,
+        mime_type: str,
+        deadline_s: Optional[float] = None,
+    ) -> dict:
         """Main entry point - with detailed error logging"""
         import traceback
         try:
-            return await self._analyze_prescription_image_impl(image_bytes, mime_type)
+            return await self._analyze_prescription_image_impl(image_bytes, mime_type, deadline_s)
         except Exception as e:
             import os
             error_file = os.path.join(os.getcwd(), "prescription_error.txt")
@@ -54,9 +130,12 @@ class PrescriptionService:
             print(f"[ERROR] Wrote error to {error_file}", flush=True)
             raise
 
-    async def _analyze_prescription_image_impl(self, image_bytes: bytes, mime_type: str) -> dict:
-        import sys
-        print("[TRACE] === Starting _analyze_prescription_image_impl ===", file=sys.stderr, flush=True)
+    async def _analyze_prescription_image_impl(
+        self,
+        image_bytes: bytes,
+        mime_type: str,
+        deadline_s: Optional[float] = None,
+    ) -> dict:
         """
         처방전 이미지를 분석하여 5-섹션 리포트를 반환합니다.
 
@@ -66,119 +145,309 @@ class PrescriptionService:
         4. PubMed RAG     → 임상 논문 근거 (MFDS 없을 때 fallback)
         5. AnalyzeService → 동의보감/식재료 매핑
         6. 결과 조합 반환
+
+        deadline_s: 요청 시작 기준 응답 예산(초). None이면 모든 단계를 끝까지 기다립니다.
         """
-        # ── Step 1: Gemini Vision OCR ──────────────────────────────
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+
+        # ── Step 1: Vision OCR (예산과 무관하게 완료 — 이미지 없이는 재개 불가) ──
         ocr_result = await self._extract_drugs_from_image(image_bytes, mime_type)
         drug_list = ocr_result.get("drugList", [])
         warnings = ocr_result.get("warnings", "")
 
-        # ── Step 2: DUR 병용금기 (약물 2개 이상) ───────────────────
-        if len(drug_list) >= 2:
-            try:
-                dur_interactions = await self.dur_service.check_interactions(drug_list)
-                if dur_interactions:
-                    dur_warnings = self.dur_service.format_warnings(dur_interactions)
-                    sep = " | " if warnings else ""
-                    warnings = warnings + sep + " | ".join(dur_warnings)
-            except Exception as e:
-                print(f"[PrescriptionService] DUR 조회 오류: {e}")
+        # ── Step 2~4: DUR / 약물정보 / 동의보감 동시 실행 ─────────────
+        dur_task = asyncio.create_task(self._get_dur_warnings(drug_list))
+        evidence_task = asyncio.create_task(self._collect_drug_evidence(drug_list))
+        analysis_task = asyncio.create_task(
+            self._run_tkm_analysis(drug_list, self._symptom_text(drug_list, warnings))
+        )
 
-        # ── Step 3: 식약처 라벨 + PubMed 병렬 조회 ────────────────
-        # Fallback chain: Level A (MFDS) → Level B (PubMed) → Level C (Tavily)
-        drug_details = []
-        all_papers = []
-        mfds_hit_count = 0
-        tavily_results: dict = {}
+        try:
+            dur_warnings = await self._await_stage(dur_task, deadline)
+            evidence = await self._await_stage(evidence_task, deadline)
+            analysis = await self._await_stage(analysis_task, deadline)
+        finally:
+            # 예산 초과·요청 취소 시 남은 단계 정리
+            for task in (dur_task, evidence_task, analysis_task):
+                if not task.done():
+                    task.cancel()
+
+        self._remember_stages(drug_list, dur_warnings, evidence, analysis)
+        return self._compose_report(drug_list, warnings, dur_warnings, evidence, analysis)
+
+    async def analyze_prescription_batch(
+        self,
+        images: list[tuple[bytes, str]],
+        deadline_s: Optional[float] = None,
+    ) -> dict:
+        """
+        처방전 여러 장을 한 번에 분석합니다 (약국·가족 계정 일괄 업로드).
+
+        1. OCR         → BATCH_OCR_CONCURRENCY 개씩 동시 실행
+        2. 약물 합집합 → 중복 제거 후 MFDS/PubMed/Tavily 를 약물당 1회만 조회
+        3. DUR         → 전체 복용 약물(합집합) 기준 1회 조회
+                         처방전 간 병용금기는 crossPrescriptionWarnings 로 별도 표시
+        4. 동의보감    → 같은 약물 구성의 처방전은 1회만 분석
+        5. 처방전별 5-섹션 리포트 조합 (단건 분석과 같은 형식)
+
+        Args:
+            images: [(image_bytes, mime_type), ...]
+            deadline_s: OCR 이후 단계 응답 예산(초)
+        """
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+
+        # ── Step 1: OCR (동시 호출 수 제한) ────────────────────────
+        limiter = asyncio.Semaphore(BATCH_OCR_CONCURRENCY)
+
+        async def _ocr(image_bytes: bytes, mime_type: str) -> dict:
+            async with limiter:
+                return await self._extract_drugs_from_image(image_bytes, mime_type)
+
+        ocr_results = await asyncio.gather(*[_ocr(b, m) for b, m in images])
+        drug_lists = [r.get("drugList", []) for r in ocr_results]
+        warnings_list = [r.get("warnings", "") for r in ocr_results]
+
+        # ── Step 2: 약물 합집합 (입력 순서 유지) ────────────────────
+        all_drugs = list(dict.fromkeys(d for drugs in drug_lists for d in drugs))
+        # 단건 분석과 같은 기준(처방전당 앞 3개)으로 조회 대상 선정
+        evidence_targets = list(dict.fromkeys(d for drugs in drug_lists for d in drugs[:3]))
+        print(
+            f"[PrescriptionService] 배치 {len(images)}장 — "
+            f"약물 {sum(len(d) for d in drug_lists)}건 → 고유 {len(all_drugs)}종"
+        )
 
-        if drug_list:
-            targets = drug_list[:3]
+        # ── Step 3~4: DUR / 약물정보 / 동의보감 동시 실행 ─────────────
+        dur_task = asyncio.create_task(self._get_dur_interactions(all_drugs))
+        evidence_task = asyncio.create_task(
+            self._collect_drug_evidence(evidence_targets, limit=None)
+        )
+        analysis_tasks: dict[tuple, asyncio.Task] = {}
+        for drugs, warnings in zip(drug_lists, warnings_list):
+            symptom_text = self._symptom_text(drugs, warnings)
+            key = (tuple(drugs), symptom_text)
+            if key not in analysis_tasks:
+                analysis_tasks[key] = asyncio.create_task(
+                    self._run_tkm_analysis(drugs, symptom_text)
+                )
 
-            # 식약처 & PubMed 동시 조회
-            mfds_task = self.mfds_service.get_drug_labels_bulk(targets)
-            pubmed_tasks = [
-                self.medication_service.get_drug_info(drug) for drug in targets
-            ]
-            mfds_labels, *pubmed_results_raw = await asyncio.gather(
-                mfds_task, *pubmed_tasks, return_exceptions=True
+        try:
+            interactions = await self._await_stage(dur_task, deadline)
+            evidence = await self._await_stage(evidence_task, deadline)
+            analyses = {
+                key: await self._await_stage(task, deadline)
+                for key, task in analysis_tasks.items()
+            }
+        finally:
+            for task in (dur_task, evidence_task, *analysis_tasks.values()):
+                if not task.done():
+                    task.cancel()
+
+        # ── Step 5: 처방전별 리포트 ─────────────────────────────────
+        reports = []
+        cross_interactions = [] if interactions is _PENDING else list(interactions)
+        for index, (drugs, warnings) in enumerate(zip(drug_lists, warnings_list)):
+            if interactions is _PENDING:
+                dur_warnings = _PENDING
+            else:
+                own = [
+                    item for item in interactions
+                    if item["drug_a"] in drugs and item["drug_b"] in drugs
+                ]
+                cross_interactions = [item for item in cross_interactions if item not in own]
+                dur_warnings = self.dur_service.format_warnings(own)
+
+            image_evidence = evidence if evidence is _PENDING else evidence.subset(drugs[:3])
+            analysis = analyses[(tuple(drugs), self._symptom_text(drugs, warnings))]
+            self._remember_stages(drugs, dur_warnings, image_evidence, analysis)
+            report = self._compose_report(drugs, warnings, dur_warnings, image_evidence, analysis)
+            reports.append({"index": index, **report})
+
+        result = {
+            "reports": reports,
+            "combinedDrugList": all_drugs,
+            "combinedDurWarnings": (
+                [] if interactions is _PENDING
+                else self.dur_service.format_warnings(interactions)
+            ),
+            "crossPrescriptionWarnings": self.dur_service.format_warnings(cross_interactions),
+        }
+        if interactions is _PENDING and len(all_drugs) >= 2:
+            result["pendingSections"] = [SECTION_SUMMARY]
+            result["continuationToken"] = self.encode_continuation_token(
+                all_drugs, {SECTION_SUMMARY}
             )
+        return result
 
-            # gather 예외 처리 — mfds_labels 가 Exception이면 빈 dict
-            if isinstance(mfds_labels, Exception):
-                print(f"[PrescriptionService] MFDS bulk 오류: {mfds_labels}")
-                mfds_labels = {}
-
-            # MFDS/PubMed 둘 다 없는 약물만 Tavily로 보완
-            tavily_needed = []
-            for drug, pubmed_raw in zip(targets, pubmed_results_raw):
-                label: Optional[DrugLabel] = mfds_labels.get(drug)
-                has_pubmed = (
-                    not isinstance(pubmed_raw, Exception)
-                    and bool(pubmed_raw.get("info") or pubmed_raw.get("papers"))
-                )
-                if not label and not has_pubmed:
-                    tavily_needed.append(drug)
-
-            tavily_results: dict = {}
-            if tavily_needed:
-                try:
-                    tavily_results = await self.tavily_service.search_bulk(tavily_needed)
-                except Exception as e:
-                    print(f"[PrescriptionService] Tavily bulk 오류: {e}")
-
-            for drug, pubmed_raw in zip(targets, pubmed_results_raw):
-                label: Optional[DrugLabel] = mfds_labels.get(drug)
-
-                if label:
-                    # ── Level A: 식약처 데이터 ──────────────────
-                    mfds_hit_count += 1
-                    detail = self.mfds_service.to_drug_detail(label)
-                    drug_details.append({
-                        "name":        detail["name"],
-                        "efficacy":    detail["efficacy"],
-                        "sideEffects": detail["sideEffects"],
-                    })
-                    # PubMed 논문은 academicEvidence 용으로만 수집
-                    if not isinstance(pubmed_raw, Exception):
-                        all_papers.extend(pubmed_raw.get("papers", []))
-
-                elif not isinstance(pubmed_raw, Exception) and (
-                    pubmed_raw.get("info") or pubmed_raw.get("papers")
-                ):
-                    # ── Level B: PubMed fallback ─────────────────
-                    info_text = pubmed_raw.get("info", "")
-                    papers = pubmed_raw.get("papers", [])
-                    all_papers.extend(papers)
-                    drug_details.append({
-                        "name":        drug,
-                        "efficacy":    self._extract_section(info_text, "효능"),
-                        "sideEffects": self._extract_section(info_text, "주의"),
-                    })
-
-                elif drug in tavily_results and tavily_results[drug]:
-                    # ── Level C: Tavily 웹 검색 fallback ─────────
-                    web_info = tavily_results[drug]
-                    detail = TavilyService.to_drug_detail(web_info)
-                    all_papers.extend(TavilyService.to_papers(web_info))
-                    drug_details.append({
-                        "name":        detail["name"],
-                        "efficacy":    detail["efficacy"],
-                        "sideEffects": detail["sideEffects"],
-                    })
-                    print(f"[PrescriptionService] Tavily 보완: {drug}")
+    # ──────────────────────────────────────────────────────────────
+    # Stage helpers
+    # ──────────────────────────────────────────────────────────────
 
-                else:
-                    # ── 모든 소스 실패 ────────────────────────────
-                    drug_details.append({
-                        "name":        drug,
-                        "efficacy":    "정보를 가져오지 못했습니다.",
-                        "sideEffects": "",
-                    })
+    @staticmethod
+    async def _await_stage(aw, deadline: Optional[float]):
+        """
+        남은 시간 예산 안에서 단계 결과를 기다립니다.
+        예산을 넘기면 단계를 취소하고 _PENDING 을 반환합니다.
+        """
+        if deadline is None:
+            return await aw
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if isinstance(aw, asyncio.Future):
+                aw.cancel()
+            else:
+                aw.close()
+            return _PENDING
+        try:
+            return await asyncio.wait_for(aw, timeout=remaining)
+        except asyncio.TimeoutError:
+            return _PENDING
 
-        # ── Step 4: 동의보감/TKM 분석 + 유사처방 조회 (병렬) ────────
-        symptom_text = (
+    def _remember_stages(self, drug_list: list, dur_warnings, evidence, analysis) -> None:
+        """
+        완료된 단계 결과를 저장소에 기록 (pending·실패 단계는 제외)
+        이후 fetch_optional_sections 가 같은 약물 목록에 대해 그대로 재사용합니다.
+        """
+        if not drug_list:
+            return
+        if dur_warnings is not _PENDING:
+            self.stage_store.put(drug_list, STAGE_DUR, dur_warnings)
+        if evidence is not _PENDING:
+            self.stage_store.put(drug_list, STAGE_EVIDENCE, evidence)
+        if analysis is not _PENDING and analysis[0] is not None:
+            self.stage_store.put(drug_list, STAGE_ANALYSIS, analysis)
+
+    def _stored_stage(self, drug_list: list, stage: str):
+        """
+        저장된 단계 결과 조회 (없으면 None)
+        저장소 키는 약물 집합이지만 약물정보 단계는 목록 앞쪽 EVIDENCE_DRUG_LIMIT 개만 조회하므로,
+        저장된 약물별 결과(by_drug)로 이번 목록의 대상 약물을 순서대로 재조합합니다.
+        대상 약물 중 저장되지 않은 것이 있으면 미스로 처리합니다.
+        """
+        stored = self.stage_store.get(drug_list, stage)
+        if stage != STAGE_EVIDENCE or stored is None:
+            return stored
+        targets = drug_list[:EVIDENCE_DRUG_LIMIT]
+        if any(drug not in stored.by_drug for drug in targets):
+            return None
+        return stored.subset(targets)
+
+    @staticmethod
+    def _symptom_text(drug_list: list, warnings: str = "") -> str:
+        """AnalyzeService 입력 텍스트 (약물 기반 증상 추론)"""
+        return (
             f"복용 약물: {', '.join(drug_list)}" if drug_list
             else warnings or "처방 분석"
         )
+
+    async def _get_dur_interactions(self, drug_list: list) -> list[dict]:
+        """Step 2: DUR 병용금기 쌍 조회 (약물 2개 이상)"""
+        if len(drug_list) < 2:
+            return []
+        try:
+            return await self.dur_service.check_interactions(drug_list) or []
+        except Exception as e:
+            print(f"[PrescriptionService] DUR 조회 오류: {e}")
+        return []
+
+    async def _get_dur_warnings(self, drug_list: list) -> list[str]:
+        """Step 2: DUR 병용금기 경고 문자열"""
+        return self.dur_service.format_warnings(await self._get_dur_interactions(drug_list))
+
+    async def _collect_drug_evidence(
+        self, drug_list: list, limit: Optional[int] = EVIDENCE_DRUG_LIMIT
+    ) -> DrugEvidence:
+        """
+        Step 3: 식약처 라벨 + PubMed 병렬 조회
+        Fallback chain: Level A (MFDS) → Level B (PubMed) → Level C (Tavily)
+
+        limit: 조회할 앞쪽 약물 수 (None이면 전체 — 배치 분석에서 이미 선별한 목록)
+        """
+        evidence = DrugEvidence()
+        if not drug_list:
+            return evidence
+
+        targets = drug_list[:limit] if limit else list(drug_list)
+
+        # 식약처 & PubMed 동시 조회
+        mfds_task = self.mfds_service.get_drug_labels_bulk(targets)
+        pubmed_tasks = [
+            self.medication_service.get_drug_info(drug) for drug in targets
+        ]
+        mfds_labels, *pubmed_results_raw = await asyncio.gather(
+            mfds_task, *pubmed_tasks, return_exceptions=True
+        )
+
+        # gather 예외 처리 — mfds_labels 가 Exception이면 빈 dict
+        if isinstance(mfds_labels, Exception):
+            print(f"[PrescriptionService] MFDS bulk 오류: {mfds_labels}")
+            mfds_labels = {}
+
+        # MFDS/PubMed 둘 다 없는 약물만 Tavily로 보완
+        tavily_needed = []
+        for drug, pubmed_raw in zip(targets, pubmed_results_raw):
+            label: Optional[DrugLabel] = mfds_labels.get(drug)
+            has_pubmed = (
+                not isinstance(pubmed_raw, Exception)
+                and bool(pubmed_raw.get("info") or pubmed_raw.get("papers"))
+            )
+            if not label and not has_pubmed:
+                tavily_needed.append(drug)
+
+        tavily_results: dict = {}
+        if tavily_needed:
+            try:
+                tavily_results = await self.tavily_service.search_bulk(tavily_needed)
+            except Exception as e:
+                print(f"[PrescriptionService] Tavily bulk 오류: {e}")
+
+        for drug, pubmed_raw in zip(targets, pubmed_results_raw):
+            label: Optional[DrugLabel] = mfds_labels.get(drug)
+
+            if label:
+                # ── Level A: 식약처 데이터 ──────────────────
+                detail = self.mfds_service.to_drug_detail(label)
+                # PubMed 논문은 academicEvidence 용으로만 수집
+                papers = [] if isinstance(pubmed_raw, Exception) else pubmed_raw.get("papers", [])
+                evidence.add(drug, {
+                    "name":        detail["name"],
+                    "efficacy":    detail["efficacy"],
+                    "sideEffects": detail["sideEffects"],
+                }, papers, mfds_hit=True)
+
+            elif not isinstance(pubmed_raw, Exception) and (
+                pubmed_raw.get("info") or pubmed_raw.get("papers")
+            ):
+                # ── Level B: PubMed fallback ─────────────────
+                info_text = pubmed_raw.get("info", "")
+                evidence.add(drug, {
+                    "name":        drug,
+                    "efficacy":    self._extract_section(info_text, "효능"),
+                    "sideEffects": self._extract_section(info_text, "주의"),
+                }, pubmed_raw.get("papers", []))
+
+            elif drug in tavily_results and tavily_results[drug]:
+                # ── Level C: Tavily 웹 검색 fallback ─────────
+                web_info = tavily_results[drug]
+                detail = TavilyService.to_drug_detail(web_info)
+                evidence.add(drug, {
+                    "name":        detail["name"],
+                    "efficacy":    detail["efficacy"],
+                    "sideEffects": detail["sideEffects"],
+                }, TavilyService.to_papers(web_info), web_hit=True)
+                print(f"[PrescriptionService] Tavily 보완: {drug}")
+
+            else:
+                # ── 모든 소스 실패 ────────────────────────────
+                evidence.add(drug, {
+                    "name":        drug,
+                    "efficacy":    "정보를 가져오지 못했습니다.",
+                    "sideEffects": "",
+                }, [])
+
+        return evidence
+
+    async def _run_tkm_analysis(self, drug_list: list, symptom_text: str) -> tuple:
+        """Step 4: 동의보감/TKM 분석 + 유사처방 조회 (병렬)"""
         analysis_result, sim_pre_result = await asyncio.gather(
             self.analyze_service.analyze_symptom(symptom_text, current_meds=drug_list),
             self.sim_pre_service.search_by_drugs(drug_list, num_rows=3),
@@ -190,15 +459,69 @@ class PrescriptionService:
         if isinstance(sim_pre_result, Exception):
             print(f"[PrescriptionService] SimPreService 오류: {sim_pre_result}")
             sim_pre_result = None
+        return analysis_result, sim_pre_result
+
+    # ──────────────────────────────────────────────────────────────
+    # Section builders
+    # ──────────────────────────────────────────────────────────────
+
+    def _compose_report(self, drug_list: list, warnings: str, dur_warnings, evidence, analysis) -> dict:
+        """
+        단계 결과를 5-섹션 리포트로 조합합니다.
+        _PENDING 인 단계에 의존하는 섹션은 pendingSections 에 기록합니다.
+        """
+        pending: set[str] = set()
+        if dur_warnings is _PENDING:
+            pending.add(SECTION_SUMMARY)
+            dur_warnings = []
+        if evidence is _PENDING:
+            pending |= {SECTION_DRUGS, SECTION_ACADEMIC}
+            evidence = DrugEvidence()
+        if analysis is _PENDING:
+            pending |= {SECTION_ACADEMIC, SECTION_LIFESTYLE, SECTION_DONGUI}
+            analysis = (None, None)
+        analysis_result, sim_pre_result = analysis
+
+        report = {
+            "prescriptionSummary": self._build_summary(drug_list, warnings, dur_warnings),
+            "drugDetails": evidence.details,
+            "academicEvidence": self._build_academic_evidence(evidence, analysis_result),
+            "lifestyleGuide": self._build_lifestyle_guide(analysis_result, drug_list),
+            "donguibogam": self._build_donguibogam(analysis_result, sim_pre_result),
+        }
+
+        if pending and drug_list:
+            report["pendingSections"] = sorted(pending)
+            report["continuationToken"] = self.encode_continuation_token(drug_list, pending)
+            print(f"[PrescriptionService] 시간 예산 초과 — pending 섹션: {sorted(pending)}")
+
+        return report
 
-        # ── Step 5: 학술 근거 요약 ────────────────────────────────
-        # 신뢰도: A(식약처) → B(PubMed) → C(Tavily 웹) → C(AI)
+    @staticmethod
+    def _build_summary(drug_list: list, warnings: str, dur_warnings: list) -> dict:
+        """Section 1: 처방 요약 — OCR 주의사항 + DUR 병용금기 경고를 warnings 한 줄로"""
+        if dur_warnings:
+            sep = " | " if warnings else ""
+            warnings = warnings + sep + " | ".join(dur_warnings)
+
+        default_warning = (
+            f"복용 약물 {len(drug_list)}종 분석 완료. "
+            "복약 중 이상 증상 시 의사·약사와 상담하세요."
+            if drug_list else "처방전 분석이 완료되었습니다."
+        )
+        return {
+            "drugList": drug_list,
+            "warnings": warnings or default_warning,
+        }
+
+    def _build_academic_evidence(self, evidence: DrugEvidence, analysis_result) -> dict:
+        """Section 3: 학술 근거 요약 — 신뢰도: A(식약처) → B(PubMed) → C(Tavily 웹) → C(AI)"""
         symptom_summary = analysis_result.symptom_summary if analysis_result else ""
-        if mfds_hit_count > 0:
+        if evidence.mfds_hit_count > 0:
             trust_level = "A"
-        elif all_papers:
+        elif evidence.papers:
             trust_level = "B"
-        elif tavily_results:
+        elif evidence.web_hit:
             trust_level = "C"
         else:
             trust_level = (
@@ -206,8 +529,8 @@ class PrescriptionService:
                 .get(analysis_result.source if analysis_result else "", "C")
             )
 
-        paper_titles = [p.get("title", "") for p in all_papers[:3] if p.get("title")]
-        if paper_titles and mfds_hit_count > 0:
+        paper_titles = [p.get("title", "") for p in evidence.papers[:3] if p.get("title")]
+        if paper_titles and evidence.mfds_hit_count > 0:
             academic_summary = (
                 f"식약처 공인 정보 + PubMed 논문 {len(paper_titles)}편 분석 결과: "
                 f"{symptom_summary}"
@@ -218,16 +541,27 @@ class PrescriptionService:
                 f"{symptom_summary}"
             )
         else:
-            academic_summary = symptom_summary
+            academic_summary = symptom_summary or "약물 정보를 분석하였습니다."
 
-        # ── Step 6: 동의보감 식재료 ────────────────────────────────
-        import sys
-        print(f"[TRACE] Step 6: Processing ingredients. analysis_result type: {type(analysis_result)}", file=sys.stderr, flush=True)
-        if analysis_result:
-            print(f"[TRACE] Number of ingredients: {len(analysis_result.ingredients)}", file=sys.stderr, flush=True)
-            if analysis_result.ingredients:
-                print(f"[TRACE] First ingredient type: {type(analysis_result.ingredients[0])}", file=sys.stderr, flush=True)
+        return {
+            "summary":    academic_summary,
+            "trustLevel": trust_level,
+            "papers": [
+                {"title": p.get("title", ""), "url": p.get("url", "")}
+                for p in evidence.papers[:3]
+            ],
+        }
+
+    def _build_lifestyle_guide(self, analysis_result, drug_list: list) -> dict:
+        """Section 4: 생활 가이드"""
+        matched_name = analysis_result.matched_symptom_name if analysis_result else None
+        return {
+            "symptomTokens": [t for t in (matched_name or "").split() if len(t) >= 2],
+            "advice":        self._build_lifestyle_advice(analysis_result, drug_list),
+        }
 
+    def _build_donguibogam(self, analysis_result, sim_pre_result) -> dict:
+        """Section 5: 동의보감 식재료 + 유사처방 (SimPre)"""
         foods = []
         if analysis_result:
             for ing in analysis_result.ingredients:
@@ -261,56 +595,86 @@ class PrescriptionService:
             if matched_name
             else "처방약 기반 동의보감 권장 식재료"
         )
-
-        lifestyle_advice = self._build_lifestyle_advice(analysis_result, drug_list)
-        symptom_tokens = [
-            t for t in (matched_name or "").split()
-            if len(t) >= 2
-        ]
-
-        default_warning = (
-            f"복용 약물 {len(drug_list)}종 분석 완료. "
-            "복약 중 이상 증상 시 의사·약사와 상담하세요."
-            if drug_list else "처방전 분석이 완료되었습니다."
-        )
-
-        # ── Step 7: 유사처방 (SimPre) 데이터 조합 ─────────────────
         sim_pre_section = (
             self.sim_pre_service.to_donguibogam_section(sim_pre_result)
             if sim_pre_result else {"traditionalPrescriptions": [], "tkmPapers": []}
         )
-
         return {
-            "prescriptionSummary": {
-                "drugList": drug_list,
-                "warnings": warnings or default_warning,
-            },
-            "drugDetails": drug_details,
-            "academicEvidence": {
-                "summary":    academic_summary,
-                "trustLevel": trust_level,
-                "papers": [
-                    {"title": p.get("title", ""), "url": p.get("url", "")}
-                    for p in all_papers[:3]
-                ],
-            },
-            "lifestyleGuide": {
-                "symptomTokens": symptom_tokens,
-                "advice":        lifestyle_advice,
-            },
-            "donguibogam": {
-                "foods":                    foods[:5],
-                "donguiSection":            dongui_section,
-                "traditionalPrescriptions": sim_pre_section["traditionalPrescriptions"],
-                "tkmPapers":                sim_pre_section["tkmPapers"],
-            },
+            "foods":                    foods[:5],
+            "donguiSection":            dongui_section,
+            "traditionalPrescriptions": sim_pre_section["traditionalPrescriptions"],
+            "tkmPapers":                sim_pre_section["tkmPapers"],
         }
 
+    # ──────────────────────────────────────────────────────────────
+    # Continuation token
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def encode_continuation_token(drug_list: list, sections) -> str:
+        """pending 섹션 재조회용 토큰 (약물 목록 + 섹션 번호, URL-safe base64 JSON)"""
+        payload = json.dumps(
+            {"drugs": list(drug_list), "sections": sorted(sections)},
+            ensure_ascii=False,
+        )
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_continuation_token(token: str) -> tuple[list, set]:
+        """
+        continuationToken → (drug_list, sections)
+
+        Raises:
+            ValueError: 토큰 형식이 올바르지 않은 경우
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            drugs = payload["drugs"]
+            sections = payload["sections"]
+        except Exception as e:
+            raise ValueError(f"잘못된 continuationToken: {e}") from e
+        if not isinstance(drugs, list) or not isinstance(sections, list):
+            raise ValueError("잘못된 continuationToken: drugs/sections 형식 오류")
+        return [str(d) for d in drugs], {str(s) for s in sections}
+
+    @staticmethod
+    def parse_deadline_ms(value) -> Optional[float]:
+        """
+        요청 본문의 deadline_ms → 초 단위 예산 (없으면 None)
+
+        Raises:
+            ValueError: 숫자가 아니거나 0 이하인 경우
+        """
+        if value is None or value == "":
+            return None
+        if isinstance(value, bool):
+            raise ValueError("deadline_ms 는 숫자(ms)여야 합니다.")
+        try:
+            deadline_ms = float(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError("deadline_ms 는 숫자(ms)여야 합니다.") from e
+        if not math.isfinite(deadline_ms) or deadline_ms <= 0:
+            raise ValueError("deadline_ms 는 0보다 커야 합니다.")
+        return deadline_ms / 1000
+
     # ──────────────────────────────────────────────────────────────
     # Internal helpers
     # ──────────────────────────────────────────────────────────────
 
     async def _extract_drugs_from_image(self, image_bytes: bytes, mime_type: str) -> dict:
+        """
+        처방전 약물 목록 추출 (이미지 해시 캐시 적용)
+        같은 이미지는 캐시에서 즉시 반환, 동시 업로드는 Vision 호출 1회로 합칩니다.
+        실패 응답(drugList 비어있음)은 캐시하지 않습니다.
+        """
+        return await self.ocr_cache.get_or_compute(
+            "vision",
+            image_bytes,
+            lambda: self._call_vision_ocr(image_bytes, mime_type),
+            cacheable=lambda result: bool(result.get("drugList")),
+        )
+
+    async def _call_vision_ocr(self, image_bytes: bytes, mime_type: str) -> dict:
         """OpenAI GPT-4o Vision으로 처방전에서 약물 목록 추출"""
         try:
             import openai
@@ -319,6 +683,8 @@ class PrescriptionService:
                 raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
 
             client = openai.AsyncOpenAI(api_key=openai_key)
+            # 회전 보정 + 유효 해상도 축소 + 재인코딩 (업로드 바이트·토큰 절감)
+            image_bytes, mime_type = await preprocess_for_vision(image_bytes, mime_type)
             image_b64 = base64.b64encode(image_bytes).decode("utf-8")
 
             prompt = """이 처방전 이미지를 분석해서 아래 JSON 형식으로만 반환해줘:
@@ -389,83 +755,104 @@ class PrescriptionService:
 
         return " ".join(result) if result else text[:120]
 
-    async def fetch_optional_sections(self, drug_list: list, sections: set) -> dict:
+    async def fetch_optional_sections(
+        self,
+        drug_list: list,
+        sections: set,
+        deadline_s: Optional[float] = None,
+    ) -> dict:
         """
-        결과 화면에서 사용자가 개별 선택한 섹션(4·5)을 on-demand로 분석.
-        - Section 3 (학술근거): 프론트에서 기존 academicEvidence 데이터를 즉시 표시 → 이 메서드 불필요
+        결과 화면에서 사용자가 개별 선택한 섹션을 on-demand로 분석.
+        - Section 1 (DUR 경고): 시간 예산 초과로 누락된 병용금기 경고 재조회
+        - Section 2/3 (약물정보·학술근거): MFDS/PubMed/Tavily 재조회
         - Section 4 (생활가이드): AnalyzeService 필요
         - Section 5 (동의보감): AnalyzeService + SimPreService 필요
+
+        continuationToken 으로 넘어온 pending 섹션도 이 메서드로 처리합니다.
+        deadline_s 안에 끝나지 않은 섹션은 다시 pendingSections 로 반환됩니다.
+
+        스트리밍 분석에서 이미 계산한 단계 결과(stage_store)는 즉시 사용하고,
+        저장소에 없는 단계만 새로 실행합니다.
         """
+        deadline = time.monotonic() + deadline_s if deadline_s else None
         result = {}
-        analysis_result = None
-        sim_pre_result = None
 
-        if sections & {"4", "5"}:
-            symptom_text = (
-                f"복용 약물: {', '.join(drug_list)}" if drug_list
-                else "처방 분석"
-            )
-            tasks: list = [
-                self.analyze_service.analyze_symptom(symptom_text, current_meds=drug_list)
-            ]
-            include_sim_pre = "5" in sections
-            if include_sim_pre:
-                tasks.append(self.sim_pre_service.search_by_drugs(drug_list, num_rows=3))
-
-            gathered = await asyncio.gather(*tasks, return_exceptions=True)
-            analysis_result = gathered[0] if not isinstance(gathered[0], Exception) else None
-            if include_sim_pre and len(gathered) > 1:
-                sim_pre_result = gathered[1] if not isinstance(gathered[1], Exception) else None
-
-        if "4" in sections:
-            matched_name = analysis_result.matched_symptom_name if analysis_result else None
-            symptom_tokens = [t for t in (matched_name or "").split() if len(t) >= 2]
-            lifestyle_advice = self._build_lifestyle_advice(analysis_result, drug_list)
-            result["lifestyleGuide"] = {
-                "symptomTokens": symptom_tokens,
-                "advice": lifestyle_advice,
-            }
+        # 단계별: (필요 여부, 실행 함수, 불필요 시 기본값)
+        stages = {
+            STAGE_DUR: (
+                SECTION_SUMMARY in sections,
+                lambda: self._get_dur_warnings(drug_list),
+                [],
+            ),
+            STAGE_EVIDENCE: (
+                bool(sections & {SECTION_DRUGS, SECTION_ACADEMIC}),
+                lambda: self._collect_drug_evidence(drug_list),
+                DrugEvidence(),
+            ),
+            STAGE_ANALYSIS: (
+                bool(sections & {SECTION_ACADEMIC, SECTION_LIFESTYLE, SECTION_DONGUI}),
+                lambda: self._run_tkm_analysis(drug_list, self._symptom_text(drug_list)),
+                (None, None),
+            ),
+        }
 
-        if "5" in sections:
-            foods = []
-            if analysis_result:
-                for ing in analysis_result.ingredients:
-                    if isinstance(ing, dict):
-                        direction = ing.get("direction", "recommend")
-                        modern_name = ing.get("modern_name", "")
-                        rationale_ko = ing.get("rationale_ko", "")
-                    else:
-                        direction = ing.direction
-                        modern_name = ing.modern_name
-                        rationale_ko = ing.rationale_ko
-                    if direction in ("recommend", "good", "neutral"):
-                        foods.append({
-                            "name": modern_name,
-                            "reason": rationale_ko,
-                            "precaution": "과다 섭취는 피하고 의사와 상담 후 섭취하세요." if direction == "neutral" else "",
-                        })
-                    elif direction in ("caution", "avoid"):
-                        foods.append({
-                            "name": modern_name,
-                            "reason": rationale_ko,
-                            "precaution": f"⚠️ 복용 중 주의 필요: {rationale_ko}",
-                        })
-
-            matched_name = analysis_result.matched_symptom_name if analysis_result else None
-            dongui_section = (
-                f"{matched_name} 관련 동의보감 처방" if matched_name
-                else "처방약 기반 동의보감 권장 식재료"
-            )
-            sim_pre_section = (
-                self.sim_pre_service.to_donguibogam_section(sim_pre_result)
-                if sim_pre_result else {"traditionalPrescriptions": [], "tkmPapers": []}
-            )
-            result["donguibogam"] = {
-                "foods": foods[:5],
-                "donguiSection": dongui_section,
-                "traditionalPrescriptions": sim_pre_section["traditionalPrescriptions"],
-                "tkmPapers": sim_pre_section["tkmPapers"],
-            }
+        values: dict = {}
+        tasks: dict[str, asyncio.Task] = {}
+        for stage, (required, run, default) in stages.items():
+            if not required:
+                values[stage] = default
+                continue
+            stored = self._stored_stage(drug_list, stage)
+            if stored is not None:
+                values[stage] = stored
+            else:
+                tasks[stage] = asyncio.create_task(run())
+
+        reused = [stage for stage in values if stages[stage][0]]
+        if reused:
+            print(f"[PrescriptionService] 저장된 단계 결과 재사용: {reused} / 새로 실행: {list(tasks)}")
+
+        try:
+            for stage, task in tasks.items():
+                values[stage] = await self._await_stage(task, deadline)
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+        dur_warnings = values[STAGE_DUR]
+        evidence = values[STAGE_EVIDENCE]
+        analysis = values[STAGE_ANALYSIS]
+        self._remember_stages(
+            drug_list,
+            dur_warnings if STAGE_DUR in tasks else _PENDING,
+            evidence if STAGE_EVIDENCE in tasks else _PENDING,
+            analysis if STAGE_ANALYSIS in tasks else _PENDING,
+        )
+
+        pending: set[str] = set()
+        if dur_warnings is _PENDING:
+            pending.add(SECTION_SUMMARY)
+        if evidence is _PENDING:
+            pending |= sections & {SECTION_DRUGS, SECTION_ACADEMIC}
+        if analysis is _PENDING:
+            pending |= sections & {SECTION_ACADEMIC, SECTION_LIFESTYLE, SECTION_DONGUI}
+        analysis_result, sim_pre_result = analysis if analysis is not _PENDING else (None, None)
+
+        if SECTION_SUMMARY in sections - pending:
+            result["prescriptionSummary"] = self._build_summary(drug_list, "", dur_warnings)
+        if SECTION_DRUGS in sections - pending:
+            result["drugDetails"] = evidence.details
+        if SECTION_ACADEMIC in sections - pending:
+            result["academicEvidence"] = self._build_academic_evidence(evidence, analysis_result)
+        if SECTION_LIFESTYLE in sections - pending:
+            result["lifestyleGuide"] = self._build_lifestyle_guide(analysis_result, drug_list)
+        if SECTION_DONGUI in sections - pending:
+            result["donguibogam"] = self._build_donguibogam(analysis_result, sim_pre_result)
+
+        if pending:
+            result["pendingSections"] = sorted(pending)
+            result["continuationToken"] = self.encode_continuation_token(drug_list, pending)
 
         return result
 
@@ -474,14 +861,16 @@ class PrescriptionService:
         image_bytes: bytes,
         mime_type: str,
         sections: set,
+        deadline_s: Optional[float] = None,
     ) -> AsyncGenerator[dict, None]:
         """
         SSE 스트리밍용 처방전 분석 generator.
         sections: {"1","2"} → AnalyzeService 스킵 (빠름)
                   {"1","2","3","4","5"} → 전체 실행
         각 단계마다 {"type":"progress",...} yield, 마지막에 {"type":"result","data":{...}} yield.
+        deadline_s 를 넘긴 단계는 취소되고 result.data.pendingSections 로 표시됩니다.
         """
-        import sys
+        deadline = time.monotonic() + deadline_s if deadline_s else None
 
         # ── Step 1: OCR ────────────────────────────────────────────
         yield {"type": "progress", "step": 1, "message": "처방전 OCR 분석 중...", "progress": 15}
@@ -489,204 +878,39 @@ class PrescriptionService:
         drug_list = ocr_result.get("drugList", [])
         warnings = ocr_result.get("warnings", "")
 
-        # ── Step 2: DUR ─────────────────────────────────────────────
-        yield {"type": "progress", "step": 2, "message": "병용금기 확인 중...", "progress": 35}
-        if len(drug_list) >= 2:
-            try:
-                dur_interactions = await self.dur_service.check_interactions(drug_list)
-                if dur_interactions:
-                    dur_warnings = self.dur_service.format_warnings(dur_interactions)
-                    sep = " | " if warnings else ""
-                    warnings = warnings + sep + " | ".join(dur_warnings)
-            except Exception as e:
-                print(f"[PrescriptionService] DUR 조회 오류: {e}")
-
-        # ── Step 3: MFDS + PubMed 병렬 (항상 실행) ─────────────────
-        yield {"type": "progress", "step": 3, "message": "약물 정보 조회 중 (식약처·PubMed)...", "progress": 60}
-        drug_details = []
-        all_papers = []
-        mfds_hit_count = 0
-        tavily_results: dict = {}
-
-        if drug_list:
-            targets = drug_list[:3]
-            mfds_task = self.mfds_service.get_drug_labels_bulk(targets)
-            pubmed_tasks = [self.medication_service.get_drug_info(drug) for drug in targets]
-            mfds_labels, *pubmed_results_raw = await asyncio.gather(
-                mfds_task, *pubmed_tasks, return_exceptions=True
-            )
-            if isinstance(mfds_labels, Exception):
-                print(f"[PrescriptionService/stream] MFDS bulk 오류: {mfds_labels}")
-                mfds_labels = {}
-
-            tavily_needed = []
-            for drug, pubmed_raw in zip(targets, pubmed_results_raw):
-                label: Optional[DrugLabel] = mfds_labels.get(drug)
-                has_pubmed = (
-                    not isinstance(pubmed_raw, Exception)
-                    and bool(pubmed_raw.get("info") or pubmed_raw.get("papers"))
-                )
-                if not label and not has_pubmed:
-                    tavily_needed.append(drug)
-
-            if tavily_needed:
-                try:
-                    tavily_results = await self.tavily_service.search_bulk(tavily_needed)
-                except Exception as e:
-                    print(f"[PrescriptionService/stream] Tavily bulk 오류: {e}")
-
-            for drug, pubmed_raw in zip(targets, pubmed_results_raw):
-                label: Optional[DrugLabel] = mfds_labels.get(drug)
-                if label:
-                    mfds_hit_count += 1
-                    detail = self.mfds_service.to_drug_detail(label)
-                    drug_details.append({
-                        "name": detail["name"],
-                        "efficacy": detail["efficacy"],
-                        "sideEffects": detail["sideEffects"],
-                    })
-                    if not isinstance(pubmed_raw, Exception):
-                        all_papers.extend(pubmed_raw.get("papers", []))
-                elif not isinstance(pubmed_raw, Exception) and (
-                    pubmed_raw.get("info") or pubmed_raw.get("papers")
-                ):
-                    info_text = pubmed_raw.get("info", "")
-                    papers = pubmed_raw.get("papers", [])
-                    all_papers.extend(papers)
-                    drug_details.append({
-                        "name": drug,
-                        "efficacy": self._extract_section(info_text, "효능"),
-                        "sideEffects": self._extract_section(info_text, "주의"),
-                    })
-                elif drug in tavily_results and tavily_results[drug]:
-                    web_info = tavily_results[drug]
-                    detail = TavilyService.to_drug_detail(web_info)
-                    all_papers.extend(TavilyService.to_papers(web_info))
-                    drug_details.append({
-                        "name": detail["name"],
-                        "efficacy": detail["efficacy"],
-                        "sideEffects": detail["sideEffects"],
-                    })
-                else:
-                    drug_details.append({
-                        "name": drug,
-                        "efficacy": "정보를 가져오지 못했습니다.",
-                        "sideEffects": "",
-                    })
-
-        # ── Step 4: 동의보감·생활가이드 (항상 실행) ──────────────────
+        # Step 2~4 는 서로 독립이므로 OCR 직후 동시에 시작
         # Section 3 데이터(academic_summary)와 donguibogam.foods가 초기 응답에 포함되어야 함
-        yield {"type": "progress", "step": 4, "message": "동의보감·생활가이드 분석 중...", "progress": 85}
-        symptom_text = (
-            f"복용 약물: {', '.join(drug_list)}" if drug_list
-            else warnings or "처방 분석"
+        dur_task = asyncio.create_task(self._get_dur_warnings(drug_list))
+        evidence_task = asyncio.create_task(self._collect_drug_evidence(drug_list))
+        analysis_task = asyncio.create_task(
+            self._run_tkm_analysis(drug_list, self._symptom_text(drug_list, warnings))
         )
-        analysis_result, sim_pre_result = await asyncio.gather(
-            self.analyze_service.analyze_symptom(symptom_text, current_meds=drug_list),
-            self.sim_pre_service.search_by_drugs(drug_list, num_rows=3),
-            return_exceptions=True,
-        )
-        if isinstance(analysis_result, Exception):
-            print(f"[PrescriptionService/stream] AnalyzeService 오류: {analysis_result}")
-            analysis_result = None
-        if isinstance(sim_pre_result, Exception):
-            print(f"[PrescriptionService/stream] SimPreService 오류: {sim_pre_result}")
-            sim_pre_result = None
-
-        # ── 결과 조합 ───────────────────────────────────────────────
-        symptom_summary = analysis_result.symptom_summary if analysis_result else ""
-        if mfds_hit_count > 0:
-            trust_level = "A"
-        elif all_papers:
-            trust_level = "B"
-        elif tavily_results:
-            trust_level = "C"
-        else:
-            trust_level = (
-                {"database": "A", "similarity": "B", "cache_similarity": "B"}
-                .get(analysis_result.source if analysis_result else "", "C")
-            )
-
-        paper_titles = [p.get("title", "") for p in all_papers[:3] if p.get("title")]
-        if paper_titles and mfds_hit_count > 0:
-            academic_summary = (
-                f"식약처 공인 정보 + PubMed 논문 {len(paper_titles)}편 분석 결과: {symptom_summary}"
-            )
-        elif paper_titles:
-            academic_summary = (
-                f"관련 PubMed 논문 {len(paper_titles)}편 분석 결과: {symptom_summary}"
-            )
-        else:
-            academic_summary = symptom_summary or "약물 정보를 분석하였습니다."
 
-        foods = []
-        if analysis_result:
-            for ing in analysis_result.ingredients:
-                if isinstance(ing, dict):
-                    direction = ing.get("direction", "recommend")
-                    modern_name = ing.get("modern_name", "")
-                    rationale_ko = ing.get("rationale_ko", "")
-                else:
-                    direction = ing.direction
-                    modern_name = ing.modern_name
-                    rationale_ko = ing.rationale_ko
-                if direction in ("recommend", "good", "neutral"):
-                    foods.append({
-                        "name": modern_name,
-                        "reason": rationale_ko,
-                        "precaution": "과다 섭취는 피하고 의사와 상담 후 섭취하세요." if direction == "neutral" else "",
-                    })
-                elif direction in ("caution", "avoid"):
-                    foods.append({
-                        "name": modern_name,
-                        "reason": rationale_ko,
-                        "precaution": f"⚠️ 복용 중 주의 필요: {rationale_ko}",
-                    })
-
-        matched_name = analysis_result.matched_symptom_name if analysis_result else None
-        dongui_section = (
-            f"{matched_name} 관련 동의보감 처방" if matched_name
-            else "처방약 기반 동의보감 권장 식재료"
-        )
-        lifestyle_advice = self._build_lifestyle_advice(analysis_result, drug_list)
-        symptom_tokens = [t for t in (matched_name or "").split() if len(t) >= 2]
-        default_warning = (
-            f"복용 약물 {len(drug_list)}종 분석 완료. "
-            "복약 중 이상 증상 시 의사·약사와 상담하세요."
-            if drug_list else "처방전 분석이 완료되었습니다."
-        )
-        sim_pre_section = (
-            self.sim_pre_service.to_donguibogam_section(sim_pre_result)
-            if sim_pre_result else {"traditionalPrescriptions": [], "tkmPapers": []}
-        )
+        try:
+            # ── Step 2: DUR ─────────────────────────────────────────
+            yield {"type": "progress", "step": 2, "message": "병용금기 확인 중...", "progress": 35}
+            dur_warnings = await self._await_stage(dur_task, deadline)
+
+            # ── Step 3: MFDS + PubMed 병렬 (항상 실행) ─────────────
+            yield {"type": "progress", "step": 3, "message": "약물 정보 조회 중 (식약처·PubMed)...", "progress": 60}
+            evidence = await self._await_stage(evidence_task, deadline)
+
+            # ── Step 4: 동의보감·생활가이드 (항상 실행) ──────────────
+            yield {"type": "progress", "step": 4, "message": "동의보감·생활가이드 분석 중...", "progress": 85}
+            analysis = await self._await_stage(analysis_task, deadline)
+        finally:
+            # 클라이언트 연결 종료 시 남은 단계 정리
+            for task in (dur_task, evidence_task, analysis_task):
+                if not task.done():
+                    task.cancel()
+
+        # 결과 화면에서 섹션을 다시 열 때 재사용
+        self._remember_stages(drug_list, dur_warnings, evidence, analysis)
 
+        # ── 결과 조합 ───────────────────────────────────────────────
         yield {
             "type": "result",
-            "data": {
-                "prescriptionSummary": {
-                    "drugList": drug_list,
-                    "warnings": warnings or default_warning,
-                },
-                "drugDetails": drug_details,
-                "academicEvidence": {
-                    "summary": academic_summary,
-                    "trustLevel": trust_level,
-                    "papers": [
-                        {"title": p.get("title", ""), "url": p.get("url", "")}
-                        for p in all_papers[:3]
-                    ],
-                },
-                "lifestyleGuide": {
-                    "symptomTokens": symptom_tokens,
-                    "advice": lifestyle_advice,
-                },
-                "donguibogam": {
-                    "foods": foods[:5],
-                    "donguiSection": dongui_section,
-                    "traditionalPrescriptions": sim_pre_section["traditionalPrescriptions"],
-                    "tkmPapers": sim_pre_section["tkmPapers"],
-                },
-            },
+            "data": self._compose_report(drug_list, warnings, dur_warnings, evidence, analysis),
         }
 
     def _build_lifestyle_advice(self, analysis_result, drug_list: list) -> str:
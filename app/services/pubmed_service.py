@@ -5,16 +5,23 @@ E-utilities API를 사용하여 논문 검색 및 캐싱
 import os
 import sys
 import json
-import hashlib
+import asyncio
 import requests
 from typing import Optional
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from database.supabase_client import get_supabase_client
+from database.repositories import PubMedRepository
+from app.utils.pubmed_parser import ParsedArticle, parse_pubmed_articles
+from app.utils.ncbi_scheduler import NCBIScheduler, ESearchResult
+from app.utils.pubmed_cache import PubMedQueryCache
+from app.utils.term_translator import TermTranslator
+from app.utils.pubmed_corpus import PubMedCorpus
+from app.utils.batch_llm import gemini_json_call
 
 load_dotenv()
 
@@ -29,89 +36,67 @@ class PubMedPaper:
     pub_year: int
     url: str
     summary_ko: Optional[str] = None
+    mesh_terms: list[str] = field(default_factory=list)
+    publication_types: list[str] = field(default_factory=list)
+    doi: Optional[str] = None
 
 
 class PubMedService:
     """PubMed 논문 검색 서비스"""
     
-    BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
-    
-    
     def __init__(self):
-        self.api_key = os.getenv("PUBMED_API_KEY", "")
+        self.ncbi = NCBIScheduler.shared()  # NCBI 속도 제한 · efetch 묶음 (프로세스 공유)
         self.genai_key = os.getenv("API_KEY", "")
         self.db = get_supabase_client()
-        
-        # Configure GenAI for translation
-        if self.genai_key:
-            try:
-                from google import genai
-                self.client = genai.Client(api_key=self.genai_key)
-            except Exception as e:
-                print(f"GenAI Init Failed: {e}")
-                self.client = None
-        else:
-            self.client = None
+        self.repo = PubMedRepository()  # async 경로 DB 조회 (이벤트 루프 차단 방지)
+        self.translator = TermTranslator.shared()  # 한→영 사전 · 번역 결과 (프로세스 공유)
+        self.translate_llm = gemini_json_call(api_key=self.genai_key or None)  # 묶음 번역 (JSON 모드)
+        self.corpus = PubMedCorpus.shared()  # 수집된 초록 BM25 인덱스 (프로세스 공유)
 
     async def translate_to_english(self, keyword_ko: str) -> str:
         """한글 의학/식재료 키워드를 영문(MeSH Term)으로 변환"""
+        return (await self.translate_terms([keyword_ko]))[keyword_ko]
 
-        # 0. 먼저 DB 캐시에서 찾기 (가장 빠름, 무료)
-        try:
-            from supabase import create_client
-            supabase = create_client(
-                os.getenv("SUPABASE_URL", ""),
-                os.getenv("SUPABASE_KEY", "")
-            )
-
-            result = supabase.table("drug_translation")\
-                .select("english_name")\
-                .eq("korean_name", keyword_ko)\
-                .execute()
+    async def translate_terms(self, keywords: list[str]) -> dict[str, str]:
+        """
+        한글 키워드 여러 개를 영문으로 변환 (번역 못 한 키워드는 원문 그대로)
+        사전(foods_master / catalog_drugs / drug_database.json) → drug_translation 캐시 →
+        Gemini 묶음 번역 순서, 모두 실패한 키워드만 단건 번역 API 사용
+        """
+        if self.translator.is_ready:
+            self.translator.ensure_loaded(self.db)   # 주기적 재로드는 백그라운드 스레드
+        else:
+            # 시작 시 워밍업이 실패했으면 최초 사전 로드(foods_master·catalog_drugs 전체)는 이벤트 루프 밖에서
+            await asyncio.to_thread(self.translator.ensure_loaded, self.db)
+        return await self.translator.translate(
+            keywords, repo=self.repo, llm=self.translate_llm, fallback=self._translate_single
+        )
 
-            if result.data and len(result.data) > 0:
-                translated = result.data[0]["english_name"]
-                print(f"[DB Cache Hit] {keyword_ko} -> {translated}")
-                return translated
-        except Exception as e:
-            print(f"[DB Translation Lookup Failed] {e}")
+    async def _translate_single(self, keyword_ko: str) -> Optional[tuple[str, str]]:
+        """단건 번역 (영문, 출처) — 묶음 번역을 못 쓰거나 실패한 키워드용"""
 
         # 1. MyMemory Translation API (완전 무료!)
-        try:
+        def _mymemory() -> Optional[str]:
             import urllib.parse
             import urllib.request
 
             encoded_text = urllib.parse.quote(keyword_ko)
             url = f"https://api.mymemory.translated.net/get?q={encoded_text}&langpair=ko|en"
-
             with urllib.request.urlopen(url, timeout=5) as response:
                 data = json.loads(response.read().decode())
                 if data.get("responseStatus") == 200:
-                    translated = data["responseData"]["translatedText"]
-                    print(f"[MyMemory API] {keyword_ko} -> {translated}")
-
-                    # DB에 저장 (다음부터는 DB에서 가져옴)
-                    try:
-                        from supabase import create_client
-                        supabase = create_client(
-                            os.getenv("SUPABASE_URL", ""),
-                            os.getenv("SUPABASE_KEY", "")
-                        )
-                        supabase.table("drug_translation").insert({
-                            "korean_name": keyword_ko,
-                            "english_name": translated,
-                            "source": "mymemory",
-                            "verified": False
-                        }).execute()
-                        print(f"[DB Saved] {keyword_ko} -> {translated}")
-                    except Exception as save_error:
-                        print(f"[DB Save Failed] {save_error}")
+                    return data["responseData"]["translatedText"]
+            return None
 
-                    return translated
+        try:
+            translated = await asyncio.to_thread(_mymemory)
+            if translated:
+                print(f"[MyMemory API] {keyword_ko} -> {translated}")
+                return translated, "mymemory"
         except Exception as e:
             print(f"[MyMemory API Failed] {e}")
 
-        # 2. Google Translation API (기존 코드)
+        # 2. Google Translation API
         if self.genai_key:
             try:
                 url = "https://translation.googleapis.com/language/translate/v2"
@@ -122,36 +107,17 @@ class PubMedService:
                     "format": "text",
                     "key": self.genai_key
                 }
-                resp = requests.post(url, params=params, timeout=5)
+                resp = await asyncio.to_thread(requests.post, url, params=params, timeout=5)
                 if resp.status_code == 200:
                     data = resp.json()
                     if "data" in data and "translations" in data["data"]:
-                        return data["data"]["translations"][0]["translatedText"]
+                        return data["data"]["translations"][0]["translatedText"], "google"
                 else:
                      print(f"Translation API Error: {resp.status_code} {resp.text}")
             except Exception as e:
                 print(f"Google Translate API Failed: {e}")
 
-        # 1. Try Gemini if available
-        if self.client:
-            try:
-                prompt = f"""
-                Translate the following Korean medical/food term into its most appropriate English scientific or MeSH term for PubMed search.
-                Only return the English term. No explanation.
-                
-                Korean: {keyword_ko}
-                English:
-                """
-                response = await self.client.aio.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=prompt
-                )
-                return response.text.strip()
-            except Exception as e:
-                print(f"Gemini Translation error: {e}")
-                # Fallthrough to OpenAI
-        
-        # 2. Try OpenAI Fallback
+        # 3. OpenAI Fallback
         try:
             import openai
             openai_key = os.getenv("OPENAI_API_KEY")
@@ -164,11 +130,11 @@ class PubMedService:
                         {"role": "user", "content": keyword_ko}
                     ]
                 )
-                return response.choices[0].message.content.strip()
+                return response.choices[0].message.content.strip(), "openai"
         except Exception as e_openai:
             print(f"OpenAI Translation Failed: {e_openai}")
 
-        return keyword_ko
+        return None
 
     
     async def search_papers(
@@ -194,26 +160,79 @@ class PubMedService:
             print(f"Translated '{query}' -> '{translated_query}'")
             query = translated_query
 
-        # 캐시 확인
+        # 로컬 초록 코퍼스 (BM25) → 검색어 캐시 순서로 확인
+        # (히트 시 esearch / efetch 모두 생략, 0건 검색어는 빈 목록)
         if use_cache:
-            cached = self._get_cached_papers(query)
-            if cached:
+            local = await self._search_corpus(query, max_results)
+            if local is not None:
+                return local
+            cached = await self._get_cached_papers(query, max_results)
+            if cached is not None:
                 return cached[:max_results]
         
         # PubMed 검색
-        pmids = self._search_pmids(query, max_results)
-        if not pmids:
+        found = await self._esearch(query, max_results)
+        if found is None:
+            return []  # 검색 오류는 캐시하지 않음
+        if not found.ids:
+            await self._cache_papers(query, [], max_results, total=0)
             return []
         
-        # 논문 상세 정보 조회
-        papers = self._fetch_paper_details(pmids)
+        # 논문 상세 정보 조회 (동시 요청의 PMID 와 묶어 efetch)
+        papers = await self._fetch_paper_details(found.ids, found)
         
         # 캐시 저장
         if papers:
-            self._cache_papers(query, papers)
+            await self._cache_papers(query, papers, max_results, total=max(found.count, len(found.ids)))
         
         return papers
     
+    async def _search_corpus(self, query: str, max_results: int) -> Optional[list[PubMedPaper]]:
+        """로컬 코퍼스 검색 (미로드 · 콜드 검색어면 None → 실시간 API)"""
+        corpus = self.corpus
+        if corpus is None:
+            return None
+        # 최초 로드(pubmed_papers 전체 조회 + 색인)는 이벤트 루프 밖에서
+        if not corpus.is_ready:
+            loaded = await asyncio.to_thread(corpus.ensure_loaded, self.db)
+        else:
+            loaded = corpus.ensure_loaded(self.db)
+        if not loaded:
+            return None
+        rows = corpus.lookup(query, max_results)
+        if rows is None:
+            return None
+        print(f"[PubMed Corpus] {query} → 로컬 {len(rows)}건")
+        return [self._paper_from_row(row) for row in rows]
+    
+    async def harvest(self, query: str, per_term: int = 100) -> dict:
+        """
+        코퍼스 수집: 검색식 하나의 상위 per_term 건 중 pubmed_papers 에 없는 논문만 efetch 후 일괄 저장
+        
+        Returns:
+            {"found": 검색 결과 수, "stored": 새로 저장한 논문 수}
+        """
+        found = await self.ncbi.esearch(query, per_term)
+        if not found.ids:
+            return {"found": 0, "stored": 0}
+        existing = await self.repo.papers_by_pmids(found.ids)
+        new_ids = [pmid for pmid in found.ids if pmid not in existing]
+        if not new_ids:
+            if self.corpus is not None:
+                self.corpus.mark_warm(query)
+            return {"found": len(found.ids), "stored": 0}
+        
+        # 전부 새 논문이면 history 페이지 조회, 일부면 PMID 묶음 조회
+        search = found if len(new_ids) == len(found.ids) else None
+        papers = self._papers_from_articles(await self.ncbi.fetch_articles(new_ids, search), new_ids)
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [self._paper_row(paper, now) for paper in papers]
+        await self.repo.upsert_papers(rows)
+        if self.corpus is not None:
+            self.corpus.add(rows)
+            self.corpus.mark_warm(query)
+        return {"found": len(found.ids), "stored": len(rows)}
+    
     async def search_by_symptom_and_ingredient(
         self, 
         symptom_id: int, 
@@ -224,26 +243,22 @@ class PubMedService:
         symptom_pubmed_map, ingredient_pubmed_map 테이블 활용
         """
         try:
-            # 증상 키워드 조회
-            symptom_result = self.db.table("symptom_pubmed_map").select(
-                "keyword_en, mesh_term"
-            ).eq("symptom_id", symptom_id).order("priority").limit(2).execute()
-            
-            # 식재료 키워드 조회
-            ingredient_result = self.db.table("ingredient_pubmed_map").select(
-                "ingredient_name_en, mesh_term, bioactive_compound"
-            ).eq("rep_code", rep_code).order("priority").limit(2).execute()
+            # 증상 / 식재료 키워드 동시 조회
+            symptom_rows, ingredient_rows = await asyncio.gather(
+                self.repo.symptom_terms(symptom_id, limit=2),
+                self.repo.ingredient_terms(rep_code, limit=2),
+            )
             
             # 검색 쿼리 생성
             symptom_terms = []
-            for row in symptom_result.data:
+            for row in symptom_rows:
                 if row.get("mesh_term"):
                     symptom_terms.append(f'"{row["mesh_term"]}"[MeSH]')
                 elif row.get("keyword_en"):
                     symptom_terms.append(row["keyword_en"])
             
             ingredient_terms = []
-            for row in ingredient_result.data:
+            for row in ingredient_rows:
                 if row.get("mesh_term"):
                     ingredient_terms.append(f'"{row["mesh_term"]}"[MeSH]')
                 elif row.get("ingredient_name_en"):
@@ -263,139 +278,153 @@ class PubMedService:
             print(f"증상-식재료 검색 오류: {e}")
             return []
     
-    def _search_pmids(self, query: str, max_results: int) -> list[str]:
-        """검색 쿼리로 PMID 목록 조회"""
+    async def _esearch(self, query: str, max_results: int) -> Optional[ESearchResult]:
+        """검색 쿼리로 PMID 목록 조회 (오류 시 None — 0건 결과와 구분)"""
         try:
-            params = {
-                "db": "pubmed",
-                "term": query,
-                "retmax": max_results,
-                "retmode": "json",
-                "sort": "relevance"
-            }
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            response = requests.get(
-                f"{self.BASE_URL}/esearch.fcgi",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get("esearchresult", {}).get("idlist", [])
-            
+            return await self.ncbi.esearch(query, max_results)
         except Exception as e:
             print(f"PMID 검색 오류: {e}")
-            return []
+            return None
     
-    def _fetch_paper_details(self, pmids: list[str]) -> list[PubMedPaper]:
-        """PMID로 논문 상세 정보 조회"""
+    async def _search_pmids(self, query: str, max_results: int) -> Optional[list[str]]:
+        """검색 쿼리로 PMID 목록만 조회"""
+        found = await self._esearch(query, max_results)
+        return found.ids if found is not None else None
+    
+    async def _fetch_paper_details(self, pmids: list[str], search: Optional[ESearchResult] = None) -> list[PubMedPaper]:
+        """PMID로 논문 상세 정보 조회 (큰 결과 집합은 esearch history 사용)"""
         try:
-            params = {
-                "db": "pubmed",
-                "id": ",".join(pmids),
-                "retmode": "xml"
-            }
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            response = requests.get(
-                f"{self.BASE_URL}/efetch.fcgi",
-                params=params,
-                timeout=15
-            )
-            response.raise_for_status()
-            
-            # XML 파싱 (간단 버전)
-            return self._parse_xml_response(response.text, pmids)
-            
+            articles = await self.ncbi.fetch_articles(pmids, search)
+            return self._papers_from_articles(articles, pmids)
         except Exception as e:
             print(f"논문 상세 조회 오류: {e}")
             return []
     
-    def _parse_xml_response(self, xml_text: str, pmids: list[str]) -> list[PubMedPaper]:
-        """XML 응답 파싱 (간단 구현)"""
-        import re
-        
+    def _parse_xml_response(self, xml_text, pmids: list[str]) -> list[PubMedPaper]:
+        """efetch XML 파싱 (PubmedArticle 1회 순회, 검색 결과 PMID 순서 유지)"""
+        return self._papers_from_articles(parse_pubmed_articles(xml_text), pmids)
+    
+    @staticmethod
+    def _papers_from_articles(articles: dict[str, ParsedArticle], pmids: list[str]) -> list[PubMedPaper]:
         papers = []
-        
         for pmid in pmids:
-            try:
-                # 제목 추출
-                title_match = re.search(
-                    r'<PMID[^>]*>' + pmid + r'</PMID>.*?<ArticleTitle>(.+?)</ArticleTitle>',
-                    xml_text, re.DOTALL
-                )
-                title = title_match.group(1) if title_match else f"Paper {pmid}"
-                title = re.sub(r'<[^>]+>', '', title)  # HTML 태그 제거
-                
-                # 저널 추출
-                journal_match = re.search(
-                    r'<PMID[^>]*>' + pmid + r'</PMID>.*?<Journal>.*?<Title>(.+?)</Title>',
-                    xml_text, re.DOTALL
-                )
-                journal = journal_match.group(1) if journal_match else ""
-                
-                # 연도 추출
-                year_match = re.search(
-                    r'<PMID[^>]*>' + pmid + r'</PMID>.*?<PubDate>.*?<Year>(\d{4})</Year>',
-                    xml_text, re.DOTALL
-                )
-                pub_year = int(year_match.group(1)) if year_match else 2024
-                
-                # 초록 추출
-                abstract_match = re.search(
-                    r'<PMID[^>]*>' + pmid + r'</PMID>.*?<Abstract>.*?<AbstractText[^>]*>(.+?)</AbstractText>',
-                    xml_text, re.DOTALL
-                )
-                abstract = abstract_match.group(1) if abstract_match else ""
-                abstract = re.sub(r'<[^>]+>', '', abstract)[:500]  # 500자 제한
-                
-                papers.append(PubMedPaper(
-                    pmid=pmid,
-                    title=title[:200],
-                    abstract=abstract,
-                    journal=journal[:100],
-                    pub_year=pub_year,
-                    url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                ))
-                
-            except Exception as e:
-                print(f"PMID {pmid} 파싱 오류: {e}")
+            article = articles.get(pmid)
+            if article is None:
+                print(f"PMID {pmid} 응답에 없음")
+                continue
+            
+            papers.append(PubMedPaper(
+                pmid=pmid,
+                title=(article.title or f"Paper {pmid}")[:200],
+                abstract=article.abstract[:500],  # 500자 제한
+                journal=article.journal[:100],
+                pub_year=article.pub_year or 2024,
+                url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                mesh_terms=article.mesh_terms,
+                publication_types=article.publication_types,
+                doi=article.doi
+            ))
         
         return papers
     
-    def _get_cached_papers(self, query: str) -> Optional[list[PubMedPaper]]:
-        """캐시된 논문 조회"""
+    async def _get_cached_papers(self, query: str, max_results: int) -> Optional[list[PubMedPaper]]:
+        """
+        캐시된 논문 조회: 프로세스 메모리 → pubmed_cache(PMID 목록) + pubmed_papers(본문)
+        
+        Returns:
+            논문 목록 (0건 검색어면 빈 목록), 캐시 미스면 None
+        """
+        cache = PubMedQueryCache.shared()
+        query_hash = cache.query_hash(query)
+        cached = cache.get(query_hash, max_results)
+        if cached is not None:
+            return cached
+        
         try:
-            query_hash = hashlib.md5(query.encode()).hexdigest()
+            row = await self.repo.get_query_cache(query_hash)
+            if not row:
+                return None
             
-            result = self.db.table("pubmed_papers").select("*").filter(
-                "pmid", "in", f"(SELECT pmid FROM pubmed_cache WHERE query_hash = '{query_hash}')"
-            ).execute()
+            remaining = (datetime.fromisoformat(row["expires_at"]) - datetime.now(timezone.utc)).total_seconds()
+            pmids = row.get("pmids") or []
+            total = row.get("total_count")
+            if remaining <= 0 or not cache.covers(total, row.get("retmax") or 0, max_results):
+                return None
             
-            # 간단히 DB에서 직접 조회
-            # 실제로는 별도 캐시 테이블 필요
-            return None
+            papers = []
+            if pmids:
+                rows = await self.repo.papers_by_pmids(pmids)
+                if len(rows) < len(pmids):
+                    return None  # 본문 일부 유실 → 다시 검색
+                papers = [self._paper_from_row(rows[pmid]) for pmid in pmids]
+            
+            cache.put(query_hash, papers, row.get("retmax") or 0, total=total, ttl_seconds=remaining)
+            return papers[:max_results]
             
-        except Exception:
+        except Exception as e:
+            print(f"캐시 조회 오류: {e}")
             return None
     
-    def _cache_papers(self, query: str, papers: list[PubMedPaper]):
-        """논문 캐시 저장"""
+    @staticmethod
+    def _paper_from_row(row: dict) -> PubMedPaper:
+        return PubMedPaper(
+            pmid=row["pmid"],
+            title=row.get("title") or "",
+            abstract=row.get("abstract") or "",
+            journal=row.get("journal") or "",
+            pub_year=row.get("pub_year") or 2024,
+            url=row.get("url") or f"https://pubmed.ncbi.nlm.nih.gov/{row['pmid']}/",
+            mesh_terms=row.get("mesh_terms") or [],
+            publication_types=row.get("publication_types") or []
+        )
+    
+    @staticmethod
+    def _paper_row(paper: PubMedPaper, updated_at: str) -> dict:
+        """PubMedPaper → pubmed_papers 행"""
+        return {
+            "pmid": paper.pmid,
+            "title": paper.title,
+            "abstract": paper.abstract,
+            "journal": paper.journal,
+            "pub_year": paper.pub_year,
+            "url": paper.url,
+            "mesh_terms": paper.mesh_terms,
+            "publication_types": paper.publication_types,
+            "updated_at": updated_at
+        }
+    
+    async def _cache_papers(
+        self, query: str, papers: list[PubMedPaper], retmax: int, total: Optional[int] = None
+    ):
+        """
+        검색 결과 캐시 저장: 메모리 + pubmed_papers 일괄 upsert 1회 + pubmed_cache 1행
+        (papers 가 비어 있으면 0건 검색어로 짧게 저장)
+
+        total: esearch 전체 결과 수 — 이후 더 큰 max_results 요청에 답할 수 있는지 판단
+        """
+        cache = PubMedQueryCache.shared()
+        query_hash = cache.query_hash(query)
+        cache.put(query_hash, papers, retmax, total=total)
+        
         try:
-            for paper in papers:
-                self.db.table("pubmed_papers").upsert({
-                    "pmid": paper.pmid,
-                    "title": paper.title,
-                    "abstract": paper.abstract,
-                    "journal": paper.journal,
-                    "pub_year": paper.pub_year,
-                    "url": paper.url,
-                    "updated_at": datetime.now().isoformat()
-                }, on_conflict="pmid").execute()
+            now = datetime.now(timezone.utc)
+            ttl = cache.ttl_for(papers)
+            rows = [self._paper_row(paper, now.isoformat()) for paper in papers]
+            if self.corpus is not None and papers:
+                self.corpus.add(rows)  # 다음 같은 검색식은 로컬에서 응답
+                self.corpus.mark_warm(query)
+            await asyncio.gather(
+                self.repo.upsert_papers(rows),
+                self.repo.upsert_query_cache({
+                    "query_hash": query_hash,
+                    "query": query,
+                    "pmids": [paper.pmid for paper in papers],
+                    "retmax": retmax,
+                    "total_count": total,
+                    "expires_at": (now + timedelta(seconds=ttl)).isoformat(),
+                    "last_accessed_at": now.isoformat()
+                }),
+            )
         except Exception as e:
             print(f"캐시 저장 오류: {e}")
 
@@ -0,0 +1,187 @@
+"""
+AI 레시피 백필 큐
+매칭된 증상에 레시피가 없을 때 분석 응답을 기다리게 하지 않고 백그라운드에서 생성·저장합니다.
+
+- symptom_id 단위 중복 제거: 생성 중인 증상은 다시 넣지 않음, 실패한 증상은 retry_after_seconds 후 재시도
+- 전용 스레드의 이벤트 루프에서 concurrency 개까지 동시 생성 (요청 이벤트 루프와 분리)
+- 생성된 레시피는 SymptomDataSnapshot.add_recipes 로 바로 반영 → 다음 요청부터 응답에 포함
+- 배치 모드: run_batch() 로 레시피 없는 증상 전체를 묶음 생성 함수 한 번으로 채움 (scripts/backfill_recipes.py)
+"""
+import os
+import time
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Optional
+
+from database.supabase_client import fetch_all_rows
+
+
+# (symptom_id, symptom_name) → 생성된 레시피 목록 (실패 시 빈 목록)
+RecipeGenerator = Callable[[int, str], Awaitable[list]]
+# [(symptom_id, symptom_name), ...] → {symptom_id: 레시피 목록} (실패 증상 제외)
+BatchRecipeGenerator = Callable[[list[tuple[int, str]]], Awaitable[dict]]
+
+RECIPE_BACKFILL_CONCURRENCY = int(os.getenv("RECIPE_BACKFILL_CONCURRENCY", "2"))
+
+
+class RecipeBackfillQueue:
+    """증상별 레시피 생성 작업 큐 (프로세스 공유)"""
+
+    _shared: Optional["RecipeBackfillQueue"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, concurrency: int = RECIPE_BACKFILL_CONCURRENCY, retry_after_seconds: int = 600):
+        """
+        Args:
+            concurrency: 동시 생성 수 (LLM 호출 한도)
+            retry_after_seconds: 실패한 증상 재시도 대기 시간
+        """
+        self.concurrency = concurrency
+        self.retry_after_seconds = retry_after_seconds
+        self._inflight: set[int] = set()
+        self._failed_at: dict[int, float] = {}
+        self._stats = {"submitted": 0, "deduplicated": 0, "generated": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def shared(cls) -> "RecipeBackfillQueue":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # ──────────────────────────────────────────
+    # Submit
+    # ──────────────────────────────────────────
+
+    def _claim(self, symptom_id: int) -> bool:
+        """생성 대상으로 등록 (이미 생성 중이거나 최근 실패했으면 False)"""
+        with self._lock:
+            failed_at = self._failed_at.get(symptom_id)
+            if symptom_id in self._inflight or (
+                failed_at is not None and time.monotonic() - failed_at < self.retry_after_seconds
+            ):
+                self._stats["deduplicated"] += 1
+                return False
+            self._inflight.add(symptom_id)
+            self._stats["submitted"] += 1
+            return True
+
+    def submit(self, symptom_id: int, symptom_name: str, generate: RecipeGenerator) -> bool:
+        """
+        레시피 생성 예약 (즉시 반환)
+
+        Returns:
+            새로 예약했으면 True, 이미 진행 중·재시도 대기 중이면 False
+        """
+        if not self._claim(symptom_id):
+            return False
+        asyncio.run_coroutine_threadsafe(
+            self._process(symptom_id, symptom_name, generate), self._worker_loop()
+        )
+        print(f"[RecipeBackfill] 예약: {symptom_name} (#{symptom_id})")
+        return True
+
+    def _worker_loop(self) -> asyncio.AbstractEventLoop:
+        """백필 전용 이벤트 루프 (데몬 스레드, 최초 예약 시 시작)"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="recipe-backfill", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    async def _process(self, symptom_id: int, symptom_name: str, generate: RecipeGenerator) -> bool:
+        # 백필 스레드 루프 / 배치 실행 루프마다 별도 동시 생성 한도
+        semaphore = self._semaphores.setdefault(
+            asyncio.get_running_loop(), asyncio.Semaphore(self.concurrency)
+        )
+        try:
+            async with semaphore:
+                recipes = await generate(symptom_id, symptom_name)
+        except Exception as e:
+            print(f"[RecipeBackfill] 생성 오류: {symptom_name} (#{symptom_id}) {e}")
+            recipes = []
+
+        self._finish(symptom_id, bool(recipes))
+        print(f"[RecipeBackfill] {'완료' if recipes else '실패'}: {symptom_name} (#{symptom_id}) {len(recipes)}건")
+        return bool(recipes)
+
+    def _finish(self, symptom_id: int, ok: bool) -> None:
+        with self._lock:
+            self._inflight.discard(symptom_id)
+            if ok:
+                self._failed_at.pop(symptom_id, None)
+                self._stats["generated"] += 1
+            else:
+                self._failed_at[symptom_id] = time.monotonic()
+                self._stats["failed"] += 1
+
+    # ──────────────────────────────────────────
+    # Batch
+    # ──────────────────────────────────────────
+
+    async def run_batch(self, symptoms: list[tuple[int, str]], generate_batch: BatchRecipeGenerator) -> dict:
+        """
+        여러 증상 레시피를 묶음 생성 함수 한 번으로 생성 (현재 이벤트 루프에서 실행)
+        요청 경로에서 이미 생성 중이거나 재시도 대기 중인 증상은 건너뜁니다.
+
+        Returns:
+            {"generated": n, "failed": n, "skipped": n}
+        """
+        targets = [(sid, name) for sid, name in symptoms if self._claim(sid)]
+        generated: dict = {}
+        try:
+            if targets:
+                generated = await generate_batch(targets)
+        except Exception as e:
+            print(f"[RecipeBackfill] 배치 생성 오류: {e}")
+
+        ok_count = 0
+        for symptom_id, _ in targets:
+            ok = bool(generated.get(symptom_id))
+            ok_count += ok
+            self._finish(symptom_id, ok)
+        return {
+            "generated": ok_count,
+            "failed": len(targets) - ok_count,
+            "skipped": len(symptoms) - len(targets),
+        }
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "pending": len(self._inflight), "cooling_down": len(self._failed_at)}
+
+
+def recipe_less_symptoms(db, only_mapped: bool = True) -> list[tuple[int, str]]:
+    """
+    symptom_recipe_map 에 레시피가 하나도 없는 증상 목록
+
+    Args:
+        db: Supabase 클라이언트 (동기)
+        only_mapped: 식재료 매핑이 있는 증상만 (분석 응답에 실제로 쓰이는 증상)
+    """
+    diseases = fetch_all_rows(db, "disease_master", "id, modern_name_ko, disease_read", "id")
+    with_recipes = {row["symptom_id"] for row in fetch_all_rows(db, "symptom_recipe_map", "symptom_id", "id")}
+    mapped = None
+    if only_mapped:
+        mapped = {row["symptom_id"] for row in fetch_all_rows(db, "symptom_ingredient_map", "symptom_id", "id")}
+
+    return [
+        (row["id"], row.get("modern_name_ko") or row.get("disease_read") or "")
+        for row in diseases
+        if row["id"] not in with_recipes and (mapped is None or row["id"] in mapped)
+    ]
@@ -4,8 +4,10 @@ Health Stack FastAPI 백엔드 서버
 """
 import os
 import sys
+import asyncio
 from typing import Optional
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -24,6 +26,11 @@ from app.services.naver_ocr_service import NaverOCRService
 from app.services.faq_service import FAQService
 from app.utils.drug_info_loader import get_drugs_info_list
 from app.utils.cache_manager import CacheManager
+from database.supabase_client import QueryCache
+from app.utils.pubmed_cache import PubMedQueryCache
+from app.utils.term_translator import TermTranslator
+from app.utils.pubmed_corpus import PubMedCorpus
+from app.utils.warm_up import warm_up_shared_indexes
 
 app = FastAPI(
     title="Health Stack API",
@@ -63,6 +70,21 @@ def load_precomputed_cache():
 async def startup_event():
     """서버 시작 시 실행"""
     load_precomputed_cache()
+    # disease_master 인덱스 · 증상→식재료/레시피 스냅샷 · 상호작용 그래프 · 번역 사전 · PubMed 코퍼스 사전 로드
+    await warm_up_shared_indexes()
+
+
+@app.on_event("shutdown")
+async def close_async_clients():
+    """비동기 Supabase / NCBI / YouTube 연결 풀 · 이미지 전처리 프로세스 풀 정리"""
+    from database.supabase_client import AsyncSupabaseClient
+    from app.utils.ncbi_scheduler import NCBIScheduler
+    from app.services.youtube_service import YouTubeService
+    from app.utils.image_preprocessor import shutdown_pool
+    await AsyncSupabaseClient.aclose()
+    await NCBIScheduler.shared().aclose()
+    await YouTubeService.aclose()
+    shutdown_pool()
 
 # Static Files Mount (이미지 서빙)
 if not os.path.exists("data/uploads"):
@@ -135,6 +157,71 @@ async def root():
     return {"message": "Health Stack API v1.0", "status": "running"}
 
 
+def _analyze_response(result) -> AnalyzeResponse:
+    """HealthStackResponse → /api/analyze 응답"""
+    return AnalyzeResponse(
+        symptom_summary=result.symptom_summary,
+        confidence_level=result.confidence_level,
+        source=result.source,
+        ingredients=[
+            IngredientResponse(
+                rep_code=ing.rep_code,
+                modern_name=ing.modern_name,
+                rationale_ko=ing.rationale_ko,
+                direction=ing.direction,
+                evidence_level=ing.evidence_level,
+                pubmed_papers=ing.pubmed_papers,
+                youtube_video=ing.youtube_video,
+                tip=ing.tip
+            )
+            for ing in result.ingredients
+        ],
+        recipes=[
+            RecipeResponse(
+                id=rec.id,
+                title=rec.title,
+                description=rec.description,
+                meal_slot=rec.meal_slot,
+                priority=rec.priority,
+                rationale_ko=rec.rationale_ko,
+                tags=rec.tags
+            )
+            for rec in result.recipes
+        ],
+        medications=result.medications,
+        cautions=result.cautions,
+        matched_symptom_name=result.matched_symptom_name,
+        disclaimer=result.disclaimer
+    )
+
+
+def _sse_response(events, to_result=None) -> StreamingResponse:
+    """
+    분석 이벤트 → SSE 응답 (처방전 스트리밍과 같은 형식: progress … result / error)
+    to_result: 마지막 result 이벤트의 HealthStackResponse → 기존 엔드포인트 응답 형식 (없으면 그대로)
+    """
+    async def event_generator():
+        try:
+            async for event in events:
+                if to_result and event["type"] == "result":
+                    event = {"type": "result", "data": to_result(event["data"])}
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Connection": "keep-alive",
+        },
+    )
+
+
 @app.post("/api/analyze", response_model=AnalyzeResponse)
 async def analyze_symptom(request: AnalyzeRequest):
     """
@@ -151,40 +238,7 @@ async def analyze_symptom(request: AnalyzeRequest):
             user_id=request.user_id
         )
         
-        return AnalyzeResponse(
-            symptom_summary=result.symptom_summary,
-            confidence_level=result.confidence_level,
-            source=result.source,
-            ingredients=[
-                IngredientResponse(
-                    rep_code=ing.rep_code,
-                    modern_name=ing.modern_name,
-                    rationale_ko=ing.rationale_ko,
-                    direction=ing.direction,
-                    evidence_level=ing.evidence_level,
-                    pubmed_papers=ing.pubmed_papers,
-                    youtube_video=ing.youtube_video,
-                    tip=ing.tip
-                )
-                for ing in result.ingredients
-            ],
-            recipes=[
-                RecipeResponse(
-                    id=rec.id,
-                    title=rec.title,
-                    description=rec.description,
-                    meal_slot=rec.meal_slot,
-                    priority=rec.priority,
-                    rationale_ko=rec.rationale_ko,
-                    tags=rec.tags
-                )
-                for rec in result.recipes
-            ],
-            medications=result.medications,
-            cautions=result.cautions,
-            matched_symptom_name=result.matched_symptom_name,
-            disclaimer=result.disclaimer
-        )
+        return _analyze_response(result)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -192,6 +246,24 @@ async def analyze_symptom(request: AnalyzeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/analyze/stream")
+async def analyze_symptom_stream(request: AnalyzeRequest):
+    """
+    [증상 분석 SSE 스트리밍] /api/analyze 와 같은 분석을 2단계로 전송
+    - analysis   → 요약·식재료·레시피·주의사항 (증상 분석 직후)
+    - evidence / video / medication → 식재료별 논문 · 영상, 약물별 정보 (완료 순)
+    - result     → /api/analyze 와 같은 최종 응답
+    """
+    api = HealthStackAPI()
+    events = api.analyze_streaming(
+        symptom_text=request.symptom,
+        prescription_image_path=None,
+        medications=request.medications,
+        user_id=request.user_id
+    )
+    return _sse_response(events, lambda result: _analyze_response(result).model_dump())
+
+
 @app.post("/api/ocr")
 async def process_ocr(file: UploadFile = File(...)):
     """
@@ -221,6 +293,124 @@ async def process_ocr(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _prepare_image_analysis(
+    symptom: str, user_id: Optional[str], content: Optional[bytes], medications_json: str
+) -> tuple[str, list[str], Optional[str]]:
+    """
+    처방전 이미지 OCR + 약물 통합
+    Returns: (분석 입력 텍스트, 통합 약물 목록, 임시 이미지 경로)
+    """
+    prescription_path = None
+    extracted_medications = []
+    hospital_name = None
+    ocr_full_text = ""
+    
+    # ★ JSON 문자열을 파싱하여 약물 추출
+    user_medications = []
+    if medications_json:
+        try:
+            import json
+            user_medications = json.loads(medications_json)
+            if not isinstance(user_medications, list):
+                user_medications = []
+        except json.JSONDecodeError:
+            user_medications = []
+    print(f"[User Medications] Received: {user_medications}")
+    
+    # 이미지가 있으면 임시 저장 후 OCR 처리
+    if content:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
+            tmp.write(content)
+            prescription_path = tmp.name
+        
+        # ★ OCR 처리: 처방전에서 약물 추출
+        ocr_service = NaverOCRService()
+        try:
+            ocr_result = await asyncio.to_thread(ocr_service.extract_prescription_info, prescription_path)
+            print(f"[OCR Result] Hospital: {ocr_result.get('hospital_name')}, Drugs: {ocr_result.get('drugs', [])}")
+            
+            # 추출된 약물과 병원명 저장
+            extracted_medications = ocr_result.get("drugs", [])
+            hospital_name = ocr_result.get("hospital_name")
+            ocr_full_text = ocr_result.get("full_text", "")
+            
+            # MedicationService에 저장
+            from app.services.medication_service import MedicationService
+            med_service = MedicationService()
+            med_service.save_prescription(
+                image_path=prescription_path,
+                drugs=extracted_medications,
+                hospital_name=hospital_name,
+                user_id=user_id
+            )
+            print(f"✅ Prescription saved: {len(extracted_medications)} drugs extracted")
+        except Exception as ocr_error:
+            print(f"⚠️ OCR Processing Error (continuing): {ocr_error}")
+            # OCR 실패 - 약물 없이 계속 진행
+            extracted_medications = []
+            ocr_full_text = ""
+    
+    # ★ 프론트엔드 약물 + OCR 약물 통합
+    all_medications = list(set(extracted_medications + user_medications))
+    print(f"[Final Medications] OCR: {extracted_medications}, User: {user_medications}, Combined: {all_medications}")
+    
+    # 분석 실행: 추출된 약물 + 증상 텍스트 전달
+    # ★ 중요: OCR 텍스트를 함께 전달하여 약물 정보가 분석에 포함되도록 함
+    combined_symptom = symptom
+    if ocr_full_text:
+        combined_symptom = f"{symptom}\n\n[처방전 정보]\n{ocr_full_text}".strip()
+
+    return combined_symptom, all_medications, prescription_path
+
+
+def _image_analysis_payload(result, all_medications: list[str]) -> dict:
+    """HealthStackResponse → /api/analyze-with-image 응답"""
+    return {
+        "symptom_summary": result.symptom_summary,
+        "confidence_level": result.confidence_level,
+        "source": result.source,
+        "ingredients": [
+            {
+                "rep_code": ing.rep_code,
+                "modern_name": ing.modern_name,
+                "rationale_ko": ing.rationale_ko,
+                "direction": ing.direction,
+                "evidence_level": ing.evidence_level,
+                "pubmed_papers": ing.pubmed_papers,
+                "youtube_video": ing.youtube_video,
+                "tip": ing.tip
+            }
+            for ing in result.ingredients
+        ],
+        "recipes": [
+            {
+                "id": rec.get("id") if isinstance(rec, dict) else rec.id,
+                "title": rec.get("title") if isinstance(rec, dict) else rec.title,
+                "description": rec.get("description") if isinstance(rec, dict) else rec.description,
+                "meal_slot": rec.get("meal_slot") if isinstance(rec, dict) else rec.meal_slot,
+                "priority": rec.get("priority") if isinstance(rec, dict) else rec.priority,
+                "rationale_ko": rec.get("rationale_ko") if isinstance(rec, dict) else rec.rationale_ko,
+                "tags": rec.get("tags") if isinstance(rec, dict) else rec.tags
+            }
+            for rec in result.recipes
+        ],
+        "medications": [
+            {
+                "name_ko": med.get("name_ko", med.get("name", "")),
+                "name_en": med.get("name_en", ""),
+                "classification": med.get("classification", ""),
+                "indication": med.get("indication", "주요 효능 정보 없음"),
+                "common_side_effects": med.get("common_side_effects", []),
+                "interaction_risk": med.get("interaction_risk", "unknown")
+            }
+            for med in get_drugs_info_list(all_medications)
+        ],
+        "cautions": result.cautions,
+        "matched_symptom_name": result.matched_symptom_name,
+        "disclaimer": result.disclaimer
+    }
+
+
 @app.post("/api/analyze-with-image")
 async def analyze_with_image(
     symptom: str = Form(""),
@@ -232,66 +422,10 @@ async def analyze_with_image(
     증상 + 처방전 이미지 통합 분석 API
     """
     try:
-        prescription_path = None
-        extracted_medications = []
-        hospital_name = None
-        ocr_full_text = ""
-        
-        # ★ JSON 문자열을 파싱하여 약물 추출
-        user_medications = []
-        if medications_json:
-            try:
-                import json
-                user_medications = json.loads(medications_json)
-                if not isinstance(user_medications, list):
-                    user_medications = []
-            except json.JSONDecodeError:
-                user_medications = []
-        print(f"[User Medications] Received: {user_medications}")
-        
-        # 이미지가 있으면 임시 저장 후 OCR 처리
-        if file:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-                content = await file.read()
-                tmp.write(content)
-                prescription_path = tmp.name
-            
-            # ★ OCR 처리: 처방전에서 약물 추출
-            ocr_service = NaverOCRService()
-            try:
-                ocr_result = ocr_service.extract_prescription_info(prescription_path)
-                print(f"[OCR Result] Hospital: {ocr_result.get('hospital_name')}, Drugs: {ocr_result.get('drugs', [])}")
-                
-                # 추출된 약물과 병원명 저장
-                extracted_medications = ocr_result.get("drugs", [])
-                hospital_name = ocr_result.get("hospital_name")
-                ocr_full_text = ocr_result.get("full_text", "")
-                
-                # MedicationService에 저장
-                from app.services.medication_service import MedicationService
-                med_service = MedicationService()
-                med_service.save_prescription(
-                    image_path=prescription_path,
-                    drugs=extracted_medications,
-                    hospital_name=hospital_name,
-                    user_id=user_id
-                )
-                print(f"✅ Prescription saved: {len(extracted_medications)} drugs extracted")
-            except Exception as ocr_error:
-                print(f"⚠️ OCR Processing Error (continuing): {ocr_error}")
-                # OCR 실패 - 약물 없이 계속 진행
-                extracted_medications = []
-                ocr_full_text = ""
-        
-        # ★ 프론트엔드 약물 + OCR 약물 통합
-        all_medications = list(set(extracted_medications + user_medications))
-        print(f"[Final Medications] OCR: {extracted_medications}, User: {user_medications}, Combined: {all_medications}")
-        
-        # 분석 실행: 추출된 약물 + 증상 텍스트 전달
-        # ★ 중요: OCR 텍스트를 함께 전달하여 약물 정보가 분석에 포함되도록 함
-        combined_symptom = symptom
-        if ocr_full_text:
-            combined_symptom = f"{symptom}\n\n[처방전 정보]\n{ocr_full_text}".strip()
+        content = await file.read() if file else None
+        combined_symptom, all_medications, prescription_path = await _prepare_image_analysis(
+            symptom, user_id, content, medications_json
+        )
         
         api = HealthStackAPI()
         result = await api.analyze(
@@ -305,50 +439,7 @@ async def analyze_with_image(
         if prescription_path:
             os.unlink(prescription_path)
         
-        return {
-            "symptom_summary": result.symptom_summary,
-            "confidence_level": result.confidence_level,
-            "source": result.source,
-            "ingredients": [
-                {
-                    "rep_code": ing.rep_code,
-                    "modern_name": ing.modern_name,
-                    "rationale_ko": ing.rationale_ko,
-                    "direction": ing.direction,
-                    "evidence_level": ing.evidence_level,
-                    "pubmed_papers": ing.pubmed_papers,
-                    "youtube_video": ing.youtube_video,
-                    "tip": ing.tip
-                }
-                for ing in result.ingredients
-            ],
-            "recipes": [
-                {
-                    "id": rec.get("id") if isinstance(rec, dict) else rec.id,
-                    "title": rec.get("title") if isinstance(rec, dict) else rec.title,
-                    "description": rec.get("description") if isinstance(rec, dict) else rec.description,
-                    "meal_slot": rec.get("meal_slot") if isinstance(rec, dict) else rec.meal_slot,
-                    "priority": rec.get("priority") if isinstance(rec, dict) else rec.priority,
-                    "rationale_ko": rec.get("rationale_ko") if isinstance(rec, dict) else rec.rationale_ko,
-                    "tags": rec.get("tags") if isinstance(rec, dict) else rec.tags
-                }
-                for rec in result.recipes
-            ],
-            "medications": [
-                {
-                    "name_ko": med.get("name_ko", med.get("name", "")),
-                    "name_en": med.get("name_en", ""),
-                    "classification": med.get("classification", ""),
-                    "indication": med.get("indication", "주요 효능 정보 없음"),
-                    "common_side_effects": med.get("common_side_effects", []),
-                    "interaction_risk": med.get("interaction_risk", "unknown")
-                }
-                for med in get_drugs_info_list(all_medications)
-            ],
-            "cautions": result.cautions,
-            "matched_symptom_name": result.matched_symptom_name,
-            "disclaimer": result.disclaimer
-        }
+        return _image_analysis_payload(result, all_medications)
     except Exception as e:
         import traceback
         error_msg = f"{str(e)}\n{traceback.format_exc()}"
@@ -356,6 +447,44 @@ async def analyze_with_image(
         raise HTTPException(status_code=500, detail=error_msg)
 
 
+@app.post("/api/analyze-with-image/stream")
+async def analyze_with_image_stream(
+    symptom: str = Form(""),
+    user_id: str = Form(None),
+    file: Optional[UploadFile] = File(None),
+    medications_json: str = Form("")
+):
+    """
+    [증상 + 처방전 SSE 스트리밍] /api/analyze-with-image 와 같은 분석을 2단계로 전송
+    - progress(OCR) → analysis → evidence / video / medication (완료 순) → result (기존 응답 형식)
+    """
+    content = await file.read() if file else None
+    api = HealthStackAPI()
+
+    async def events():
+        prescription_path = None
+        try:
+            if content:
+                yield {"type": "progress", "step": 0, "message": "처방전 OCR 분석 중...", "progress": 5}
+            combined_symptom, all_medications, prescription_path = await _prepare_image_analysis(
+                symptom, user_id, content, medications_json
+            )
+            async for event in api.analyze_streaming(
+                symptom_text=combined_symptom,
+                prescription_image_path=None,
+                medications=all_medications,
+                user_id=user_id
+            ):
+                if event["type"] == "result":
+                    event = {"type": "result", "data": _image_analysis_payload(event["data"], all_medications)}
+                yield event
+        finally:
+            if prescription_path and os.path.exists(prescription_path):
+                os.unlink(prescription_path)
+
+    return _sse_response(events())
+
+
 @app.post("/api/pubmed")
 async def search_pubmed(request: PubMedRequest):
     """
@@ -374,7 +503,7 @@ async def search_youtube(request: YouTubeRequest):
     YouTube 영상 검색 API
     """
     try:
-        videos = search_youtube_videos(request.ingredient)
+        videos = await search_youtube_videos(request.ingredient)
         return {"videos": videos}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -409,17 +538,29 @@ async def get_cache_status():
                 "total_diseases": metadata.get("total_diseases", 0),
                 "cached_diseases": len(metadata.get("cached_diseases", [])),
                 "failed_diseases": len(metadata.get("failed_diseases", [])),
-                "diseases": metadata.get("cached_diseases", [])[:5]  # 처음 5개만
+                "diseases": metadata.get("cached_diseases", [])[:5],  # 처음 5개만
+                "query_cache": QueryCache.shared().get_stats(),
+                "pubmed_cache": PubMedQueryCache.shared().get_stats(),
+                "translation": TermTranslator.shared().get_stats(),
+                "pubmed_corpus": PubMedCorpus.shared().get_stats()
             }
         except Exception as e:
             return {
                 "precomputed_cache_enabled": False,
-                "error": str(e)
+                "error": str(e),
+                "query_cache": QueryCache.shared().get_stats(),
+                "pubmed_cache": PubMedQueryCache.shared().get_stats(),
+                "translation": TermTranslator.shared().get_stats(),
+                "pubmed_corpus": PubMedCorpus.shared().get_stats()
             }
     else:
         return {
             "precomputed_cache_enabled": False,
-            "message": "Pre-computed 캐시 데이터가 없습니다"
+            "message": "Pre-computed 캐시 데이터가 없습니다",
+            "query_cache": QueryCache.shared().get_stats(),
+            "pubmed_cache": PubMedQueryCache.shared().get_stats(),
+            "translation": TermTranslator.shared().get_stats(),
+            "pubmed_corpus": PubMedCorpus.shared().get_stats()
         }
 
 @app.get("/api/prescriptions")
@@ -1,22 +1,31 @@
 """
 YouTube 영상 검색 서비스 모듈
 YouTube Data API v3를 사용하여 식재료 관련 영상 검색 및 캐싱
+
+- 검색·캐시 조회는 모두 비동기 (httpx.AsyncClient 이벤트 루프별 공유, YouTubeRepository)
+- 여러 식재료 영상 조회(videos_for_ingredients)는 모든 검색어의 youtube_cache 행을 in_ 쿼리 1회로 조회하고,
+  캐시에 없는 식재료만 API 를 동시에 호출
 """
 import os
 import sys
+import asyncio
 import hashlib
-import requests
+import weakref
 from typing import Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+
+import httpx
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from database.supabase_client import get_supabase_client
+from database.repositories import YouTubeRepository
 
 load_dotenv()
 
+CACHE_TTL_HOURS = 24
+
 
 @dataclass
 class YouTubeVideo:
@@ -29,23 +38,56 @@ class YouTubeVideo:
     description: str = ""
 
 
+def _query_hash(query: str) -> str:
+    return hashlib.md5(query.encode()).hexdigest()
+
+
 class YouTubeService:
     """YouTube 영상 검색 서비스"""
     
     BASE_URL = "https://www.googleapis.com/youtube/v3"
+
+    # 이벤트 루프별 HTTP 클라이언트 (연결 재사용)
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+        weakref.WeakKeyDictionary()
+    )
     
     def __init__(self):
         self.api_key = os.getenv("YOUTUBE_API_KEY", "")
-        self.db = get_supabase_client()
+        self.repo = YouTubeRepository()  # async 경로 DB 조회
         
         if not self.api_key:
             print("⚠️ YOUTUBE_API_KEY가 설정되지 않았습니다.")
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=httpx.Timeout(10))
+            self._clients[loop] = client
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """현재 루프의 HTTP 클라이언트 종료 (앱 shutdown 시)"""
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    @staticmethod
+    def ingredient_queries(ingredient_name: str) -> list[str]:
+        """식재료 영상 검색어 (앞에서부터 결과가 나올 때까지 시도)"""
+        return [
+            f"{ingredient_name} 요리",
+            f"{ingredient_name} 효능",
+        ]
     
-    def search_videos(
+    async def search_videos(
         self, 
         query: str, 
         max_results: int = 3,
-        use_cache: bool = True
+        use_cache: bool = True,
+        cached: Optional[dict] = None,
     ) -> list[YouTubeVideo]:
         """
         YouTube에서 영상 검색
@@ -54,6 +96,7 @@ class YouTubeService:
             query: 검색 쿼리 (한글/영문)
             max_results: 최대 결과 수
             use_cache: 캐시 사용 여부
+            cached: 미리 조회한 캐시 (검색어 → 영상 목록, get_cached_videos 결과) — 있으면 DB 조회 생략
             
         Returns:
             list[YouTubeVideo]: 영상 목록
@@ -63,9 +106,10 @@ class YouTubeService:
         
         # 캐시 확인
         if use_cache:
-            cached = self._get_cached_videos(query)
-            if cached:
-                return cached[:max_results]
+            if cached is None:
+                cached = await self.get_cached_videos([query])
+            if cached.get(query):
+                return cached[query][:max_results]
         
         try:
             params = {
@@ -78,11 +122,7 @@ class YouTubeService:
                 "regionCode": "KR"
             }
             
-            response = requests.get(
-                f"{self.BASE_URL}/search",
-                params=params,
-                timeout=10
-            )
+            response = await self._client().get(f"{self.BASE_URL}/search", params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -104,7 +144,7 @@ class YouTubeService:
             
             # 캐시 저장
             if videos:
-                self._cache_videos(query, videos)
+                await self._cache_videos(query, videos)
             
             return videos
             
@@ -112,49 +152,83 @@ class YouTubeService:
             print(f"YouTube 검색 오류: {e}")
             return []
     
-    def search_by_ingredient(self, ingredient_name: str) -> list[YouTubeVideo]:
+    async def search_by_ingredient(self, ingredient_name: str, cached: Optional[dict] = None) -> list[YouTubeVideo]:
         """
         식재료 이름으로 요리/활용 영상 검색
         
         Args:
             ingredient_name: 식재료 이름 (한글)
+            cached: 미리 조회한 캐시 (없으면 검색어 캐시를 한 번에 조회)
             
         Returns:
             list[YouTubeVideo]: 영상 목록
         """
-        # 검색 쿼리 생성
-        queries = [
-            f"{ingredient_name} 요리",
-            f"{ingredient_name} 효능",
-            f"{ingredient_name} 레시피"
-        ]
-        
-        # 첫 번째 쿼리로 검색
-        videos = self.search_videos(queries[0], max_results=2)
-        
+        queries = self.ingredient_queries(ingredient_name)
+        if cached is None and self.api_key:
+            cached = await self.get_cached_videos(queries)
+
         # 결과가 없으면 다음 쿼리 시도
-        if not videos and len(queries) > 1:
-            videos = self.search_videos(queries[1], max_results=2)
+        videos = []
+        for query in queries:
+            videos = await self.search_videos(query, max_results=2, cached=cached)
+            if videos:
+                break
         
         return videos[:1]  # MVP에서는 1개만 반환
+
+    async def videos_for_ingredients(
+        self,
+        ingredient_names: list[str],
+        symptom_id: Optional[int] = None,
+    ) -> dict[str, Optional[YouTubeVideo]]:
+        """
+        여러 식재료의 대표 영상을 한 번에 조회
+        증상 매핑 영상(1회 조회)이 있으면 모든 식재료에 사용, 없으면 식재료별 검색
+        (모든 검색어 캐시는 in_ 쿼리 1회, 캐시에 없는 식재료만 API 동시 호출)
+        """
+        names = list(dict.fromkeys(ingredient_names))
+        if not names:
+            return {}
+
+        async def _mapped() -> Optional[YouTubeVideo]:
+            return await self.get_video_for_symptom_ingredient(symptom_id) if symptom_id else None
+
+        async def _cached() -> dict:
+            if not self.api_key:
+                return {}
+            return await self.get_cached_videos(
+                [query for name in names for query in self.ingredient_queries(name)]
+            )
+
+        mapped, cached = await asyncio.gather(_mapped(), _cached())
+        if mapped:
+            return {name: mapped for name in names}
+
+        results = await asyncio.gather(
+            *(self.search_by_ingredient(name, cached=cached) for name in names), return_exceptions=True
+        )
+        videos = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                print(f"YouTube 영상 조회 오류 ({name}): {result}")
+                result = []
+            videos[name] = result[0] if result else None
+        return videos
     
-    def get_video_for_symptom_ingredient(
+    async def get_video_for_symptom_ingredient(
         self, 
         symptom_id: int, 
-        rep_code: str
+        rep_code: Optional[str] = None
     ) -> Optional[YouTubeVideo]:
         """
         증상-식재료 조합에 맞는 영상 조회
-        DB에 미리 매핑된 영상 우선 사용
+        DB에 미리 매핑된 영상 우선 사용 (현재 매핑은 증상 단위)
         """
         try:
             # symptom_video_map에서 조회
-            result = self.db.table("symptom_video_map").select(
-                "priority, content_videos(video_id, title, channel, tags)"
-            ).eq("symptom_id", symptom_id).order("priority").limit(1).execute()
+            video_data = await self.repo.symptom_video(symptom_id)
             
-            if result.data and result.data[0].get("content_videos"):
-                video_data = result.data[0]["content_videos"]
+            if video_data:
                 return YouTubeVideo(
                     video_id=video_data.get("video_id", ""),
                     title=video_data.get("title", ""),
@@ -169,51 +243,54 @@ class YouTubeService:
             print(f"DB 영상 조회 오류: {e}")
             return None
     
-    def _get_cached_videos(self, query: str) -> Optional[list[YouTubeVideo]]:
-        """캐시된 영상 조회"""
+    async def get_cached_videos(self, queries: list[str]) -> dict[str, list[YouTubeVideo]]:
+        """
+        캐시된 영상 일괄 조회 (in_ 쿼리 1회)
+
+        Returns:
+            {검색어: 영상 목록} — 만료(24시간)되지 않은 캐시만
+        """
         try:
-            query_hash = hashlib.md5(query.encode()).hexdigest()
-            
-            result = self.db.table("youtube_cache").select("*").eq(
-                "query_hash", query_hash
-            ).single().execute()
-            
-            if result.data:
+            by_hash = {_query_hash(query): query for query in dict.fromkeys(queries)}
+            rows = await self.repo.get_caches(list(by_hash))
+
+            now = datetime.now()
+            videos: dict[str, list[YouTubeVideo]] = {}
+            for query_hash, row in rows.items():
                 # 캐시 만료 확인 (24시간)
                 cached_at = datetime.fromisoformat(
-                    result.data.get("created_at", "2000-01-01").replace("Z", "+00:00")
+                    (row.get("created_at") or "2000-01-01").replace("Z", "+00:00")
                 )
-                if datetime.now(cached_at.tzinfo) - cached_at < timedelta(hours=24):
-                    # 캐시 히트 카운트 업데이트
-                    self.db.table("youtube_cache").update({
-                        "last_accessed_at": datetime.now().isoformat()
-                    }).eq("query_hash", query_hash).execute()
-                    
-                    # JSON에서 영상 목록 복원
-                    response_json = result.data.get("response_json", {})
-                    videos = []
-                    for v in response_json.get("videos", []):
-                        videos.append(YouTubeVideo(
-                            video_id=v.get("video_id", ""),
-                            title=v.get("title", ""),
-                            channel=v.get("channel", ""),
-                            thumbnail_url=v.get("thumbnail_url", ""),
-                            url=v.get("url", "")
-                        ))
-                    return videos
-            
-            return None
+                if datetime.now(cached_at.tzinfo) - cached_at >= timedelta(hours=CACHE_TTL_HOURS):
+                    continue
+                # JSON에서 영상 목록 복원
+                videos[by_hash[query_hash]] = [
+                    YouTubeVideo(
+                        video_id=v.get("video_id", ""),
+                        title=v.get("title", ""),
+                        channel=v.get("channel", ""),
+                        thumbnail_url=v.get("thumbnail_url", ""),
+                        url=v.get("url", "")
+                    )
+                    for v in (row.get("response_json") or {}).get("videos", [])
+                ]
+
+            # 캐시 접근 시각 업데이트 (히트 행 한 번에)
+            hits = [query_hash for query_hash, query in by_hash.items() if query in videos]
+            if hits:
+                await self.repo.touch_caches(hits, now.isoformat())
+            return videos
             
-        except Exception:
-            return None
+        except Exception as e:
+            print(f"YouTube 캐시 조회 오류: {e}")
+            return {}
     
-    def _cache_videos(self, query: str, videos: list[YouTubeVideo]):
+    async def _cache_videos(self, query: str, videos: list[YouTubeVideo]):
         """영상 캐시 저장"""
         try:
-            query_hash = hashlib.md5(query.encode()).hexdigest()
-            
-            self.db.table("youtube_cache").upsert({
-                "query_hash": query_hash,
+            now = datetime.now()
+            await self.repo.upsert_cache({
+                "query_hash": _query_hash(query),
                 "query": query,
                 "provider": "youtube",
                 "response_json": {
@@ -228,19 +305,19 @@ class YouTubeService:
                         for v in videos
                     ]
                 },
-                "expires_at": (datetime.now() + timedelta(hours=24)).isoformat(),
-                "created_at": datetime.now().isoformat(),
-                "last_accessed_at": datetime.now().isoformat()
-            }, on_conflict="query_hash").execute()
+                "expires_at": (now + timedelta(hours=CACHE_TTL_HOURS)).isoformat(),
+                "created_at": now.isoformat(),
+                "last_accessed_at": now.isoformat()
+            })
             
         except Exception as e:
             print(f"YouTube 캐시 저장 오류: {e}")
 
 
-def search_youtube_videos(ingredient_name: str) -> list[dict]:
+async def search_youtube_videos(ingredient_name: str) -> list[dict]:
     """편의 함수: 식재료 관련 YouTube 영상 검색"""
     service = YouTubeService()
-    videos = service.search_by_ingredient(ingredient_name)
+    videos = await service.search_by_ingredient(ingredient_name)
     
     return [
         {
@@ -257,13 +334,17 @@ def search_youtube_videos(ingredient_name: str) -> list[dict]:
 if __name__ == "__main__":
     # 테스트
     ingredients = ["무", "생강", "대추"]
+
+    async def _main():
+        results = await asyncio.gather(*(search_youtube_videos(ingredient) for ingredient in ingredients))
+        await YouTubeService.aclose()
+        return results
     
-    for ingredient in ingredients:
+    for ingredient, videos in zip(ingredients, asyncio.run(_main())):
         print(f"\n{'='*50}")
         print(f"식재료: {ingredient}")
         print("="*50)
         
-        videos = search_youtube_videos(ingredient)
         for v in videos:
             print(f"▶️ {v['title'][:40]}...")
             print(f"   채널: {v['channel']}")
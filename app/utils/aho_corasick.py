@@ -0,0 +1,69 @@
+"""
+Aho-Corasick 다중 패턴 문자열 매칭
+여러 키워드(약물명, 식재료명, 증상 패턴 등)를 텍스트 한 번 순회로 모두 찾습니다.
+패턴 수·텍스트 길이와 무관하게 O(텍스트 길이 + 매칭 수)로 동작해
+'for 패턴 in 패턴들: if 패턴 in 텍스트' 형태의 중첩 부분 문자열 루프를 대체합니다.
+"""
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasick:
+    """정적 패턴 집합용 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: 찾을 문자열 목록 (빈 문자열·중복은 무시)
+        """
+        self.patterns: list[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(pattern_id)
+
+        # BFS로 실패 링크 구성 (출력 목록은 실패 링크 쪽 출력까지 합침)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter(self, text: str) -> Iterator[tuple[int, str]]:
+        """(끝 위치, 패턴) 을 텍스트 순서대로 반환"""
+        node = 0
+        for idx, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern_id in self._out[node]:
+                yield idx, self.patterns[pattern_id]
+
+    def find_all(self, text: str) -> set[str]:
+        """텍스트에 포함된 패턴 집합"""
+        return {pattern for _, pattern in self.iter(text)}
+
+    def find_ordered(self, text: str) -> list[str]:
+        """텍스트에 포함된 패턴 (처음 등장한 순서, 중복 제거)"""
+        return list(dict.fromkeys(pattern for _, pattern in self.iter(text)))
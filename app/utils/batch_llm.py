@@ -0,0 +1,186 @@
+"""
+다건 LLM 배치 생성
+항목(증상 등)마다 LLM을 한 번씩 호출하던 사전 생성 작업을, 토큰 예산 안에서 여러 항목을 하나의
+구조화(JSON) 프롬프트로 묶어 호출합니다.
+
+- 항목별 입력 토큰 + 예상 출력 토큰 합이 token_budget 을 넘지 않도록 묶음 구성
+- 응답은 {"results": [{"id": ..., ...}]} 형태로 받아 항목별로 검증
+- 누락·검증 실패·호출 실패 항목만 다음 라운드에서 다시 묶어 재시도 (max_retries 회)
+- 묶음끼리는 concurrency 개까지 동시 호출
+"""
+import os
+import json
+import math
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+
+# 프롬프트 문자열 → 모델 응답 텍스트
+LLMCall = Callable[[str], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 등 비ASCII 1자 ≈ 1토큰, ASCII 4자 ≈ 1토큰)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + math.ceil((len(text) - non_ascii) / 4)
+
+
+@dataclass
+class BatchResult:
+    """배치 생성 결과"""
+    results: dict[str, dict] = field(default_factory=dict)  # 항목 id → 모델 출력
+    failed: list[str] = field(default_factory=list)
+    calls: int = 0
+
+
+class BatchLLMGenerator:
+    """토큰 예산 기반 다건 JSON 생성기"""
+
+    def __init__(
+        self,
+        call: LLMCall,
+        token_budget: int = 8000,
+        output_tokens_per_item: int = 300,
+        max_items_per_batch: int = 30,
+        max_retries: int = 2,
+        concurrency: int = 2,
+    ):
+        """
+        Args:
+            call: LLM 호출 함수 (JSON 응답 텍스트 반환)
+            token_budget: 묶음 하나의 입력 + 예상 출력 토큰 한도
+            output_tokens_per_item: 항목당 예상 출력 토큰
+            max_items_per_batch: 묶음당 최대 항목 수
+            max_retries: 실패 항목 재시도 라운드 수
+            concurrency: 동시 호출 묶음 수
+        """
+        self.call = call
+        self.token_budget = token_budget
+        self.output_tokens_per_item = output_tokens_per_item
+        self.max_items_per_batch = max_items_per_batch
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+
+    def pack(self, items: dict[str, str], header: str) -> list[list[str]]:
+        """항목 id 를 토큰 예산에 맞춰 묶음으로 분할 (입력 순서 유지)"""
+        base = estimate_tokens(header)
+        batches: list[list[str]] = []
+        current: list[str] = []
+        used = base
+        for item_id, text in items.items():
+            cost = estimate_tokens(self._item_line(item_id, text)) + self.output_tokens_per_item
+            if current and (used + cost > self.token_budget or len(current) >= self.max_items_per_batch):
+                batches.append(current)
+                current, used = [], base
+            current.append(item_id)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _item_line(item_id: str, text: str) -> str:
+        return f"- id={item_id}: {text}"
+
+    @staticmethod
+    def build_prompt(instructions: str, item_schema: str, lines: list[str]) -> str:
+        return (
+            f"{instructions.strip()}\n\n"
+            "Output Format: JSON object ONLY (no markdown), one entry per input item, keeping each item's id:\n"
+            f'{{"results": [{{"id": "<item id>", {item_schema}}}]}}\n\n'
+            "Items:\n" + "\n".join(lines)
+        )
+
+    @staticmethod
+    def parse(text: str) -> dict[str, dict]:
+        """응답 JSON → {항목 id: 출력} (잘못된 응답은 빈 dict)"""
+        text = (text or "").strip().replace("```json", "").replace("```", "")
+        try:
+            data = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+        entries = data.get("results", []) if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            return {}
+        return {
+            str(entry["id"]): entry
+            for entry in entries
+            if isinstance(entry, dict) and entry.get("id") is not None
+        }
+
+    async def run(
+        self,
+        items: dict[Any, str],
+        instructions: str,
+        item_schema: str,
+        validate: Optional[Callable[[dict], bool]] = None,
+    ) -> BatchResult:
+        """
+        Args:
+            items: 항목 id → 프롬프트에 넣을 항목 설명
+            instructions: 공통 지시문
+            item_schema: 항목별 출력 필드 JSON 예시 (id 제외)
+            validate: 항목 출력 검증 함수 (False 면 재시도 대상)
+        """
+        remaining = {str(k): v for k, v in items.items()}
+        result = BatchResult()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        header = self.build_prompt(instructions, item_schema, [])
+
+        async def _one(batch: list[str]) -> dict[str, dict]:
+            prompt = self.build_prompt(
+                instructions, item_schema, [self._item_line(i, remaining[i]) for i in batch]
+            )
+            async with semaphore:
+                try:
+                    text = await self.call(prompt)
+                except Exception as e:
+                    print(f"[BatchLLM] 묶음 호출 실패 ({len(batch)}건): {e}")
+                    return {}
+            return self.parse(text)
+
+        for attempt in range(self.max_retries + 1):
+            if not remaining:
+                break
+            batches = self.pack(remaining, header)
+            result.calls += len(batches)
+            outputs = await asyncio.gather(*(_one(batch) for batch in batches))
+
+            for batch, parsed in zip(batches, outputs):
+                for item_id in batch:
+                    entry = parsed.get(item_id)
+                    if entry is not None and (validate is None or validate(entry)):
+                        result.results[item_id] = entry
+                        remaining.pop(item_id)
+
+            print(
+                f"[BatchLLM] 라운드 {attempt + 1}: 호출 {len(batches)}회, "
+                f"성공 누적 {len(result.results)}건, 남은 항목 {len(remaining)}건"
+            )
+
+        result.failed = list(remaining)
+        return result
+
+
+def gemini_json_call(model: str = "gemini-2.0-flash", api_key: Optional[str] = None) -> Optional[LLMCall]:
+    """JSON 응답 모드 Gemini 호출 함수 (API 키·SDK 없으면 None)"""
+    api_key = api_key or os.getenv("API_KEY")
+    if not api_key:
+        return None
+    try:
+        from google import genai
+    except ImportError:
+        return None
+
+    client = genai.Client(api_key=api_key)
+
+    async def _call(prompt: str) -> str:
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config={"response_mime_type": "application/json"},
+        )
+        return response.text
+
+    return _call
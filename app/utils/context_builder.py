@@ -0,0 +1,178 @@
+"""
+LLM 프롬프트용 근거 문맥 구성
+논문 제목·초록 전문을 그대로 이어 붙이던 프롬프트 문맥을, 질문과 관련된 문장만 골라 모델별 토큰 예산 안에 담습니다.
+
+- 출처(논문 등)마다 헤더(제목·PMID 등)는 유지하고 본문은 문장 단위로 분리
+- 문장 점수: 질문 용어 일치(IDF 가중, 문장 길이 보정) — 같은 출처의 하위 문장일수록 감쇠해 출처를 고르게 사용
+- 중복 제거: 이미 고른 문장과 용어 집합이 거의 같은(Jaccard ≥ dedup_threshold) 문장은 제외
+- 점수 순으로 예산(헤더 포함)에 들어가는 문장만 담고, 출력은 출처·문장 원래 순서 유지
+"""
+import re
+import math
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.utils.batch_llm import estimate_tokens
+
+
+# 모델별 근거 문맥 토큰 예산 (프롬프트 지시문·응답 제외)
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-4o-mini": 800,
+    "gpt-4o": 1200,
+    "gpt-3.5-turbo": 800,
+    "gemini-2.0-flash": 1500,
+}
+DEFAULT_CONTEXT_BUDGET = 800
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their these this "
+    "to was were which with we our not no than also".split()
+)
+
+_TERM = re.compile(r"[a-z0-9]+|[가-힣]{2,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def context_budget(model: Optional[str]) -> int:
+    """모델명 → 근거 문맥 토큰 예산 (날짜 접미사 등은 접두어로 매칭)"""
+    if model:
+        for name in sorted(MODEL_CONTEXT_BUDGETS, key=len, reverse=True):
+            if model.startswith(name):
+                return MODEL_CONTEXT_BUDGETS[name]
+    return DEFAULT_CONTEXT_BUDGET
+
+
+def _terms(text: str) -> list[str]:
+    """소문자 영문·숫자 토큰 + 두 글자 이상 한글 어절 (불용어·간단한 복수형 정규화)"""
+    terms = []
+    for tok in _TERM.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith(("ss", "us", "is")):
+            tok = tok[:-1]
+        terms.append(tok)
+    return terms
+
+
+def split_sentences(text: str) -> list[str]:
+    """문장 단위 분리 (마침표·물음표 뒤 공백, 줄바꿈 기준)"""
+    if not text:
+        return []
+    return [s for s in (part.strip() for part in _SENTENCE_END.split(str(text))) if s]
+
+
+@dataclass
+class ContextSource:
+    """문맥 출처 1건 (헤더는 항상 유지, 본문은 문장 단위로 선택)"""
+    header: str
+    text: str
+
+
+@dataclass
+class ContextResult:
+    """구성된 문맥과 축소 통계"""
+    text: str
+    tokens: int
+    original_tokens: int
+    sources: list[int] = field(default_factory=list)   # 포함된 출처 번호 (입력 순서)
+    sentences: int = 0
+    duplicates: int = 0
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.tokens / self.original_tokens if self.original_tokens else 0.0
+
+
+def build_context(
+    sources: list[ContextSource],
+    query: str = "",
+    model: Optional[str] = None,
+    budget: Optional[int] = None,
+    dedup_threshold: float = 0.8,
+    source_decay: float = 0.5,
+) -> ContextResult:
+    """
+    출처 목록 → 토큰 예산 안의 압축 문맥
+
+    Args:
+        sources: 관련도 순 출처 목록 (동점이면 앞쪽 출처 우선)
+        query: 질문 / 관심 주제 (비어 있으면 출처·문장 순서대로 채움)
+        model: 예산 조회용 모델명 (budget 미지정 시 MODEL_CONTEXT_BUDGETS)
+        budget: 토큰 예산 직접 지정
+        dedup_threshold: 중복으로 보는 용어 집합 Jaccard 유사도
+        source_decay: 같은 출처 안에서 k번째 문장 점수를 1 / (1 + decay·k) 로 감쇠
+    """
+    budget = budget if budget is not None else context_budget(model)
+    original_tokens = sum(
+        estimate_tokens(f"{src.header}\n{src.text}") for src in sources if src.header or src.text
+    )
+
+    # 1. 문장 분리 + 용어 추출
+    candidates = []   # (출처 번호, 문장 번호, 문장, 용어 집합)
+    for s_idx, src in enumerate(sources):
+        # 본문 없는 출처는 헤더만 (제목 자체가 근거)
+        for n_idx, sentence in enumerate(split_sentences(src.text) or ([""] if src.header else [])):
+            candidates.append((s_idx, n_idx, sentence, set(_terms(sentence))))
+
+    # 2. 점수: 질문 용어의 IDF 합 / 문장 길이 보정
+    query_terms = set(_terms(query))
+    total = len(candidates) or 1
+    doc_freq: dict[str, int] = {}
+    for *_, terms in candidates:
+        for term in terms & query_terms:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+
+    raw_scores = []
+    for *_, terms in candidates:
+        matched = terms & query_terms
+        score = sum(math.log(1 + total / doc_freq[term]) for term in matched)
+        raw_scores.append(score / math.sqrt(1 + len(terms) / 20) if score else 0.0)
+
+    # 같은 출처의 하위 문장 감쇠 (한 논문이 예산을 독차지하지 않도록)
+    scores = [0.0] * len(candidates)
+    by_source: dict[int, list[int]] = {}
+    for i, (s_idx, *_rest) in enumerate(candidates):
+        by_source.setdefault(s_idx, []).append(i)
+    for indices in by_source.values():
+        ranked = sorted(indices, key=lambda i: -raw_scores[i])
+        for rank, i in enumerate(ranked):
+            scores[i] = raw_scores[i] / (1 + source_decay * rank)
+
+    # 3. 점수 순으로 예산 안에 담기 (헤더는 출처의 첫 문장을 담을 때 함께 계산)
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], candidates[i][0], candidates[i][1]))
+    chosen: dict[int, list[int]] = {}
+    chosen_terms: list[set] = []
+    used, duplicates = 0, 0
+    for i in order:
+        s_idx, _, sentence, terms = candidates[i]
+        if terms and any(
+            len(terms & other) / len(terms | other) >= dedup_threshold for other in chosen_terms
+        ):
+            duplicates += 1
+            continue
+        cost = estimate_tokens(sentence) + 1 if sentence else 0
+        if s_idx not in chosen:
+            cost += estimate_tokens(sources[s_idx].header) + 2
+        if used + cost > budget:
+            continue
+        used += cost
+        chosen.setdefault(s_idx, []).append(i)
+        if terms:
+            chosen_terms.append(terms)
+
+    # 4. 출처·문장 원래 순서로 조립
+    blocks = []
+    for s_idx in sorted(chosen):
+        body = " ".join(candidates[i][2] for i in sorted(chosen[s_idx], key=lambda i: candidates[i][1]))
+        header = sources[s_idx].header
+        blocks.append(f"{header}\n{body}" if header and body else header or body)
+    text = "\n\n".join(blocks)
+
+    return ContextResult(
+        text=text,
+        tokens=estimate_tokens(text),
+        original_tokens=original_tokens,
+        sources=sorted(chosen),
+        sentences=sum(len(v) for v in chosen.values()),
+        duplicates=duplicates,
+    )
@@ -0,0 +1,267 @@
+"""
+disease_master 인메모리 n-gram 인덱스
+증상 매칭마다 PostgREST ilike(%키워드%) 순차 스캔을 보내는 대신
+서버 시작 시 disease_master 전체를 메모리에 올려 부분 문자열 / 유사 검색을 로컬에서 처리
+
+- 인덱스 단위: 2-gram (한글 증상명은 2글자 단어가 많아 3-gram으로는 '두통', '불면' 등이 검색되지 않음)
+- 부분 문자열 검색: 질의 n-gram 역색인 교집합으로 후보를 좁힌 뒤 실제 포함 여부 확인 (ilike 와 같은 결과)
+- 유사 검색: n-gram 집합 Jaccard 유사도 (pg_trgm similarity 와 같은 방식) — 오타·띄어쓰기 차이 대응
+- 매핑 여부: symptom_ingredient_map 의 symptom_id 집합을 함께 로드해 후보별 매핑 확인 쿼리(N+1) 제거
+- 갱신: refresh_minutes 경과 시 백그라운드 재로드 (이전 인덱스로 계속 응답), invalidate() 로 즉시 갱신 요청
+"""
+import time
+import threading
+from collections import Counter
+from typing import Optional
+
+from database.supabase_client import fetch_all_rows
+
+
+# AnalyzeService 검색 필드 (기존 ilike 쿼리와 동일)
+EXACT_FIELDS = ("modern_name_ko", "disease_read", "name_en")
+SIMILAR_FIELDS = ("modern_name_ko", "disease_read", "disease_alias_read", "category")
+INDEXED_FIELDS = ("modern_name_ko", "disease_read", "name_en", "disease_alias_read", "category")
+
+NGRAM_SIZE = 2
+
+
+def _normalize(text) -> str:
+    """ilike 와 같이 대소문자 무시"""
+    return str(text).lower().strip() if text else ""
+
+
+def _ngrams(text: str) -> set[str]:
+    """문자 n-gram 집합 (n보다 짧은 문자열은 문자열 자체)"""
+    if len(text) < NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class _Snapshot:
+    """한 번 로드한 인덱스 (교체 시 통째로 바꿔 끼워 읽기 쪽 잠금 불필요)"""
+
+    def __init__(self, rows: list[dict], mapped_ids: Optional[set] = None):
+        self.rows = rows
+        self.mapped_ids = mapped_ids
+        # 필드별 정규화 문자열: fields[field][row_idx]
+        self.fields = {
+            name: [_normalize(row.get(name)) for row in rows] for name in INDEXED_FIELDS
+        }
+        # n-gram → 행 번호 (전체 필드 통합 역색인)
+        self.postings: dict[str, set[int]] = {}
+        for idx in range(len(rows)):
+            for name in INDEXED_FIELDS:
+                for gram in _ngrams(self.fields[name][idx]):
+                    self.postings.setdefault(gram, set()).add(idx)
+
+
+class DiseaseIndex:
+    """disease_master 인메모리 검색 인덱스 (프로세스 공유)"""
+
+    _shared: Optional["DiseaseIndex"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, refresh_minutes: int = 60, page_size: int = 1000):
+        """
+        Args:
+            refresh_minutes: 주기적 재로드 간격
+            page_size: Supabase 페이지 단위 조회 크기 (PostgREST 기본 최대 1000행)
+        """
+        self.refresh_seconds = refresh_minutes * 60
+        self.page_size = page_size
+        self._snapshot: Optional[_Snapshot] = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._last_error_at = 0.0
+
+    @classmethod
+    def shared(cls) -> "DiseaseIndex":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # ──────────────────────────────────────────
+    # Load / Refresh
+    # ──────────────────────────────────────────
+
+    @property
+    def is_ready(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def mapped_ids(self) -> Optional[set]:
+        """식재료 매핑이 있는 symptom_id 집합 (미로드 시 None)"""
+        snapshot = self._snapshot
+        return snapshot.mapped_ids if snapshot else None
+
+    @property
+    def rows(self) -> Optional[list[dict]]:
+        """현재 인덱스의 disease_master 행 (미로드 시 None)"""
+        snapshot = self._snapshot
+        return snapshot.rows if snapshot else None
+
+    def build(self, rows: list[dict], mapped_ids: Optional[set] = None) -> None:
+        """행 목록으로 인덱스 구성 (테스트·외부 로더용)"""
+        started = time.perf_counter()
+        snapshot = _Snapshot(rows, mapped_ids)
+        self._snapshot = snapshot
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        print(
+            f"[DiseaseIndex] {len(rows)}건 인덱싱 완료 "
+            f"({len(snapshot.postings)} n-grams, {(time.perf_counter() - started) * 1000:.0f}ms)"
+        )
+
+    def load(self, db) -> int:
+        """disease_master 전체 + 매핑 보유 symptom_id 집합을 읽어 인덱스 재구성"""
+        rows = fetch_all_rows(db, "disease_master", "*", "id", page_size=self.page_size)
+        try:
+            mapped_ids = {
+                row["symptom_id"]
+                for row in fetch_all_rows(
+                    db, "symptom_ingredient_map", "symptom_id", "id", page_size=self.page_size
+                )
+            }
+        except Exception as e:
+            # 매핑 집합이 없으면 호출 측이 후보 전체를 한 번에 조회
+            print(f"[DiseaseIndex] 매핑 집합 로드 실패: {e}")
+            mapped_ids = None
+        self.build(rows, mapped_ids)
+        return len(rows)
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        인덱스 사용 가능 여부 반환.
+        - 최초 호출: 동기 로드 (실패 시 1분간 재시도하지 않고 False → 호출 측 DB 쿼리 fallback)
+        - 만료/invalidate: 기존 인덱스로 응답하면서 백그라운드 재로드
+        """
+        if self._snapshot is None:
+            if time.monotonic() - self._last_error_at < 60:
+                return False
+            with self._load_lock:
+                if self._snapshot is None:
+                    try:
+                        self.load(db)
+                    except Exception as e:
+                        self._last_error_at = time.monotonic()
+                        print(f"[DiseaseIndex] 로드 실패 — DB 검색 사용: {e}")
+                        return False
+            return True
+
+        if self._stale or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._refresh_in_background(db)
+        return True
+
+    def invalidate(self) -> None:
+        """disease_master 변경 알림 시 호출 — 다음 조회에서 백그라운드 재로드"""
+        self._stale = True
+
+    def _refresh_in_background(self, db) -> None:
+        with self._load_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.load(db)
+            except Exception as e:
+                # 기존 인덱스 유지, 다음 주기에 재시도
+                self._loaded_at = time.monotonic()
+                print(f"[DiseaseIndex] 재로드 실패 — 기존 인덱스 유지: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    # ──────────────────────────────────────────
+    # Search
+    # ──────────────────────────────────────────
+
+    def search(self, query: str, fields=EXACT_FIELDS, limit: int = 10) -> list[dict]:
+        """
+        부분 문자열 검색 (ilike %query% 와 같은 매칭) + 순위
+        순위: 필드 값과 완전 일치 > 접두 일치 > 포함, 앞쪽 필드 우선, 짧은 값 우선
+        """
+        snapshot = self._snapshot
+        q = _normalize(query)
+        if snapshot is None or not q:
+            return []
+
+        grams = _ngrams(q) if len(q) >= NGRAM_SIZE else set()
+        # n보다 짧은 질의(1글자)는 역색인으로 좁힐 수 없어 전체 확인
+        candidates: Optional[set[int]] = None if grams else set(range(len(snapshot.rows)))
+        for gram in sorted(grams, key=lambda g: len(snapshot.postings.get(g, ()))):
+            posting = snapshot.postings.get(gram)
+            if not posting:
+                return []
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return []
+
+        ranked = []
+        for idx in candidates:
+            best = None
+            for field_rank, name in enumerate(fields):
+                value = snapshot.fields[name][idx]
+                if q not in value:
+                    continue
+                match = 0 if value == q else 1 if value.startswith(q) else 2
+                key = (match, field_rank, len(value), idx)
+                if best is None or key < best:
+                    best = key
+            if best is not None:
+                ranked.append((best, idx))
+
+        ranked.sort()
+        return [snapshot.rows[idx] for _, idx in ranked[:limit]]
+
+    def fuzzy(self, query: str, fields=SIMILAR_FIELDS, threshold: float = 0.5, limit: int = 10) -> list[tuple[dict, float]]:
+        """
+        n-gram Jaccard 유사도 검색 (부분 문자열 검색이 비었을 때 오타 대응용)
+
+        Returns:
+            [(row, score), ...] 유사도 내림차순
+        """
+        snapshot = self._snapshot
+        q = _normalize(query)
+        if snapshot is None or not q:
+            return []
+
+        grams = _ngrams(q)
+        overlap: Counter = Counter()
+        for gram in grams:
+            for idx in snapshot.postings.get(gram, ()):
+                overlap[idx] += 1
+
+        scored = []
+        for idx, shared in overlap.items():
+            # 가장 큰 공유 n-gram 수로도 threshold 미달이면 건너뜀
+            if shared / len(grams) < threshold:
+                continue
+            best = 0.0
+            for name in fields:
+                value_grams = _ngrams(snapshot.fields[name][idx])
+                if not value_grams:
+                    continue
+                common = len(grams & value_grams)
+                best = max(best, common / (len(grams) + len(value_grams) - common))
+            if best >= threshold:
+                scored.append((best, idx))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(snapshot.rows[idx], score) for score, idx in scored[:limit]]
+
+    def get_stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "ready": snapshot is not None,
+            "rows": len(snapshot.rows) if snapshot else 0,
+            "ngrams": len(snapshot.postings) if snapshot else 0,
+            "mapped_symptoms": len(snapshot.mapped_ids) if snapshot and snapshot.mapped_ids is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at) if snapshot else None,
+        }
@@ -4,9 +4,16 @@
 """
 import json
 import os
+import re
 from typing import Optional, Dict, List
 
 
+# 성분 함량 표기 ('아세트아미노펜 500mg', '이부프로펜 250.00밀리그램')
+_DOSE_PATTERN = re.compile(r"\s*[\d.,]+\s*(밀리그램|밀리그람|마이크로그램|밀리리터|그램|mg|mcg|μg|ml|g|%)?\s*$", re.IGNORECASE)
+# 제품명 끝의 괄호 성분명 ('지르텍정(세티리진염산염)')
+_NAME_INGREDIENT_PATTERN = re.compile(r"\(([^()]+)\)\s*$")
+
+
 class DrugInfoLoader:
     """약물 정보 로더"""
     
@@ -75,6 +82,20 @@ class DrugInfoLoader:
         
         return None
     
+    def canonical_ingredients(self, drug_name: str) -> List[str]:
+        """
+        대표 성분명 목록 (함량 제외, 중복 제거, 정렬) — 제품명이 달라도 성분이 같으면 같은 값
+        
+        Returns:
+            ["아세트아미노펜"] / 사전에 성분이 없으면 제품명 괄호 안 성분명, 그것도 없으면 빈 목록
+        """
+        info = self.get_drug_info(drug_name) or {}
+        names = [_DOSE_PATTERN.sub("", ingredient).strip() for ingredient in info.get("ingredients") or []]
+        if not names:
+            match = _NAME_INGREDIENT_PATTERN.search(drug_name or "")
+            names = [match.group(1).strip()] if match else []
+        return sorted({name for name in names if name})
+    
     def format_drug_info_ko(self, drug_name: str) -> Optional[str]:
         """
         약물 정보를 한글 문자열로 포맷
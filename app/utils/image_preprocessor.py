@@ -0,0 +1,147 @@
+"""
+Vision OCR 전처리 모듈
+휴대폰 원본 사진(4~12MB)을 Vision 모델 유효 해상도에 맞춰 줄여 업로드 바이트·지연·토큰 비용 절감
+
+처리 순서:
+  1. EXIF 회전 정보 반영 (auto-orient)
+  2. 모델 유효 해상도로 축소 (GPT-4o high detail: 2048 박스 → 짧은 변 768)
+  3. 흑백 변환 + 자동 대비 (인쇄된 처방전 텍스트 가독성 유지)
+  4. 목표 바이트 이하가 될 때까지 JPEG 품질을 낮춰 재인코딩
+
+이미지 디코딩/리샘플링은 CPU 작업이므로 프로세스 풀에서 실행해 이벤트 루프와 GIL을 점유하지 않습니다.
+Pillow 미설치 또는 디코딩 실패 시 원본을 그대로 반환합니다.
+"""
+import io
+import os
+import asyncio
+from typing import Optional
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+# GPT-4o "high" detail 기준: 2048x2048 박스에 맞춘 뒤 짧은 변 768px로 축소 후 512px 타일 처리
+VISION_MAX_LONG_SIDE = 2048
+VISION_MAX_SHORT_SIDE = 768
+VISION_TARGET_BYTES = 400 * 1024
+JPEG_QUALITY_STEPS = (85, 75, 65, 55, 45)
+
+
+@dataclass
+class PreprocessOptions:
+    """전처리 옵션"""
+    max_long_side: int = VISION_MAX_LONG_SIDE
+    max_short_side: int = VISION_MAX_SHORT_SIDE
+    grayscale: bool = True
+    autocontrast: bool = True
+    target_bytes: int = VISION_TARGET_BYTES
+
+
+def preprocess_image(image_bytes: bytes, options: Optional[PreprocessOptions] = None) -> tuple[bytes, str]:
+    """
+    Vision OCR 업로드용 이미지 전처리 (동기, 프로세스 풀에서 호출 가능한 최상위 함수)
+
+    Args:
+        image_bytes: 원본 이미지 바이트
+        options: 전처리 옵션 (None이면 기본값)
+
+    Returns:
+        (처리된 이미지 바이트, MIME 타입). 처리 불가 시 (원본, "") 반환
+    """
+    if Image is None:
+        return image_bytes, ""
+    options = options or PreprocessOptions()
+
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("L") if options.grayscale else img.convert("RGB")
+
+            # 박스 맞춤 후 짧은 변 제한 (비율 유지, 확대는 하지 않음)
+            width, height = img.size
+            scale = min(
+                1.0,
+                options.max_long_side / max(width, height),
+                options.max_short_side / min(width, height),
+            )
+            if scale < 1.0:
+                img = img.resize(
+                    (max(1, round(width * scale)), max(1, round(height * scale))),
+                    Image.LANCZOS,
+                )
+
+            if options.autocontrast:
+                img = ImageOps.autocontrast(img, cutoff=1)
+
+            encoded = image_bytes
+            for quality in JPEG_QUALITY_STEPS:
+                buf = io.BytesIO()
+                img.save(buf, format="JPEG", quality=quality, optimize=True)
+                encoded = buf.getvalue()
+                if len(encoded) <= options.target_bytes:
+                    break
+    except Exception as e:
+        print(f"[ImagePreprocessor] 전처리 실패 — 원본 사용: {e}")
+        return image_bytes, ""
+
+    # 이미 작은 이미지를 재인코딩해서 더 커지는 경우 원본 유지
+    if len(encoded) >= len(image_bytes):
+        return image_bytes, ""
+    return encoded, "image/jpeg"
+
+
+# ──────────────────────────────────────────
+# 프로세스 풀 (지연 생성, 앱 전체 공유)
+# ──────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        workers = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """프로세스 풀 종료 (앱 shutdown 시 — 재시작·테스트에서 워커 프로세스가 남지 않도록), 다음 호출 시 새로 생성"""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def preprocess_for_vision(
+    image_bytes: bytes,
+    mime_type: str,
+    options: Optional[PreprocessOptions] = None,
+) -> tuple[bytes, str]:
+    """
+    프로세스 풀에서 전처리를 실행하고 (바이트, MIME) 를 반환합니다.
+    전처리하지 못한 경우 원본 바이트와 원래 MIME 타입을 그대로 돌려줍니다.
+    """
+    if Image is None:
+        return image_bytes, mime_type
+
+    loop = asyncio.get_running_loop()
+    try:
+        processed, new_mime = await loop.run_in_executor(
+            _get_pool(), preprocess_image, image_bytes, options
+        )
+    except Exception as e:
+        print(f"[ImagePreprocessor] 프로세스 풀 실행 실패 — 원본 사용: {e}")
+        return image_bytes, mime_type
+
+    if not new_mime:
+        return image_bytes, mime_type
+    print(
+        f"[ImagePreprocessor] {len(image_bytes) / 1024:.0f}KB → "
+        f"{len(processed) / 1024:.0f}KB"
+    )
+    return processed, new_mime
@@ -0,0 +1,190 @@
+"""
+interaction_facts 인메모리 상호작용 그래프
+약물마다 interaction_facts ilike 쿼리를 보내고 식재료와 중첩 부분 문자열 루프를 돌던 방식을
+서버 시작 시 한 번 로드한 이분 그래프(ref 노드 ↔ fact 엣지) + Aho-Corasick 매칭으로 대체
+
+- 노드: 정규화한 a_ref / b_ref 문자열, 엣지: interaction_facts 행
+- '약물이 ref에 포함' (ilike %약물%): 요청 약물·식재료로 오토마톤을 만들어 ref 목록을 한 번 순회
+- 'ref가 식재료명에 포함': 전체 ref 오토마톤(로드 시 1회 구성)으로 식재료명 순회
+- 요청당 DB 호출 없음, refresh_minutes 마다 백그라운드 재로드
+"""
+import time
+import threading
+from typing import Optional
+
+from database.supabase_client import fetch_all_rows
+from app.utils.aho_corasick import AhoCorasick
+
+
+def _normalize(text) -> str:
+    """ilike 와 같이 대소문자 무시"""
+    return str(text).lower().strip() if text else ""
+
+
+class InteractionGraph:
+    """interaction_facts 이분 그래프 (프로세스 공유)"""
+
+    _shared: Optional["InteractionGraph"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, refresh_minutes: int = 60, page_size: int = 1000):
+        """
+        Args:
+            refresh_minutes: 주기적 재로드 간격
+            page_size: Supabase 페이지 단위 조회 크기
+        """
+        self.refresh_seconds = refresh_minutes * 60
+        self.page_size = page_size
+        self._facts: Optional[list[dict]] = None
+        self._ref_edges: dict[str, list[int]] = {}   # ref → fact 번호
+        self._refs: list[str] = []
+        self._ref_matcher: Optional[AhoCorasick] = None
+        self._loaded_at = 0.0
+        self._last_error_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    @classmethod
+    def shared(cls) -> "InteractionGraph":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def is_ready(self) -> bool:
+        return self._facts is not None
+
+    # ──────────────────────────────────────────
+    # Load / Refresh
+    # ──────────────────────────────────────────
+
+    def build(self, facts: list[dict]) -> None:
+        """fact 행 목록으로 그래프 구성"""
+        facts = sorted(facts, key=lambda row: row.get("id") or 0)
+        ref_edges: dict[str, list[int]] = {}
+        for idx, row in enumerate(facts):
+            for side in ("a_ref", "b_ref"):
+                ref = _normalize(row.get(side))
+                if ref and (not ref_edges.get(ref) or ref_edges[ref][-1] != idx):
+                    ref_edges.setdefault(ref, []).append(idx)
+
+        # 교체는 참조 대입 한 번씩 — 읽기 쪽 잠금 불필요
+        self._ref_edges = ref_edges
+        self._refs = list(ref_edges)
+        self._ref_matcher = AhoCorasick(self._refs)
+        self._facts = facts
+        self._loaded_at = time.monotonic()
+        print(f"[InteractionGraph] fact {len(facts)}건 / ref 노드 {len(self._refs)}개 로드")
+
+    def load(self, db) -> None:
+        self.build(fetch_all_rows(db, "interaction_facts", "*", "id", page_size=self.page_size))
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        그래프 사용 가능 여부 반환.
+        최초 호출은 동기 로드 (실패 시 1분간 재시도하지 않고 False → 호출 측 DB 쿼리),
+        이후 refresh_minutes 경과 시 기존 그래프로 응답하면서 백그라운드 재로드.
+        """
+        if self._facts is None:
+            if time.monotonic() - self._last_error_at < 60:
+                return False
+            with self._load_lock:
+                if self._facts is None:
+                    try:
+                        self.load(db)
+                    except Exception as e:
+                        self._last_error_at = time.monotonic()
+                        print(f"[InteractionGraph] 로드 실패 — DB 조회 사용: {e}")
+                        return False
+            return True
+
+        if time.monotonic() - self._loaded_at > self.refresh_seconds:
+            with self._load_lock:
+                if self._refreshing:
+                    return True
+                self._refreshing = True
+
+            def _run():
+                try:
+                    self.load(db)
+                except Exception as e:
+                    self._loaded_at = time.monotonic()
+                    print(f"[InteractionGraph] 재로드 실패 — 기존 그래프 유지: {e}")
+                finally:
+                    self._refreshing = False
+
+            threading.Thread(target=_run, daemon=True).start()
+        return True
+
+    # ──────────────────────────────────────────
+    # Query
+    # ──────────────────────────────────────────
+
+    def _refs_containing(self, terms: list[str]) -> dict[str, list[str]]:
+        """각 term 을 부분 문자열로 포함하는 ref 목록 (ref 전체를 한 번만 순회)"""
+        found: dict[str, list[str]] = {term: [] for term in terms}
+        matcher = AhoCorasick(terms)
+        if not len(matcher):
+            return found
+        for ref in self._refs:
+            for term in matcher.find_all(ref):
+                found[term].append(ref)
+        return found
+
+    def facts_for_drugs(self, drug_names: list[str]) -> dict[str, list[dict]]:
+        """
+        약물별 관련 fact (a_ref 또는 b_ref 에 약물명 포함, id 순)
+        ilike '%약물%' 쿼리와 같은 매칭
+        """
+        drugs = {drug: _normalize(drug) for drug in drug_names}
+        refs_by_term = self._refs_containing([d for d in drugs.values() if d])
+
+        result: dict[str, list[dict]] = {}
+        for drug, term in drugs.items():
+            fact_ids = sorted({
+                idx for ref in refs_by_term.get(term, []) for idx in self._ref_edges[ref]
+            })
+            result[drug] = [self._facts[idx] for idx in fact_ids]
+        return result
+
+    def check_drug_food(self, drug_names: list[str], ingredient_names: list[str]) -> tuple[list[tuple], bool]:
+        """
+        약물-식재료 상호작용 조회 (요청당 ref 목록 1회 순회)
+
+        fact 의 한쪽 ref 에 약물명이 포함되고, 반대쪽 ref 와 식재료명이
+        서로 부분 문자열 관계이면 매칭
+
+        Returns:
+            ([(drug, ingredient, fact), ...], 약물 관련 fact 존재 여부)
+        """
+        drugs = {drug: _normalize(drug) for drug in drug_names if _normalize(drug)}
+        ingredients = {ing: _normalize(ing) for ing in ingredient_names if _normalize(ing)}
+
+        # 약물 ⊂ ref, 식재료 ⊂ ref 를 한 오토마톤으로 동시에 확인
+        refs_by_term = self._refs_containing(list(drugs.values()) + list(ingredients.values()))
+
+        # ref ⊂ 식재료명
+        related_refs: dict[str, set[str]] = {}
+        for ing, term in ingredients.items():
+            related_refs[ing] = set(refs_by_term.get(term, []))
+            if self._ref_matcher is not None:
+                related_refs[ing] |= self._ref_matcher.find_all(term)
+
+        matches: list[tuple] = []
+        db_hit = False
+        for drug, term in drugs.items():
+            fact_ids = sorted({
+                idx for ref in refs_by_term.get(term, []) for idx in self._ref_edges[ref]
+            })
+            if fact_ids:
+                db_hit = True
+            for idx in fact_ids:
+                fact = self._facts[idx]
+                a_ref = _normalize(fact.get("a_ref"))
+                other = _normalize(fact.get("b_ref")) if term in a_ref else a_ref
+                for ing, refs in related_refs.items():
+                    if other in refs:
+                        matches.append((drug, ing, fact))
+        return matches, db_hit
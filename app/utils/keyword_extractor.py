@@ -0,0 +1,242 @@
+"""
+증상 키워드 추출기
+AnalyzeService 유사 증상 검색과 StepByStepAnalysisService.step1_extract 가 함께 쓰는 키워드 추출 엔진
+
+- 패턴: disease_master 증상명(modern_name_ko, disease_read, modern_disease, name_en, aliases) + 증상 동의어 표
+- 입력 텍스트를 Aho-Corasick 오토마톤으로 한 번 순회해 모든 패턴을 찾음 (패턴 수와 무관)
+- 매칭되지 않은 나머지 어절은 조사·어미를 떼어 보조 키워드로 사용 (어절 중간 글자는 건드리지 않음)
+  조사·어미만으로 된 어절('해요', '와요', '있어요')은 버림
+- disease_master 패턴은 DiseaseIndex 가 로드한 행으로 구성 — 인덱스가 재로드되면 다음 호출에서 재구성
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.disease_index import DiseaseIndex
+
+
+# 증상 동의어 표 (DB 검색 키워드 → 사용자 입력 패턴)
+SYMPTOM_SYNONYMS = {
+    "불면": ["수면", "잠", "불면", "못 자", "안 자", "깨"],
+    "소화": ["소화", "위장", "더부룩", "체한", "소화불량", "속쓰림", "역류"],
+    "피로": ["피로", "지침", "기력", "힘이 없"],
+    "두통": ["두통", "머리", "편두통"],
+    "냉증": ["냉증", "손발", "차가", "냉한"],
+    "혈압": ["혈압", "고혈압", "저혈압"],
+    "당뇨": ["당뇨", "혈당"],
+    "호흡": ["호흡", "기침", "가래", "숨", "감기", "몸살", "비염"],
+    "변비": ["변비", "배변", "대변"],
+}
+
+# 어절 끝 조사·어미 (긴 것부터 확인)
+KOREAN_PARTICLES = tuple(sorted(
+    [
+        "이에요", "예요", "해요", "어요", "아요", "네요", "세요", "습니다", "합니다",
+        "에서는", "에게서", "으로는", "이랑", "에서", "에게", "한테", "으로", "부터", "까지",
+        "처럼", "보다", "하고", "이나", "은", "는", "이", "가", "을", "를", "의", "에",
+        "도", "만", "로", "와", "과", "랑", "요",
+    ],
+    key=len, reverse=True,
+))
+
+# 두 글자 어절에서는 한 글자 어간을 남기고도 떼는 주격 조사 ('잠이' → '잠')
+SHORT_STEM_PARTICLES = ("이", "가")
+
+# 종결 어미 — 한 글자 어간 + 어미뿐인 어절('와요', '있어요')은 검색어로 쓰지 않음
+_VERB_ENDINGS = tuple(p for p in KOREAN_PARTICLES if p.endswith(("요", "니다")))
+
+DISEASE_TERM_FIELDS = ("modern_name_ko", "disease_read", "modern_disease", "name_en")
+
+_TOKEN_SPLIT = re.compile(r"[\s,./!?~·()\[\]\"']+")
+
+
+def _normalize(text) -> str:
+    return str(text).lower().strip() if text else ""
+
+
+def strip_particle(word: str, min_length: int = 2) -> str:
+    """
+    어절 끝 조사·어미 제거 (제거 후 min_length 보다 짧아지면 원형 유지)
+    두 글자 어절의 주격 조사(이/가)는 한 글자 어간도 남김 ('잠이' → '잠')
+    """
+    for particle in KOREAN_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= min_length:
+            return word[:-len(particle)]
+    if len(word) == 2 and word.endswith(SHORT_STEM_PARTICLES):
+        return word[:-1]
+    return word
+
+
+def is_bare_ending(word: str) -> bool:
+    """조사·어미만으로 된 어절 ('요', '해요', '와요', '있어요' — 한 글자 어간 + 종결 어미 포함)"""
+    if word in KOREAN_PARTICLES:
+        return True
+    return any(word.endswith(ending) and len(word) - len(ending) <= 1 for ending in _VERB_ENDINGS)
+
+
+@dataclass
+class ExtractedKeyword:
+    """추출된 검색 키워드"""
+    keyword: str        # 검색에 쓸 키워드 (증상명 / 동의어 대표어 / 어절)
+    matched: str        # 입력에서 실제로 매칭된 문자열
+    source: str         # "disease" | "synonym" | "word"
+    confidence: float
+
+
+_SOURCE_CONFIDENCE = {"disease": 1.0, "synonym": 0.9, "word": 0.6}
+_SOURCE_RANK = {"disease": 0, "synonym": 1, "word": 2}
+
+
+class _Automaton:
+    """한 번 구성한 패턴 집합 (교체 시 통째로 바꿔 끼워 읽기 쪽 잠금 불필요)"""
+
+    def __init__(self, disease_rows: list[dict], synonyms: dict[str, list[str]]):
+        # 패턴 → [(keyword, source), ...]
+        self.targets: dict[str, list[tuple[str, str]]] = {}
+        for row in disease_rows:
+            canonical = row.get("modern_name_ko") or row.get("disease_read")
+            if not canonical:
+                continue
+            terms = [row.get(field) for field in DISEASE_TERM_FIELDS] + list(row.get("aliases") or [])
+            for term in terms:
+                self._add(_normalize(term), canonical, "disease")
+        for keyword, patterns in synonyms.items():
+            for pattern in patterns:
+                self._add(_normalize(pattern), keyword, "synonym")
+        self.matcher = AhoCorasick(self.targets)
+        self.disease_count = len(disease_rows)
+
+    def _add(self, pattern: str, keyword: str, source: str) -> None:
+        # 1글자 증상명은 일반 단어와 구분되지 않아 제외 (동의어 표는 그대로 사용)
+        if not pattern or (source == "disease" and len(pattern) < 2):
+            return
+        targets = self.targets.setdefault(pattern, [])
+        if (keyword, source) not in targets:
+            targets.append((keyword, source))
+
+
+class KeywordExtractor:
+    """증상 키워드 추출기 (프로세스 공유)"""
+
+    _shared: Optional["KeywordExtractor"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, synonyms: Optional[dict[str, list[str]]] = None, index: Optional[DiseaseIndex] = None):
+        """
+        Args:
+            synonyms: 동의어 표 (기본 SYMPTOM_SYNONYMS)
+            index: disease_master 행을 제공할 인덱스 (기본 DiseaseIndex.shared())
+        """
+        self.synonyms = SYMPTOM_SYNONYMS if synonyms is None else synonyms
+        self._index = index
+        self._source_rows: Optional[list[dict]] = None
+        self._automaton = _Automaton([], self.synonyms)
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "KeywordExtractor":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # ──────────────────────────────────────────
+    # Load
+    # ──────────────────────────────────────────
+
+    def build(self, disease_rows: list[dict]) -> None:
+        """disease_master 행 목록으로 오토마톤 재구성 (테스트·외부 로더용)"""
+        automaton = _Automaton(disease_rows, self.synonyms)
+        self._automaton = automaton
+        self._source_rows = disease_rows
+        print(f"[KeywordExtractor] 증상 {automaton.disease_count}건 / 패턴 {len(automaton.matcher)}개 구성")
+
+    @property
+    def is_ready(self) -> bool:
+        """현재 인덱스 행으로 오토마톤이 구성되어 있는지 (False 면 ensure_loaded 가 로드·재구성)"""
+        index = self._index or DiseaseIndex.shared()
+        return index.is_ready and index.rows is self._source_rows
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        DiseaseIndex 행으로 오토마톤 구성 (인덱스가 재로드됐으면 재구성)
+        인덱스를 쓸 수 없으면 동의어 표만으로 추출하고 False 반환
+        """
+        index = self._index or DiseaseIndex.shared()
+        if not index.ensure_loaded(db):
+            return False
+        rows = index.rows
+        if rows is not None and rows is not self._source_rows:
+            with self._build_lock:
+                if rows is not self._source_rows:
+                    self.build(rows)
+        return True
+
+    # ──────────────────────────────────────────
+    # Extract
+    # ──────────────────────────────────────────
+
+    def extract_detailed(self, text: str) -> list[ExtractedKeyword]:
+        """
+        키워드 추출 (증상명 > 동의어 > 어절 순, 같은 종류는 긴 매칭 우선)
+        """
+        normalized = _normalize(text)
+        if not normalized:
+            return []
+        automaton = self._automaton
+
+        # 1. 증상명·동의어: 오토마톤 한 번 순회
+        found: dict[tuple[str, str], tuple[int, int, str]] = {}
+        covered = [False] * len(normalized)
+        for end, pattern in automaton.matcher.iter(normalized):
+            start = end - len(pattern) + 1
+            for pos in range(start, end + 1):
+                covered[pos] = True
+            for keyword, source in automaton.targets[pattern]:
+                key = (keyword, source)
+                rank = (-len(pattern), start)
+                if key not in found or rank < found[key][:2]:
+                    found[key] = (*rank, pattern)
+
+        keywords = [
+            ExtractedKeyword(keyword, pattern, source, _SOURCE_CONFIDENCE[source])
+            for (keyword, source), (_, _, pattern) in sorted(
+                found.items(), key=lambda item: (_SOURCE_RANK[item[0][1]], item[1][:2])
+            )
+        ]
+
+        # 2. 매칭되지 않은 어절: 조사·어미 제거
+        position = 0
+        for token in _TOKEN_SPLIT.split(normalized):
+            if not token:
+                continue
+            start = normalized.index(token, position)
+            position = start + len(token)
+            if is_bare_ending(token):
+                continue
+            word = strip_particle(token)
+            if all(covered[start:start + len(word)]):
+                continue   # 증상명·동의어로 이미 잡힌 어절 ('잠이' → '잠')
+            if len(word) < 2:
+                word = token   # 한 글자 어간은 검색어로 너무 넓음 — 어절 그대로 ('오이')
+            if len(word) >= 2:
+                keywords.append(ExtractedKeyword(word, token, "word", _SOURCE_CONFIDENCE["word"]))
+
+        seen = set()
+        unique = []
+        for item in keywords:
+            if item.keyword not in seen:
+                seen.add(item.keyword)
+                unique.append(item)
+        return unique
+
+    def extract(self, text: str) -> list[str]:
+        """검색 우선순위 순 키워드 목록"""
+        return [item.keyword for item in self.extract_detailed(text)]
+
+    def get_stats(self) -> dict:
+        automaton = self._automaton
+        return {"diseases": automaton.disease_count, "patterns": len(automaton.matcher)}
@@ -0,0 +1,260 @@
+"""
+NCBI E-utilities 요청 스케줄러
+식재료별(HealthStackAPI._fetch_evidence_parallel) · 약물별(MedicationService) PubMed 검색이 각자
+esearch / efetch 를 보내 NCBI 제한(API 키 없음 초당 3회, 있음 초당 10회)을 넘기고 429를 받던 문제를
+프로세스 공유 스케줄러 하나로 모아 처리합니다.
+
+- 속도 제한: API 키 등급별 요청 간격을 프로세스 전체에서 보장 (이벤트 루프·스레드 무관)
+- 429 / Retry-After: 해당 시간만큼 전체 스케줄을 뒤로 미루고 재시도
+- efetch 묶음: batch_window 안에 들어온 서로 다른 PMID 요청을 efetch 1회(POST, 최대 200개씩)로 합침
+- 큰 결과 집합: esearch usehistory=y 로 받은 WebEnv / query_key 로 efetch 를 페이지 단위 요청
+"""
+import os
+import time
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+from app.utils.pubmed_parser import ParsedArticle, parse_pubmed_articles
+
+
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+EFETCH_BATCH_SIZE = 200          # efetch 요청 1회당 PMID 수 (NCBI 권장: 200개 초과는 history 사용)
+HISTORY_THRESHOLD = int(os.getenv("NCBI_HISTORY_THRESHOLD", str(EFETCH_BATCH_SIZE)))
+
+
+@dataclass
+class ESearchResult:
+    """esearch 결과 (usehistory 사용 시 WebEnv / query_key 포함)"""
+    ids: list[str] = field(default_factory=list)
+    count: int = 0
+    webenv: Optional[str] = None
+    query_key: Optional[str] = None
+
+
+class _PendingFetch:
+    """batch_window 동안 모으는 efetch PMID 묶음 (이벤트 루프별)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.pmids: dict[str, None] = {}
+        self.future: asyncio.Future = loop.create_future()
+        self.task: Optional[asyncio.Task] = None
+
+
+class NCBIScheduler:
+    """E-utilities 요청 스케줄러 (프로세스 공유)"""
+
+    _shared: Optional["NCBIScheduler"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        requests_per_second: Optional[float] = None,
+        batch_window_ms: int = 30,
+        max_retries: int = 3,
+        timeout_seconds: float = 15,
+    ):
+        """
+        Args:
+            api_key: NCBI API 키 (기본 PUBMED_API_KEY)
+            requests_per_second: 초당 요청 수 (기본: 키 있으면 10, 없으면 3)
+            batch_window_ms: efetch 요청을 모으는 시간
+            max_retries: 429 / 5xx 재시도 횟수
+            timeout_seconds: 요청 타임아웃
+        """
+        self.api_key = os.getenv("PUBMED_API_KEY", "") if api_key is None else api_key
+        self.requests_per_second = requests_per_second or (10 if self.api_key else 3)
+        self.interval = 1.0 / self.requests_per_second
+        self.batch_window = batch_window_ms / 1000
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self.tool = os.getenv("NCBI_TOOL", "healthstack")
+        self.email = os.getenv("NCBI_EMAIL", "")
+
+        self._next_slot = 0.0
+        self._slot_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "esearch": 0, "efetch": 0, "efetch_pmids": 0,
+                       "merged_fetches": 0, "history_pages": 0, "throttled": 0}
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingFetch]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def shared(cls) -> "NCBIScheduler":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    # ──────────────────────────────────────────
+    # Rate limit / HTTP
+    # ──────────────────────────────────────────
+
+    async def _wait_for_slot(self) -> None:
+        """다음 요청 시각 예약 후 대기 (요청 간 최소 간격 = 1 / requests_per_second)"""
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _defer(self, seconds: float) -> None:
+        """429 수신 시 이후 모든 요청을 seconds 만큼 미룸"""
+        with self._slot_lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout_seconds))
+            self._clients[loop] = client
+        return client
+
+    async def _request(self, endpoint: str, params: dict, post: bool = False) -> httpx.Response:
+        params = {**params, "tool": self.tool}
+        if self.email:
+            params["email"] = self.email
+        if self.api_key:
+            params["api_key"] = self.api_key
+        url = f"{EUTILS_URL}/{endpoint}"
+
+        attempt = 0
+        while True:
+            await self._wait_for_slot()
+            self._count(requests=1)
+            client = self._client()
+            response = await (client.post(url, data=params) if post else client.get(url, params=params))
+            if (response.status_code == 429 or response.status_code >= 500) and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                self._defer(delay)
+                self._count(throttled=1)
+                print(f"[NCBI] {endpoint} {response.status_code} — {delay:.0f}초 후 재시도")
+                attempt += 1
+                continue
+            response.raise_for_status()
+            return response
+
+    async def aclose(self) -> None:
+        """현재 루프의 HTTP 클라이언트 종료 (앱 shutdown 시)"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    # ──────────────────────────────────────────
+    # esearch
+    # ──────────────────────────────────────────
+
+    async def esearch(self, term: str, retmax: int, sort: str = "relevance",
+                      use_history: Optional[bool] = None) -> ESearchResult:
+        """
+        PMID 검색 (retmax 가 HISTORY_THRESHOLD 를 넘으면 history 서버에 결과 보관)
+        """
+        if use_history is None:
+            use_history = retmax > HISTORY_THRESHOLD
+        params = {"db": "pubmed", "term": term, "retmax": retmax, "retmode": "json", "sort": sort}
+        if use_history:
+            params["usehistory"] = "y"
+        self._count(esearch=1)
+        data = (await self._request("esearch.fcgi", params)).json().get("esearchresult", {})
+        return ESearchResult(
+            ids=data.get("idlist", []),
+            count=int(data.get("count") or 0),
+            webenv=data.get("webenv"),
+            query_key=data.get("querykey"),
+        )
+
+    # ──────────────────────────────────────────
+    # efetch
+    # ──────────────────────────────────────────
+
+    async def efetch(self, pmids: list[str]) -> dict[str, ParsedArticle]:
+        """
+        PMID 상세 조회. batch_window 안에 들어온 다른 요청의 PMID 와 합쳐 한 번에 요청하고
+        요청한 PMID 만 돌려줌 (응답에 없는 PMID 는 제외)
+        """
+        if not pmids:
+            return {}
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = _PendingFetch(loop)
+            self._pending[loop] = batch
+            batch.task = loop.create_task(self._flush(loop, batch))
+        else:
+            self._count(merged_fetches=1)
+        batch.pmids.update(dict.fromkeys(pmids))
+
+        # 한 호출자가 취소돼도 묶음 요청은 계속 진행
+        articles = await asyncio.shield(batch.future)
+        return {pmid: articles[pmid] for pmid in pmids if pmid in articles}
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop, batch: _PendingFetch) -> None:
+        await asyncio.sleep(self.batch_window)
+        if self._pending.get(loop) is batch:
+            del self._pending[loop]
+        pmids = list(batch.pmids)
+        try:
+            chunks = [pmids[i:i + EFETCH_BATCH_SIZE] for i in range(0, len(pmids), EFETCH_BATCH_SIZE)]
+            merged: dict[str, ParsedArticle] = {}
+            for articles in await asyncio.gather(*(self._efetch_ids(chunk) for chunk in chunks)):
+                merged.update(articles)
+            batch.future.set_result(merged)
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()  # 대기자가 모두 취소된 경우 경고 방지
+
+    async def _efetch_ids(self, pmids: list[str]) -> dict[str, ParsedArticle]:
+        self._count(efetch=1, efetch_pmids=len(pmids))
+        response = await self._request(
+            "efetch.fcgi", {"db": "pubmed", "id": ",".join(pmids), "retmode": "xml"}, post=True
+        )
+        return parse_pubmed_articles(response.content)
+
+    async def efetch_history(self, search: ESearchResult, page_size: int = EFETCH_BATCH_SIZE) -> dict[str, ParsedArticle]:
+        """esearch history(WebEnv / query_key) 결과를 page_size 씩 조회"""
+        total = len(search.ids)
+        pages = range(0, total, page_size)
+
+        async def _page(start: int) -> dict[str, ParsedArticle]:
+            self._count(efetch=1, efetch_pmids=min(page_size, total - start), history_pages=1)
+            response = await self._request("efetch.fcgi", {
+                "db": "pubmed", "WebEnv": search.webenv, "query_key": search.query_key,
+                "retstart": start, "retmax": min(page_size, total - start), "retmode": "xml",
+            })
+            return parse_pubmed_articles(response.content)
+
+        merged: dict[str, ParsedArticle] = {}
+        for articles in await asyncio.gather(*(_page(start) for start in pages)):
+            merged.update(articles)
+        return merged
+
+    async def fetch_articles(self, pmids: list[str], search: Optional[ESearchResult] = None) -> dict[str, ParsedArticle]:
+        """
+        PMID 상세 조회 — 큰 결과 집합은 history 서버, 나머지는 묶음 efetch
+        """
+        if search is not None and search.webenv and search.query_key and len(pmids) > EFETCH_BATCH_SIZE:
+            articles = await self.efetch_history(search)
+            return {pmid: articles[pmid] for pmid in pmids if pmid in articles}
+        return await self.efetch(pmids)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {**self._stats, "requests_per_second": self.requests_per_second}
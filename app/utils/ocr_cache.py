@@ -0,0 +1,236 @@
+"""
+OCR 결과 캐시 - 처방전 이미지 내용 해시 기반
+같은 사진 재업로드 / 테스트 이미지 반복 사용 시 Vision·Clova OCR 호출을 생략
+
+키 구성:
+  1차: 이미지 바이트 SHA-256 (완전히 같은 파일)
+  2차: 디코딩한 픽셀 SHA-256 (use_pixel_hash, Pillow 설치 시)
+       — EXIF·컨테이너만 다르고 픽셀이 같은 재업로드(메신저 재전송 등)
+
+근사 중복(지각 해시) 조회는 하지 않습니다. 같은 양식의 처방전은 축소 이미지가 거의 같아
+(dHash 해밍 거리 0~1) 다른 환자의 약물 목록을 돌려줄 수 있기 때문입니다.
+
+동시에 같은 이미지가 들어오면 OCR 호출은 한 번만 수행하고 결과를 공유합니다.
+"""
+import io
+import asyncio
+import hashlib
+import threading
+import weakref
+from typing import Optional, Callable, Awaitable
+
+from app.utils.cache_manager import CacheManager
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+class OcrResultCache:
+    """OCR 엔진 공용 이미지 해시 캐시"""
+
+    # 진행 중인 OCR 호출 (동일 이미지 요청 합치기, 비동기는 이벤트 루프별)
+    _inflight_async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _inflight_sync: dict[str, dict] = {}
+    _sync_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: str = "data/cache",
+        ttl_hours: int = 24 * 30,
+        use_pixel_hash: bool = False,
+    ):
+        """
+        Args:
+            cache_dir: 캐시 파일 저장 디렉토리
+            ttl_hours: 캐시 유효 시간 (이미지 내용이 같으면 결과도 같으므로 길게)
+            use_pixel_hash: 픽셀 해시 2차 조회 사용 여부 (미스마다 이미지 1회 디코딩)
+        """
+        self.cache = CacheManager(cache_dir)
+        self.ttl_hours = ttl_hours
+        self.use_pixel_hash = use_pixel_hash and Image is not None
+
+    # ──────────────────────────────────────────
+    # Hashing
+    # ──────────────────────────────────────────
+
+    @staticmethod
+    def content_hash(image_bytes: bytes) -> str:
+        """이미지 바이트 SHA-256"""
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    @staticmethod
+    def pixel_hash(image_bytes: bytes) -> Optional[str]:
+        """
+        디코딩한 픽셀의 SHA-256 (회전 정보(EXIF) 반영, 원본 해상도 RGB).
+        픽셀이 하나라도 다르면 값이 달라지므로 다른 이미지와 겹치지 않습니다.
+        Pillow 미설치 또는 디코딩 실패 시 None.
+        """
+        if Image is None:
+            return None
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                img = ImageOps.exif_transpose(img).convert("RGB")
+                digest = hashlib.sha256(f"{img.width}x{img.height}:".encode())
+                digest.update(img.tobytes())
+                return digest.hexdigest()
+        except Exception as e:
+            print(f"[OcrCache] 픽셀 해시 계산 실패: {e}")
+            return None
+
+    # ──────────────────────────────────────────
+    # Lookup / Store
+    # ──────────────────────────────────────────
+
+    def lookup(self, engine: str, image_bytes: bytes, content_hash: Optional[str] = None) -> Optional[dict]:
+        """
+        캐시된 OCR 결과 조회 (바이트 해시 → 픽셀 해시 순, 모두 정확 일치)
+
+        Args:
+            engine: OCR 엔진 식별자 (e.g., "vision", "naver")
+            image_bytes: 원본 이미지 바이트
+        """
+        return self._lookup(engine, image_bytes, content_hash)[1]
+
+    def store(self, engine: str, image_bytes: bytes, result: dict, content_hash: Optional[str] = None) -> None:
+        """OCR 결과 저장 (바이트 해시 + 픽셀 해시 키)"""
+        content_hash = content_hash or self.content_hash(image_bytes)
+        pixel_hash = self.pixel_hash(image_bytes) if self.use_pixel_hash else None
+        self._store(engine, image_bytes, result, content_hash, pixel_hash)
+
+    def _lookup(
+        self, engine: str, image_bytes: bytes, content_hash: Optional[str] = None
+    ) -> tuple[str, Optional[dict], Optional[str]]:
+        """조회 본체 → (바이트 해시, 캐시 결과, 픽셀 해시) — 해시는 저장 시 재사용 (디코딩 1회)"""
+        namespace = f"ocr_{engine}"
+        content_hash = content_hash or self.content_hash(image_bytes)
+
+        cached = self.cache.get(namespace, content_hash, ttl_hours=self.ttl_hours)
+        if cached is not None:
+            print(f"[OcrCache] HIT ({engine}) sha256={content_hash[:12]}")
+            return content_hash, cached, None
+
+        if not self.use_pixel_hash:
+            return content_hash, None, None
+        pixel_hash = self.pixel_hash(image_bytes)
+        if pixel_hash is None:
+            return content_hash, None, None
+
+        cached = self.cache.get(namespace, f"pixels:{pixel_hash}", ttl_hours=self.ttl_hours)
+        if cached is not None:
+            print(f"[OcrCache] PIXEL HIT ({engine}) pixels={pixel_hash[:12]}")
+        return content_hash, cached, pixel_hash
+
+    def _store(
+        self, engine: str, image_bytes: bytes, result: dict, content_hash: str, pixel_hash: Optional[str]
+    ) -> None:
+        """저장 본체 — 키마다 캐시 파일 1개 (공용 인덱스 파일 없음)"""
+        namespace = f"ocr_{engine}"
+        metadata = {"engine": engine, "size_bytes": len(image_bytes)}
+        self.cache.set(namespace, content_hash, result, metadata=metadata)
+        if pixel_hash:
+            self.cache.set(namespace, f"pixels:{pixel_hash}", result, metadata=metadata)
+
+    # ──────────────────────────────────────────
+    # Get-or-compute (동일 이미지 요청 합치기)
+    # ──────────────────────────────────────────
+
+    async def get_or_compute(
+        self,
+        engine: str,
+        image_bytes: bytes,
+        compute: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool] = bool,
+    ) -> dict:
+        """
+        비동기 OCR 엔진용. 캐시 미스 시 compute()를 호출하고,
+        같은 이미지에 대한 동시 요청은 첫 호출 결과를 함께 기다립니다.
+
+        Args:
+            cacheable: 결과를 저장할지 판단 (실패 응답은 저장하지 않음)
+        """
+        # 해시·디코딩·캐시 파일 IO 는 이벤트 루프 밖에서
+        content_hash, cached, pixel_hash = await asyncio.to_thread(self._lookup, engine, image_bytes)
+        if cached is not None:
+            return cached
+
+        # 같은 이미지의 OCR 은 분리된 태스크 하나로 — 요청한 쪽이 취소되어도(SSE 연결 끊김 등)
+        # 함께 기다리는 다른 요청은 결과를 받음
+        key = f"{engine}:{content_hash}"
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight_async.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is None:
+            task = loop.create_task(
+                self._compute_and_store(engine, image_bytes, compute, cacheable, content_hash, pixel_hash)
+            )
+            inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(inflight, key, done))
+        else:
+            print(f"[OcrCache] 동일 이미지 OCR 진행 중 — 결과 공유 ({engine})")
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(
+        self,
+        engine: str,
+        image_bytes: bytes,
+        compute: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool],
+        content_hash: str,
+        pixel_hash: Optional[str],
+    ) -> dict:
+        result = await compute()
+        if cacheable(result):
+            await asyncio.to_thread(self._store, engine, image_bytes, result, content_hash, pixel_hash)
+        return result
+
+    @staticmethod
+    def _finish_inflight(inflight: dict, key: str, task: asyncio.Task) -> None:
+        inflight.pop(key, None)
+        # 기다리던 요청이 모두 취소된 뒤 실패해도 'exception was never retrieved' 경고 방지
+        if not task.cancelled():
+            task.exception()
+
+    def get_or_compute_sync(
+        self,
+        engine: str,
+        image_bytes: bytes,
+        compute: Callable[[], dict],
+        cacheable: Callable[[dict], bool] = bool,
+    ) -> dict:
+        """동기 OCR 엔진(Naver Clova)용 get_or_compute — 스레드 간 동일 이미지 호출 합치기"""
+        content_hash, cached, pixel_hash = self._lookup(engine, image_bytes)
+        if cached is not None:
+            return cached
+
+        key = f"{engine}:{content_hash}"
+        with self._sync_lock:
+            slot = self._inflight_sync.get(key)
+            owner = slot is None
+            if owner:
+                slot = {"event": threading.Event(), "result": None, "error": None}
+                self._inflight_sync[key] = slot
+
+        if not owner:
+            print(f"[OcrCache] 동일 이미지 OCR 진행 중 — 결과 공유 ({engine})")
+            slot["event"].wait()
+            if slot["error"] is not None:
+                raise slot["error"]
+            return slot["result"]
+
+        try:
+            result = compute()
+            if cacheable(result):
+                self._store(engine, image_bytes, result, content_hash, pixel_hash)
+            slot["result"] = result
+            return result
+        except Exception as e:
+            slot["error"] = e
+            raise
+        finally:
+            with self._sync_lock:
+                self._inflight_sync.pop(key, None)
+            slot["event"].set()
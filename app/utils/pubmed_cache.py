@@ -0,0 +1,121 @@
+"""
+PubMed 검색어 결과 캐시 (프로세스 메모리)
+검색어 해시 → (PMID 목록, 논문 목록) 을 TTL 과 함께 보관해 같은 검색어의 esearch / efetch 호출을 생략
+
+- 키: 공백·대소문자를 정규화한 검색어의 MD5 (DB pubmed_cache.query_hash 와 같은 값)
+- 0건 결과도 저장 (negative cache) — 만료를 짧게 두어 새 논문이 올라오면 다시 검색
+- retmax: 저장 당시 요청한 최대 결과 수. 더 많이 요청하면 캐시 미스
+  (단, esearch 전체 결과 수(total)가 retmax 이하였으면 전체 결과이므로 히트 —
+   efetch 가 일부 논문을 놓쳐 목록이 짧아진 경우는 전체 결과로 보지 않음)
+- 프로세스 간 공유·재시작 후 복원은 PubMedService 가 pubmed_cache / pubmed_papers 테이블로 처리
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+PUBMED_CACHE_TTL_HOURS = int(os.getenv("PUBMED_CACHE_TTL_HOURS", str(24 * 7)))
+PUBMED_NEGATIVE_TTL_HOURS = int(os.getenv("PUBMED_NEGATIVE_TTL_HOURS", "24"))
+
+
+class PubMedQueryCache:
+    """검색어 해시 단위 PubMed 결과 캐시 (프로세스 공유)"""
+
+    _shared: Optional["PubMedQueryCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        ttl_hours: int = PUBMED_CACHE_TTL_HOURS,
+        negative_ttl_hours: int = PUBMED_NEGATIVE_TTL_HOURS,
+        max_entries: int = 1024,
+    ):
+        """
+        Args:
+            ttl_hours: 결과 있는 검색어 보관 시간
+            negative_ttl_hours: 0건 검색어 보관 시간
+            max_entries: 최대 보관 검색어 수 (초과 시 오래 안 쓴 것부터 제거)
+        """
+        self.ttl_seconds = ttl_hours * 3600
+        self.negative_ttl_seconds = negative_ttl_hours * 3600
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0}
+
+    @classmethod
+    def shared(cls) -> "PubMedQueryCache":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        """검색어 정규화 해시 (PubMed 검색은 대소문자·연속 공백 무관)"""
+        normalized = " ".join(query.lower().split())
+        return hashlib.md5(normalized.encode()).hexdigest()
+
+    @staticmethod
+    def covers(total: Optional[int], retmax: int, max_results: int) -> bool:
+        """
+        저장된 결과로 max_results 요청에 답할 수 있는지
+        total: esearch 전체 결과 수 (모르면 None → retmax 이하 요청에만 응답)
+        """
+        return retmax >= max_results or (total is not None and total <= retmax)
+
+    def ttl_for(self, pmids: list) -> int:
+        return self.ttl_seconds if pmids else self.negative_ttl_seconds
+
+    def get(self, query_hash: str, max_results: int) -> Optional[list]:
+        """
+        캐시된 논문 목록 (없거나 만료·결과 수 부족이면 None, 0건 검색어면 빈 목록)
+        """
+        with self._lock:
+            entry = self._entries.get(query_hash)
+            if entry is not None and time.monotonic() >= entry["expires_at"]:
+                del self._entries[query_hash]
+                entry = None
+            if entry is None or not self.covers(entry["total"], entry["retmax"], max_results):
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(query_hash)
+            self._stats["negative_hits" if not entry["pmids"] else "hits"] += 1
+            return list(entry["papers"][:max_results])
+
+    def put(
+        self,
+        query_hash: str,
+        papers: list,
+        retmax: int,
+        total: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        검색 결과 저장 (papers 가 비어 있으면 0건 검색어로 저장)
+
+        Args:
+            total: esearch 전체 결과 수 (전체 결과 여부 판단, 모르면 None)
+            ttl_seconds: 남은 유효 시간 (DB에서 복원할 때 expires_at 기준 값 전달)
+        """
+        pmids = [paper.pmid for paper in papers]
+        ttl = self.ttl_for(pmids) if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[query_hash] = {
+                "pmids": pmids,
+                "papers": list(papers),
+                "retmax": retmax,
+                "total": total,
+                "expires_at": time.monotonic() + ttl,
+            }
+            self._entries.move_to_end(query_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
@@ -0,0 +1,423 @@
+"""
+로컬 PubMed 초록 코퍼스 (BM25)
+식재료·약물마다 NCBI 를 실시간 호출하던 근거 검색을, 수집 작업(scripts/harvest_pubmed_corpus.py)이
+pubmed_papers 에 모아 둔 초록의 인메모리 역색인으로 먼저 처리합니다.
+
+- 수집 키: modern_to_mesh_map.mesh_term, ingredient_pubmed_map(mesh_term / ingredient_name_en / bioactive_compound)
+- 색인 필드: 제목·MeSH(가중치 2) + 초록(가중치 1), 소문자·간단한 복수형 정규화
+- 검색식: PubMed 형식 AND / OR / 괄호 / 필드 태그([MeSH] 등) 해석 — 절마다 대안 하나 이상 만족하는 문서만 후보
+- 웜 판정: 수집·캐시된 검색식(mark_warm)이거나, 대안을 구(phrase)로 보고 필드 태그 범위 안에서 연속 일치하면서
+  BM25 점수가 min_score 이상인 문서가 요청 수만큼 있을 때만 로컬 응답 — 아니면 None → 호출 측이 실시간 API 사용
+- refresh_minutes 마다 백그라운드 재로드, 실시간 검색 결과는 add() 로 max_live_additions 건까지만 바로 반영
+"""
+import re
+import math
+import heapq
+import time
+import threading
+from typing import Optional
+
+from database.supabase_client import fetch_all_rows
+
+
+CORPUS_COLUMNS = "pmid, title, abstract, journal, pub_year, url, mesh_terms, publication_types"
+FIELD_WEIGHTS = {"title": 2, "mesh_terms": 2, "abstract": 1}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their these this "
+    "to was were which with".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_FIELD_TAG = re.compile(r"\[([^\]]*)\]")
+_FILTER_TERMS = frozenset({"hasabstract"})   # PubMed 필터 (색인 토큰 아님)
+
+
+def _stem(token: str) -> str:
+    """간단한 복수형 정규화 (studies → study, effects → effect)"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text) -> list[str]:
+    if not text:
+        return []
+    return [_stem(tok) for tok in _TOKEN.findall(str(text).lower()) if tok not in STOPWORDS]
+
+
+def _split_top(text: str, op: str) -> list[str]:
+    """괄호 밖의 ' AND ' / ' OR ' 기준 분리"""
+    parts, depth, start, i = [], 0, 0, 0
+    sep = f" {op} "
+    while i < len(text):
+        ch = text[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0 and text.startswith(sep, i):
+            parts.append(text[start:i])
+            i += len(sep)
+            start = i
+            continue
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _strip_parens(text: str) -> str:
+    """검색식 전체를 감싼 괄호 제거 ('(a OR b)' → 'a OR b', '(a) AND (b)' 는 그대로)"""
+    text = text.strip()
+    while text.startswith("(") and text.endswith(")"):
+        depth = 0
+        for i, ch in enumerate(text):
+            depth += 1 if ch == "(" else -1 if ch == ")" else 0
+            if depth == 0 and i < len(text) - 1:
+                return text
+        text = text[1:-1].strip()
+    return text
+
+
+def _field_scope(tag: str) -> Optional[tuple[str, ...]]:
+    """필드 태그 → 구 일치를 확인할 필드 (모르는 태그는 전체)"""
+    tag = tag.strip().lower()
+    if tag.startswith("mesh") or tag in ("mh", "majr"):
+        return ("mesh_terms",)
+    if tag in ("title/abstract", "tiab"):
+        return ("title", "abstract")
+    if tag in ("title", "ti"):
+        return ("title",)
+    if tag in ("abstract", "ab"):
+        return ("abstract",)
+    return None
+
+
+def parse_phrases(query: str) -> list[list[tuple[Optional[tuple[str, ...]], list[str]]]]:
+    """
+    PubMed 검색식 → AND 절 목록
+    절 = OR 대안 목록, 대안 = (필드 범위 또는 None, 토큰 목록) — 토큰은 해당 필드에 연속으로 나와야 하는 구
+    """
+    clauses = []
+    for clause in _split_top(_strip_parens(query or ""), "AND"):
+        alternatives = []
+        for alt in _split_top(_strip_parens(clause), "OR"):
+            tags = _FIELD_TAG.findall(alt)
+            tokens = tokenize(_FIELD_TAG.sub(" ", alt))
+            if tokens and not (len(tokens) == 1 and tokens[0] in _FILTER_TERMS):
+                alternatives.append((_field_scope(tags[0]) if len(tags) == 1 else None, tokens))
+        if alternatives:
+            clauses.append(alternatives)
+    return clauses
+
+
+def parse_query(query: str) -> list[list[list[str]]]:
+    """
+    PubMed 검색식 → AND 절 목록
+    절 = OR 대안 목록, 대안 = 모두 포함해야 하는 토큰 목록 (중첩 괄호는 대안 안에서 AND 로 취급)
+    """
+    return [[tokens for _, tokens in alternatives] for alternatives in parse_phrases(query)]
+
+
+def _contains_phrase(row: dict, fields: Optional[tuple[str, ...]], tokens: list[str]) -> bool:
+    """row 의 필드(MeSH 는 용어별) 중 하나에 tokens 가 연속으로 나오는지"""
+    size = len(tokens)
+    for field in fields or FIELD_WEIGHTS:
+        value = row.get(field)
+        for text in value if isinstance(value, list) else [value]:
+            words = tokenize(text)
+            if any(words[i:i + size] == tokens for i in range(len(words) - size + 1)):
+                return True
+    return False
+
+
+def _query_key(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+class _Snapshot:
+    """역색인 한 벌 (재로드 시 새로 만들어 교체 — 구성 중에도 기존 인덱스로 검색)"""
+
+    def __init__(self):
+        self.docs: list[dict] = []
+        self.lengths: list[float] = []
+        self.postings: dict[str, dict[int, float]] = {}   # 토큰 → {문서 번호: 가중 tf}
+        self.by_pmid: dict[str, int] = {}
+        self.total_length = 0.0
+
+    def index(self, row: dict) -> bool:
+        """문서 1건 색인 (PMID 없거나 이미 있으면 False)"""
+        pmid = row.get("pmid")
+        if not pmid or pmid in self.by_pmid:
+            return False
+        idx = len(self.docs)
+        weighted: dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = row.get(field)
+            text = " ".join(value) if isinstance(value, list) else value
+            for token in tokenize(text):
+                weighted[token] = weighted.get(token, 0.0) + weight
+        length = sum(weighted.values())
+
+        self.docs.append(row)
+        self.lengths.append(length)
+        self.by_pmid[pmid] = idx
+        self.total_length += length
+        for token, tf in weighted.items():
+            self.postings.setdefault(token, {})[idx] = tf
+        return True
+
+
+class PubMedCorpus:
+    """pubmed_papers 초록 BM25 인덱스 (프로세스 공유)"""
+
+    _shared: Optional["PubMedCorpus"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        refresh_minutes: int = 60,
+        page_size: int = 1000,
+        min_score: float = 1.0,
+        max_live_additions: int = 2000,
+        max_warm_queries: int = 10000,
+    ):
+        """
+        Args:
+            k1, b: BM25 파라미터
+            refresh_minutes: pubmed_papers 재로드 간격
+            page_size: Supabase 페이지 단위 조회 크기
+            min_score: 수집·캐시되지 않은 검색식을 로컬에서 답할 최소 BM25 점수
+            max_live_additions: 재로드 사이 add() 로 색인할 최대 논문 수 (초과분은 다음 재로드 때 반영)
+            max_warm_queries: 기억할 수집·캐시 검색식 수 (오래된 것부터 제거)
+        """
+        self.k1 = k1
+        self.b = b
+        self.refresh_seconds = refresh_minutes * 60
+        self.page_size = page_size
+        self.min_score = min_score
+        self.max_live_additions = max_live_additions
+        self.max_warm_queries = max_warm_queries
+
+        self._snapshot = _Snapshot()
+        self._lock = threading.Lock()   # 검색 ↔ add() 사이 보호
+        self._live_added = 0             # 마지막 build 이후 add() 로 색인한 수
+        self._warm_queries: dict[str, None] = {}   # 수집·캐시된 검색식 (삽입 순 = 오래된 순)
+
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._last_error_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._stats = {"searches": 0, "hits": 0, "cold": 0}
+
+    @classmethod
+    def shared(cls) -> "PubMedCorpus":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def is_ready(self) -> bool:
+        """인덱스가 한 번이라도 로드되었는지 (False 면 ensure_loaded 가 동기 로드)"""
+        return self._loaded
+
+    # ──────────────────────────────────────────
+    # Index
+    # ──────────────────────────────────────────
+
+    def build(self, rows: list[dict]) -> None:
+        """행 목록으로 인덱스 재구성"""
+        started = time.perf_counter()
+        snapshot = _Snapshot()
+        for row in rows:
+            snapshot.index(row)
+        with self._lock:
+            self._snapshot = snapshot
+            self._live_added = 0
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+        print(
+            f"[PubMedCorpus] 초록 {len(snapshot.docs)}건 색인 "
+            f"({len(snapshot.postings)} terms, {(time.perf_counter() - started) * 1000:.0f}ms)"
+        )
+
+    def add(self, rows: list[dict]) -> int:
+        """
+        실시간 검색 결과 반영 (이미 있는 PMID 는 건너뜀), 추가 건수 반환
+        재로드 사이 max_live_additions 건을 넘으면 더 색인하지 않음 (pubmed_papers 에 저장되어 재로드 때 반영)
+        """
+        added = 0
+        with self._lock:
+            for row in rows:
+                if self._live_added >= self.max_live_additions:
+                    break
+                if self._snapshot.index(row):
+                    self._live_added += 1
+                    added += 1
+        return added
+
+    def mark_warm(self, query: str) -> None:
+        """수집·캐시된 검색식 등록 — 이후 같은 검색식은 후보 수만 채우면 로컬 응답"""
+        key = _query_key(query)
+        with self._lock:
+            self._warm_queries.pop(key, None)
+            self._warm_queries[key] = None
+            if len(self._warm_queries) > self.max_warm_queries:
+                del self._warm_queries[next(iter(self._warm_queries))]
+
+    def load(self, db) -> None:
+        self.build(fetch_all_rows(db, "pubmed_papers", CORPUS_COLUMNS, "pmid", page_size=self.page_size))
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        코퍼스 사용 가능 여부 반환.
+        최초 호출은 동기 로드 (실패 시 1분간 재시도하지 않고 False → 실시간 API),
+        이후 refresh_minutes 경과 시 기존 인덱스로 응답하면서 백그라운드 재로드.
+        """
+        if not self._loaded:
+            if time.monotonic() - self._last_error_at < 60:
+                return False
+            with self._load_lock:
+                if not self._loaded:
+                    try:
+                        self.load(db)
+                    except Exception as e:
+                        self._last_error_at = time.monotonic()
+                        print(f"[PubMedCorpus] 로드 실패 — 실시간 API 사용: {e}")
+                        return False
+            return True
+
+        if time.monotonic() - self._loaded_at > self.refresh_seconds:
+            with self._load_lock:
+                if self._refreshing:
+                    return True
+                self._refreshing = True
+
+            def _run():
+                try:
+                    self.load(db)
+                except Exception as e:
+                    self._loaded_at = time.monotonic()
+                    print(f"[PubMedCorpus] 재로드 실패 — 기존 인덱스 유지: {e}")
+                finally:
+                    self._refreshing = False
+
+            threading.Thread(target=_run, daemon=True).start()
+        return True
+
+    # ──────────────────────────────────────────
+    # Search
+    # ──────────────────────────────────────────
+
+    @staticmethod
+    def _matches(snapshot: _Snapshot, clauses: list[list[list[str]]]) -> set[int]:
+        """모든 절을 만족하는 문서 번호"""
+        matched: Optional[set[int]] = None
+        for alternatives in clauses:
+            clause_docs: set[int] = set()
+            for tokens in alternatives:
+                docs: Optional[set[int]] = None
+                for token in sorted(tokens, key=lambda t: len(snapshot.postings.get(t, ()))):
+                    posting = snapshot.postings.get(token)
+                    docs = set() if not posting else set(posting) if docs is None else docs & posting.keys()
+                    if not docs:
+                        break
+                clause_docs |= docs
+            matched = clause_docs if matched is None else matched & clause_docs
+            if not matched:
+                return set()
+        return matched or set()
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[dict, float]]:
+        """
+        검색식에 맞는 문서를 BM25 점수 순으로 반환
+
+        Returns:
+            [(pubmed_papers 행, 점수), ...]
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        with self._lock:
+            snapshot = self._snapshot
+            total = len(snapshot.docs)
+            if not total:
+                return []
+            candidates = self._matches(snapshot, clauses)
+            avg_length = snapshot.total_length / total
+            tokens = {token for alternatives in clauses for alt in alternatives for token in alt}
+
+            scored = []
+            for idx in candidates:
+                score = 0.0
+                norm = self.k1 * (1 - self.b + self.b * snapshot.lengths[idx] / avg_length)
+                for token in tokens:
+                    posting = snapshot.postings.get(token)
+                    tf = posting.get(idx) if posting else None
+                    if not tf:
+                        continue
+                    idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                    score += idf * tf * (self.k1 + 1) / (tf + norm)
+                scored.append((score, snapshot.docs[idx].get("pub_year") or 0, idx))
+
+            top = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], -item[1], item[2]))
+            return [(snapshot.docs[idx], score) for score, _, idx in top]
+
+    def lookup(self, query: str, max_results: int) -> Optional[list[dict]]:
+        """
+        로컬에서 답할 수 있으면 상위 max_results 행, 콜드 검색어면 None
+
+        - mark_warm 으로 등록된 검색식: BM25 상위 max_results 건
+        - 그 외: 모든 절에서 대안 하나가 필드 범위 안에 구로 연속 일치하고 점수가 min_score 이상인 문서만
+          (흩어진 토큰만 맞는 초록으로는 답하지 않음)
+        """
+        with self._lock:
+            known = _query_key(query) in self._warm_queries
+        if known:
+            rows = [row for row, _ in self.search(query, max_results)]
+        else:
+            phrases = parse_phrases(query)
+            rows = [
+                row for row, score in self.search(query, max_results * 4)
+                if score >= self.min_score and all(
+                    any(_contains_phrase(row, fields, tokens) for fields, tokens in alternatives)
+                    for alternatives in phrases
+                )
+            ][:max_results]
+        with self._lock:
+            self._stats["searches"] += 1
+            warm = len(rows) >= max_results
+            self._stats["hits" if warm else "cold"] += 1
+        return rows if warm else None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "documents": len(self._snapshot.docs),
+                    "terms": len(self._snapshot.postings), "loaded": self._loaded,
+                    "live_added": self._live_added, "warm_queries": len(self._warm_queries)}
+
+
+def corpus_queries(db, page_size: int = 1000) -> list[str]:
+    """
+    수집 작업 검색식 목록 (modern_to_mesh_map / ingredient_pubmed_map, 중복 제거, 초록 있는 논문만)
+    """
+    terms: dict[str, None] = {}
+    for row in fetch_all_rows(db, "modern_to_mesh_map", "mesh_term, priority", "id", page_size=page_size):
+        if row.get("mesh_term"):
+            terms[f'"{row["mesh_term"]}"[MeSH Terms]'] = None
+    for row in fetch_all_rows(
+        db, "ingredient_pubmed_map", "ingredient_name_en, mesh_term, bioactive_compound", "id", page_size=page_size
+    ):
+        if row.get("mesh_term"):
+            terms[f'"{row["mesh_term"]}"[MeSH Terms]'] = None
+        for name in (row.get("ingredient_name_en"), row.get("bioactive_compound")):
+            if name:
+                terms[f'"{name}"[Title/Abstract]'] = None
+    return [f"{term} AND hasabstract" for term in terms]
@@ -0,0 +1,130 @@
+"""
+PubMed efetch XML 스트리밍 파서
+PMID마다 문서 전체에 re.search(DOTALL) 를 돌리던 방식(O(PMID 수 × 문서 크기))을
+iterparse 로 PubmedArticle 요소를 한 번씩만 순회하는 방식으로 대체
+
+- 문서를 앞에서부터 한 번 읽으며 PubmedArticle 이 닫힐 때마다 필드 추출 (O(문서 크기))
+- 추출이 끝난 요소는 바로 비워 메모리에 기사 하나 분량만 유지
+- 추출 필드: PMID, 제목, 저널, 출판 연도, 초록 섹션(Label 포함), MeSH, 출판 유형, DOI
+"""
+import io
+import re
+from dataclasses import dataclass, field
+from typing import IO, Iterator, Optional, Union
+from xml.etree import ElementTree as ET
+
+
+_YEAR = re.compile(r"(\d{4})")
+
+
+@dataclass
+class ParsedArticle:
+    """efetch PubmedArticle 한 건"""
+    pmid: str
+    title: str = ""
+    journal: str = ""
+    pub_year: Optional[int] = None
+    abstract_sections: list[tuple[str, str]] = field(default_factory=list)  # (Label, 본문)
+    mesh_terms: list[str] = field(default_factory=list)
+    publication_types: list[str] = field(default_factory=list)
+    doi: Optional[str] = None
+
+    @property
+    def abstract(self) -> str:
+        """섹션을 'LABEL: 본문' 형태로 이어 붙인 초록"""
+        return " ".join(
+            f"{label}: {text}" if label else text
+            for label, text in self.abstract_sections
+        )
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    """하위 태그(<i>, <sup> 등)를 포함한 전체 텍스트, 공백 정리"""
+    if elem is None:
+        return ""
+    return " ".join("".join(elem.itertext()).split())
+
+
+def _pub_year(article: ET.Element) -> Optional[int]:
+    """JournalIssue/PubDate/Year → MedlineDate 앞 연도 → ArticleDate/Year"""
+    pub_date = article.find("Journal/JournalIssue/PubDate")
+    if pub_date is not None:
+        year = pub_date.findtext("Year") or pub_date.findtext("MedlineDate") or ""
+        match = _YEAR.search(year)
+        if match:
+            return int(match.group(1))
+    year = article.findtext("ArticleDate/Year")
+    return int(year) if year and year.isdigit() else None
+
+
+def _doi(elem: ET.Element, article: Optional[ET.Element]) -> Optional[str]:
+    for article_id in elem.iterfind("PubmedData/ArticleIdList/ArticleId"):
+        if article_id.get("IdType") == "doi" and article_id.text:
+            return article_id.text.strip()
+    if article is not None:
+        for location in article.iterfind("ELocationID"):
+            if location.get("EIdType") == "doi" and location.text:
+                return location.text.strip()
+    return None
+
+
+def _parse_article(elem: ET.Element) -> Optional[ParsedArticle]:
+    citation = elem.find("MedlineCitation")
+    if citation is None:
+        return None
+    pmid = (citation.findtext("PMID") or "").strip()
+    if not pmid:
+        return None
+
+    article = citation.find("Article")
+    parsed = ParsedArticle(pmid=pmid, doi=_doi(elem, article))
+    if article is not None:
+        parsed.title = _text(article.find("ArticleTitle"))
+        parsed.journal = _text(article.find("Journal/Title"))
+        parsed.pub_year = _pub_year(article)
+        parsed.abstract_sections = [
+            (section.get("Label") or "", _text(section))
+            for section in article.iterfind("Abstract/AbstractText")
+            if _text(section)
+        ]
+        parsed.publication_types = [
+            _text(pt) for pt in article.iterfind("PublicationTypeList/PublicationType") if _text(pt)
+        ]
+    parsed.mesh_terms = [
+        _text(name) for name in citation.iterfind("MeshHeadingList/MeshHeading/DescriptorName") if _text(name)
+    ]
+    return parsed
+
+
+def iter_pubmed_articles(source: Union[str, bytes, IO[bytes]]) -> Iterator[ParsedArticle]:
+    """
+    efetch XML 에서 PubmedArticle 을 문서 순서대로 하나씩 추출
+
+    Args:
+        source: XML 문자열 / bytes / 바이너리 파일 객체 (응답 스트림 그대로 전달 가능)
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "PubmedArticle":
+            continue
+        parsed = _parse_article(elem)
+        # 처리한 기사 요소 해제 (루트에 붙은 이전 기사까지 함께 제거)
+        elem.clear()
+        if root is not None:
+            root.clear()
+        if parsed is not None:
+            yield parsed
+
+
+def parse_pubmed_articles(source: Union[str, bytes, IO[bytes]]) -> dict[str, ParsedArticle]:
+    """PMID → ParsedArticle (문서 순서 유지)"""
+    return {article.pmid: article for article in iter_pubmed_articles(source)}
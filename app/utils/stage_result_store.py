@@ -0,0 +1,85 @@
+"""
+분석 단계 결과 저장소 - 처방전 분석 세션 동안 메모리에 보관
+스트리밍 분석에서 계산한 DUR / 약물정보 / 동의보감 단계 결과를 약물 목록 기준으로 보관해
+결과 화면의 on-demand 섹션 요청(/prescription/sections)이 같은 분석을 다시 돌리지 않도록 합니다.
+
+- 키: 정규화한 약물 목록 (공백 제거 · 중복 제거 · 정렬)
+  순서에 따라 결과가 달라지는 단계(앞쪽 약물만 조회하는 약물정보)는 약물별 결과를 함께 저장하고
+  호출 측이 이번 목록 순서로 재조합합니다 (PrescriptionService._stored_stage)
+- 값: {단계명: 결과} — 분석 객체(AnalysisResult 등)를 그대로 보관하므로 파일 캐시 대신 메모리 사용
+- 세션 범위: TTL(기본 30분) + 최대 항목 수(LRU)로 제한
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class StageResultStore:
+    """약물 목록 단위 단계 결과 저장소 (프로세스 내 공유)"""
+
+    def __init__(self, ttl_seconds: int = 30 * 60, max_entries: int = 256):
+        """
+        Args:
+            ttl_seconds: 결과 보관 시간 (결과 화면을 보는 세션 길이 기준)
+            max_entries: 최대 보관 약물 목록 수 (초과 시 오래된 것부터 제거)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonical_key(drug_list: list) -> tuple:
+        """약물 목록 정규화 — 순서·중복·앞뒤 공백과 무관하게 같은 키"""
+        return tuple(sorted({str(d).strip() for d in drug_list if str(d).strip()}))
+
+    def get(self, drug_list: list, stage: str) -> Optional[Any]:
+        """저장된 단계 결과 조회 (없거나 만료되면 None)"""
+        key = self.canonical_key(drug_list)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry["_ts"] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            if stage not in entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[stage]
+
+    def put(self, drug_list: list, stage: str, value: Any) -> None:
+        """단계 결과 저장 (빈 약물 목록은 저장하지 않음)"""
+        key = self.canonical_key(drug_list)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry["_ts"] > self.ttl_seconds:
+                entry = {}
+                self._entries[key] = entry
+            entry[stage] = value
+            entry["_ts"] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """적중률 통계"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{self.hits / total * 100:.1f}%" if total else "0.0%",
+        }
@@ -0,0 +1,204 @@
+"""
+증상 → 식재료 / 레시피 인메모리 스냅샷
+symptom_ingredient_map ⋈ foods_master, symptom_recipe_map ⋈ recipes 를 서버 시작 시 한 번 조인해
+symptom_id 별로 보관합니다. 시드 적재 때만 바뀌는 데이터이므로 분석 요청마다 DB를 왕복하지 않습니다.
+
+버전 관리:
+  - data_versions 테이블의 'symptom_data' 버전 (네 테이블 변경 시 트리거가 증가)
+    → version_check_seconds 마다 백그라운드에서 확인, 바뀌었으면 재로드
+  - 앱 내부 쓰기(AI 레시피 생성)는 add_recipes() 로 즉시 반영
+  - data_versions 테이블이 없으면 version_check_seconds 마다 재로드
+"""
+import time
+import threading
+from typing import Optional
+
+from database.supabase_client import fetch_all_rows
+
+
+SYMPTOM_DATA_VERSION_KEY = "symptom_data"
+
+
+def _by_priority_desc(rows: list[dict]) -> list[dict]:
+    """order("priority", desc=True) 와 같은 순서 (PostgreSQL DESC 기본값: NULL 먼저)"""
+    return sorted(
+        rows,
+        key=lambda r: (r.get("priority") is None, r.get("priority") or 0),
+        reverse=True,
+    )
+
+
+class SymptomDataSnapshot:
+    """symptom_id → 식재료 / 레시피 조인 결과 (프로세스 공유)"""
+
+    _shared: Optional["SymptomDataSnapshot"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, version_check_seconds: int = 300, page_size: int = 1000):
+        """
+        Args:
+            version_check_seconds: 원격 버전 확인 간격
+            page_size: Supabase 페이지 단위 조회 크기
+        """
+        self.version_check_seconds = version_check_seconds
+        self.page_size = page_size
+        self.version: Optional[int] = None
+        self._ingredients: Optional[dict[int, list[dict]]] = None
+        self._recipes: Optional[dict[int, list[dict]]] = None
+        self._checked_at = 0.0
+        self._last_error_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    @classmethod
+    def shared(cls) -> "SymptomDataSnapshot":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ingredients is not None
+
+    # ──────────────────────────────────────────
+    # Lookup
+    # ──────────────────────────────────────────
+
+    def ingredients(self, symptom_id: int, limit: int = 3) -> list[dict]:
+        """
+        증상별 추천 식재료 (priority 내림차순)
+        각 항목: rep_code, modern_name, direction, rationale_ko, priority, evidence_level
+        """
+        return (self._ingredients or {}).get(symptom_id, [])[:limit]
+
+    def recipes(self, symptom_id: int, limit: int = 3) -> list[dict]:
+        """
+        증상별 추천 레시피 (priority 내림차순)
+        각 항목: recipe_id, title, description, tags, meal_slot, priority, rationale_ko
+        """
+        return (self._recipes or {}).get(symptom_id, [])[:limit]
+
+    def add_recipes(self, symptom_id: int, recipes: list[dict]) -> None:
+        """앱에서 새로 저장한 레시피를 스냅샷에 바로 반영 (재로드 전 중복 생성 방지)"""
+        if self._recipes is None:
+            return
+        merged = self._recipes.get(symptom_id, []) + list(recipes)
+        self._recipes = {**self._recipes, symptom_id: _by_priority_desc(merged)}
+
+    # ──────────────────────────────────────────
+    # Load / Version check
+    # ──────────────────────────────────────────
+
+    def build(self, ingredient_maps: list[dict], foods: list[dict],
+              recipe_maps: list[dict], recipes: list[dict], version: Optional[int] = None) -> None:
+        """조회한 행으로 symptom_id 인덱스 구성"""
+        food_names = {f["rep_code"]: f.get("modern_name") for f in foods}
+        recipe_info = {r["id"]: r for r in recipes}
+
+        ingredients: dict[int, list[dict]] = {}
+        for row in ingredient_maps:
+            rep_code = row.get("rep_code", "")
+            ingredients.setdefault(row["symptom_id"], []).append({
+                "rep_code": rep_code,
+                "modern_name": food_names.get(rep_code) or rep_code,
+                "direction": row.get("direction", "recommend"),
+                "rationale_ko": row.get("rationale_ko", ""),
+                "priority": row.get("priority"),
+                "evidence_level": row.get("evidence_level", "traditional"),
+            })
+
+        recipes_by_symptom: dict[int, list[dict]] = {}
+        for row in recipe_maps:
+            info = recipe_info.get(row["recipe_id"], {})
+            recipes_by_symptom.setdefault(row["symptom_id"], []).append({
+                "recipe_id": row["recipe_id"],
+                "title": info.get("title", f"Recipe {row['recipe_id']}"),
+                "description": info.get("description", ""),
+                "tags": info.get("tags", []),
+                "meal_slot": row.get("meal_slot", "anytime"),
+                "priority": row.get("priority"),
+                "rationale_ko": row.get("rationale_ko", ""),
+            })
+
+        self._ingredients = {k: _by_priority_desc(v) for k, v in ingredients.items()}
+        self._recipes = {k: _by_priority_desc(v) for k, v in recipes_by_symptom.items()}
+        self.version = version
+        self._checked_at = time.monotonic()
+        print(
+            f"[SymptomSnapshot] v{version} 로드 — 식재료 매핑 {len(ingredient_maps)}건 / "
+            f"레시피 매핑 {len(recipe_maps)}건 ({len(self._ingredients)}·{len(self._recipes)} 증상)"
+        )
+
+    def load(self, db) -> None:
+        """네 테이블 전체 조회 후 스냅샷 교체"""
+        version = self.remote_version(db)
+        self.build(
+            fetch_all_rows(
+                db, "symptom_ingredient_map",
+                "symptom_id, rep_code, direction, rationale_ko, priority, evidence_level", "id",
+                page_size=self.page_size,
+            ),
+            fetch_all_rows(db, "foods_master", "rep_code, modern_name", "rep_code", page_size=self.page_size),
+            fetch_all_rows(
+                db, "symptom_recipe_map",
+                "symptom_id, recipe_id, meal_slot, priority, rationale_ko", "id",
+                page_size=self.page_size,
+            ),
+            fetch_all_rows(db, "recipes", "id, title, description, tags", "id", page_size=self.page_size),
+            version,
+        )
+
+    @staticmethod
+    def remote_version(db) -> Optional[int]:
+        """data_versions 의 현재 버전 (테이블이 없으면 None)"""
+        try:
+            result = db.table("data_versions").select("version").eq(
+                "name", SYMPTOM_DATA_VERSION_KEY
+            ).limit(1).execute()
+            return result.data[0]["version"] if result.data else 0
+        except Exception:
+            return None
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        스냅샷 사용 가능 여부 반환.
+        - 최초 호출: 동기 로드 (실패 시 1분간 재시도하지 않고 False → 호출 측 DB 쿼리)
+        - 이후: version_check_seconds 마다 백그라운드에서 버전 확인 후 필요 시 재로드
+        """
+        if self._ingredients is None:
+            if time.monotonic() - self._last_error_at < 60:
+                return False
+            with self._load_lock:
+                if self._ingredients is None:
+                    try:
+                        self.load(db)
+                    except Exception as e:
+                        self._last_error_at = time.monotonic()
+                        print(f"[SymptomSnapshot] 로드 실패 — DB 조회 사용: {e}")
+                        return False
+            return True
+
+        if time.monotonic() - self._checked_at > self.version_check_seconds:
+            self._check_in_background(db)
+        return True
+
+    def _check_in_background(self, db) -> None:
+        with self._load_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._checked_at = time.monotonic()
+
+        def _run():
+            try:
+                version = self.remote_version(db)
+                if version is None or version != self.version:
+                    self.load(db)
+            except Exception as e:
+                print(f"[SymptomSnapshot] 재로드 실패 — 기존 스냅샷 유지: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, daemon=True).start()
@@ -0,0 +1,367 @@
+"""
+한→영 검색어 번역 계층 (PubMed 검색용)
+검색어마다 DB 조회 → 외부 번역 API → LLM 을 차례로 부르던 방식을, 자주 반복되는 식재료·약물명은
+로컬 사전에서 바로 답하고 나머지만 묶어서 번역하도록 바꿉니다.
+
+- 1단계 사전: foods_master(modern_name / rep_name / 한글 별칭 → name_en), catalog_drugs,
+  data/drug_database.json(제품명 / 별칭 → name_en). 띄어쓴 검색어는 단어가 모두 사전에 있으면 조합
+- 2단계 영구 캐시: drug_translation 테이블 (in_ 조회 1회) + 한 번 번역한 결과를 담는 프로세스 메모리
+- 3단계 LLM 묶음 번역: batch_window 안에 들어온 미번역 검색어를 JSON 프롬프트 하나로 번역 후 DB 저장
+- 같은 검색어의 재번역은 네트워크 호출 없음
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from database.supabase_client import fetch_all_rows
+from app.utils.batch_llm import BatchLLMGenerator, LLMCall
+
+
+DRUG_DATABASE_PATH = os.path.join(os.path.dirname(__file__), "../../data/drug_database.json")
+
+# 검색어 → (영문, 출처) — LLM 묶음 번역에 실패한 검색어의 단건 번역
+FallbackTranslate = Callable[[str], Awaitable[Optional[tuple[str, str]]]]
+
+TRANSLATE_INSTRUCTIONS = """
+Translate each Korean medical / food / drug term into its most appropriate English scientific or MeSH term
+for a PubMed search. Keep each translation short (the term only, no explanation).
+"""
+
+
+def _normalize(term) -> str:
+    return " ".join(str(term).lower().split()) if term else ""
+
+
+def _has_korean(text: str) -> bool:
+    return any(ord(ch) > 127 for ch in text)
+
+
+def _english(name) -> str:
+    """영문명 정리 ('Jujube, Red Date' → 'Jujube')"""
+    return str(name).split(",")[0].strip() if name else ""
+
+
+class _PendingTranslation:
+    """batch_window 동안 모으는 미번역 검색어 묶음 (이벤트 루프별)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, repo, llm, fallback):
+        self.terms: dict[str, None] = {}
+        self.future: asyncio.Future = loop.create_future()
+        self.repo = repo
+        self.llm = llm
+        self.fallback = fallback
+
+
+class TermTranslator:
+    """사전 → 영구 캐시 → LLM 묶음 번역 (프로세스 공유)"""
+
+    _shared: Optional["TermTranslator"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        drug_database_path: Optional[str] = DRUG_DATABASE_PATH,
+        refresh_minutes: int = 60,
+        page_size: int = 1000,
+        batch_window_ms: int = 30,
+        max_cached: int = 5000,
+    ):
+        """
+        Args:
+            drug_database_path: 약물 사전 JSON (None 이면 사용 안 함)
+            refresh_minutes: foods_master / catalog_drugs 재로드 간격
+            page_size: Supabase 페이지 단위 조회 크기
+            batch_window_ms: 미번역 검색어를 모으는 시간
+            max_cached: 번역 결과 메모리 보관 수 (초과 시 오래 안 쓴 것부터 제거)
+        """
+        self.refresh_seconds = refresh_minutes * 60
+        self.page_size = page_size
+        self.batch_window = batch_window_ms / 1000
+        self.max_cached = max_cached
+
+        self._seed = self._load_drug_database(drug_database_path) if drug_database_path else {}
+        self._dictionary: dict[str, str] = dict(self._seed)
+        self._cached: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingTranslation]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._last_error_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._stats_lock = threading.Lock()
+        self._stats = {"dictionary": 0, "cached": 0, "db": 0, "llm": 0, "llm_calls": 0,
+                       "fallback": 0, "failed": 0}
+
+    @property
+    def is_ready(self) -> bool:
+        """DB 사전 로드 완료 여부 (미완료면 최초 로드는 동기 — 비동기 호출 측은 스레드에서)"""
+        return self._loaded
+
+    @classmethod
+    def shared(cls) -> "TermTranslator":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    # ──────────────────────────────────────────
+    # Dictionary
+    # ──────────────────────────────────────────
+
+    @staticmethod
+    def _load_drug_database(path: str) -> dict[str, str]:
+        """drug_database.json 제품명·별칭 → 영문명"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[TermTranslator] 약물 사전 로드 실패: {e}")
+            return {}
+
+        entries: dict[str, str] = {}
+        drugs = data.get("drugs", {})
+        for key, info in drugs.items():
+            english = _english(info.get("name_en"))
+            if not english:
+                continue
+            name_ko = info.get("name_ko") or ""
+            for name in (key, name_ko, re.sub(r"\(.*\)", "", name_ko)):
+                if _has_korean(name):
+                    entries.setdefault(_normalize(name), english)
+        for alias, key in data.get("aliases", {}).items():
+            english = _english(drugs.get(key, {}).get("name_en"))
+            if english and _has_korean(alias):
+                entries.setdefault(_normalize(alias), english)
+        return entries
+
+    def build(self, food_rows: list[dict], drug_rows: list[dict]) -> None:
+        """foods_master / catalog_drugs 행 + 약물 JSON 으로 사전 구성"""
+        dictionary = dict(self._seed)
+        for row in food_rows:
+            english = _english(row.get("name_en"))
+            if not english:
+                continue
+            for name in (row.get("modern_name"), row.get("rep_name"), *(row.get("aliases") or [])):
+                if name and _has_korean(name):
+                    dictionary.setdefault(_normalize(name), english)
+        for row in drug_rows:
+            # 스키마별 컬럼명 차이 (name_ko / name_en, name / generic_name)
+            name = row.get("name_ko") or row.get("name")
+            english = _english(row.get("name_en") or row.get("generic_name"))
+            if name and english and _has_korean(name) and not _has_korean(english):
+                dictionary.setdefault(_normalize(name), english)
+
+        self._dictionary = dictionary
+        self._loaded = True
+        self._loaded_at = time.monotonic()
+        print(f"[TermTranslator] 사전 {len(dictionary)}건 로드 (식재료 {len(food_rows)} / 약물 {len(drug_rows)})")
+
+    def load(self, db) -> None:
+        food_rows = fetch_all_rows(db, "foods_master", "*", "rep_code", page_size=self.page_size)
+        try:
+            drug_rows = fetch_all_rows(db, "catalog_drugs", "*", "id", page_size=self.page_size)
+        except Exception as e:
+            # catalog_drugs 가 없는 환경은 식재료 + 약물 JSON 만 사용
+            print(f"[TermTranslator] catalog_drugs 로드 실패: {e}")
+            drug_rows = []
+        self.build(food_rows, drug_rows)
+
+    def ensure_loaded(self, db) -> bool:
+        """
+        DB 사전 사용 가능 여부 반환 (실패해도 약물 JSON 사전으로 번역 계속).
+        최초 호출은 동기 로드, 이후 refresh_minutes 경과 시 백그라운드 재로드.
+        """
+        if not self._loaded:
+            if time.monotonic() - self._last_error_at < 60:
+                return False
+            with self._load_lock:
+                if not self._loaded:
+                    try:
+                        self.load(db)
+                    except Exception as e:
+                        self._last_error_at = time.monotonic()
+                        print(f"[TermTranslator] 사전 로드 실패 — 약물 JSON 사전만 사용: {e}")
+                        return False
+            return True
+
+        if time.monotonic() - self._loaded_at > self.refresh_seconds:
+            with self._load_lock:
+                if self._refreshing:
+                    return True
+                self._refreshing = True
+
+            def _run():
+                try:
+                    self.load(db)
+                except Exception as e:
+                    self._loaded_at = time.monotonic()
+                    print(f"[TermTranslator] 재로드 실패 — 기존 사전 유지: {e}")
+                finally:
+                    self._refreshing = False
+
+            threading.Thread(target=_run, daemon=True).start()
+        return True
+
+    def lookup(self, term: str) -> Optional[str]:
+        """
+        로컬 번역 (사전 → 번역 결과 메모리). 한글이 없으면 그대로, 모르면 None
+        """
+        if not _has_korean(term):
+            return term
+        key = _normalize(term)
+        english = self._dictionary.get(key)
+        if english is not None:
+            self._count(dictionary=1)
+            return english
+        with self._cache_lock:
+            english = self._cached.get(key)
+            if english is not None:
+                self._cached.move_to_end(key)
+        if english is not None:
+            self._count(cached=1)
+            return english
+
+        # 띄어쓴 검색어: 한글 단어가 모두 사전에 있으면 단어별 번역 조합
+        words = key.split()
+        if len(words) > 1:
+            parts = [self._dictionary.get(word) if _has_korean(word) else word for word in words]
+            if all(parts):
+                self._count(dictionary=1)
+                return " ".join(parts)
+        return None
+
+    def _remember(self, translations: dict[str, str]) -> None:
+        with self._cache_lock:
+            for term, english in translations.items():
+                self._cached[_normalize(term)] = english
+                self._cached.move_to_end(_normalize(term))
+            while len(self._cached) > self.max_cached:
+                self._cached.popitem(last=False)
+
+    # ──────────────────────────────────────────
+    # Translate
+    # ──────────────────────────────────────────
+
+    async def translate(
+        self,
+        terms: list[str],
+        repo=None,
+        llm: Optional[LLMCall] = None,
+        fallback: Optional[FallbackTranslate] = None,
+    ) -> dict[str, str]:
+        """
+        검색어 → 영문 (번역하지 못한 검색어는 원문 그대로)
+
+        Args:
+            repo: get_translations / save_translations 를 가진 저장소 (PubMedRepository)
+            llm: 묶음 번역용 JSON 응답 LLM 호출 함수
+            fallback: LLM 묶음 번역에 실패한 검색어의 단건 번역
+        """
+        results: dict[str, str] = {}
+        misses: list[str] = []
+        for term in dict.fromkeys(terms):
+            english = self.lookup(term)
+            if english is None:
+                misses.append(term)
+            else:
+                results[term] = english
+        if misses:
+            translated = await self._enqueue(misses, repo, llm, fallback)
+            results.update({term: translated.get(term, term) for term in misses})
+        return results
+
+    async def _enqueue(self, terms: list[str], repo, llm, fallback) -> dict[str, str]:
+        """다른 요청의 미번역 검색어와 묶어 한 번에 처리"""
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = _PendingTranslation(loop, repo, llm, fallback)
+            self._pending[loop] = batch
+            loop.create_task(self._flush(loop, batch))
+        batch.terms.update(dict.fromkeys(terms))
+
+        # 한 호출자가 취소돼도 묶음 번역은 계속 진행
+        translated = await asyncio.shield(batch.future)
+        return {term: translated[term] for term in terms if term in translated}
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop, batch: _PendingTranslation) -> None:
+        await asyncio.sleep(self.batch_window)
+        if self._pending.get(loop) is batch:
+            del self._pending[loop]
+        try:
+            batch.future.set_result(await self._resolve(list(batch.terms), batch.repo, batch.llm, batch.fallback))
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()  # 대기자가 모두 취소된 경우 경고 방지
+
+    async def _resolve(self, terms: list[str], repo, llm, fallback) -> dict[str, str]:
+        found: dict[str, str] = {}
+
+        # 2. 영구 캐시 (drug_translation)
+        if repo is not None:
+            try:
+                rows = await repo.get_translations(terms)
+                found.update({term: rows[term] for term in terms if rows.get(term)})
+                self._count(db=len(found))
+            except Exception as e:
+                print(f"[TermTranslator] 번역 캐시 조회 실패: {e}")
+
+        remaining = [term for term in terms if term not in found]
+        new_rows: list[dict] = []
+
+        # 3. LLM 묶음 번역
+        if remaining and llm is not None:
+            generator = BatchLLMGenerator(
+                llm, token_budget=4000, output_tokens_per_item=20, max_items_per_batch=50, max_retries=1
+            )
+            batch = await generator.run(
+                {str(i): term for i, term in enumerate(remaining)},
+                TRANSLATE_INSTRUCTIONS,
+                '"en": "<English term>"',
+                validate=lambda entry: isinstance(entry.get("en"), str) and bool(entry["en"].strip()),
+            )
+            self._count(llm_calls=batch.calls, llm=len(batch.results))
+            for item_id, entry in batch.results.items():
+                term = remaining[int(item_id)]
+                found[term] = entry["en"].strip()
+                new_rows.append({"korean_name": term, "english_name": found[term], "source": "gemini"})
+            remaining = [term for term in remaining if term not in found]
+
+        # 4. 단건 번역 (LLM 미설정·실패 시)
+        if remaining and fallback is not None:
+            outputs = await asyncio.gather(*(fallback(term) for term in remaining), return_exceptions=True)
+            for term, output in zip(remaining, outputs):
+                if isinstance(output, tuple) and output[0]:
+                    found[term] = output[0]
+                    new_rows.append({"korean_name": term, "english_name": output[0], "source": output[1]})
+            self._count(fallback=sum(1 for term in remaining if term in found))
+
+        self._count(failed=sum(1 for term in terms if term not in found))
+        self._remember(found)
+        if new_rows and repo is not None:
+            try:
+                await repo.save_translations(new_rows)
+            except Exception as e:
+                print(f"[TermTranslator] 번역 캐시 저장 실패: {e}")
+        return found
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {**stats, "dictionary_size": len(self._dictionary), "cached_terms": len(self._cached)}
@@ -0,0 +1,37 @@
+"""
+공유 인메모리 인덱스 사전 로드
+app/main.py 와 app/services/server.py 의 startup 훅이 함께 사용합니다.
+
+- DiseaseIndex         : disease_master 검색 인덱스
+- SymptomDataSnapshot  : 증상 → 식재료/레시피 스냅샷
+- InteractionGraph     : 약물-식재료 상호작용 그래프
+- TermTranslator       : 한→영 용어 사전
+- PubMedCorpus         : PubMed 초록 BM25 코퍼스
+
+모두 DB 전체 조회라 워커 스레드에서 동시에 로드합니다. 실패해도 서버는 뜨고,
+각 로더가 첫 요청 때(이벤트 루프 밖에서) 다시 시도합니다.
+"""
+import asyncio
+
+from app.utils.disease_index import DiseaseIndex
+from app.utils.symptom_snapshot import SymptomDataSnapshot
+from app.utils.interaction_graph import InteractionGraph
+from app.utils.term_translator import TermTranslator
+from app.utils.pubmed_corpus import PubMedCorpus
+
+
+async def warm_up_shared_indexes(db=None) -> None:
+    """공유 인덱스 사전 로드 (첫 분석 지연 방지, db 생략 시 기본 Supabase 클라이언트)"""
+    try:
+        if db is None:
+            from database.supabase_client import get_supabase_client
+            db = get_supabase_client()
+        await asyncio.gather(
+            asyncio.to_thread(DiseaseIndex.shared().ensure_loaded, db),
+            asyncio.to_thread(SymptomDataSnapshot.shared().ensure_loaded, db),
+            asyncio.to_thread(InteractionGraph.shared().ensure_loaded, db),
+            asyncio.to_thread(TermTranslator.shared().ensure_loaded, db),
+            asyncio.to_thread(PubMedCorpus.shared().ensure_loaded, db),
+        )
+    except Exception as e:
+        print(f"⚠️ 증상 인덱스 사전 로드 실패: {e}")
@@ -5,15 +5,23 @@ Supabase 데이터베이스 연결 및 관리
 
 from .supabase_client import (
     SupabaseClient,
+    AsyncSupabaseClient,
     get_supabase_client,
     get_supabase_service_client,
+    get_async_supabase_client,
+    QueryCache,
+    cached_table,
     test_connection
 )
 
 __all__ = [
     "SupabaseClient",
+    "AsyncSupabaseClient",
     "get_supabase_client",
     "get_supabase_service_client",
+    "get_async_supabase_client",
+    "QueryCache",
+    "cached_table",
     "test_connection"
 ]
 
@@ -0,0 +1,252 @@
+"""
+비동기 Supabase 저장소 (Repository) 모듈
+async 요청 핸들러(AnalyzeService, PubMedService, YouTubeService, StepByStepAnalysisService)가 쓰는
+테이블 조회/저장을 AsyncClient 위에 모아 둡니다.
+
+- 동기 supabase-py 호출은 PostgREST 왕복 동안 이벤트 루프를 막아 동시 요청·SSE 스트림이 직렬화됨
+- 모든 메서드는 코루틴이며 연결 풀을 공유하는 AsyncSupabaseClient 를 사용
+- 마스터 테이블(MASTER_TABLES) 조회는 QueryCache 를 거침 (버전 변경 시 폐기)
+- 오류 처리는 호출 측 기존 방식(try/except 후 빈 결과) 유지 — 저장소는 예외를 그대로 전달
+"""
+from typing import Iterable, Optional
+
+from supabase import AsyncClient
+
+from database.supabase_client import get_async_supabase_client, cached_table
+
+
+def _ilike_any(fields: Iterable[str], keyword: str) -> str:
+    """여러 컬럼 ilike OR 필터 (예: 'a.ilike.%x%,b.ilike.%x%')"""
+    return ",".join(f"{field}.ilike.%{keyword}%" for field in fields)
+
+
+class AsyncRepository:
+    """비동기 저장소 베이스"""
+
+    def __init__(self, client: Optional[AsyncClient] = None):
+        """
+        Args:
+            client: 사용할 AsyncClient (없으면 현재 이벤트 루프의 공유 클라이언트)
+        """
+        self._client = client
+
+    async def _table(self, name: str):
+        client = self._client or await get_async_supabase_client()
+        return cached_table(client, name)
+
+
+# ──────────────────────────────────────────
+# 증상 / 식재료 / 레시피
+# ──────────────────────────────────────────
+
+class SymptomRepository(AsyncRepository):
+    """disease_master, symptom_ingredient_map, foods_master, symptom_recipe_map, recipes"""
+
+    async def search_diseases(
+        self, keyword: str, fields: Iterable[str], columns: str = "*", limit: int = 10
+    ) -> list[dict]:
+        """disease_master 부분 문자열 검색 (fields 중 하나라도 ilike 매칭)"""
+        table = await self._table("disease_master")
+        result = await table.select(columns).or_(_ilike_any(fields, keyword)).limit(limit).execute()
+        return result.data or []
+
+    async def get_disease(self, disease_id: int, columns: str = "*") -> Optional[dict]:
+        table = await self._table("disease_master")
+        result = await table.select(columns).eq("id", disease_id).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    async def mapped_symptom_ids(self, symptom_ids: list[int]) -> set[int]:
+        """symptom_ingredient_map 에 매핑이 있는 symptom_id 집합 (in_ 쿼리 1회)"""
+        if not symptom_ids:
+            return set()
+        table = await self._table("symptom_ingredient_map")
+        result = await table.select("symptom_id").in_("symptom_id", symptom_ids).execute()
+        return {row["symptom_id"] for row in result.data or []}
+
+    async def ingredient_maps(self, symptom_id: int, limit: int = 3) -> list[dict]:
+        """증상별 식재료 매핑 (priority 내림차순)"""
+        table = await self._table("symptom_ingredient_map")
+        result = await table.select(
+            "rep_code, direction, rationale_ko, priority, evidence_level"
+        ).eq("symptom_id", symptom_id).order("priority", desc=True).limit(limit).execute()
+        return result.data or []
+
+    async def food_names(self, rep_codes: list[str]) -> dict[str, str]:
+        """rep_code → foods_master.modern_name"""
+        if not rep_codes:
+            return {}
+        table = await self._table("foods_master")
+        result = await table.select("rep_code, modern_name").in_("rep_code", rep_codes).execute()
+        return {row["rep_code"]: row["modern_name"] for row in result.data or []}
+
+    async def recipe_maps(self, symptom_id: int, limit: int = 3) -> list[dict]:
+        """증상별 레시피 매핑 (priority 내림차순)"""
+        table = await self._table("symptom_recipe_map")
+        result = await table.select(
+            "recipe_id, meal_slot, priority, rationale_ko"
+        ).eq("symptom_id", symptom_id).order("priority", desc=True).limit(limit).execute()
+        return result.data or []
+
+    async def recipes_by_ids(self, recipe_ids: list[int]) -> dict[int, dict]:
+        """recipe id → recipes 행"""
+        if not recipe_ids:
+            return {}
+        table = await self._table("recipes")
+        result = await table.select("id, title, description, tags").in_("id", recipe_ids).execute()
+        return {row["id"]: row for row in result.data or []}
+
+    async def insert_recipes(self, recipes: list[dict]) -> list[dict]:
+        """recipes 일괄 추가 (요청 1회), 추가된 행을 입력 순서대로 반환"""
+        if not recipes:
+            return []
+        table = await self._table("recipes")
+        result = await table.insert(recipes).execute()
+        return result.data or []
+
+    async def insert_recipe_maps(self, rows: list[dict]) -> None:
+        """symptom_recipe_map 일괄 추가 (요청 1회)"""
+        if not rows:
+            return
+        table = await self._table("symptom_recipe_map")
+        await table.insert(rows).execute()
+
+
+# ──────────────────────────────────────────
+# 약물 / 상호작용
+# ──────────────────────────────────────────
+
+class DrugRepository(AsyncRepository):
+    """interaction_facts, catalog_drugs"""
+
+    async def interaction_facts(self, drug_name: str, columns: str = "*", limit: Optional[int] = None) -> list[dict]:
+        """a_ref 또는 b_ref 에 약물명이 포함된 상호작용"""
+        table = await self._table("interaction_facts")
+        query = table.select(columns).or_(_ilike_any(("a_ref", "b_ref"), drug_name))
+        if limit:
+            query = query.limit(limit)
+        result = await query.execute()
+        return result.data or []
+
+    async def search_catalog(
+        self, keyword: str, columns: str = "*", limit: int = 5
+    ) -> list[dict]:
+        """catalog_drugs 한글/영문명 부분 문자열 검색"""
+        table = await self._table("catalog_drugs")
+        result = await table.select(columns).or_(
+            _ilike_any(("name_ko", "name_en"), keyword)
+        ).limit(limit).execute()
+        return result.data or []
+
+    async def get_catalog_drug(self, drug_id: int, columns: str = "*") -> Optional[dict]:
+        table = await self._table("catalog_drugs")
+        result = await table.select(columns).eq("id", drug_id).limit(1).execute()
+        return result.data[0] if result.data else None
+
+
+# ──────────────────────────────────────────
+# PubMed
+# ──────────────────────────────────────────
+
+class PubMedRepository(AsyncRepository):
+    """symptom_pubmed_map, ingredient_pubmed_map, pubmed_papers, pubmed_cache, drug_translation"""
+
+    async def symptom_terms(self, symptom_id: int, limit: int = 2) -> list[dict]:
+        table = await self._table("symptom_pubmed_map")
+        result = await table.select("keyword_en, mesh_term").eq(
+            "symptom_id", symptom_id
+        ).order("priority").limit(limit).execute()
+        return result.data or []
+
+    async def ingredient_terms(self, rep_code: str, limit: int = 2) -> list[dict]:
+        table = await self._table("ingredient_pubmed_map")
+        result = await table.select("ingredient_name_en, mesh_term, bioactive_compound").eq(
+            "rep_code", rep_code
+        ).order("priority").limit(limit).execute()
+        return result.data or []
+
+    async def upsert_papers(self, rows: list[dict]) -> None:
+        """pubmed_papers 일괄 upsert (요청 1회)"""
+        if not rows:
+            return
+        table = await self._table("pubmed_papers")
+        await table.upsert(rows, on_conflict="pmid").execute()
+
+    async def papers_by_pmids(self, pmids: list[str]) -> dict[str, dict]:
+        """pmid → pubmed_papers 행 (in_ 쿼리 1회)"""
+        if not pmids:
+            return {}
+        table = await self._table("pubmed_papers")
+        result = await table.select("*").in_("pmid", pmids).execute()
+        return {row["pmid"]: row for row in result.data or []}
+
+    async def get_query_cache(self, query_hash: str) -> Optional[dict]:
+        table = await self._table("pubmed_cache")
+        result = await table.select("*").eq("query_hash", query_hash).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    async def upsert_query_cache(self, row: dict) -> None:
+        table = await self._table("pubmed_cache")
+        await table.upsert(row, on_conflict="query_hash").execute()
+
+    async def get_translations(self, korean_names: list[str]) -> dict[str, str]:
+        """한글명 → drug_translation.english_name (in_ 쿼리 1회)"""
+        if not korean_names:
+            return {}
+        table = await self._table("drug_translation")
+        result = await table.select("korean_name, english_name").in_("korean_name", korean_names).execute()
+        return {row["korean_name"]: row["english_name"] for row in result.data or []}
+
+    async def save_translations(self, rows: list[dict]) -> None:
+        """drug_translation 일괄 추가 (korean_name, english_name, source) — 이미 있는 한글명(검증 행 등)은 유지"""
+        if not rows:
+            return
+        table = await self._table("drug_translation")
+        await table.upsert(
+            [{**row, "verified": False} for row in rows], on_conflict="korean_name", ignore_duplicates=True
+        ).execute()
+
+
+# ──────────────────────────────────────────
+# YouTube
+# ──────────────────────────────────────────
+
+class YouTubeRepository(AsyncRepository):
+    """symptom_video_map, youtube_cache"""
+
+    async def symptom_video(self, symptom_id: int) -> Optional[dict]:
+        """증상에 매핑된 우선순위 1순위 영상 (content_videos 조인)"""
+        table = await self._table("symptom_video_map")
+        result = await table.select(
+            "priority, content_videos(video_id, title, channel, tags)"
+        ).eq("symptom_id", symptom_id).order("priority").limit(1).execute()
+        if result.data and result.data[0].get("content_videos"):
+            return result.data[0]["content_videos"]
+        return None
+
+    async def get_cache(self, query_hash: str) -> Optional[dict]:
+        table = await self._table("youtube_cache")
+        result = await table.select("*").eq("query_hash", query_hash).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    async def get_caches(self, query_hashes: list[str]) -> dict[str, dict]:
+        """여러 query_hash 캐시 행을 한 번에 조회"""
+        if not query_hashes:
+            return {}
+        table = await self._table("youtube_cache")
+        result = await table.select("*").in_("query_hash", query_hashes).execute()
+        return {row["query_hash"]: row for row in result.data or []}
+
+    async def touch_cache(self, query_hash: str, accessed_at: str) -> None:
+        table = await self._table("youtube_cache")
+        await table.update({"last_accessed_at": accessed_at}).eq("query_hash", query_hash).execute()
+
+    async def touch_caches(self, query_hashes: list[str], accessed_at: str) -> None:
+        """여러 캐시 행 접근 시각 일괄 갱신 (요청 1회)"""
+        if not query_hashes:
+            return
+        table = await self._table("youtube_cache")
+        await table.update({"last_accessed_at": accessed_at}).in_("query_hash", query_hashes).execute()
+
+    async def upsert_cache(self, row: dict) -> None:
+        table = await self._table("youtube_cache")
+        await table.upsert(row, on_conflict="query_hash").execute()
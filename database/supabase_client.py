@@ -4,8 +4,16 @@ GitHub 저장소와 연동된 Supabase 데이터베이스 연결 관리
 """
 
 import os
-from typing import Optional
-from supabase import create_client, Client
+import copy
+import time
+import asyncio
+import inspect
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+import httpx
+from supabase import create_client, Client, acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -65,6 +73,332 @@ class SupabaseClient:
         return create_client(supabase_url, service_role_key)
 
 
+class AsyncSupabaseClient:
+    """
+    비동기 Supabase 클라이언트 (이벤트 루프별 싱글톤)
+
+    async 핸들러에서 동기 클라이언트를 쓰면 PostgREST 왕복 동안 이벤트 루프 전체가 멈추므로
+    연결 풀을 가진 httpx.AsyncClient 위의 AsyncClient 를 사용합니다.
+    httpx.AsyncClient 는 생성된 이벤트 루프에 묶이므로 루프마다 하나씩 만듭니다
+    (서버는 루프 1개, asyncio.run 을 반복하는 스크립트·테스트는 루프별 생성).
+    """
+
+    POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+    TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+    _instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    async def get_client(cls) -> AsyncClient:
+        """
+        현재 이벤트 루프의 AsyncClient 반환
+
+        Raises:
+            ValueError: 환경 변수가 설정되지 않은 경우
+        """
+        loop = asyncio.get_running_loop()
+        client = cls._instances.get(loop)
+        if client is None:
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_ANON_KEY")
+
+            if not supabase_url or not supabase_key:
+                raise ValueError(
+                    "Supabase 환경 변수가 설정되지 않았습니다. "
+                    ".env 파일에 SUPABASE_URL과 SUPABASE_ANON_KEY를 설정하세요."
+                )
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=cls.POOL_SIZE,
+                    max_keepalive_connections=cls.POOL_SIZE,
+                ),
+                timeout=httpx.Timeout(cls.TIMEOUT_SECONDS),
+            )
+            client = await acreate_client(
+                supabase_url,
+                supabase_key,
+                options=AsyncClientOptions(httpx_client=http_client),
+            )
+            # 생성 중 다른 코루틴이 먼저 등록했으면 그것을 사용
+            client = cls._instances.setdefault(loop, client)
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """현재 루프의 클라이언트와 연결 풀 종료 (앱 shutdown 시)"""
+        client = cls._instances.pop(asyncio.get_running_loop(), None)
+        if client is not None and client.options.httpx_client is not None:
+            await client.options.httpx_client.aclose()
+
+
+# ──────────────────────────────────────────
+# 마스터 테이블 조회 캐시 (read-through)
+# ──────────────────────────────────────────
+
+# 시드 마이그레이션으로만 바뀌는 참조 데이터
+MASTER_TABLES = (
+    "disease_master",
+    "foods_master",
+    "recipes",
+    "catalog_drugs",
+    "tkm_symptom_master",
+    "tkm_to_modern_map",
+)
+
+_WRITE_METHODS = {"insert", "upsert", "update", "delete"}
+_MISSING = object()
+
+
+class CachedResponse:
+    """캐시에서 돌려주는 PostgREST 응답 (data / count 만 보존)"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class QueryCache:
+    """
+    마스터 테이블 read-through 조회 캐시 (프로세스 공유)
+
+    - 키: 테이블 + 쿼리 빌더 호출 순서(projection, 필터, 정렬, limit)
+    - 무효화: data_versions 의 테이블별 버전 (시드 적재·수정 시 트리거가 증가)을
+      version_check_seconds 마다 한 번 조회해 바뀐 테이블 항목만 폐기
+      + 같은 프로세스의 쓰기(insert/upsert/update/delete)는 즉시 폐기
+    - data_versions 를 읽을 수 없으면 ttl_seconds 만료로만 갱신
+    - 테이블별 hit / miss / 무효화 횟수 집계
+    """
+
+    _shared: Optional["QueryCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        tables: tuple = MASTER_TABLES,
+        ttl_seconds: int = 600,
+        version_check_seconds: int = 60,
+        max_entries: int = 2048,
+    ):
+        """
+        Args:
+            tables: 캐시할 테이블
+            ttl_seconds: 항목 최대 보존 시간
+            version_check_seconds: data_versions 확인 간격
+            max_entries: 최대 항목 수 (초과 시 오래된 항목부터 제거)
+        """
+        self.tables = tuple(tables)
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (table, key) → (만료 시각, data, count)
+        self._versions: dict[str, int] = {}
+        self._stats = {table: {"hits": 0, "misses": 0, "invalidations": 0} for table in self.tables}
+        self._checked_at = float("-inf")  # 첫 조회 때 바로 버전 확인
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "QueryCache":
+        """앱 전체 공유 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def wrap(self, client, table: str):
+        """client.table(table) 빌더 (캐시 대상 테이블이면 캐시 경유)"""
+        builder = client.table(table)
+        if table not in self.tables:
+            return builder
+        return _CachedQuery(self, client, table, builder)
+
+    # ──────────────────────────────────────────
+    # Entries
+    # ──────────────────────────────────────────
+
+    def lookup(self, table: str, key: str) -> Any:
+        """캐시된 응답 (없으면 _MISSING)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((table, key))
+                self._stats[table]["hits"] += 1
+                data, count = entry[1], entry[2]
+            else:
+                if entry is not None:
+                    del self._entries[(table, key)]
+                self._stats[table]["misses"] += 1
+                return _MISSING
+        # 호출 측이 결과를 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return CachedResponse(copy.deepcopy(data), count)
+
+    def store(self, table: str, key: str, response) -> None:
+        data = copy.deepcopy(getattr(response, "data", None))
+        count = getattr(response, "count", None)
+        with self._lock:
+            self._entries[(table, key)] = (time.monotonic() + self.ttl_seconds, data, count)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: Optional[str] = None) -> int:
+        """테이블(없으면 전체) 항목 폐기, 폐기 건수 반환"""
+        with self._lock:
+            keys = [k for k in self._entries if table is None or k[0] == table]
+            for k in keys:
+                del self._entries[k]
+            for name in ([table] if table else self.tables):
+                if name in self._stats:
+                    self._stats[name]["invalidations"] += 1
+        return len(keys)
+
+    # ──────────────────────────────────────────
+    # Version stamps
+    # ──────────────────────────────────────────
+
+    def _claim_version_check(self) -> bool:
+        """버전 확인 차례인지 (동시에 한 요청만 확인)"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.version_check_seconds:
+                return False
+            self._checked_at = now
+            return True
+
+    def _version_query(self, client):
+        return client.table("data_versions").select("name, version").in_("name", list(self.tables))
+
+    def apply_versions(self, rows: list[dict]) -> list[str]:
+        """조회한 버전과 비교해 바뀐 테이블 항목 폐기, 폐기한 테이블 목록 반환"""
+        changed = []
+        # 행이 없는 테이블은 버전 0 (첫 변경 시 행이 생기면서 폐기 대상이 되도록)
+        current = {table: 0 for table in self.tables}
+        current.update({row.get("name"): row.get("version") for row in rows if row.get("name") in self._stats})
+        for name, version in current.items():
+            previous = self._versions.get(name)
+            self._versions[name] = version
+            if previous is not None and previous != version:
+                self.invalidate(name)
+                changed.append(name)
+        if changed:
+            print(f"[QueryCache] 버전 변경으로 캐시 폐기: {', '.join(changed)}")
+        return changed
+
+    def check_versions(self, client) -> None:
+        """동기 클라이언트용 버전 확인"""
+        if not self._claim_version_check():
+            return
+        try:
+            self.apply_versions(self._version_query(client).execute().data or [])
+        except Exception as e:
+            print(f"[QueryCache] 버전 조회 실패 — TTL 만료로만 갱신: {e}")
+
+    async def check_versions_async(self, client) -> None:
+        """비동기 클라이언트용 버전 확인"""
+        if not self._claim_version_check():
+            return
+        try:
+            result = await self._version_query(client).execute()
+            self.apply_versions(result.data or [])
+        except Exception as e:
+            print(f"[QueryCache] 버전 조회 실패 — TTL 만료로만 갱신: {e}")
+
+    def get_stats(self) -> dict:
+        """테이블별 hit / miss / 무효화 횟수, 항목 수, 버전"""
+        with self._lock:
+            per_table = {}
+            for table, stats in self._stats.items():
+                total = stats["hits"] + stats["misses"]
+                per_table[table] = {
+                    **stats,
+                    "hit_rate": round(stats["hits"] / total * 100, 1) if total else 0.0,
+                    "entries": sum(1 for k in self._entries if k[0] == table),
+                    "version": self._versions.get(table),
+                }
+            return {"entries": len(self._entries), "tables": per_table}
+
+
+class _CachedQuery:
+    """
+    PostgREST 쿼리 빌더 래퍼
+    빌더 호출을 그대로 전달하면서 호출 순서를 캐시 키로 기록합니다.
+    동기 / 비동기 클라이언트 모두 같은 방식으로 사용 (execute 가 코루틴이면 await)
+    """
+
+    def __init__(self, cache: QueryCache, client, table: str, builder):
+        self._cache = cache
+        self._client = client
+        self._table = table
+        self._builder = builder
+        self._calls: list[tuple] = []
+
+    def __getattr__(self, name):
+        method = getattr(self._builder, name)
+        if not callable(method):
+            # 빌더를 돌려주는 속성(.not_ 등)도 체인에 기록하고 래퍼 유지 (캐시 키·버전 확인 우회 방지)
+            if hasattr(method, "execute"):
+                self._calls.append((name, (), ()))
+                self._builder = method
+                return self
+            return method
+
+        def _call(*args, **kwargs):
+            self._calls.append((name, args, tuple(sorted(kwargs.items()))))
+            self._builder = method(*args, **kwargs)
+            return self
+
+        return _call
+
+    @property
+    def _key(self) -> str:
+        return repr(self._calls)
+
+    @property
+    def _is_write(self) -> bool:
+        return any(name in _WRITE_METHODS for name, _, _ in self._calls)
+
+    def execute(self):
+        if inspect.iscoroutinefunction(self._builder.execute):
+            return self._execute_async()
+
+        if self._is_write:
+            result = self._builder.execute()
+            self._cache.invalidate(self._table)
+            return result
+
+        self._cache.check_versions(self._client)
+        cached = self._cache.lookup(self._table, self._key)
+        if cached is not _MISSING:
+            return cached
+        result = self._builder.execute()
+        self._cache.store(self._table, self._key, result)
+        return result
+
+    async def _execute_async(self):
+        if self._is_write:
+            result = await self._builder.execute()
+            self._cache.invalidate(self._table)
+            return result
+
+        await self._cache.check_versions_async(self._client)
+        cached = self._cache.lookup(self._table, self._key)
+        if cached is not _MISSING:
+            return cached
+        result = await self._builder.execute()
+        self._cache.store(self._table, self._key, result)
+        return result
+
+
+def cached_table(client, table: str):
+    """
+    마스터 테이블이면 조회 캐시를 거치는 client.table(table)
+
+    사용 예: cached_table(db, "disease_master").select("*").eq("id", 1).execute()
+    """
+    return QueryCache.shared().wrap(client, table)
+
+
 # 편의 함수
 def get_supabase_client() -> Client:
     """
@@ -86,6 +420,44 @@ def get_supabase_service_client() -> Client:
     return SupabaseClient.get_service_client()
 
 
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    비동기 Supabase 클라이언트 반환 편의 함수
+    
+    Returns:
+        AsyncClient: 현재 이벤트 루프의 비동기 클라이언트
+    """
+    return await AsyncSupabaseClient.get_client()
+
+
+def fetch_all_rows(client: Client, table: str, columns: str = "*", order: str = "id", page_size: int = 1000) -> list[dict]:
+    """
+    테이블 전체를 페이지 단위로 조회 (PostgREST 기본 최대 1000행 제한 대응)
+    
+    Args:
+        client: Supabase 클라이언트
+        table: 테이블명
+        columns: select 컬럼
+        order: 페이지 순서 고정용 정렬 컬럼
+        page_size: 페이지 크기
+        
+    Returns:
+        list[dict]: 전체 행
+    """
+    rows: list[dict] = []
+    start = 0
+    while True:
+        result = client.table(table).select(columns).order(order).range(
+            start, start + page_size - 1
+        ).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        start += page_size
+    return rows
+
+
 # 연결 테스트 함수
 def test_connection() -> bool:
     """
@@ -0,0 +1,54 @@
+"""
+레시피 일괄 백필 스크립트
+symptom_recipe_map 에 레시피가 없는 증상을 모두 찾아 AI 로 레시피를 생성·저장
+(여러 증상을 토큰 예산 안에서 한 프롬프트로 묶어 생성, 실패 증상만 재시도, 일괄 insert)
+
+사용법:
+  python scripts/backfill_recipes.py                # 식재료 매핑이 있는 증상만
+  python scripts/backfill_recipes.py --all          # 전체 증상
+  python scripts/backfill_recipes.py --dry-run      # 대상 목록만 출력
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+# 경로 설정
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.supabase_client import get_supabase_client
+from app.services.analyze_service import AnalyzeService
+from app.services.recipe_backfill import RecipeBackfillQueue, recipe_less_symptoms
+
+
+async def main(only_mapped: bool, dry_run: bool):
+    targets = recipe_less_symptoms(get_supabase_client(), only_mapped=only_mapped)
+
+    print("\n" + "=" * 70)
+    print(f"🍲 레시피 백필 대상: {len(targets)}개 증상")
+    print("=" * 70)
+    for symptom_id, name in targets[:20]:
+        print(f"  - #{symptom_id} {name}")
+    if len(targets) > 20:
+        print(f"  ... 외 {len(targets) - 20}개")
+
+    if dry_run or not targets:
+        return
+
+    service = AnalyzeService()
+    start = time.time()
+    result = await RecipeBackfillQueue().run_batch(targets, service.generate_recipes_for_symptoms)
+
+    print("\n" + "=" * 70)
+    print(f"✅ 생성 {result['generated']} / ❌ 실패 {result['failed']} / ⏭️ 건너뜀 {result['skipped']}")
+    print(f"⏱️ 소요 시간: {time.time() - start:.1f}초")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="식재료 매핑이 없는 증상도 포함")
+    parser.add_argument("--dry-run", action="store_true", help="대상 목록만 출력")
+    args = parser.parse_args()
+    asyncio.run(main(not args.all, args.dry_run))
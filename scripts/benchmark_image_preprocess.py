@@ -0,0 +1,119 @@
+"""
+Vision OCR 이미지 전처리 벤치마크
+저장소 샘플 처방전 이미지로 전처리 옵션별 업로드 크기 / 전처리 시간 / 이미지 토큰 추정치를 비교하고,
+OPENAI_API_KEY가 있으면 실제 Vision 호출 지연과 약물 추출 일치도(원본 대비)를 측정
+
+사용법:
+  python scripts/benchmark_image_preprocess.py
+  python scripts/benchmark_image_preprocess.py --live   # Vision API 실제 호출 포함
+"""
+import os
+import io
+import sys
+import math
+import time
+import asyncio
+import argparse
+
+# 경로 설정
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from app.utils.image_preprocessor import preprocess_image, PreprocessOptions
+
+
+SAMPLE_IMAGES = [
+    "test_prescription.jpg",
+    "img/KakaoTalk_20260208_141809644.jpg",
+    "img/KakaoTalk_20260208_142809689.jpg",
+]
+
+VARIANTS = {
+    "raw": None,
+    "default (gray, 768)": PreprocessOptions(),
+    "color (768)": PreprocessOptions(grayscale=False, autocontrast=False),
+    "low (gray, 512)": PreprocessOptions(max_short_side=512, target_bytes=150 * 1024),
+}
+
+
+def estimate_image_tokens(image_bytes: bytes) -> int:
+    """GPT-4o high detail 토큰 추정: 2048 박스 → 짧은 변 768 → 512px 타일당 170 + 기본 85"""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        width, height = img.size
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+async def run_vision(image_bytes: bytes, mime_type: str) -> tuple[list, float]:
+    """전처리 없이 Vision OCR 직접 호출 (변형별 입력을 그대로 보내기 위해)"""
+    from app.services.prescription_service import PrescriptionService
+    import app.services.prescription_service as ps
+
+    async def passthrough(data, mime, options=None):
+        return data, mime
+
+    ps.preprocess_for_vision = passthrough
+    service = PrescriptionService()
+    start = time.perf_counter()
+    result = await service._call_vision_ocr(image_bytes, mime_type)
+    return result.get("drugList", []), time.perf_counter() - start
+
+
+def jaccard(a: list, b: list) -> float:
+    sa, sb = set(a), set(b)
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+async def main(live: bool):
+    print("\n" + "=" * 90)
+    print("🖼️  Vision OCR 이미지 전처리 벤치마크")
+    print("=" * 90)
+
+    for path in SAMPLE_IMAGES:
+        if not os.path.exists(path):
+            print(f"\n⚠️ 샘플 없음: {path}")
+            continue
+
+        with open(path, "rb") as f:
+            original = f.read()
+
+        print(f"\n📄 {path}")
+        print(f"{'variant':<22}{'bytes':>12}{'prep ms':>10}{'img tokens':>12}"
+              + (f"{'vision s':>10}{'drugs':>7}{'agree':>8}" if live else ""))
+        print("-" * (56 + (25 if live else 0)))
+
+        baseline_drugs = None
+        for name, options in VARIANTS.items():
+            start = time.perf_counter()
+            if options is None:
+                data, mime = original, "image/jpeg"
+            else:
+                data, mime = preprocess_image(original, options)
+                mime = mime or "image/jpeg"
+            prep_ms = (time.perf_counter() - start) * 1000
+
+            line = f"{name:<22}{len(data):>12,}{prep_ms:>10.0f}{estimate_image_tokens(data):>12}"
+            if live:
+                drugs, vision_s = await run_vision(data, mime)
+                if baseline_drugs is None:
+                    baseline_drugs = drugs
+                line += f"{vision_s:>10.2f}{len(drugs):>7}{jaccard(baseline_drugs, drugs):>8.2f}"
+            print(line)
+
+    print("\n" + "=" * 90)
+    print("※ img tokens: 서버측 축소 기준 추정치 (raw와 768 변형은 동일, 512 변형은 타일 수 감소)")
+    print("※ agree: raw 입력 대비 추출 약물 목록 Jaccard 일치도")
+    print("=" * 90 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="Vision API 실제 호출 포함")
+    args = parser.parse_args()
+    asyncio.run(main(args.live or False))
@@ -0,0 +1,164 @@
+"""
+PubMed efetch XML 파서 벤치마크
+합성 efetch 응답(기본 200건)으로 기존 PMID별 re.search(DOTALL) 파서와 iterparse 스트리밍 파서를 비교
+
+사용법:
+  python scripts/benchmark_pubmed_parser.py
+  python scripts/benchmark_pubmed_parser.py --articles 50 100 200 400 --repeat 5
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# 경로 설정
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.pubmed_parser import parse_pubmed_articles
+
+
+WORDS = (
+    "ginger gingerol digestion gastric motility randomized trial patients nausea extract "
+    "inflammation cytokine oxidative stress supplementation placebo outcome cohort analysis"
+).split()
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def build_fixture(count: int, seed: int = 41) -> tuple[str, list[str]]:
+    """efetch 형식 합성 XML (구조화 초록, MeSH, DOI, CommentsCorrections 의 다른 PMID 포함)"""
+    rng = random.Random(seed)
+    pmids = [str(30000000 + i * 7) for i in range(count)]
+    articles = []
+    for i, pmid in enumerate(pmids):
+        sections = "".join(
+            f'<AbstractText Label="{label}" NlmCategory="{label}">{_sentence(rng, 40)} '
+            f'<i>{rng.choice(WORDS)}</i> {_sentence(rng, 20)}</AbstractText>'
+            for label in ("BACKGROUND", "METHODS", "RESULTS", "CONCLUSIONS")
+        )
+        mesh = "".join(
+            f'<MeshHeading><DescriptorName UI="D{rng.randint(1000, 9999)}" MajorTopicYN="N">'
+            f'{rng.choice(WORDS).title()}</DescriptorName></MeshHeading>'
+            for _ in range(8)
+        )
+        pub_date = (
+            f"<Year>{2000 + i % 24}</Year><Month>Jan</Month>" if i % 5
+            else f"<MedlineDate>{2000 + i % 24} Jan-Feb</MedlineDate>"
+        )
+        articles.append(f"""
+<PubmedArticle>
+  <MedlineCitation Status="MEDLINE" Owner="NLM">
+    <PMID Version="1">{pmid}</PMID>
+    <Article PubModel="Print">
+      <Journal>
+        <ISSN IssnType="Electronic">1234-5678</ISSN>
+        <JournalIssue CitedMedium="Internet"><Volume>{i}</Volume><PubDate>{pub_date}</PubDate></JournalIssue>
+        <Title>Journal of {rng.choice(WORDS).title()} Research</Title>
+      </Journal>
+      <ArticleTitle>{_sentence(rng, 12)[:-1]} <sup>{i}</sup> study {pmid}.</ArticleTitle>
+      <Abstract>{sections}</Abstract>
+      <AuthorList>{"".join(f"<Author><LastName>Kim{n}</LastName><ForeName>A</ForeName></Author>" for n in range(6))}</AuthorList>
+      <PublicationTypeList><PublicationType UI="D016449">Randomized Controlled Trial</PublicationType></PublicationTypeList>
+    </Article>
+    <MeshHeadingList>{mesh}</MeshHeadingList>
+    <CommentsCorrectionsList>
+      <CommentsCorrections RefType="Cites"><PMID Version="1">{rng.randint(1000000, 9999999)}</PMID></CommentsCorrections>
+    </CommentsCorrectionsList>
+  </MedlineCitation>
+  <PubmedData>
+    <ArticleIdList>
+      <ArticleId IdType="pubmed">{pmid}</ArticleId>
+      <ArticleId IdType="doi">10.1000/bench.{pmid}</ArticleId>
+    </ArticleIdList>
+  </PubmedData>
+</PubmedArticle>""")
+    xml = (
+        '<?xml version="1.0" ?>\n'
+        '<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2024//EN" '
+        '"https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_240101.dtd">\n'
+        "<PubmedArticleSet>" + "".join(articles) + "\n</PubmedArticleSet>"
+    )
+    return xml, pmids
+
+
+def legacy_parse(xml_text: str, pmids: list[str]) -> list[dict]:
+    """기존 PubMedService._parse_xml_response (PMID마다 문서 전체 re.search 4회)"""
+    papers = []
+    for pmid in pmids:
+        title_match = re.search(
+            r'<PMID[^>]*>' + pmid + r'</PMID>.*?<ArticleTitle>(.+?)</ArticleTitle>', xml_text, re.DOTALL
+        )
+        journal_match = re.search(
+            r'<PMID[^>]*>' + pmid + r'</PMID>.*?<Journal>.*?<Title>(.+?)</Title>', xml_text, re.DOTALL
+        )
+        year_match = re.search(
+            r'<PMID[^>]*>' + pmid + r'</PMID>.*?<PubDate>.*?<Year>(\d{4})</Year>', xml_text, re.DOTALL
+        )
+        abstract_match = re.search(
+            r'<PMID[^>]*>' + pmid + r'</PMID>.*?<Abstract>.*?<AbstractText[^>]*>(.+?)</AbstractText>',
+            xml_text, re.DOTALL
+        )
+        papers.append({
+            "pmid": pmid,
+            "title": re.sub(r'<[^>]+>', '', title_match.group(1)) if title_match else f"Paper {pmid}",
+            "journal": journal_match.group(1) if journal_match else "",
+            "pub_year": int(year_match.group(1)) if year_match else 2024,
+            "abstract": re.sub(r'<[^>]+>', '', abstract_match.group(1))[:500] if abstract_match else "",
+        })
+    return papers
+
+
+def _measure(fn, repeat: int) -> tuple[float, int]:
+    """(최소 실행 시간 ms, 최대 메모리 KB)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak // 1024
+
+
+def main(sizes: list[int], repeat: int):
+    print("\n" + "=" * 78)
+    print("📚 PubMed efetch XML 파서 벤치마크")
+    print("=" * 78)
+    print(f"{'articles':>9}{'xml KB':>9}{'regex ms':>11}{'stream ms':>11}{'speedup':>9}"
+          f"{'regex KB':>10}{'stream KB':>11}")
+    print("-" * 78)
+
+    for size in sizes:
+        xml, pmids = build_fixture(size)
+        data = xml.encode("utf-8")
+        regex_ms, regex_kb = _measure(lambda: legacy_parse(xml, pmids), repeat)
+        stream_ms, stream_kb = _measure(lambda: parse_pubmed_articles(data), repeat)
+
+        # 기존 파서가 뽑던 필드가 같은지 확인 (초록은 첫 섹션만 비교)
+        parsed = parse_pubmed_articles(data)
+        for old in legacy_parse(xml, pmids[:5]):
+            new = parsed[old["pmid"]]
+            assert (new.title, new.journal) == (old["title"], old["journal"])
+            assert new.abstract_sections[0][1][:500] == old["abstract"]
+
+        print(f"{size:>9}{len(data) // 1024:>9}{regex_ms:>11.1f}{stream_ms:>11.1f}"
+              f"{regex_ms / stream_ms:>8.1f}x{regex_kb:>10}{stream_kb:>11}")
+
+    print("\n※ regex: 기존 파서는 PMID마다 문서 전체를 다시 스캔 → 기사 수에 대해 제곱으로 증가")
+    print("※ stream KB: 결과 객체 포함 최대 할당량 (처리한 기사 요소는 즉시 해제)")
+    print("=" * 78 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, nargs="+", default=[50, 100, 200], help="기사 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최소값 사용)")
+    args = parser.parse_args()
+    main(args.articles, args.repeat)
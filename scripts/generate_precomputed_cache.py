@@ -15,6 +15,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.analyze_service import AnalyzeService
+from app.services.recipe_backfill import RecipeBackfillQueue, recipe_less_symptoms
 from app.utils.cache_manager import CacheManager
 from dataclasses import asdict
 
@@ -101,6 +102,14 @@ async def generate_precomputed_cache():
         "failed_diseases": []
     }
     
+    # 레시피 없는 증상을 먼저 묶음 생성 (분석 경로는 레시피를 백그라운드 생성하므로
+    # 미리 채워 두지 않으면 캐시된 결과의 레시피가 비어 있음)
+    targets = recipe_less_symptoms(analyze_service.db)
+    if targets:
+        print(f"\n🍲 레시피 없는 증상 {len(targets)}개 묶음 생성 중...")
+        backfill = await RecipeBackfillQueue().run_batch(targets, analyze_service.generate_recipes_for_symptoms)
+        print(f"   - 생성 {backfill['generated']} / 실패 {backfill['failed']}")
+    
     for idx, disease in enumerate(COMMON_DISEASES, 1):
         try:
             print(f"\n[{idx}/{len(COMMON_DISEASES)}] {disease['description']} 분석 중...")
@@ -0,0 +1,77 @@
+"""
+PubMed 초록 코퍼스 수집 스크립트
+modern_to_mesh_map / ingredient_pubmed_map 의 MeSH·식재료·성분 검색어마다 상위 논문을 모아 pubmed_papers 에 저장
+(이미 있는 PMID 는 efetch 생략, NCBI 요청은 NCBIScheduler 속도 제한을 따름)
+서버의 PubMedCorpus 는 다음 재로드(기본 60분) 때 새 논문을 색인
+
+사용법:
+  python scripts/harvest_pubmed_corpus.py                   # 검색어당 100건
+  python scripts/harvest_pubmed_corpus.py --per-term 300    # 검색어당 300건 (200건 초과는 history 조회)
+  python scripts/harvest_pubmed_corpus.py --limit 10        # 앞의 10개 검색어만
+  python scripts/harvest_pubmed_corpus.py --dry-run         # 검색어 목록만 출력
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+# 경로 설정
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.supabase_client import get_supabase_client
+from app.services.pubmed_service import PubMedService
+from app.utils.pubmed_corpus import corpus_queries
+
+
+async def main(per_term: int, limit: int, concurrency: int, dry_run: bool):
+    queries = corpus_queries(get_supabase_client())
+    if limit:
+        queries = queries[:limit]
+
+    print("\n" + "=" * 70)
+    print(f"📚 PubMed 코퍼스 수집 대상: 검색어 {len(queries)}개 (검색어당 최대 {per_term}건)")
+    print("=" * 70)
+    for query in queries[:20]:
+        print(f"  - {query}")
+    if len(queries) > 20:
+        print(f"  ... 외 {len(queries) - 20}개")
+
+    if dry_run or not queries:
+        return
+
+    service = PubMedService()
+    service.corpus = None  # 스크립트에서는 색인하지 않음 (서버가 재로드 시 색인)
+    semaphore = asyncio.Semaphore(concurrency)
+    totals = {"found": 0, "stored": 0, "failed": 0}
+    start = time.time()
+
+    async def _one(query: str):
+        async with semaphore:
+            try:
+                result = await service.harvest(query, per_term)
+            except Exception as e:
+                totals["failed"] += 1
+                print(f"  ❌ {query}: {e}")
+                return
+        totals["found"] += result["found"]
+        totals["stored"] += result["stored"]
+        print(f"  ✅ {query}: 검색 {result['found']}건 / 신규 {result['stored']}건")
+
+    await asyncio.gather(*(_one(query) for query in queries))
+    await service.ncbi.aclose()
+
+    print("\n" + "=" * 70)
+    print(f"✅ 신규 저장 {totals['stored']}건 (검색 {totals['found']}건) / ❌ 실패 검색어 {totals['failed']}개")
+    print(f"⏱️ 소요 시간: {time.time() - start:.1f}초 / NCBI {service.ncbi.get_stats()}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-term", type=int, default=100, help="검색어당 최대 논문 수")
+    parser.add_argument("--limit", type=int, default=0, help="처리할 검색어 수 (0: 전체)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 처리 검색어 수 (NCBI 속도 제한은 별도 적용)")
+    parser.add_argument("--dry-run", action="store_true", help="검색어 목록만 출력")
+    args = parser.parse_args()
+    asyncio.run(main(args.per_term, args.limit, args.concurrency, args.dry_run))
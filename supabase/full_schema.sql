@@ -622,6 +622,27 @@ CREATE TABLE IF NOT EXISTS public.youtube_cache (
     last_accessed_at TIMESTAMPTZ
 );
 
+CREATE TABLE IF NOT EXISTS public.pubmed_cache (
+    query_hash TEXT PRIMARY KEY,
+    query TEXT,
+    pmids TEXT[] NOT NULL DEFAULT '{}',
+    retmax INT NOT NULL DEFAULT 0,
+    total_count INT,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_accessed_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS public.drug_translation (
+    id SERIAL PRIMARY KEY,
+    korean_name TEXT NOT NULL UNIQUE,
+    english_name TEXT NOT NULL,
+    source TEXT DEFAULT 'manual',
+    verified BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 CREATE TABLE IF NOT EXISTS public.commerce_cache (
     id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
     query_hash TEXT UNIQUE,
@@ -632,3 +653,100 @@ CREATE TABLE IF NOT EXISTS public.commerce_cache (
     created_at TIMESTAMPTZ DEFAULT NOW(),
     last_accessed_at TIMESTAMPTZ
 );
+
+-- ==============================================================================
+-- 11. Data Versions (인메모리 스냅샷·조회 캐시 무효화)
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS public.data_versions (
+    name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO public.data_versions (name, version)
+VALUES
+    ('symptom_data', 1),
+    ('disease_master', 1),
+    ('foods_master', 1),
+    ('recipes', 1),
+    ('catalog_drugs', 1),
+    ('tkm_symptom_master', 1),
+    ('tkm_to_modern_map', 1)
+ON CONFLICT (name) DO NOTHING;
+
+-- 'symptom_data': SymptomDataSnapshot 재로드 (문장 단위 — 시드 일괄 적재도 1회 증가)
+CREATE OR REPLACE FUNCTION public.bump_symptom_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.data_versions (name, version, updated_at)
+    VALUES ('symptom_data', 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+        SET version = public.data_versions.version + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_symptom_ingredient_map_version ON public.symptom_ingredient_map;
+CREATE TRIGGER trg_symptom_ingredient_map_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.symptom_ingredient_map
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_foods_master_version ON public.foods_master;
+CREATE TRIGGER trg_foods_master_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.foods_master
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_symptom_recipe_map_version ON public.symptom_recipe_map;
+CREATE TRIGGER trg_symptom_recipe_map_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.symptom_recipe_map
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_recipes_version ON public.recipes;
+CREATE TRIGGER trg_recipes_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.recipes
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+-- 테이블명 행: QueryCache 가 해당 마스터 테이블 항목만 폐기
+CREATE OR REPLACE FUNCTION public.bump_table_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.data_versions (name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+        SET version = public.data_versions.version + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_disease_master_table_version ON public.disease_master;
+CREATE TRIGGER trg_disease_master_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.disease_master
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
+
+DROP TRIGGER IF EXISTS trg_foods_master_table_version ON public.foods_master;
+CREATE TRIGGER trg_foods_master_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.foods_master
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
+
+DROP TRIGGER IF EXISTS trg_recipes_table_version ON public.recipes;
+CREATE TRIGGER trg_recipes_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.recipes
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
+
+DROP TRIGGER IF EXISTS trg_catalog_drugs_table_version ON public.catalog_drugs;
+CREATE TRIGGER trg_catalog_drugs_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.catalog_drugs
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
+
+DROP TRIGGER IF EXISTS trg_tkm_symptom_master_table_version ON public.tkm_symptom_master;
+CREATE TRIGGER trg_tkm_symptom_master_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.tkm_symptom_master
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
+
+DROP TRIGGER IF EXISTS trg_tkm_to_modern_map_table_version ON public.tkm_to_modern_map;
+CREATE TRIGGER trg_tkm_to_modern_map_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.tkm_to_modern_map
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version();
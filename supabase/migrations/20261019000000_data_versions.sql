@@ -0,0 +1,48 @@
+-- =============================================
+-- data_versions: 인메모리 스냅샷 버전 관리
+-- Description: symptom_ingredient_map / foods_master / symptom_recipe_map / recipes 변경 시
+--              'symptom_data' 버전을 증가시켜 앱 서버가 스냅샷을 재로드하도록 알림
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS public.data_versions (
+    name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO public.data_versions (name, version)
+VALUES ('symptom_data', 1)
+ON CONFLICT (name) DO NOTHING;
+
+-- 문장 단위 트리거: 시드 일괄 적재도 버전 1회 증가
+CREATE OR REPLACE FUNCTION public.bump_symptom_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.data_versions (name, version, updated_at)
+    VALUES ('symptom_data', 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+        SET version = public.data_versions.version + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_symptom_ingredient_map_version ON public.symptom_ingredient_map;
+CREATE TRIGGER trg_symptom_ingredient_map_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.symptom_ingredient_map
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_foods_master_version ON public.foods_master;
+CREATE TRIGGER trg_foods_master_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.foods_master
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_symptom_recipe_map_version ON public.symptom_recipe_map;
+CREATE TRIGGER trg_symptom_recipe_map_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.symptom_recipe_map
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
+
+DROP TRIGGER IF EXISTS trg_recipes_version ON public.recipes;
+CREATE TRIGGER trg_recipes_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.recipes
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_symptom_data_version();
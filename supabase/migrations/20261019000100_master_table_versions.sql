@@ -0,0 +1,51 @@
+-- =============================================
+-- data_versions: 마스터 테이블별 버전
+-- Description: disease_master / foods_master / recipes / catalog_drugs /
+--              tkm_symptom_master / tkm_to_modern_map 변경 시 테이블명 행의 버전을 증가시켜
+--              앱 서버의 조회 캐시(QueryCache)가 해당 테이블 항목만 폐기하도록 알림
+-- Depends: 20261019000000_data_versions.sql
+-- =============================================
+
+INSERT INTO public.data_versions (name, version)
+VALUES
+    ('disease_master', 1),
+    ('foods_master', 1),
+    ('recipes', 1),
+    ('catalog_drugs', 1),
+    ('tkm_symptom_master', 1),
+    ('tkm_to_modern_map', 1)
+ON CONFLICT (name) DO NOTHING;
+
+-- 문장 단위 트리거: 시드 일괄 적재도 버전 1회 증가
+CREATE OR REPLACE FUNCTION public.bump_table_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.data_versions (name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+        SET version = public.data_versions.version + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 환경에 따라 없는 테이블(catalog_drugs 등)은 건너뜀
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'disease_master', 'foods_master', 'recipes',
+        'catalog_drugs', 'tkm_symptom_master', 'tkm_to_modern_map'
+    ]
+    LOOP
+        IF to_regclass('public.' || tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', 'trg_' || tbl || '_table_version', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON public.%I '
+                'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_data_version()',
+                'trg_' || tbl || '_table_version', tbl
+            );
+        END IF;
+    END LOOP;
+END $$;
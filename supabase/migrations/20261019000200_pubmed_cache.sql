@@ -0,0 +1,18 @@
+-- =============================================
+-- pubmed_cache: PubMed 검색어 → PMID 목록 캐시
+-- Description: PubMedService.search_papers 가 같은 검색어로 esearch / efetch 를 반복 호출하지 않도록
+--              검색어 해시별 PMID 목록(논문 본문은 pubmed_papers)을 만료 시각과 함께 저장.
+--              검색 결과 0건도 빈 배열로 저장 (negative cache, 짧은 만료)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS public.pubmed_cache (
+    query_hash TEXT PRIMARY KEY,
+    query TEXT,
+    pmids TEXT[] NOT NULL DEFAULT '{}',
+    retmax INT NOT NULL DEFAULT 0,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_accessed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_pubmed_cache_expires_at ON public.pubmed_cache (expires_at);
@@ -0,0 +1,18 @@
+-- =============================================
+-- drug_translation: 한→영 검색어 번역 캐시
+-- Description: PubMedService 번역 계층(TermTranslator)의 영구 캐시.
+--              로컬 사전(foods_master / catalog_drugs / drug_database.json)에 없는 약물·식재료·증상 검색어를
+--              LLM 묶음 번역 / 단건 번역 API 로 번역한 결과를 저장 (docs/erd/migration_drug_translation.sql 과 같은 구조)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS public.drug_translation (
+    id SERIAL PRIMARY KEY,
+    korean_name TEXT NOT NULL UNIQUE,
+    english_name TEXT NOT NULL,
+    source TEXT DEFAULT 'manual',
+    verified BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON COLUMN public.drug_translation.source IS '번역 출처: manual(수동입력), gemini(LLM 묶음 번역), mymemory, google, openai';
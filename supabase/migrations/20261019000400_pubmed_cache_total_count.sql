@@ -0,0 +1,8 @@
+-- =============================================
+-- pubmed_cache.total_count: esearch 전체 결과 수
+-- Description: 저장된 PMID 목록이 검색어의 전체 결과인지 판단하는 기준.
+--              efetch 가 일부 논문을 돌려주지 못하면 pmids 가 retmax 보다 짧아도 전체 결과가 아니므로
+--              pmids 길이 대신 esearch Count 로 판단 (NULL: 이전 행 → retmax 이하 요청에만 사용)
+-- =============================================
+
+ALTER TABLE public.pubmed_cache ADD COLUMN IF NOT EXISTS total_count INT;
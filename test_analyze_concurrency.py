@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+HealthStackAPI.analyze 동시 실행 테스트
+- 약물 상세 정보 조회가 증상 분석 · 식재료 근거 수집과 동시에 진행 (전체 지연 ≈ 가장 긴 갈래)
+- 약물 정보는 입력 순서 유지, 실패한 약물만 제외, [OCR 원문 항목 제외, 최대 5개
+- 공유 limiter 의 동시 실행 한도 준수
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.analyze_service import AnalysisResult, Ingredient
+from app.services.healthstack_api import HealthStackAPI
+from app.services.pubmed_service import PubMedPaper
+
+
+class _Tracker:
+    def __init__(self):
+        self.active = self.peak = 0
+        self.drugs: list[str] = []
+
+    async def work(self, seconds: float):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(seconds)
+        self.active -= 1
+
+
+def _api(tracker: _Tracker) -> HealthStackAPI:
+    class _Analyze:
+        async def analyze_symptom(self, text, meds):
+            await tracker.work(0.1)
+            return AnalysisResult(
+                symptom_summary="요약",
+                ingredients=[Ingredient("R1", "무", "", "recommend", 1, "B"),
+                             Ingredient("R2", "생강", "", "recommend", 2, "B")],
+                recipes=[], confidence_level="general", source="ai_generated",
+            )
+
+    class _PubMed:
+        async def search_papers(self, query, max_results=1):
+            await tracker.work(0.1)
+            return [PubMedPaper("1", query, "", "J", 2020, "")]
+
+    class _YouTube:
+        async def videos_for_ingredients(self, names, symptom_id=None):
+            await tracker.work(0.1)
+            return {}
+
+    class _Medication:
+        async def get_drug_info(self, drug):
+            tracker.drugs.append(drug)
+            await tracker.work(0.2)
+            if drug == "실패약":
+                raise RuntimeError("quota")
+            return {"name": drug, "info": f"{drug} 정보", "papers": []}
+
+    api = HealthStackAPI.__new__(HealthStackAPI)
+    api.analyze_service = _Analyze()
+    api.pubmed_service = _PubMed()
+    api.youtube_service = _YouTube()
+    api.medication_service = _Medication()
+    return api
+
+
+def test_drug_details_overlap_with_evidence():
+    print("=" * 70)
+    print("[TEST] Analyze concurrency - branches")
+    print("=" * 70)
+    tracker = _Tracker()
+    api = _api(tracker)
+    medications = ["타이레놀", "[OCR] 원문", "실패약", "아스피린", "A", "B", "C"]
+
+    started = time.perf_counter()
+    response = asyncio.run(api.analyze(symptom_text="소화불량", medications=medications))
+    elapsed = time.perf_counter() - started
+    print(f"[elapsed] {elapsed:.2f}s / peak {tracker.peak}")
+
+    # 직렬이면 분석 0.1 + 근거 0.1 + 약물 5 x 0.2 = 1.2s
+    assert elapsed < 0.45
+    assert tracker.drugs == ["타이레놀", "실패약", "아스피린", "A", "B"]
+    assert [m["name"] for m in response.medications] == ["타이레놀", "아스피린", "A", "B"]
+    assert [i.modern_name for i in response.ingredients] == ["무", "생강"]
+    assert response.ingredients[0].pubmed_papers[0]["title"] == "무 health benefit"
+
+
+def test_shared_limiter_bounds_concurrency():
+    print("\n[TEST] Analyze concurrency - limiter")
+    tracker = _Tracker()
+    api = _api(tracker)
+
+    async def _run():
+        limiter = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            api._fetch_drug_details(["A", "B", "C", "D"], limiter=limiter),
+            api._fetch_evidence_parallel(
+                [Ingredient("R1", "무", "", "recommend", 1, "B")], None, limiter=limiter
+            ),
+        )
+
+    details, evidence = asyncio.run(_run())
+    assert [d["name"] for d in details] == ["A", "B", "C", "D"] and len(evidence) == 1
+    assert tracker.peak == 2
+
+
+if __name__ == "__main__":
+    test_drug_details_overlap_with_evidence()
+    test_shared_limiter_bounds_concurrency()
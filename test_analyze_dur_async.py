@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+AnalyzeService DUR fallback 비동기 처리 테스트
+- DUR 조회가 증상 분석과 동시에 진행 (스레드·새 이벤트 루프 없음)
+- interaction_facts 에 약물 데이터가 있으면 DUR 조회를 시작하지 않음
+- DUR 시간 초과 / 오류 시 경고 없이 진행
+- DurService: 같은 약물 동시 조회는 API 호출 1회 (처방전 DUR 섹션 + 분석 fallback)
+"""
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.services.analyze_service as analyze_module
+from app.services.analyze_service import AnalyzeService, AnalysisResult, Ingredient
+from app.utils.interaction_graph import InteractionGraph
+
+FACTS = [
+    {"id": 1, "a_ref": "와파린", "b_ref": "녹차", "summary_ko": "출혈 위험 변화", "severity": "주의"},
+]
+DUR_ROWS = [{
+    "drug_a": "아스피린", "drug_b": "이부프로펜",
+    "severity": "CONTRAINDICATED", "reason": "위장관 출혈",
+}]
+INGREDIENTS = [Ingredient("F1", "녹차", "", "recommend", 90, "traditional")]
+
+
+class _FakeDur:
+    """check_interactions 호출 시각·취소 여부 기록"""
+
+    def __init__(self, delay: float = 0.2, error: bool = False):
+        self.delay = delay
+        self.error = error
+        self.started_at = None
+        self.cancelled = False
+
+    async def check_interactions(self, drug_names):
+        self.started_at = time.perf_counter()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise RuntimeError("DUR API 오류")
+        return DUR_ROWS
+
+
+def _service() -> AnalyzeService:
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    return service
+
+
+def _run_with(fake_dur, coro_factory):
+    """DUR 서비스·상호작용 그래프를 교체한 상태로 실행"""
+    original_dur = analyze_module._dur_service
+    original_graph = InteractionGraph._shared
+    try:
+        analyze_module._dur_service = fake_dur
+        InteractionGraph._shared = InteractionGraph()
+        InteractionGraph._shared.build(FACTS)
+        return asyncio.run(coro_factory())
+    finally:
+        analyze_module._dur_service = original_dur
+        InteractionGraph._shared = original_graph
+
+
+def test_dur_runs_concurrently_with_lookup():
+    """증상 조회(0.2초)와 DUR(0.2초)가 겹쳐서 약 0.2초에 완료"""
+    print("=" * 70)
+    print("[TEST] DUR fallback - concurrency")
+    print("=" * 70)
+    fake_dur = _FakeDur(delay=0.2)
+    service = _service()
+    threads_before = threading.active_count()
+
+    async def _logic(symptom_text, current_meds=None, dur_task=None):
+        await asyncio.sleep(0.2)   # 증상 매칭·식재료 조회 자리
+        cautions = await service._check_interactions(current_meds, INGREDIENTS, dur_task)
+        return AnalysisResult(symptom_summary=symptom_text, cautions=cautions)
+
+    service._analyze_symptom_logic = _logic
+    start = time.perf_counter()
+    result = _run_with(fake_dur, lambda: service.analyze_symptom("두통", ["아스피린", "이부프로펜"]))
+    elapsed = time.perf_counter() - start
+
+    print(f"[elapsed] {elapsed:.3f}s / [cautions] {result.cautions}")
+    assert fake_dur.started_at - start < 0.1
+    assert elapsed < 0.35
+    assert len(result.cautions) == 1 and "DUR 병용금기" in result.cautions[0]
+    assert threading.active_count() == threads_before
+
+
+def test_dur_skipped_when_db_has_drug():
+    """interaction_facts 에 약물 데이터가 있으면 DUR API 를 호출하지 않음"""
+    print("\n[TEST] DUR fallback - skip on DB hit")
+    fake_dur = _FakeDur(delay=1.0)
+    service = _service()
+
+    async def _logic(symptom_text, current_meds=None, dur_task=None):
+        await asyncio.sleep(0)
+        cautions = await service._check_interactions(current_meds, INGREDIENTS, dur_task)
+        return AnalysisResult(symptom_summary=symptom_text, cautions=cautions)
+
+    service._analyze_symptom_logic = _logic
+    start = time.perf_counter()
+    result = _run_with(fake_dur, lambda: service.analyze_symptom("두통", ["와파린", "아스피린"]))
+    elapsed = time.perf_counter() - start
+
+    print(f"[elapsed] {elapsed:.3f}s / [cautions] {result.cautions}")
+    assert elapsed < 0.5
+    assert fake_dur.started_at is None
+    assert len(result.cautions) == 1 and "녹차" in result.cautions[0]
+
+
+def test_dur_error_and_single_drug():
+    """DUR 오류는 경고 없이 진행, 약물 1개면 DUR 조회 안 함"""
+    print("\n[TEST] DUR fallback - error / single drug")
+    service = _service()
+
+    fake_dur = _FakeDur(delay=0, error=True)
+    cautions = _run_with(fake_dur, lambda: service._check_interactions(["아스피린", "이부프로펜"], INGREDIENTS))
+    assert cautions == []
+
+    fake_dur = _FakeDur(delay=0)
+
+    async def _single():
+        assert service._start_dur_check(["아스피린"]) is None
+        return await service._check_interactions(["아스피린"], INGREDIENTS)
+
+    assert _run_with(fake_dur, _single) == []
+    assert fake_dur.started_at is None
+
+
+def test_dur_service_shares_inflight_fetches():
+    """동시에 같은 약물 목록 조회 → 약물별 API 1회, 한쪽 취소해도 다른 쪽은 결과 수신"""
+    print("\n[TEST] DurService - shared in-flight fetches")
+    import tempfile
+    from app.services.dur_service import DurService
+    from app.utils.cache_manager import CacheManager
+
+    fetched = []
+
+    def _service():
+        dur = DurService.__new__(DurService)
+        dur.api_key = "test"
+        dur.cache = cache
+
+        def _fetch_sync(drug_name):
+            fetched.append(drug_name)
+            time.sleep(0.1)
+            other = "이부프로펜" if drug_name == "아스피린" else "아스피린"
+            return [{"other_drug": other, "reason": "병용금기"}]
+
+        dur._fetch_sync = _fetch_sync
+        return dur
+
+    cache = CacheManager(cache_dir=tempfile.mkdtemp())
+    drugs = ["아스피린", "이부프로펜"]
+
+    async def _run():
+        cancelled = asyncio.ensure_future(_service().check_interactions(drugs))
+        sections, analysis = _service().check_interactions(drugs), _service().check_interactions(drugs)
+        await asyncio.sleep(0.02)
+        cancelled.cancel()
+        return await asyncio.gather(sections, analysis)
+
+    sections, analysis = asyncio.run(_run())
+    print(f"[fetched] {fetched}")
+    assert sorted(fetched) == drugs
+    assert sections == analysis and len(sections) == 1
+
+
+if __name__ == "__main__":
+    test_dur_runs_concurrently_with_lookup()
+    test_dur_skipped_when_db_has_drug()
+    test_dur_error_and_single_drug()
+    test_dur_service_shares_inflight_fetches()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+2단계 분석 SSE 스트리밍 테스트
+- HealthStackAPI.analyze_streaming: 증상 분석 직후 analysis 이벤트 (근거 없음), 느린 약물 조회를 기다리지 않음
+- 이후 evidence / video / medication 이벤트가 완료 순으로, 마지막 result 는 analyze() 와 같은 결과
+- /api/analyze/stream, /api/analyze-with-image/stream: 처방전 스트리밍과 같은 'data: {json}' 형식, result 는 기존 응답 형식
+- 분석 실패 시 error 이벤트
+"""
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.testclient import TestClient
+
+import app.services.server as server
+from app.services.analyze_service import AnalysisResult, Ingredient, Recipe
+from app.services.healthstack_api import HealthStackAPI
+from app.services.pubmed_service import PubMedPaper
+from app.services.youtube_service import YouTubeVideo
+
+
+def _api(fail: bool = False) -> HealthStackAPI:
+    class _Analyze:
+        async def analyze_symptom(self, text, meds):
+            await asyncio.sleep(0.05)
+            if fail:
+                raise RuntimeError("analysis down")
+            return AnalysisResult(
+                symptom_summary="소화가 잘 안 되는 상태예요.",
+                ingredients=[Ingredient("R1", "무", "소화", "recommend", 1, "B"),
+                             Ingredient("R2", "생강", "위 운동", "recommend", 2, "B")],
+                recipes=[Recipe(1, "무생채", "", "lunch", 1, "", ["소화"])],
+                confidence_level="high", source="database", cautions=["주의"],
+            )
+
+    class _PubMed:
+        async def search_papers(self, query, max_results=1):
+            await asyncio.sleep(0.05 if query.startswith("무") else 0.15)
+            return [PubMedPaper("1", query, "Abstract", "J", 2020, "https://x/1")]
+
+    class _YouTube:
+        async def videos_for_ingredients(self, names, symptom_id=None):
+            await asyncio.sleep(0.1)
+            return {"무": YouTubeVideo("v1", "무 요리", "C", "", "https://youtu.be/v1")}
+
+    class _Medication:
+        async def get_drug_info(self, drug):
+            await asyncio.sleep(0.3)
+            return {"name": drug, "info": f"{drug} 정보", "papers": []}
+
+    api = HealthStackAPI.__new__(HealthStackAPI)
+    api.analyze_service = _Analyze()
+    api.pubmed_service = _PubMed()
+    api.youtube_service = _YouTube()
+    api.medication_service = _Medication()
+    return api
+
+
+def test_two_phase_events():
+    print("=" * 70)
+    print("[TEST] Analyze stream - events")
+    print("=" * 70)
+    api = _api()
+
+    async def _collect():
+        started = time.perf_counter()
+        events = []
+        async for event in api.analyze_streaming(symptom_text="소화불량", medications=["타이레놀"]):
+            events.append((round(time.perf_counter() - started, 2), event))
+        return events
+
+    events = asyncio.run(_collect())
+    print([(t, e["type"]) for t, e in events])
+    types = [e["type"] for _, e in events]
+
+    assert types[:2] == ["progress", "analysis"] and types[-1] == "result"
+    # 핵심 결과는 약물 조회(0.3s)를 기다리지 않고 바로
+    at, analysis = events[1]
+    assert at < 0.15
+    assert analysis["data"]["symptom_summary"] == "소화가 잘 안 되는 상태예요."
+    assert [i["modern_name"] for i in analysis["data"]["ingredients"]] == ["무", "생강"]
+    assert all(not i["pubmed_papers"] and i["youtube_video"] is None for i in analysis["data"]["ingredients"])
+    assert analysis["data"]["recipes"][0]["title"] == "무생채" and analysis["data"]["cautions"] == ["주의"]
+    json.dumps(analysis, ensure_ascii=False)
+
+    # 완료 순: 무 논문(0.05) → 영상(0.1) → 생강 논문(0.15) → 약물(0.3)
+    phase2 = [(e["type"], e["data"].get("modern_name") or e["data"].get("name")) for _, e in events[3:-1]]
+    assert phase2 == [("evidence", "무"), ("video", "무"), ("video", "생강"), ("evidence", "생강"),
+                      ("medication", "타이레놀")]
+
+    result = events[-1][1]["data"]
+    assert [i.youtube_video["video_id"] if i.youtube_video else None for i in result.ingredients] == ["v1", None]
+    assert result.ingredients[1].pubmed_papers[0]["title"] == "생강 health benefit"
+    assert [m["name"] for m in result.medications] == ["타이레놀"]
+    # 전체 지연 ≈ 가장 긴 갈래 (약물 0.3s)
+    assert events[-1][0] < 0.45
+
+
+def _sse(response) -> list[dict]:
+    return [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line.startswith("data: ")]
+
+
+def test_stream_endpoints():
+    print("\n[TEST] Analyze stream - endpoints")
+    original = server.HealthStackAPI
+    server.HealthStackAPI = _api
+    try:
+        client = TestClient(server.app)
+        response = client.post("/api/analyze/stream", json={"symptom": "소화불량", "medications": ["타이레놀"]})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse(response)
+        assert [e["type"] for e in events][:2] == ["progress", "analysis"]
+        result = events[-1]
+        assert result["type"] == "result"
+        # 기존 /api/analyze 응답 형식
+        assert set(server.AnalyzeResponse.model_fields) == set(result["data"])
+        assert result["data"]["ingredients"][0]["youtube_video"]["video_id"] == "v1"
+
+        image = _sse(client.post("/api/analyze-with-image/stream",
+                                 data={"symptom": "소화불량", "medications_json": '["타이레놀"]'}))
+        assert image[-1]["type"] == "result"
+        assert image[-1]["data"]["medications"][0]["name_ko"].startswith("타이레놀")  # 로컬 약물 DB 형식
+        assert "medication" in [e["type"] for e in image]
+
+        server.HealthStackAPI = lambda: _api(fail=True)
+        failed = _sse(client.post("/api/analyze/stream", json={"symptom": "소화불량"}))
+        assert failed[-1] == {"type": "error", "message": "analysis down"}
+    finally:
+        server.HealthStackAPI = original
+
+
+if __name__ == "__main__":
+    test_two_phase_events()
+    test_stream_endpoints()
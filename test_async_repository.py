@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 Supabase 저장소 테스트
+- 이벤트 루프별 AsyncClient 싱글톤 + 연결 풀 공유
+- 저장소 쿼리 구성 (ilike OR 필터 / in_ / 일괄 upsert)
+- DB 왕복 중에도 이벤트 루프가 막히지 않고 동시 요청이 겹쳐서 처리 (증상 검색, 약물 주의사항)
+"""
+import os
+import sys
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database.supabase_client import AsyncSupabaseClient, QueryCache
+from database.repositories import SymptomRepository, DrugRepository, PubMedRepository
+from app.services.analyze_service import AnalyzeService
+from app.services.pubmed_service import PubMedService
+from app.utils.disease_index import DiseaseIndex, EXACT_FIELDS
+
+DB_LATENCY = 0.1
+
+
+class _FakeQuery:
+    """호출한 필터를 기록하고 DB_LATENCY 만큼 비동기 대기하는 PostgREST 쿼리 대역"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.calls = [table]
+
+    def __getattr__(self, name):
+        def _record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return _record
+
+    async def execute(self):
+        self.client.log.append(self.calls)
+        await asyncio.sleep(DB_LATENCY)
+        return type("Result", (), {"data": self.client.data.get(self.table, [])})()
+
+
+def setup_module(module):
+    """쿼리 횟수를 세는 테스트이므로 마스터 테이블 캐시는 끔 (test_query_cache.py 에서 따로 검증)"""
+    module._original_cache = QueryCache._shared
+    QueryCache._shared = QueryCache(tables=())
+
+
+def teardown_module(module):
+    QueryCache._shared = module._original_cache
+
+
+class _FakeAsyncClient:
+    def __init__(self, data=None):
+        self.data = data or {}
+        self.log = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def test_async_client_per_event_loop():
+    """같은 루프에서는 같은 클라이언트, 루프가 바뀌면 새 클라이언트 (연결 풀 공유)"""
+    print("=" * 70)
+    print("[TEST] AsyncSupabaseClient")
+    print("=" * 70)
+    os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+
+    async def _twice():
+        first, second = await asyncio.gather(
+            AsyncSupabaseClient.get_client(), AsyncSupabaseClient.get_client()
+        )
+        pool = first.options.httpx_client
+        await AsyncSupabaseClient.aclose()
+        return first, second, pool
+
+    first, second, pool = asyncio.run(_twice())
+    other, _, _ = asyncio.run(_twice())
+    assert first is second
+    assert other is not first
+    assert pool is not None and pool.is_closed
+
+
+def test_repository_queries():
+    """저장소가 기존 동기 쿼리와 같은 필터를 구성"""
+    print("\n[TEST] Repository queries")
+    client = _FakeAsyncClient({"disease_master": [{"id": 1}]})
+    repo = SymptomRepository(client=client)
+    rows = asyncio.run(repo.search_diseases("두통", EXACT_FIELDS, limit=10))
+    assert rows == [{"id": 1}]
+    table, select, or_filter, limit = client.log[0]
+    assert table == "disease_master"
+    assert or_filter == ("or_", ("modern_name_ko.ilike.%두통%,disease_read.ilike.%두통%,name_en.ilike.%두통%",), {})
+    assert limit == ("limit", (10,), {})
+
+    # 빈 목록이면 쿼리 없음, 논문은 한 번에 upsert
+    assert asyncio.run(repo.mapped_symptom_ids([])) == set()
+    papers = PubMedRepository(client=client)
+    asyncio.run(papers.upsert_papers([{"pmid": "1"}, {"pmid": "2"}]))
+    assert len(client.log) == 2
+    assert client.log[1][1] == ("upsert", ([{"pmid": "1"}, {"pmid": "2"}],), {"on_conflict": "pmid"})
+
+
+def test_db_fallback_does_not_block_loop():
+    """인덱스 미로드 시 DB 검색 10건이 겹쳐서 처리되고 그동안 루프가 계속 동작"""
+    print("\n[TEST] Non-blocking DB fallback")
+    client = _FakeAsyncClient({
+        "disease_master": [{"id": 1, "modern_name_ko": "두통"}, {"id": 2, "modern_name_ko": "편두통"}],
+        "symptom_ingredient_map": [{"symptom_id": 2}],
+    })
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    service.symptom_repo = SymptomRepository(client=client)
+
+    original = DiseaseIndex._shared
+    DiseaseIndex._shared = DiseaseIndex()
+    DiseaseIndex._shared._last_error_at = time.monotonic()   # 로드 실패 상태 → DB 경로
+
+    async def _run():
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service._search_exact_symptom("두통") for _ in range(10)))
+        elapsed = time.perf_counter() - start
+        ticker.cancel()
+        return results, elapsed, ticks
+
+    try:
+        results, elapsed, ticks = asyncio.run(_run())
+    finally:
+        DiseaseIndex._shared = original
+
+    print(f"[elapsed] {elapsed:.3f}s / [ticks] {ticks} / [queries] {len(client.log)}")
+    assert all(row["id"] == 2 for row in results)
+    assert len(client.log) == 20                 # 검색 + 매핑 확인 × 10
+    assert elapsed < DB_LATENCY * 2 * 3          # 직렬이면 2초
+    assert ticks >= 10
+
+
+def test_drug_cautions_db_fallback():
+    """그래프 미로드 시 약물 주의사항은 비동기 저장소로 약물별 동시 조회"""
+    print("\n[TEST] Drug cautions DB fallback")
+    client = _FakeAsyncClient({
+        "interaction_facts": [{"summary_ko": "출혈 위험"}, {"summary_ko": None}],
+    })
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    service.drug_repo = DrugRepository(client=client)
+
+    async def _no_graph():
+        return None
+
+    service._interaction_graph = _no_graph
+
+    start = time.perf_counter()
+    cautions = asyncio.run(service.get_cautions_for_drugs(["와파린", "아스피린"]))
+    elapsed = time.perf_counter() - start
+
+    print(f"[elapsed] {elapsed:.3f}s / [cautions] {cautions}")
+    assert cautions == ["출혈 위험", "출혈 위험"]
+    assert len(client.log) == 2
+    assert elapsed < DB_LATENCY * 2
+
+
+def test_pubmed_term_lookup_concurrent():
+    """증상/식재료 키워드 조회를 동시에 보내고 검색 쿼리 구성"""
+    print("\n[TEST] PubMed term lookup")
+    client = _FakeAsyncClient({
+        "symptom_pubmed_map": [{"mesh_term": "Headache"}],
+        "ingredient_pubmed_map": [{"ingredient_name_en": "Ginger", "bioactive_compound": "gingerol"}],
+    })
+    service = PubMedService.__new__(PubMedService)
+    service.repo = PubMedRepository(client=client)
+    queries = []
+
+    async def _search(query, max_results=3, use_cache=True):
+        queries.append(query)
+        return []
+
+    service.search_papers = _search
+    start = time.perf_counter()
+    asyncio.run(service.search_by_symptom_and_ingredient(1, "F01"))
+    elapsed = time.perf_counter() - start
+
+    print(f"[query] {queries[0]} ({elapsed:.3f}s)")
+    assert queries == ['("Headache"[MeSH]) AND (Ginger OR gingerol)']
+    assert elapsed < DB_LATENCY * 1.8
+
+
+if __name__ == "__main__":
+    setup_module(sys.modules[__name__])
+    test_async_client_per_event_loop()
+    test_repository_queries()
+    test_db_fallback_does_not_block_loop()
+    test_drug_cautions_db_fallback()
+    test_pubmed_term_lookup_concurrent()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+다건 LLM 배치 생성 테스트
+- 토큰 예산 / 묶음당 항목 수 한도 안에서 묶음 구성
+- 응답 파싱 (코드 펜스, 잘못된 JSON)
+- 누락·검증 실패 항목만 재시도
+- AnalyzeService.generate_recipes_for_symptoms: 호출 수 감소, insert 각 1회, 스냅샷 반영
+"""
+import sys
+import json
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.batch_llm import BatchLLMGenerator, estimate_tokens
+from app.services.analyze_service import AnalyzeService
+from app.utils.symptom_snapshot import SymptomDataSnapshot
+
+
+def _ids_in_prompt(prompt: str) -> list[str]:
+    return [line.split("id=")[1].split(":")[0] for line in prompt.splitlines() if line.startswith("- id=")]
+
+
+def test_pack_respects_budget():
+    """묶음마다 헤더 + 항목 + 예상 출력 토큰이 예산 이하"""
+    print("=" * 70)
+    print("[TEST] Batch LLM - packing")
+    print("=" * 70)
+    generator = BatchLLMGenerator(None, token_budget=1000, output_tokens_per_item=150, max_items_per_batch=4)
+    items = {str(i): f"증상{i}" * (i % 3 + 1) for i in range(20)}
+    header = "지시문 " * 20
+    batches = generator.pack(items, header)
+
+    print(f"[batches] {[len(b) for b in batches]}")
+    assert [i for b in batches for i in b] == list(items)
+    for batch in batches:
+        cost = estimate_tokens(header) + sum(
+            estimate_tokens(generator._item_line(i, items[i])) + 150 for i in batch
+        )
+        assert cost <= 1000 and len(batch) <= 4
+
+
+def test_parse():
+    print("\n[TEST] Batch LLM - parse")
+    text = '```json\n{"results": [{"id": 1, "v": "a"}, {"v": "no id"}, "x"]}\n```'
+    assert BatchLLMGenerator.parse(text) == {"1": {"id": 1, "v": "a"}}
+    assert BatchLLMGenerator.parse('[{"id": "2"}]') == {"2": {"id": "2"}}
+    assert BatchLLMGenerator.parse("not json") == {}
+    assert BatchLLMGenerator.parse(None) == {}
+
+
+def test_retries_only_failed_items():
+    """첫 라운드에서 누락·검증 실패한 항목만 다음 프롬프트에 포함"""
+    print("\n[TEST] Batch LLM - retry")
+    prompts = []
+
+    async def _call(prompt):
+        ids = _ids_in_prompt(prompt)
+        prompts.append(ids)
+        if len(prompts) == 1:
+            # 2 누락, 3 빈 값
+            return json.dumps({"results": [{"id": "1", "v": "a"}, {"id": "3", "v": ""}, {"id": "4", "v": "d"}]})
+        return json.dumps({"results": [{"id": i, "v": "retry"} for i in ids]})
+
+    generator = BatchLLMGenerator(_call, max_retries=2)
+    result = asyncio.run(generator.run(
+        {1: "a", 2: "b", 3: "c", 4: "d"}, "지시문", '"v": "..."', validate=lambda e: bool(e.get("v"))
+    ))
+
+    print(f"[prompts] {prompts}")
+    assert prompts == [["1", "2", "3", "4"], ["2", "3"]]
+    assert result.calls == 2 and result.failed == []
+    assert {k: v["v"] for k, v in result.results.items()} == {"1": "a", "2": "retry", "3": "retry", "4": "d"}
+
+
+def test_generate_recipes_for_symptoms():
+    """증상 5개 → 1차 묶음 호출 1회 + 실패 증상만 재시도, recipes / symptom_recipe_map insert 각 1회"""
+    print("\n[TEST] Batch LLM - generate_recipes_for_symptoms")
+    calls = []
+
+    async def _call(prompt):
+        calls.append(prompt)
+        return json.dumps({"results": [
+            {"id": i, "recipes": [
+                {"title": f"레시피{i}-{n}", "description": "", "meal_slot": "tea", "rationale": "근거", "tags": []}
+                for n in range(3)
+            ] if i != "5" else []}
+            for i in _ids_in_prompt(prompt)
+        ]})
+
+    class _Repo:
+        def __init__(self):
+            self.recipe_inserts = []
+            self.map_inserts = []
+
+        async def insert_recipes(self, rows):
+            self.recipe_inserts.append(rows)
+            return [{"id": 100 + n, **row} for n, row in enumerate(rows)]
+
+        async def insert_recipe_maps(self, rows):
+            self.map_inserts.append(rows)
+
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.symptom_repo = _Repo()
+    snapshot = SymptomDataSnapshot()
+    snapshot.build([], [], [], [], version=1)
+    original = SymptomDataSnapshot._shared
+    try:
+        SymptomDataSnapshot._shared = snapshot
+        generated = asyncio.run(service.generate_recipes_for_symptoms(
+            [(i, f"증상{i}") for i in range(1, 6)], llm_call=_call
+        ))
+    finally:
+        SymptomDataSnapshot._shared = original
+
+    print(f"[calls] {len(calls)} / [generated] { {k: [r.title for r in v] for k, v in generated.items()} }")
+    assert [_ids_in_prompt(p) for p in calls] == [["1", "2", "3", "4", "5"], ["5"], ["5"]]
+    assert sorted(generated) == [1, 2, 3, 4]
+    assert all(len(v) == 2 for v in generated.values())
+    assert len(service.symptom_repo.recipe_inserts) == 1 and len(service.symptom_repo.recipe_inserts[0]) == 8
+    assert len(service.symptom_repo.map_inserts) == 1
+    assert [row["recipe_id"] for row in service.symptom_repo.map_inserts[0]] == list(range(100, 108))
+    assert [r["title"] for r in snapshot.recipes(1)] == ["레시피1-0", "레시피1-1"]
+
+
+if __name__ == "__main__":
+    test_pack_respects_budget()
+    test_parse()
+    test_retries_only_failed_items()
+    test_generate_recipes_for_symptoms()
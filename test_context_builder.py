@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 프롬프트 근거 문맥 구성(context_builder) 테스트
+- 모델별 토큰 예산 (접두어 매칭, 기본값)
+- 질문 관련 문장 우선 선택, 헤더 유지, 출처·문장 원래 순서로 조립, 예산 초과 없음
+- 출처 간 거의 같은 문장 중복 제거
+- 질문이 없으면 앞쪽부터 채움, 초록 없는 출처는 헤더만
+- MedicationService.get_drug_info 프롬프트가 초록 전문보다 작음
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.batch_llm import estimate_tokens
+from app.utils.context_builder import ContextSource, build_context, context_budget, split_sentences
+
+FILLER = (
+    "Participants were recruited from three outpatient clinics between 2015 and 2018. "
+    "Baseline characteristics were similar across groups. "
+    "Statistical analysis used mixed models adjusted for age and sex. "
+)
+SOURCES = [
+    ContextSource(
+        "PMID 1 | Metformin and lactic acidosis",
+        FILLER + "Metformin rarely causes lactic acidosis in patients with renal impairment. "
+        "Gastrointestinal side effects such as diarrhea were the most common adverse events.",
+    ),
+    ContextSource(
+        "PMID 2 | Metformin in type 2 diabetes",
+        FILLER + "Metformin lowers hepatic glucose production as its main mechanism. "
+        "Gastrointestinal side effects such as diarrhea were the most common adverse events!",
+    ),
+    ContextSource("PMID 3 | Cohort design", FILLER * 3),
+]
+
+
+def test_context_budget():
+    print("=" * 70)
+    print("[TEST] Context builder - budget")
+    print("=" * 70)
+    assert context_budget("gpt-4o-mini") == 800
+    assert context_budget("gpt-4o-2024-08-06") == 1200
+    assert context_budget("unknown-model") == context_budget(None) == 800
+    assert split_sentences("A b. C d?\nE f") == ["A b.", "C d?", "E f"]
+
+
+def test_selects_relevant_sentences_within_budget():
+    print("\n[TEST] Context builder - selection")
+    result = build_context(SOURCES, query="metformin side effects mechanism", budget=90)
+    print(f"[context] {result.original_tokens} → {result.tokens} tokens / dup {result.duplicates}\n{result.text}")
+
+    assert result.tokens <= 90 < result.original_tokens
+    assert result.sources == [0, 1]
+    assert "lactic acidosis" in result.text and "hepatic glucose" in result.text
+    assert "recruited" not in result.text
+    # 헤더 유지, 출처 순서 유지
+    assert result.text.index("PMID 1 |") < result.text.index("PMID 2 |")
+    # 출처 간 거의 같은 부작용 문장은 한 번만
+    assert result.text.count("Gastrointestinal side effects") == 1
+    assert result.duplicates >= 1
+
+
+def test_fallbacks():
+    print("\n[TEST] Context builder - no query / header only")
+    result = build_context(SOURCES, budget=60)
+    # 질문이 없으면 앞쪽 출처·문장부터 (중복 문장은 제외)
+    assert result.text.startswith("PMID 1 | Metformin and lactic acidosis\nParticipants were recruited")
+    assert result.tokens <= 60
+
+    headers_only = build_context([ContextSource("PMID 9 | Title only", ""), ContextSource("", "")], query="x")
+    assert headers_only.text == "PMID 9 | Title only" and headers_only.sources == [0]
+    assert build_context([], query="x").text == ""
+
+
+def test_medication_prompt_is_compact():
+    print("\n[TEST] Context builder - MedicationService prompt")
+    import os
+    import tempfile
+    import openai
+    from app.services.medication_service import MedicationService
+    from app.utils.cache_manager import CacheManager
+
+    long_abstract = " ".join(source.text for source in SOURCES) * 3
+    prompts: list[str] = []
+
+    class _PubMed:
+        async def translate_terms(self, terms):
+            return {term: term for term in terms}
+
+        async def search_papers(self, query, max_results=3):
+            from app.services.pubmed_service import PubMedPaper
+            return [
+                PubMedPaper(str(i), f"Paper {i}", f"Metformin dose {500 * (i + 1)} mg improved efficacy. " + long_abstract,
+                            "J", 2020, f"https://x/{i}")
+                for i in range(3)
+            ]
+
+    class _OpenAI:
+        def __init__(self, api_key=None):
+            self.chat = self
+            self.completions = self
+
+        async def create(self, model, messages, **kwargs):
+            prompts.append(messages[-1]["content"])
+
+            class _Choice:
+                class message:
+                    content = "요약"
+
+            class _Response:
+                choices = [_Choice]
+
+            return _Response
+
+    service = MedicationService.__new__(MedicationService)
+    service.pubmed = _PubMed()
+    service.cache = CacheManager(cache_dir=tempfile.mkdtemp())
+
+    original_client, original_key = openai.AsyncOpenAI, os.environ.get("OPENAI_API_KEY")
+    openai.AsyncOpenAI = _OpenAI
+    os.environ["OPENAI_API_KEY"] = "test"
+    try:
+        asyncio.run(service.get_drug_info("메트포르민"))
+    finally:
+        openai.AsyncOpenAI = original_client
+        if original_key is None:
+            os.environ.pop("OPENAI_API_KEY", None)
+        else:
+            os.environ["OPENAI_API_KEY"] = original_key
+
+    naive = estimate_tokens(long_abstract) * 3
+    used = estimate_tokens(prompts[0])
+    print(f"[prompt] {naive} → {used} tokens")
+    assert used < naive / 3
+    assert all(f"Paper: Paper {i}" in prompts[0] for i in range(3))
+    assert "lactic acidosis" in prompts[0]
+
+
+if __name__ == "__main__":
+    test_context_budget()
+    test_selects_relevant_sentences_within_budget()
+    test_fallbacks()
+    test_medication_prompt_is_compact()
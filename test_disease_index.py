@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+disease_master 인메모리 인덱스 테스트
+- 부분 문자열 검색이 ilike(%x%) 순차 스캔과 같은 결과
+- 순위 / 1글자 질의 / 유사도 검색
+- 조회 속도 (ms 미만)
+- 매핑 우선 후보 선택 (쿼리 0~1회)
+- AnalyzeService: 최초 로드는 이벤트 루프 밖 스레드에서
+"""
+import re
+import sys
+import time
+import threading
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.disease_index import DiseaseIndex, EXACT_FIELDS, SIMILAR_FIELDS
+from app.services.analyze_service import AnalyzeService
+from database.repositories import SymptomRepository
+
+SEED_PATH = Path(__file__).parent / "supabase" / "migrations" / "20260206220200_disease_master_seed.sql"
+COLUMNS = ["disease", "disease_read", "disease_alias", "modern_disease",
+           "modern_name_ko", "name_en", "icd10_code", "category"]
+
+
+def _load_seed_rows() -> list[dict]:
+    """시드 SQL의 VALUES 행을 dict로 변환"""
+    rows = []
+    for line in SEED_PATH.read_text(encoding="utf-8").splitlines():
+        if not line.startswith("('"):
+            continue
+        head = line.split("ARRAY[")[0]
+        values = [m.group(1) if m.group(0) != "NULL" else None
+                  for m in re.finditer(r"'([^']*)'|NULL", head)]
+        row = dict(zip(COLUMNS, values))
+        row["id"] = len(rows) + 1
+        rows.append(row)
+    return rows
+
+
+def _ilike_scan(rows: list[dict], query: str, fields) -> set[int]:
+    q = query.lower()
+    return {row["id"] for row in rows if any(q in (row.get(f) or "").lower() for f in fields)}
+
+
+def test_search_matches_ilike_scan():
+    """인덱스 검색 결과 = ilike 순차 스캔 결과"""
+    print("=" * 70)
+    print("[TEST] Disease index - substring")
+    print("=" * 70)
+    rows = _load_seed_rows()
+    index = DiseaseIndex()
+    index.build(rows)
+
+    for query in ["불면", "소화", "두통", "insomnia", "증", "수면", "없는증상명"]:
+        for fields in (EXACT_FIELDS, SIMILAR_FIELDS):
+            found = {row["id"] for row in index.search(query, fields, limit=len(rows))}
+            assert found == _ilike_scan(rows, query, fields), (query, fields)
+    print(f"[rows] {len(rows)} / [stats] {index.get_stats()}")
+
+
+def test_search_ranking_and_fuzzy():
+    """완전 일치 우선, 오타는 유사도 검색으로 매칭"""
+    print("\n[TEST] Disease index - ranking / fuzzy")
+    index = DiseaseIndex()
+    index.build(_load_seed_rows())
+
+    top = index.search("소화불량", EXACT_FIELDS)[0]
+    print(f"[top] {top['modern_name_ko']}")
+    assert top["modern_name_ko"] == "소화불량"
+
+    fuzzy = index.fuzzy("불면증상", SIMILAR_FIELDS, threshold=0.4)
+    print(f"[fuzzy] {[(r['modern_name_ko'], round(s, 2)) for r, s in fuzzy[:3]]}")
+    assert fuzzy and fuzzy[0][0]["modern_name_ko"] == "불면증"
+
+
+def test_search_is_sub_millisecond():
+    """키워드 검색 평균 1ms 미만"""
+    print("\n[TEST] Disease index - latency")
+    index = DiseaseIndex()
+    index.build(_load_seed_rows())
+    queries = ["불면", "소화", "두통", "피로", "변비", "기침"] * 100
+
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q, SIMILAR_FIELDS)
+    avg_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"[avg] {avg_ms:.4f}ms")
+    assert avg_ms < 1.0
+
+
+class _FakeQuery:
+    """symptom_ingredient_map 조회 횟수만 기록하는 비동기 Supabase 쿼리 대역"""
+
+    def __init__(self, calls: list, mapped: set):
+        self.calls = calls
+        self.mapped = mapped
+        self.ids = []
+
+    def select(self, *args):
+        return self
+
+    def in_(self, column, values):
+        self.ids = values
+        return self
+
+    async def execute(self):
+        self.calls.append(self.ids)
+        return type("Result", (), {"data": [{"symptom_id": i} for i in self.ids if i in self.mapped]})()
+
+
+def test_prefer_mapped_without_n_plus_one():
+    """매핑 집합이 있으면 쿼리 0회, 없으면 후보 전체 1회"""
+    print("\n[TEST] Disease index - mapped candidates")
+    calls: list = []
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.symptom_repo = SymptomRepository(
+        client=type("DB", (), {"table": lambda self, name: _FakeQuery(calls, {3})})()
+    )
+    rows = [{"id": 1}, {"id": 2}, {"id": 3}]
+    original = DiseaseIndex._shared
+
+    try:
+        DiseaseIndex._shared = DiseaseIndex()
+        DiseaseIndex._shared.build(rows, mapped_ids={2, 3})
+        assert asyncio.run(service._prefer_mapped(rows))["id"] == 2
+        assert calls == []
+
+        DiseaseIndex._shared = DiseaseIndex()
+        assert asyncio.run(service._prefer_mapped(rows))["id"] == 3
+        assert calls == [[1, 2, 3]]
+        print(f"[queries] {len(calls)}")
+    finally:
+        DiseaseIndex._shared = original
+
+
+def test_first_load_off_event_loop():
+    """인덱스 미로드 상태의 첫 요청은 disease_master 전체 로드를 워커 스레드에서"""
+    print("\n[TEST] Disease index - first load in thread")
+    threads = []
+    index = DiseaseIndex()
+
+    def _load(db):
+        threads.append(threading.current_thread())
+        index.build([{"id": 1, "modern_name_ko": "소화불량"}], mapped_ids={1})
+
+    index.load = _load
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    original = DiseaseIndex._shared
+    try:
+        DiseaseIndex._shared = index
+        row = asyncio.run(service._search_exact_symptom("소화불량"))
+        again = asyncio.run(service._search_exact_symptom("소화불량"))
+    finally:
+        DiseaseIndex._shared = original
+
+    assert row == again == {"id": 1, "modern_name_ko": "소화불량"}
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+if __name__ == "__main__":
+    test_search_matches_ilike_scan()
+    test_search_ranking_and_fuzzy()
+    test_search_is_sub_millisecond()
+    test_prefer_mapped_without_n_plus_one()
+    test_first_load_off_event_loop()
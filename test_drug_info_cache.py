@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+MedicationService.get_drug_info 검색 / 요약 캐시 분리 테스트
+- 대표 성분: 함량 제외, 제품명 괄호 성분명 사용
+- 같은 성분의 다른 제품명은 PubMed 검색 결과 공유 (동시 요청도 검색 1회)
+- 같은 약물 재조회는 번역 · 검색 · LLM 호출 없음
+- 요약은 입력(근거 포함) 해시 기준: 근거가 같으면 검색 캐시가 만료돼도 재생성하지 않고, 바뀌면 재생성
+"""
+import os
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import openai
+
+from app.services.medication_service import MedicationService
+from app.services.pubmed_service import PubMedPaper
+from app.utils.cache_manager import CacheManager
+from app.utils.drug_info_loader import drug_loader
+
+
+class _PubMed:
+    def __init__(self):
+        self.translations: list[list[str]] = []
+        self.queries: list[str] = []
+        self.pmid = "100"
+
+    async def translate_terms(self, terms):
+        self.translations.append(list(terms))
+        return {term: {"아세트아미노펜": "Acetaminophen"}.get(term, term) for term in terms}
+
+    async def search_papers(self, query, max_results=3):
+        self.queries.append(query)
+        await asyncio.sleep(0.01)
+        return [PubMedPaper(self.pmid, f"Paper {self.pmid}", "Abstract", "J", 2020, f"https://x/{self.pmid}")]
+
+
+class _OpenAI:
+    """chat.completions.create 호출 기록 대역"""
+    prompts: list[str] = []
+
+    def __init__(self, api_key=None):
+        self.chat = self
+        self.completions = self
+
+    async def create(self, model, messages, **kwargs):
+        _OpenAI.prompts.append(messages[-1]["content"])
+
+        class _Choice:
+            class message:
+                content = f"요약 {len(_OpenAI.prompts)}"
+
+        class _Response:
+            choices = [_Choice]
+
+        return _Response
+
+
+def _service() -> tuple[MedicationService, _PubMed]:
+    service = MedicationService.__new__(MedicationService)
+    service.pubmed = _PubMed()
+    service.cache = CacheManager(cache_dir=tempfile.mkdtemp())
+    return service, service.pubmed
+
+
+def _run_with_openai(coro):
+    original_client, original_key = openai.AsyncOpenAI, os.environ.get("OPENAI_API_KEY")
+    openai.AsyncOpenAI = _OpenAI
+    os.environ["OPENAI_API_KEY"] = "test"
+    _OpenAI.prompts = []
+    try:
+        return asyncio.run(coro)
+    finally:
+        openai.AsyncOpenAI = original_client
+        if original_key is None:
+            os.environ.pop("OPENAI_API_KEY", None)
+        else:
+            os.environ["OPENAI_API_KEY"] = original_key
+
+
+def test_canonical_ingredients():
+    print("=" * 70)
+    print("[TEST] Drug info cache - canonical ingredients")
+    print("=" * 70)
+    assert drug_loader.canonical_ingredients("타이레놀") == ["아세트아미노펜"]
+    assert drug_loader.canonical_ingredients("펜잘큐정") == ["아세트아미노펜", "에텐자미드", "카페인무수물"]
+    assert drug_loader.canonical_ingredients("없는정(아세트아미노펜)") == ["아세트아미노펜"]
+    assert drug_loader.canonical_ingredients("모르는약") == []
+
+
+def test_brands_share_retrieval():
+    print("\n[TEST] Drug info cache - shared retrieval")
+    service, pubmed = _service()
+
+    async def _run():
+        first = await asyncio.gather(
+            service.get_drug_info("타이레놀"),
+            service.get_drug_info("없는정(아세트아미노펜)"),
+        )
+        again = await service.get_drug_info("타이레놀")
+        return first, again
+
+    (tylenol, generic), again = _run_with_openai(_run())
+    print(f"[queries] {pubmed.queries} / [llm] {len(_OpenAI.prompts)}")
+    # 같은 성분 → 번역 · 검색 1회, 요약은 약물명이 달라 각각 생성
+    assert pubmed.translations == [["아세트아미노펜"]]
+    assert pubmed.queries == ["Acetaminophen mechanism side effects"]
+    assert len(_OpenAI.prompts) == 2
+    assert tylenol["papers"] == generic["papers"] == [{"title": "Paper 100", "url": "https://x/100"}]
+    # 재조회는 호출 없음
+    assert again == tylenol and len(pubmed.queries) == 1 and len(_OpenAI.prompts) == 2
+
+
+def test_summary_keyed_by_context():
+    print("\n[TEST] Drug info cache - summary key")
+    service, pubmed = _service()
+
+    async def _run():
+        first = await service.get_drug_info("펜잘큐정")
+        service.cache.clear_namespace("drug_evidence")      # 검색 캐시 만료, 근거는 그대로
+        same = await service.get_drug_info("펜잘큐정")
+        service.cache.clear_namespace("drug_evidence")
+        pubmed.pmid = "200"                                 # 근거 변경
+        changed = await service.get_drug_info("펜잘큐정")
+        return first, same, changed
+
+    first, same, changed = _run_with_openai(_run())
+    print(f"[queries] {pubmed.queries}")
+    assert pubmed.queries[0] == "(Acetaminophen OR 에텐자미드 OR 카페인무수물) mechanism side effects"
+    assert len(pubmed.queries) == 3
+    assert first["info"] == same["info"] == "요약 1"
+    assert changed["info"] == "요약 2" and "Paper 200" in _OpenAI.prompts[-1]
+
+
+if __name__ == "__main__":
+    test_canonical_ingredients()
+    test_brands_share_retrieval()
+    test_summary_keyed_by_context()
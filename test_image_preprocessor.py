@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Vision OCR 이미지 전처리 테스트
+- 모델 유효 해상도로 축소 + 용량 감소
+- 디코딩 불가 입력은 원본 유지
+- 앱 shutdown 시 프로세스 풀 종료
+"""
+import io
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PIL import Image
+import app.utils.image_preprocessor as image_preprocessor
+from app.utils.image_preprocessor import preprocess_image, preprocess_for_vision, shutdown_pool
+
+IMAGE_PATH = Path(__file__).parent / "test_prescription.jpg"
+
+
+def test_preprocess_downscales_prescription():
+    """원본 사진을 짧은 변 768 이하 JPEG로 축소"""
+    print("=" * 70)
+    print("[TEST] Image preprocess")
+    print("=" * 70)
+    original = IMAGE_PATH.read_bytes()
+    processed, mime = preprocess_image(original)
+
+    with Image.open(io.BytesIO(processed)) as img:
+        size = img.size
+    print(f"[bytes] {len(original):,} → {len(processed):,} / [size] {size}")
+    assert mime == "image/jpeg"
+    assert len(processed) < len(original)
+    assert min(size) <= 768 and max(size) <= 2048
+
+
+def test_invalid_bytes_fall_back_to_original():
+    """이미지가 아닌 입력은 원본 바이트와 MIME 유지"""
+    print("\n[TEST] Image preprocess - fallback")
+    data = b"not an image"
+    processed, mime = asyncio.run(preprocess_for_vision(data, "image/png"))
+    assert processed == data
+    assert mime == "image/png"
+
+
+def test_shutdown_pool_stops_workers():
+    """shutdown_pool 은 워커 프로세스를 종료하고, 이후 호출은 새 풀 사용"""
+    print("\n[TEST] Preprocess - pool shutdown")
+    data = IMAGE_PATH.read_bytes()
+    asyncio.run(preprocess_for_vision(data, "image/jpeg"))
+    pool = image_preprocessor._pool
+    workers = list(pool._processes.values())
+    assert workers
+
+    shutdown_pool()
+    assert image_preprocessor._pool is None
+    assert all(not worker.is_alive() for worker in workers)
+    shutdown_pool()   # 중복 호출 무해
+
+    asyncio.run(preprocess_for_vision(data, "image/jpeg"))
+    assert image_preprocessor._pool is not None and image_preprocessor._pool is not pool
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    test_preprocess_downscales_prescription()
+    test_invalid_bytes_fall_back_to_original()
+    test_shutdown_pool_stops_workers()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+약물-식재료 상호작용 그래프 테스트
+- Aho-Corasick 매칭 = 부분 문자열 루프
+- 그래프 조회 = 기존 ilike + 중첩 루프 결과
+- AnalyzeService 상호작용 체크가 DB 호출 없이 동작, 최초 로드는 이벤트 루프 밖 스레드에서
+"""
+import sys
+import random
+import asyncio
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.interaction_graph import InteractionGraph
+from app.services.analyze_service import AnalyzeService, Ingredient
+
+FACTS = [
+    {"id": 1, "a_ref": "와파린", "b_ref": "녹차", "summary_ko": "출혈 위험 변화", "severity": "주의"},
+    {"id": 2, "a_ref": "자몽", "b_ref": "암로디핀", "summary_ko": "혈중농도 상승", "severity": "금기"},
+    {"id": 3, "a_ref": "와파린나트륨", "b_ref": "인삼", "summary_ko": "항응고 효과 감소", "severity": "주의"},
+    {"id": 4, "a_ref": "메트포르민", "b_ref": "알코올", "summary_ko": "젖산증 위험", "severity": "금기"},
+    {"id": 5, "a_ref": "Warfarin", "b_ref": "Ginkgo", "summary_ko": "출혈 위험", "severity": "주의"},
+]
+
+
+def _naive_check(facts, drugs, ingredients):
+    """기존 구현 (ilike → 중첩 부분 문자열 루프) 의 소문자 기준 재현"""
+    found = []
+    for drug in drugs:
+        d = drug.lower()
+        for row in facts:
+            a, b = row["a_ref"].lower(), row["b_ref"].lower()
+            if d not in a and d not in b:
+                continue
+            other = b if d in a else a
+            for ing in ingredients:
+                i = ing.lower()
+                if i in other or other in i:
+                    found.append((drug, ing, row["id"]))
+    return sorted(found)
+
+
+def test_aho_corasick_matches_substring_loop():
+    """무작위 패턴/텍스트에서 'p in text' 와 동일"""
+    print("=" * 70)
+    print("[TEST] Aho-Corasick")
+    print("=" * 70)
+    rng = random.Random(7)
+    for _ in range(500):
+        patterns = ["".join(rng.choice("가나다") for _ in range(rng.randint(1, 3))) for _ in range(6)]
+        text = "".join(rng.choice("가나다라") for _ in range(rng.randint(0, 20)))
+        assert AhoCorasick(patterns).find_all(text) == {p for p in patterns if p in text}
+    assert AhoCorasick(["두통", "편두통", "머리"]).find_ordered("편두통으로 머리가") == ["편두통", "두통", "머리"]
+
+
+def test_graph_matches_naive_check():
+    """그래프 조회 결과 = 약물별 ilike + 중첩 루프 결과"""
+    print("\n[TEST] Interaction graph - equivalence")
+    graph = InteractionGraph()
+    graph.build(FACTS)
+
+    cases = [
+        (["와파린"], ["녹차", "인삼", "생강"]),
+        (["암로디핀정", "암로디핀"], ["자몽주스", "자몽"]),
+        (["warfarin"], ["ginkgo biloba"]),
+        (["메트포르민", "와파린"], ["알코올", "녹차잎"]),
+        (["없는약"], ["녹차"]),
+    ]
+    for drugs, ingredients in cases:
+        matches, db_hit = graph.check_drug_food(drugs, ingredients)
+        got = sorted((d, i, fact["id"]) for d, i, fact in matches)
+        expected = _naive_check(FACTS, drugs, ingredients)
+        print(f"[{drugs} x {ingredients}] {got}")
+        assert got == expected
+        assert db_hit == any(
+            d.lower() in f["a_ref"].lower() or d.lower() in f["b_ref"].lower()
+            for d in drugs for f in FACTS
+        )
+
+    per_drug = graph.facts_for_drugs(["와파린"])
+    assert [f["id"] for f in per_drug["와파린"]] == [1, 3]
+
+
+def test_analyze_service_cautions_without_db():
+    """그래프가 로드되어 있으면 DB 호출 없음"""
+    print("\n[TEST] Interaction graph - AnalyzeService")
+
+    class _NoDB:
+        def table(self, name):
+            raise AssertionError(f"DB 조회 발생: {name}")
+
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = _NoDB()
+    original = InteractionGraph._shared
+    try:
+        InteractionGraph._shared = InteractionGraph()
+        InteractionGraph._shared.build(FACTS)
+        cautions = asyncio.run(service._check_interactions(
+            ["와파린"],
+            [Ingredient("F1", "녹차", "", "recommend", 90, "traditional")],
+        ))
+        drug_cautions = asyncio.run(service.get_cautions_for_drugs(["와파린", "메트포르민"]))
+    finally:
+        InteractionGraph._shared = original
+
+    print(f"[cautions] {cautions}")
+    assert len(cautions) == 1 and "녹차" in cautions[0]
+    assert drug_cautions == ["출혈 위험 변화", "항응고 효과 감소", "젖산증 위험"]
+
+
+def test_first_load_off_event_loop():
+    """그래프 미로드 상태의 첫 요청은 interaction_facts 로드·오토마톤 구성을 워커 스레드에서"""
+    print("\n[TEST] Interaction graph - first load in thread")
+    threads = []
+    graph = InteractionGraph()
+
+    def _load(db):
+        threads.append(threading.current_thread())
+        graph.build(FACTS)
+
+    graph.load = _load
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    original = InteractionGraph._shared
+    try:
+        InteractionGraph._shared = graph
+        cautions = asyncio.run(service.get_cautions_for_drugs(["메트포르민"]))
+        again = asyncio.run(service.get_cautions_for_drugs(["메트포르민"]))
+    finally:
+        InteractionGraph._shared = original
+
+    assert cautions == again == ["젖산증 위험"]
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+if __name__ == "__main__":
+    test_aho_corasick_matches_substring_loop()
+    test_graph_matches_naive_check()
+    test_analyze_service_cautions_without_db()
+    test_first_load_off_event_loop()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+증상 키워드 추출기 테스트
+- disease_master 증상명·별칭 + 동의어 표 매칭 (한 번 순회)
+- 조사·어미 제거 (어절 중간 글자 보존: '이명', '가래', 두 글자 어절의 이/가: '잠이' → '잠')
+- 조사·어미만으로 된 어절('해요', '와요')은 키워드에서 제외
+- DiseaseIndex 재로드 시 오토마톤 재구성
+- AnalyzeService / step1_extract 가 같은 추출기 사용, AnalyzeService 의 최초 로드는 이벤트 루프 밖 스레드에서
+"""
+import sys
+import asyncio
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.keyword_extractor import KeywordExtractor, strip_particle, is_bare_ending
+from app.utils.disease_index import DiseaseIndex
+from app.services.analyze_service import AnalyzeService
+from app.services.analysis_step_service import StepByStepAnalysisService
+
+ROWS = [
+    {"id": 1, "modern_name_ko": "불면증", "disease_read": "불면", "modern_disease": "불면증",
+     "name_en": "Insomnia", "aliases": ["잠 못 이룸", "수면 장애"]},
+    {"id": 2, "modern_name_ko": "소화불량", "disease_read": "소화불량", "modern_disease": "소화불량",
+     "name_en": "Dyspepsia", "aliases": ["체함", "소화 안됨"]},
+    {"id": 3, "modern_name_ko": "이명", "disease_read": "이명", "modern_disease": "이명",
+     "name_en": "Tinnitus", "aliases": ["귀울림"]},
+    {"id": 4, "modern_name_ko": "편두통", "disease_read": "편두통", "modern_disease": "편두통",
+     "name_en": "Migraine", "aliases": []},
+]
+
+
+def _extractor() -> KeywordExtractor:
+    index = DiseaseIndex()
+    index.build(ROWS, mapped_ids={1, 2})
+    extractor = KeywordExtractor(index=index)
+    assert extractor.ensure_loaded(None)
+    return extractor
+
+
+def test_strip_particle():
+    print("=" * 70)
+    print("[TEST] Keyword extractor - particles")
+    print("=" * 70)
+    assert strip_particle("머리가") == "머리"
+    assert strip_particle("이명이") == "이명"
+    assert strip_particle("소화불량으로") == "소화불량"
+    assert strip_particle("가래") == "가래"      # 남는 글자가 2자 미만이면 그대로
+    assert strip_particle("어지러워요") == "어지러워"
+    # 두 글자 어절의 주격 조사는 한 글자 어간도 남김
+    assert strip_particle("잠이") == "잠"
+    assert strip_particle("눈가") == "눈"
+    assert strip_particle("이명") == "이명"
+
+
+def test_bare_endings_dropped():
+    """어미·조사만 남는 어절은 버리고, 증상어에 붙은 조사는 떼어 중복 키워드를 만들지 않음"""
+    print("\n[TEST] Keyword extractor - bare endings")
+    assert all(is_bare_ending(word) for word in ["해요", "와요", "요", "있어요", "에서"])
+    assert not any(is_bare_ending(word) for word in ["아파요", "두통", "지끈거려요"])
+
+    extractor = _extractor()
+    keywords = extractor.extract("잠이 안 와요 밤에 자주 깨고 해요")
+    print(f"[keywords] {keywords}")
+    assert keywords[0] == "불면"
+    assert not {"해요", "와요", "잠이", "잠"} & set(keywords)
+    assert "자주" in keywords
+
+    # 한 글자 어간이 증상어가 아니면 어절 그대로 ('오이' → '오' 아님), '싶어요' 는 어미로 보지 않음
+    assert extractor.extract("오이 나이") == ["오이", "나이"]
+    assert extractor.extract("오이가 먹고 싶어요")[0] == "오이"
+
+
+def test_disease_and_synonym_matching():
+    """증상명·별칭은 대표 증상명으로, 동의어는 대표어로 — 증상명 > 동의어 > 어절 순"""
+    print("\n[TEST] Keyword extractor - matching")
+    extractor = _extractor()
+
+    keywords = extractor.extract("요즘 잠 못 이룸 증상에 귀울림까지 있어요")
+    print(f"[keywords] {keywords}")
+    assert keywords[:2] == ["불면증", "이명"]
+    assert "불면" in keywords and "요즘" in keywords
+    assert "잠" not in keywords and "귀울림까지" not in keywords
+
+    keywords = extractor.extract("편두통이 심하고 머리가 지끈거려요")
+    print(f"[keywords] {keywords}")
+    assert keywords[0] == "편두통" and "두통" in keywords
+    assert "편두통이" not in keywords and "머리" not in keywords
+    assert "지끈거려" in keywords
+
+    # 'Insomnia' 영문명 대소문자 무시
+    assert extractor.extract("insomnia")[0] == "불면증"
+
+
+def test_synonyms_only_without_index():
+    """인덱스 로드 전에는 동의어 표만으로 추출 (예전 _extract_keywords 와 같은 대표어)"""
+    print("\n[TEST] Keyword extractor - synonyms only")
+    extractor = KeywordExtractor(index=DiseaseIndex())
+    keywords = extractor.extract("소화가 안 되고 기침이 나요")
+    print(f"[keywords] {keywords}")
+    assert keywords[:2] == ["소화", "호흡"]
+    assert extractor.get_stats()["diseases"] == 0
+
+
+def test_rebuild_after_index_reload():
+    print("\n[TEST] Keyword extractor - rebuild")
+    index = DiseaseIndex()
+    index.build(ROWS[:1])
+    extractor = KeywordExtractor(index=index)
+    assert not extractor.is_ready
+    extractor.ensure_loaded(None)
+    assert extractor.is_ready
+    assert extractor.extract_detailed("이명이 심해요")[0].source == "word"
+
+    index.build(ROWS)
+    assert not extractor.is_ready
+    extractor.ensure_loaded(None)
+    assert extractor.extract_detailed("이명이 심해요")[0].source == "disease"
+
+
+def test_services_share_extractor():
+    """AnalyzeService._extract_keywords 와 step1_extract 가 같은 결과"""
+    print("\n[TEST] Keyword extractor - services")
+    originals = (DiseaseIndex._shared, KeywordExtractor._shared)
+    try:
+        DiseaseIndex._shared = DiseaseIndex()
+        DiseaseIndex._shared.build(ROWS)
+        KeywordExtractor._shared = None
+
+        analyze = AnalyzeService.__new__(AnalyzeService)
+        analyze.db = None
+        step = StepByStepAnalysisService.__new__(StepByStepAnalysisService)
+        step.analyze_service = analyze
+        step._sessions = {}
+
+        text = "속이 더부룩하고 체함 증상이 있어요"
+        keywords = asyncio.run(analyze._extract_keywords(text))
+        result = step.step1_extract("symptom", text, None)
+    finally:
+        DiseaseIndex._shared, KeywordExtractor._shared = originals
+
+    print(f"[keywords] {keywords} / [step1] {result['detected_keywords']}")
+    assert keywords[:2] == ["소화불량", "소화"]
+    assert [k["keyword"] for k in result["detected_keywords"]] == keywords
+    assert result["detected_keywords"][0]["confidence"] == 1.0
+
+
+def test_first_load_off_event_loop():
+    """AnalyzeService 의 첫 키워드 추출은 DiseaseIndex 로드·오토마톤 구성을 워커 스레드에서"""
+    print("\n[TEST] Keyword extractor - first load in thread")
+    threads = []
+    index = DiseaseIndex()
+
+    def _load(db):
+        threads.append(threading.current_thread())
+        index.build(ROWS)
+
+    index.load = _load
+    analyze = AnalyzeService.__new__(AnalyzeService)
+    analyze.db = None
+    originals = (DiseaseIndex._shared, KeywordExtractor._shared)
+    try:
+        DiseaseIndex._shared, KeywordExtractor._shared = index, None
+        keywords = asyncio.run(analyze._extract_keywords("이명이 심해요"))
+        again = asyncio.run(analyze._extract_keywords("이명이 심해요"))
+    finally:
+        DiseaseIndex._shared, KeywordExtractor._shared = originals
+
+    assert keywords[0] == again[0] == "이명"
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+if __name__ == "__main__":
+    test_strip_particle()
+    test_bare_endings_dropped()
+    test_disease_and_synonym_matching()
+    test_synonyms_only_without_index()
+    test_rebuild_after_index_reload()
+    test_services_share_extractor()
+    test_first_load_off_event_loop()
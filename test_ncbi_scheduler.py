@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+NCBI E-utilities 스케줄러 테스트
+- 요청 간격이 requests_per_second 를 넘지 않음 (동시 요청 포함)
+- batch_window 안의 서로 다른 PMID efetch 요청을 POST 1회로 합치고 호출자별 PMID 만 반환
+- 429 + Retry-After 재시도
+- retmax 가 기준을 넘으면 usehistory=y, WebEnv / query_key 로 페이지 단위 efetch
+- PubMedService 동시 검색이 스케줄러를 거쳐 efetch 1회로 합쳐짐
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+from urllib.parse import parse_qs
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.services.pubmed_service import PubMedService
+from app.utils.ncbi_scheduler import NCBIScheduler, EFETCH_BATCH_SIZE
+
+
+def _articles_xml(pmids: list[str]) -> str:
+    articles = "".join(
+        f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+        f"<Journal><JournalIssue><PubDate><Year>2020</Year></PubDate></JournalIssue><Title>J</Title></Journal>"
+        f"<ArticleTitle>Paper {pmid}</ArticleTitle></Article></MedlineCitation></PubmedArticle>"
+        for pmid in pmids
+    )
+    return f"<PubmedArticleSet>{articles}</PubmedArticleSet>"
+
+
+class _EUtils:
+    """E-utilities 대역 (요청 기록, 검색어별 PMID 응답)"""
+
+    def __init__(self, results: dict = None, throttle_first: int = 0):
+        self.results = results or {}
+        self.throttle_first = throttle_first
+        self.requests: list[tuple[float, str, dict]] = []
+        self.history: list[str] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        if request.method == "POST":
+            params = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        else:
+            params = dict(request.url.params)
+        self.requests.append((time.monotonic(), endpoint, params))
+
+        if self.throttle_first > 0:
+            self.throttle_first -= 1
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        if endpoint == "esearch.fcgi":
+            ids = self.results.get(params["term"], [])[:int(params["retmax"])]
+            result = {"count": str(len(ids)), "idlist": ids}
+            if params.get("usehistory") == "y":
+                self.history = ids
+                result.update(webenv="ENV1", querykey="1")
+            return httpx.Response(200, json={"esearchresult": result})
+
+        if "WebEnv" in params:
+            start = int(params["retstart"])
+            pmids = self.history[start:start + int(params["retmax"])]
+        else:
+            pmids = params["id"].split(",")
+        return httpx.Response(200, text=_articles_xml(pmids))
+
+    def calls(self, endpoint: str) -> list[dict]:
+        return [params for _, name, params in self.requests if name == endpoint]
+
+
+def _scheduler(eutils: _EUtils, **kwargs) -> NCBIScheduler:
+    scheduler = NCBIScheduler(api_key="", **kwargs)
+    transport = httpx.MockTransport(eutils.handler)
+    scheduler._client = lambda: scheduler._clients.setdefault(
+        asyncio.get_running_loop(), httpx.AsyncClient(transport=transport)
+    )
+    return scheduler
+
+
+def test_rate_limit_spacing():
+    print("=" * 70)
+    print("[TEST] NCBI scheduler - rate limit")
+    print("=" * 70)
+    eutils = _EUtils({"q": ["1"]})
+    scheduler = _scheduler(eutils, requests_per_second=20)
+
+    async def _run():
+        await asyncio.gather(*(scheduler.esearch("q", 1) for _ in range(6)))
+        await scheduler.aclose()
+
+    asyncio.run(_run())
+    times = [t for t, _, _ in eutils.requests]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    print(f"[gaps] {[round(g * 1000) for g in gaps]} ms")
+    assert len(times) == 6
+    assert min(gaps) >= 0.045 and times[-1] - times[0] >= 0.24
+
+
+def test_default_rate_by_api_key():
+    assert NCBIScheduler(api_key="").requests_per_second == 3
+    assert NCBIScheduler(api_key="key").requests_per_second == 10
+
+
+def test_efetch_merges_concurrent_requests():
+    print("\n[TEST] NCBI scheduler - efetch merge")
+    eutils = _EUtils()
+    scheduler = _scheduler(eutils, requests_per_second=100)
+
+    async def _run():
+        results = await asyncio.gather(
+            scheduler.efetch(["1", "2"]),
+            scheduler.efetch(["2", "3"]),
+            scheduler.efetch(["4"]),
+        )
+        await scheduler.aclose()
+        return results
+
+    first, second, third = asyncio.run(_run())
+    fetches = eutils.calls("efetch.fcgi")
+    print(f"[efetch] {fetches} / [stats] {scheduler.get_stats()}")
+    assert len(fetches) == 1 and fetches[0]["id"] == "1,2,3,4"
+    assert list(first) == ["1", "2"] and list(second) == ["2", "3"] and list(third) == ["4"]
+    assert second["3"].title == "Paper 3"
+    assert scheduler.get_stats()["merged_fetches"] == 2
+
+
+def test_retry_after_429():
+    print("\n[TEST] NCBI scheduler - 429")
+    eutils = _EUtils({"q": ["5", "6"]}, throttle_first=1)
+    scheduler = _scheduler(eutils, requests_per_second=100)
+
+    async def _run():
+        found = await scheduler.esearch("q", 2)
+        await scheduler.aclose()
+        return found
+
+    found = asyncio.run(_run())
+    assert found.ids == ["5", "6"]
+    assert len(eutils.requests) == 2 and scheduler.get_stats()["throttled"] == 1
+
+
+def test_history_paging_for_large_sets():
+    print("\n[TEST] NCBI scheduler - history")
+    pmids = [str(1000 + i) for i in range(450)]
+    eutils = _EUtils({"big": pmids, "small": pmids[:3]})
+    scheduler = _scheduler(eutils, requests_per_second=100)
+
+    async def _run():
+        small = await scheduler.esearch("small", 3)
+        found = await scheduler.esearch("big", 450)
+        articles = await scheduler.fetch_articles(found.ids, found)
+        await scheduler.aclose()
+        return small, found, articles
+
+    small, found, articles = asyncio.run(_run())
+    searches = eutils.calls("esearch.fcgi")
+    fetches = eutils.calls("efetch.fcgi")
+    print(f"[pages] {[(p['retstart'], p['retmax']) for p in fetches]}")
+    assert "usehistory" not in searches[0] and searches[1]["usehistory"] == "y"
+    assert small.webenv is None and (found.webenv, found.query_key) == ("ENV1", "1")
+    assert [int(p["retstart"]) for p in fetches] == [0, EFETCH_BATCH_SIZE, 2 * EFETCH_BATCH_SIZE]
+    assert all("id" not in p for p in fetches)
+    assert list(articles) == pmids
+
+
+def test_service_searches_share_one_efetch():
+    print("\n[TEST] NCBI scheduler - PubMedService")
+    eutils = _EUtils({"ginger": ["1", "2"], "radish": ["3"], "garlic": ["2", "4"]})
+    scheduler = _scheduler(eutils, requests_per_second=100)
+    service = PubMedService.__new__(PubMedService)
+    service.ncbi = scheduler
+    service.corpus = None
+
+    async def _run():
+        results = await asyncio.gather(*(
+            service.search_papers(query, max_results=2, use_cache=False)
+            for query in ("ginger", "radish", "garlic")
+        ))
+        await scheduler.aclose()
+        return results
+
+    ginger, radish, garlic = asyncio.run(_run())
+    print(f"[stats] {scheduler.get_stats()}")
+    assert [p.pmid for p in ginger] == ["1", "2"] and [p.pmid for p in garlic] == ["2", "4"]
+    assert radish[0].title == "Paper 3"
+    assert len(eutils.calls("esearch.fcgi")) == 3
+    assert len(eutils.calls("efetch.fcgi")) == 1
+
+
+if __name__ == "__main__":
+    test_rate_limit_spacing()
+    test_default_rate_by_api_key()
+    test_efetch_merges_concurrent_requests()
+    test_retry_after_429()
+    test_history_paging_for_large_sets()
+    test_service_searches_share_one_efetch()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+OCR 결과 캐시 테스트
+- 이미지 내용 해시 캐시 히트
+- 실패 결과 미저장
+- 동시 동일 이미지 요청 합치기 (async / thread), OCR 을 시작한 요청이 취소되어도 다른 대기 요청은 결과 수신
+- 같은 양식의 다른 처방전은 결과를 공유하지 않음 (근사 중복 조회 없음), 픽셀이 같은 재인코딩만 픽셀 해시 히트
+- 비동기 경로의 해시·캐시 IO 는 이벤트 루프 밖 스레드에서
+"""
+import io
+import sys
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.ocr_cache import OcrResultCache
+
+IMAGE_PATH = Path(__file__).parent / "test_prescription.jpg"
+
+
+def _image_bytes() -> bytes:
+    return IMAGE_PATH.read_bytes()
+
+
+def test_content_hash_hit():
+    """같은 이미지는 두 번째부터 OCR 호출 없이 반환"""
+    print("=" * 70)
+    print("[TEST] OCR cache - content hash")
+    print("=" * 70)
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp())
+    calls = []
+
+    async def fake_ocr():
+        calls.append(1)
+        return {"drugList": ["아세로낙정"], "warnings": ""}
+
+    async def run():
+        first = await cache.get_or_compute("vision", _image_bytes(), fake_ocr)
+        second = await cache.get_or_compute("vision", _image_bytes(), fake_ocr)
+        return first, second
+
+    first, second = asyncio.run(run())
+    print(f"[calls] {len(calls)} / [result] {second}")
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_failed_result_not_cached():
+    """cacheable=False 인 결과는 저장하지 않음"""
+    print("\n[TEST] OCR cache - failures are not cached")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp())
+    calls = []
+
+    async def failing_ocr():
+        calls.append(1)
+        return {"drugList": [], "warnings": "처방전 이미지 분석에 실패했습니다"}
+
+    async def run():
+        for _ in range(2):
+            await cache.get_or_compute(
+                "vision", _image_bytes(), failing_ocr,
+                cacheable=lambda r: bool(r.get("drugList")),
+            )
+
+    asyncio.run(run())
+    print(f"[calls] {len(calls)}")
+    assert len(calls) == 2
+
+
+def test_concurrent_requests_coalesced():
+    """동시에 들어온 동일 이미지는 OCR 1회"""
+    print("\n[TEST] OCR cache - async coalescing")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp())
+    calls = []
+
+    async def slow_ocr():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"drugList": ["넥세라정"], "warnings": ""}
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_compute("vision", _image_bytes(), slow_ocr) for _ in range(5)
+        ])
+
+    results = asyncio.run(run())
+    print(f"[calls] {len(calls)} / [results] {len(results)}")
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results)
+
+
+def test_owner_cancel_does_not_cancel_waiters():
+    """OCR 을 시작한 요청이 취소되어도(SSE 연결 끊김) 같은 이미지를 기다리던 요청은 결과를 받음"""
+    print("\n[TEST] OCR cache - owner cancelled")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp())
+    calls = []
+
+    async def slow_ocr():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"drugList": ["넥세라정"], "warnings": ""}
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_compute("vision", _image_bytes(), slow_ocr))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(cache.get_or_compute("vision", _image_bytes(), slow_ocr))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        result = await waiter
+        again = await cache.get_or_compute("vision", _image_bytes(), slow_ocr)
+        return owner, result, again
+
+    owner, result, again = asyncio.run(run())
+    print(f"[calls] {len(calls)} / [result] {result}")
+    assert owner.cancelled()
+    assert result == again == {"drugList": ["넥세라정"], "warnings": ""}
+    # 취소와 관계없이 OCR 은 끝까지 실행되어 저장됨
+    assert len(calls) == 1
+
+
+def test_sync_engine_coalesced():
+    """동기 엔진(Naver)도 스레드 간 OCR 1회"""
+    print("\n[TEST] OCR cache - sync coalescing")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp())
+    calls = []
+    results = []
+
+    def slow_ocr():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"raw_texts": ["에페신정"], "drugs": ["에페신정"]}
+
+    def worker():
+        results.append(cache.get_or_compute_sync("naver", _image_bytes(), slow_ocr))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"[calls] {len(calls)} / [results] {len(results)}")
+    assert len(calls) == 1
+    assert len(results) == 4
+
+
+def _form_image(patient: str, drugs: list[str], compress_level: int = 6) -> bytes:
+    """같은 처방전 양식 위에 환자·약물만 다른 합성 이미지 (PNG)"""
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", (600, 800), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((20, 20, 580, 780), outline="black", width=3)
+    for y in range(80, 760, 40):
+        draw.line((30, y, 570, y), fill="black")
+    draw.text((40, 30), "PRESCRIPTION", fill="black")
+    draw.text((40, 90), f"Patient: {patient}", fill="black")
+    for i, drug in enumerate(drugs):
+        draw.text((40, 170 + i * 40), drug, fill="black")
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=compress_level)
+    return buf.getvalue()
+
+
+def test_same_form_different_patient_not_shared():
+    """같은 양식 다른 처방전은 각자 OCR, 픽셀이 같은 재저장만 재사용"""
+    print("\n[TEST] OCR cache - no near-duplicate sharing")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp(), use_pixel_hash=True)
+    kim = _form_image("Kim", ["Tylenol 500mg", "Amoxicillin 250mg"])
+    lee = _form_image("Lee", ["Aspirin 100mg", "Metformin 500mg"])
+    kim_resaved = _form_image("Kim", ["Tylenol 500mg", "Amoxicillin 250mg"], compress_level=1)
+    assert kim != kim_resaved
+    calls = []
+
+    async def ocr_for(name):
+        calls.append(name)
+        return {"drugList": [name]}
+
+    async def run():
+        return [
+            await cache.get_or_compute("vision", image, lambda name=name: ocr_for(name))
+            for name, image in [("kim", kim), ("lee", lee), ("kim", kim_resaved)]
+        ]
+
+    results = asyncio.run(run())
+    print(f"[calls] {calls} / [results] {results}")
+    assert calls == ["kim", "lee"]
+    assert results == [{"drugList": ["kim"]}, {"drugList": ["lee"]}, {"drugList": ["kim"]}]
+    # 기본값은 바이트 해시만
+    assert OcrResultCache(cache_dir=tempfile.mkdtemp()).use_pixel_hash is False
+
+
+def test_async_lookup_off_event_loop():
+    """get_or_compute 의 조회·저장은 워커 스레드에서"""
+    print("\n[TEST] OCR cache - lookup/store in thread")
+    cache = OcrResultCache(cache_dir=tempfile.mkdtemp(), use_pixel_hash=True)
+    threads = []
+    lookup, store = cache._lookup, cache._store
+    cache._lookup = lambda *a: threads.append(threading.current_thread()) or lookup(*a)
+    cache._store = lambda *a: threads.append(threading.current_thread()) or store(*a)
+
+    async def fake_ocr():
+        return {"drugList": ["아세로낙정"]}
+
+    asyncio.run(cache.get_or_compute("vision", _image_bytes(), fake_ocr))
+    assert len(threads) == 2
+    assert all(t is not threading.main_thread() for t in threads)
+
+
+if __name__ == "__main__":
+    test_content_hash_hit()
+    test_failed_result_not_cached()
+    test_concurrent_requests_coalesced()
+    test_owner_cancel_does_not_cancel_waiters()
+    test_sync_engine_coalesced()
+    test_same_form_different_patient_not_shared()
+    test_async_lookup_off_event_loop()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+처방전 일괄 분석 테스트
+- OCR 동시 실행 수 제한
+- 중복 약물 1회 조회
+- 처방전 간 병용금기 분리
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.services.prescription_service as ps
+from app.services.prescription_service import PrescriptionService, DrugEvidence
+from app.services.dur_service import DurService
+
+OCR = {
+    b"img-a": ["아세로낙정", "넥세라정"],
+    b"img-b": ["넥세라정", "에페신정"],
+    b"img-c": ["아세로낙정", "넥세라정"],
+}
+
+
+def _make_service(calls: dict) -> PrescriptionService:
+    """외부 API 없이 단계별 호출만 기록하는 서비스"""
+    service = PrescriptionService.__new__(PrescriptionService)
+    service.dur_service = DurService.__new__(DurService)
+    service.sim_pre_service = None
+    active = {"now": 0}
+
+    async def fake_ocr(image_bytes, mime_type):
+        active["now"] += 1
+        calls["max_active"] = max(calls.get("max_active", 0), active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return {"drugList": OCR[image_bytes], "warnings": ""}
+
+    async def fake_evidence(drug_list, limit=3):
+        calls.setdefault("evidence", []).append(list(drug_list))
+        evidence = DrugEvidence()
+        for drug in drug_list:
+            evidence.add(drug, {"name": drug, "efficacy": "효능", "sideEffects": ""}, [])
+        return evidence
+
+    async def fake_dur(drug_list):
+        calls.setdefault("dur", []).append(list(drug_list))
+        return [
+            {"drug_a": "아세로낙정", "drug_b": "넥세라정", "reason": "A", "severity": "CAUTION"},
+            {"drug_a": "아세로낙정", "drug_b": "에페신정", "reason": "B", "severity": "CAUTION"},
+        ]
+
+    async def fake_tkm(drug_list, symptom_text):
+        calls.setdefault("tkm", []).append(list(drug_list))
+        return None, None
+
+    service._extract_drugs_from_image = fake_ocr
+    service._collect_drug_evidence = fake_evidence
+    service._get_dur_interactions = fake_dur
+    service._run_tkm_analysis = fake_tkm
+    return service
+
+
+def test_batch_deduplicates_drugs(monkeypatch):
+    """고유 약물만 1회 조회, DUR은 합집합 1회, 같은 구성은 동의보감 1회"""
+    print("=" * 70)
+    print("[TEST] Prescription batch")
+    print("=" * 70)
+    calls: dict = {}
+    monkeypatch.setattr(ps, "BATCH_OCR_CONCURRENCY", 2)
+    service = _make_service(calls)
+
+    images = [(key, "image/jpeg") for key in OCR]
+    result = asyncio.run(service.analyze_prescription_batch(images))
+
+    print(f"[combined] {result['combinedDrugList']}")
+    print(f"[calls] {calls}")
+    assert result["combinedDrugList"] == ["아세로낙정", "넥세라정", "에페신정"]
+    assert calls["evidence"] == [["아세로낙정", "넥세라정", "에페신정"]]
+    assert calls["dur"] == [["아세로낙정", "넥세라정", "에페신정"]]
+    assert len(calls["tkm"]) == 2
+    assert calls["max_active"] <= 2
+
+    reports = result["reports"]
+    assert [r["index"] for r in reports] == [0, 1, 2]
+    assert [d["name"] for d in reports[1]["drugDetails"]] == ["넥세라정", "에페신정"]
+
+
+def test_batch_cross_prescription_warnings():
+    """같은 처방전 안의 병용금기는 리포트에, 처방전 간 병용금기는 별도 목록에"""
+    print("\n[TEST] Prescription batch - cross prescription DUR")
+    service = _make_service({})
+    images = [(key, "image/jpeg") for key in OCR]
+    result = asyncio.run(service.analyze_prescription_batch(images))
+
+    print(f"[cross] {result['crossPrescriptionWarnings']}")
+    assert len(result["combinedDurWarnings"]) == 2
+    assert len(result["crossPrescriptionWarnings"]) == 1
+    assert "에페신정" in result["crossPrescriptionWarnings"][0]
+    assert "DUR" in result["reports"][0]["prescriptionSummary"]["warnings"]
+    assert "DUR" not in result["reports"][1]["prescriptionSummary"]["warnings"]
+
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as mp:
+        test_batch_deduplicates_drugs(mp)
+    test_batch_cross_prescription_warnings()
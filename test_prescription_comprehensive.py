@@ -7,6 +7,7 @@
 """
 
 import json
+import asyncio
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -173,13 +174,13 @@ def search_pubmed_for_drugs(drugs):
         print(f"    영문명: {scientific_name}")
         
         try:
-            # ★ 영문명으로 PubMed 검색 (동기 방식)
+            # ★ 영문명으로 PubMed 검색
             query = f"{scientific_name} mechanism side effects"
-            pmids = pubmed_service._search_pmids(query, max_results=2)
+            pmids = asyncio.run(pubmed_service._search_pmids(query, max_results=2))
             
             papers = []
             if pmids:
-                papers = pubmed_service._fetch_paper_details(pmids)
+                papers = asyncio.run(pubmed_service._fetch_paper_details(pmids))
             
             if papers:
                 drug_pubmed_data[drug_name] = {
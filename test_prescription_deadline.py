@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+처방전 분석 시간 예산(deadline) 테스트
+- 예산 초과 단계 pending 처리, 단건 분석은 예산 초과·취소 시 남은 단계 태스크 취소
+- continuationToken 인코딩/디코딩
+- /prescription/sections: deadline_ms 검증(422), prescriptionSummary 키는 전체 응답과 동일
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.prescription_service import PrescriptionService, _PENDING
+
+
+async def _slow_stage(seconds: float):
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+def test_await_stage_deadline():
+    """예산 안에 끝나는 단계는 결과, 넘기는 단계는 pending"""
+    print("=" * 70)
+    print("[TEST] Stage deadline")
+    print("=" * 70)
+
+    async def run():
+        deadline = time.monotonic() + 0.2
+        fast = await PrescriptionService._await_stage(_slow_stage(0.01), deadline)
+        slow = await PrescriptionService._await_stage(
+            asyncio.create_task(_slow_stage(2)), deadline
+        )
+        expired = await PrescriptionService._await_stage(_slow_stage(0.01), time.monotonic() - 1)
+        unbounded = await PrescriptionService._await_stage(_slow_stage(0.01), None)
+        return fast, slow, expired, unbounded
+
+    start = time.monotonic()
+    fast, slow, expired, unbounded = asyncio.run(run())
+    elapsed = time.monotonic() - start
+
+    print(f"[fast] {fast} / [slow] pending={slow is _PENDING} / elapsed={elapsed:.2f}s")
+    assert fast == "done"
+    assert slow is _PENDING
+    assert expired is _PENDING
+    assert unbounded == "done"
+    assert elapsed < 1.0, "예산 초과 단계를 기다리지 않아야 합니다"
+
+
+def test_image_analysis_cancels_leftover_stages():
+    """단건 분석: 예산을 넘긴 단계는 pending 후 취소, 요청 취소 시에도 남은 단계 정리"""
+    print("\n[TEST] Image analysis - leftover stages cancelled")
+    started: dict[str, asyncio.Task] = {}
+
+    def _service() -> PrescriptionService:
+        service = PrescriptionService.__new__(PrescriptionService)
+
+        async def ocr(image_bytes, mime_type):
+            return {"drugList": ["A"], "warnings": ""}
+
+        def slow(name):
+            async def _stage(*args):
+                started[name] = asyncio.current_task()
+                await asyncio.sleep(5)
+            return _stage
+
+        service._extract_drugs_from_image = ocr
+        service._get_dur_warnings = slow("dur")
+        service._collect_drug_evidence = slow("evidence")
+        service._run_tkm_analysis = slow("analysis")
+        service._symptom_text = lambda drugs, warnings: ""
+        service._remember_stages = lambda *args: None
+        service._compose_report = lambda drugs, warnings, *stages: list(stages)
+        return service
+
+    async def run():
+        stages = await _service()._analyze_prescription_image_impl(b"", "image/png", deadline_s=0.05)
+        await asyncio.sleep(0)
+        expired = {name: task.cancelled() for name, task in started.items()}
+
+        started.clear()
+        request = asyncio.create_task(_service()._analyze_prescription_image_impl(b"", "image/png"))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        await asyncio.sleep(0.01)
+        cancelled = {name: task.cancelled() for name, task in started.items()}
+        return stages, expired, cancelled
+
+    stages, expired, cancelled = asyncio.run(run())
+    print(f"[expired] {expired} / [cancelled] {cancelled}")
+    assert all(stage is _PENDING for stage in stages)
+    assert expired == cancelled == {"dur": True, "evidence": True, "analysis": True}
+
+
+def test_continuation_token_roundtrip():
+    """pending 섹션 토큰 왕복"""
+    print("\n[TEST] Continuation token")
+    drugs = ["아세로낙정", "넥세라정"]
+    token = PrescriptionService.encode_continuation_token(drugs, {"5", "3"})
+    decoded_drugs, decoded_sections = PrescriptionService.decode_continuation_token(token)
+    print(f"[token] {token[:40]}... → {decoded_drugs}, {sorted(decoded_sections)}")
+    assert decoded_drugs == drugs
+    assert decoded_sections == {"3", "5"}
+
+    try:
+        PrescriptionService.decode_continuation_token("not-a-token")
+        assert False, "잘못된 토큰은 ValueError"
+    except ValueError:
+        print("[OK] invalid token rejected")
+
+
+def test_sections_deadline_and_summary():
+    """숫자가 아닌 deadline_ms 는 ValueError(→ 422), 재조회한 요약도 전체 응답과 같은 warnings 키"""
+    print("\n[TEST] /prescription/sections deadline + summary")
+    from app.utils.stage_result_store import StageResultStore
+
+    assert PrescriptionService.parse_deadline_ms(None) is None
+    assert PrescriptionService.parse_deadline_ms("5000") == 5.0
+    for bad in ["soon", [1], -5, 0, True, float("nan")]:
+        try:
+            PrescriptionService.parse_deadline_ms(bad)
+            assert False, f"{bad!r} 는 거부되어야 합니다"
+        except ValueError:
+            pass
+
+    service = PrescriptionService.__new__(PrescriptionService)
+    service.stage_store = StageResultStore()
+
+    async def fake_dur(drug_list):
+        return ["A + B 병용금기"]
+
+    service._get_dur_warnings = fake_dur
+    summary = asyncio.run(service.fetch_optional_sections(["A", "B"], {"1"}))["prescriptionSummary"]
+    full = service._compose_report(["A", "B"], "", ["A + B 병용금기"], _PENDING, _PENDING)["prescriptionSummary"]
+    print(f"[summary] {summary}")
+    assert summary == full == {"drugList": ["A", "B"], "warnings": "A + B 병용금기"}
+
+
+if __name__ == "__main__":
+    test_await_stage_deadline()
+    test_image_analysis_cancels_leftover_stages()
+    test_continuation_token_roundtrip()
+    test_sections_deadline_and_summary()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+PubMed 검색어 캐시 테스트
+- 캐시 히트 시 esearch / efetch 모두 생략
+- 0건 검색어 negative cache, 검색 오류는 캐시하지 않음
+- 저장: pubmed_papers 일괄 upsert 1회 + pubmed_cache 1행
+- 프로세스 재시작 후 DB(pubmed_cache + pubmed_papers) 에서 복원, 만료 행 무시
+- retmax 보다 많이 요청하면 미스 (esearch 전체 결과 수가 retmax 이하였으면 히트,
+  efetch 가 일부를 놓쳐 짧아진 목록은 전체 결과로 보지 않음 — 메모리 / DB 복원 모두)
+"""
+import sys
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.pubmed_service import PubMedService, PubMedPaper
+from app.utils.pubmed_cache import PubMedQueryCache
+from app.utils.ncbi_scheduler import ESearchResult
+
+
+class _Repo:
+    """pubmed_papers / pubmed_cache 메모리 대역"""
+
+    def __init__(self):
+        self.papers: dict[str, dict] = {}
+        self.cache: dict[str, dict] = {}
+        self.paper_upserts = 0
+        self.cache_upserts = 0
+
+    async def upsert_papers(self, rows):
+        if rows:
+            self.paper_upserts += 1
+            self.papers.update({row["pmid"]: row for row in rows})
+
+    async def upsert_query_cache(self, row):
+        self.cache_upserts += 1
+        self.cache[row["query_hash"]] = row
+
+    async def get_query_cache(self, query_hash):
+        return self.cache.get(query_hash)
+
+    async def papers_by_pmids(self, pmids):
+        return {pmid: self.papers[pmid] for pmid in pmids if pmid in self.papers}
+
+
+def _service(repo: _Repo, results: dict, missing: frozenset = frozenset()) -> tuple[PubMedService, dict]:
+    calls = {"esearch": 0, "efetch": 0}
+    service = PubMedService.__new__(PubMedService)
+    service.repo = repo
+    service.corpus = None
+
+    async def _search(query, max_results):
+        calls["esearch"] += 1
+        pmids = results.get(query)
+        return None if pmids is None else ESearchResult(ids=pmids[:max_results], count=len(pmids))
+
+    async def _fetch(pmids, search=None):
+        calls["efetch"] += 1
+        return [PubMedPaper(p, f"Title {p}", "", "J", 2020, f"https://pubmed.ncbi.nlm.nih.gov/{p}/")
+                for p in pmids if p not in missing]
+
+    service._esearch = _search
+    service._fetch_paper_details = _fetch
+    return service, calls
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_hit_skips_esearch_and_efetch():
+    print("=" * 70)
+    print("[TEST] PubMed cache - hit")
+    print("=" * 70)
+    repo = _Repo()
+    service, calls = _service(repo, {"ginger nausea": ["1", "2", "3"]})
+    original = PubMedQueryCache._shared
+    try:
+        PubMedQueryCache._shared = PubMedQueryCache()
+        first = _run(service.search_papers("ginger nausea", max_results=2))
+        second = _run(service.search_papers("  Ginger   NAUSEA ", max_results=2))
+        smaller = _run(service.search_papers("ginger nausea", max_results=1))
+        larger = _run(service.search_papers("ginger nausea", max_results=3))
+        stats = PubMedQueryCache._shared.get_stats()
+    finally:
+        PubMedQueryCache._shared = original
+
+    print(f"[calls] {calls} / [stats] {stats}")
+    assert [p.pmid for p in first] == [p.pmid for p in second] == ["1", "2"]
+    assert [p.pmid for p in smaller] == ["1"] and [p.pmid for p in larger] == ["1", "2", "3"]
+    # 1회차 + retmax 를 넘은 요청만 NCBI 호출
+    assert calls == {"esearch": 2, "efetch": 2}
+    # 결과 묶음마다 논문 upsert 1회
+    assert repo.paper_upserts == 2 and repo.cache_upserts == 2
+
+
+def test_negative_cache_and_errors():
+    print("\n[TEST] PubMed cache - negative")
+    repo = _Repo()
+    service, calls = _service(repo, {"no hits": []})
+    original = PubMedQueryCache._shared
+    try:
+        PubMedQueryCache._shared = PubMedQueryCache()
+        assert _run(service.search_papers("no hits")) == []
+        assert _run(service.search_papers("no hits", max_results=10)) == []   # 전체 결과가 0건 → 히트
+        assert _run(service.search_papers("esearch error")) == []
+        assert _run(service.search_papers("esearch error")) == []
+        stats = PubMedQueryCache._shared.get_stats()
+    finally:
+        PubMedQueryCache._shared = original
+
+    print(f"[calls] {calls} / [stats] {stats}")
+    assert calls == {"esearch": 3, "efetch": 0}
+    assert stats["negative_hits"] == 1
+    row = repo.cache[PubMedQueryCache.query_hash("no hits")]
+    expires = datetime.fromisoformat(row["expires_at"]) - datetime.now(timezone.utc)
+    assert row["pmids"] == [] and expires < timedelta(hours=25)
+    assert PubMedQueryCache.query_hash("esearch error") not in repo.cache
+
+
+def test_restore_from_db_after_restart():
+    """메모리 캐시가 비어도 pubmed_cache + pubmed_papers 로 응답, 만료 행은 재검색"""
+    print("\n[TEST] PubMed cache - DB restore")
+    repo = _Repo()
+    service, calls = _service(repo, {"radish": ["7", "8"], "old": ["9"]})
+    original = PubMedQueryCache._shared
+    try:
+        PubMedQueryCache._shared = PubMedQueryCache()
+        _run(service.search_papers("radish"))
+        _run(service.search_papers("old"))
+        repo.cache[PubMedQueryCache.query_hash("old")]["expires_at"] = (
+            datetime.now(timezone.utc) - timedelta(minutes=1)
+        ).isoformat()
+
+        PubMedQueryCache._shared = PubMedQueryCache()   # 재시작
+        restored = _run(service.search_papers("radish"))
+        again = _run(service.search_papers("radish"))
+        _run(service.search_papers("old"))
+        stats = PubMedQueryCache._shared.get_stats()
+    finally:
+        PubMedQueryCache._shared = original
+
+    print(f"[calls] {calls} / [stats] {stats}")
+    assert [p.pmid for p in restored] == [p.pmid for p in again] == ["7", "8"]
+    assert restored[0].title == "Title 7"
+    assert calls == {"esearch": 3, "efetch": 3}
+    assert stats["hits"] == 1
+
+
+def test_partial_efetch_not_complete():
+    """efetch 가 일부 논문을 놓쳐 목록이 retmax 보다 짧아도, 전체 결과가 더 많으면 큰 요청은 미스"""
+    print("\n[TEST] PubMed cache - partial efetch")
+    repo = _Repo()
+    service, calls = _service(repo, {"garlic": [str(i) for i in range(10)]}, missing=frozenset({"2"}))
+    original = PubMedQueryCache._shared
+    try:
+        PubMedQueryCache._shared = PubMedQueryCache()
+        first = _run(service.search_papers("garlic", max_results=3))
+        same = _run(service.search_papers("garlic", max_results=3))
+        larger = _run(service.search_papers("garlic", max_results=5))
+
+        PubMedQueryCache._shared = PubMedQueryCache()   # 재시작 → DB 행으로 판단
+        restored = _run(service.search_papers("garlic", max_results=5))
+        more = _run(service.search_papers("garlic", max_results=8))
+    finally:
+        PubMedQueryCache._shared = original
+
+    print(f"[calls] {calls}")
+    assert [p.pmid for p in first] == [p.pmid for p in same] == ["0", "1"]
+    assert [p.pmid for p in larger] == [p.pmid for p in restored] == ["0", "1", "3", "4"]
+    assert len(more) == 7
+    # 3건 요청(짧아진 2건) 결과로 5건·8건 요청에 답하지 않음
+    assert calls == {"esearch": 3, "efetch": 3}
+    assert repo.cache[PubMedQueryCache.query_hash("garlic")]["total_count"] == 10
+
+
+def test_local_ttl_and_lru():
+    print("\n[TEST] PubMed cache - TTL / LRU")
+    cache = PubMedQueryCache(max_entries=2)
+    paper = PubMedPaper("1", "t", "", "", 2020, "")
+    cache.put("a", [paper], retmax=3)
+    cache.put("b", [], retmax=3)
+    cache.put("c", [paper], retmax=3, ttl_seconds=-1)
+    assert cache.get("a", 3) is None          # LRU 제거
+    assert cache.get("b", 3) == []            # negative
+    assert cache.get("c", 3) is None          # 만료
+
+
+if __name__ == "__main__":
+    test_hit_skips_esearch_and_efetch()
+    test_negative_cache_and_errors()
+    test_restore_from_db_after_restart()
+    test_partial_efetch_not_complete()
+    test_local_ttl_and_lru()
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 PubMed 초록 코퍼스(BM25) 테스트
+- PubMed 검색식 해석: AND / OR / 괄호 / 필드 태그 / hasabstract 필터
+- BM25 순위: 제목·MeSH 가중, 모든 AND 절을 만족하는 문서만 후보
+- 구 일치·최소 점수를 만족하는 후보가 요청 수보다 적으면 콜드 → None (흩어진 토큰만 맞는 초록은 콜드),
+  수집·캐시된 검색식은 웜
+- 실시간 add() 는 재로드 사이 max_live_additions 건까지
+- PubMedService.search_papers: 웜 검색어는 NCBI / DB 캐시 호출 없음, 콜드 검색어만 실시간 API 후 코퍼스 반영,
+  최초 로드는 이벤트 루프 밖 스레드에서
+- 수집: 이미 저장된 PMID 는 efetch 생략, 수집 검색식은 웜
+- 수집 검색식: modern_to_mesh_map / ingredient_pubmed_map
+"""
+import sys
+import time
+import threading
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.utils.pubmed_corpus as pubmed_corpus
+from app.services.pubmed_service import PubMedService, PubMedPaper
+from app.utils.pubmed_corpus import PubMedCorpus, parse_query, corpus_queries
+from app.utils.pubmed_parser import ParsedArticle
+from app.utils.ncbi_scheduler import ESearchResult
+
+ROWS = [
+    {"pmid": "1", "title": "Jujube seed extract improves insomnia", "abstract": "Ziziphus jujuba sleep trial.",
+     "mesh_terms": ["Ziziphus", "Sleep Initiation and Maintenance Disorders"], "pub_year": 2020},
+    {"pmid": "2", "title": "Ginger for nausea", "abstract": "Ginger reduced nausea and vomiting in pregnancy.",
+     "mesh_terms": ["Zingiber officinale", "Nausea"], "pub_year": 2019},
+    {"pmid": "3", "title": "Dietary review", "abstract": "Jujube, ginger and radish were discussed. Insomnia was rare.",
+     "mesh_terms": [], "pub_year": 2022},
+    {"pmid": "4", "title": "Ginger gingerols and gastric emptying", "abstract": "Ginger accelerated gastric emptying.",
+     "mesh_terms": ["Zingiber officinale", "Gastric Emptying"], "pub_year": 2021},
+]
+
+
+def _corpus() -> PubMedCorpus:
+    corpus = PubMedCorpus()
+    corpus.build(ROWS)
+    return corpus
+
+
+def test_parse_query():
+    print("=" * 70)
+    print("[TEST] PubMed corpus - query parser")
+    print("=" * 70)
+    query = '("Insomnia"[MeSH] OR Sleeplessness) AND ("Ziziphus"[MeSH] OR Jujube)'
+    assert parse_query(query) == [[["insomnia"], ["sleeplessness"]], [["ziziphus"], ["jujube"]]]
+    assert parse_query("Ginger health benefits") == [[["ginger", "health", "benefit"]]]
+    assert parse_query("(ginger) AND (nausea OR vomiting)") == [[["ginger"]], [["nausea"], ["vomiting"]]]
+    assert parse_query("  ") == []
+    assert parse_query('"Ziziphus"[MeSH Terms] AND hasabstract') == [[["ziziphus"]]]
+
+
+def test_bm25_ranking_and_cold():
+    print("\n[TEST] PubMed corpus - BM25")
+    corpus = _corpus()
+
+    results = corpus.search('("Insomnia"[MeSH] OR Sleeplessness) AND ("Ziziphus"[MeSH] OR Jujube)', limit=5)
+    print(f"[insomnia x jujube] {[(row['pmid'], round(score, 2)) for row, score in results]}")
+    # 제목·MeSH 에 등장한 문서가 초록에만 나온 문서보다 위
+    assert [row["pmid"] for row, _ in results] == ["1", "3"]
+    assert results[0][1] > results[1][1]
+
+    ginger = corpus.search("ginger", limit=5)
+    assert {row["pmid"] for row, _ in ginger} == {"2", "3", "4"}
+    assert corpus.search("ginger AND nausea", limit=5)[0][0]["pmid"] == "2"
+
+    # 후보가 요청 수 이상이면 로컬 응답, 부족하면 콜드
+    assert [row["pmid"] for row in corpus.lookup("ginger nausea", 1)] == ["2"]
+    assert corpus.lookup("ginger nausea", 2) is None
+    assert corpus.lookup("turmeric", 1) is None
+    stats = corpus.get_stats()
+    assert (stats["hits"], stats["cold"], stats["documents"]) == (1, 2, 4)
+
+    assert corpus.add([{"pmid": "5", "title": "Turmeric curcumin", "abstract": ""}, ROWS[0]]) == 1
+    assert corpus.lookup("turmeric", 1)[0]["pmid"] == "5"
+
+
+def test_loose_tokens_stay_cold():
+    """검색어 토큰이 초록에 흩어져 있기만 한 문서로는 답하지 않음, 필드 태그 범위 준수"""
+    print("\n[TEST] PubMed corpus - warm criterion")
+    corpus = PubMedCorpus()
+    corpus.build(ROWS + [
+        {"pmid": "6", "title": "Ginger tea in winter",
+         "abstract": "Participants reported better health. The benefit was small.", "mesh_terms": []},
+    ])
+    assert corpus.search("ginger health benefit", limit=5)[0][0]["pmid"] == "6"
+    assert corpus.lookup("ginger health benefit", 1) is None
+    # 제목·초록에만 나오는 용어는 [MeSH] 검색식으로 웜이 되지 않음
+    assert corpus.lookup('"Insomnia"[MeSH Terms]', 1) is None
+    assert [row["pmid"] for row in corpus.lookup('"Insomnia"[Title/Abstract]', 1)] == ["1"]
+    assert [row["pmid"] for row in corpus.lookup('"Gastric Emptying"[MeSH Terms]', 1)] == ["4"]
+
+    # 실시간 검색 후 캐시된 검색식은 웜
+    corpus.mark_warm("Ginger  health benefit")
+    assert [row["pmid"] for row in corpus.lookup("ginger health benefit", 1)] == ["6"]
+    assert corpus.lookup("ginger health benefit", 2) is None
+
+
+def test_live_additions_capped():
+    print("\n[TEST] PubMed corpus - live addition cap")
+    corpus = PubMedCorpus(max_live_additions=2)
+    corpus.build([])
+    assert corpus.add(ROWS[:3]) == 2
+    assert corpus.add(ROWS[3:]) == 0
+    assert corpus.get_stats()["documents"] == 2
+    # 재로드하면 한도 초기화
+    corpus.build(ROWS[:1])
+    assert corpus.add(ROWS) == 2
+
+
+def test_search_speed():
+    """1만 건 코퍼스에서 검색 1회가 수 ms 수준"""
+    words = "ginger jujube radish garlic insomnia nausea digestion cough fatigue sleep".split()
+    rows = [
+        {"pmid": str(i), "title": f"{words[i % 10]} {words[(i * 3) % 10]} trial",
+         "abstract": " ".join(words[(i + k) % 10] for k in range(40)), "mesh_terms": [words[(i * 7) % 10]]}
+        for i in range(10000)
+    ]
+    corpus = PubMedCorpus()
+    corpus.build(rows)
+    started = time.perf_counter()
+    for _ in range(10):
+        corpus.lookup('("Insomnia"[MeSH] OR sleep) AND (jujube OR "Ziziphus"[MeSH])', 3)
+    elapsed = (time.perf_counter() - started) / 10 * 1000
+    print(f"[speed] {elapsed:.1f} ms / search")
+    assert elapsed < 200
+
+
+def _service(corpus: PubMedCorpus) -> tuple[PubMedService, dict]:
+    calls = {"esearch": 0, "efetch": 0, "cache": 0}
+    service = PubMedService.__new__(PubMedService)
+    service.corpus = corpus
+    service.db = None
+
+    async def _cached(query, max_results):
+        calls["cache"] += 1
+        return None
+
+    async def _esearch(query, max_results):
+        calls["esearch"] += 1
+        return ESearchResult(ids=["9"], count=1)
+
+    async def _fetch(pmids, search=None):
+        calls["efetch"] += 1
+        return [PubMedPaper("9", "Turmeric and arthritis", "Curcumin reduced pain.", "J", 2023, "")]
+
+    async def _store(query, papers, retmax, total=None):
+        corpus.add([service._paper_row(paper, "") for paper in papers])
+        corpus.mark_warm(query)
+
+    service._get_cached_papers = _cached
+    service._esearch = _esearch
+    service._fetch_paper_details = _fetch
+    service._cache_papers = _store
+    return service, calls
+
+
+def test_service_serves_warm_queries_locally():
+    print("\n[TEST] PubMed corpus - PubMedService")
+    service, calls = _service(_corpus())
+
+    async def _run():
+        warm = await service.search_papers('("Ziziphus"[MeSH] OR Jujube) AND insomnia', max_results=2)
+        cold = await service.search_papers("turmeric arthritis", max_results=1)
+        again = await service.search_papers("turmeric arthritis", max_results=1)
+        return warm, cold, again
+
+    warm, cold, again = asyncio.run(_run())
+    print(f"[calls] {calls}")
+    assert [p.pmid for p in warm] == ["1", "3"] and warm[0].title == ROWS[0]["title"]
+    assert [p.pmid for p in cold] == [p.pmid for p in again] == ["9"]
+    # 웜 검색어와 반복 검색은 NCBI · DB 캐시 호출 없음
+    assert calls == {"esearch": 1, "efetch": 1, "cache": 1}
+
+
+def test_first_load_off_event_loop():
+    """콜드 프로세스의 pubmed_papers 전체 로드는 워커 스레드에서"""
+    print("\n[TEST] PubMed corpus - first load in thread")
+    corpus = PubMedCorpus()
+    threads = []
+
+    def _load(db):
+        threads.append(threading.current_thread())
+        corpus.build(ROWS)
+
+    corpus.load = _load
+    service, calls = _service(corpus)
+    assert not corpus.is_ready
+    papers = asyncio.run(service.search_papers("ginger nausea", max_results=1))
+    assert [p.pmid for p in papers] == ["2"] and corpus.is_ready
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    assert calls["esearch"] == 0
+
+
+def test_harvest_skips_stored_pmids():
+    print("\n[TEST] PubMed corpus - harvest")
+    fetched: list[list[str]] = []
+    stored: list[list[dict]] = []
+
+    class _NCBI:
+        async def esearch(self, term, retmax):
+            return ESearchResult(ids=["1", "7", "8"], count=3)
+
+        async def fetch_articles(self, pmids, search=None):
+            fetched.append(list(pmids))
+            return {pmid: ParsedArticle(pmid=pmid, title=f"Ziziphus paper {pmid}") for pmid in pmids}
+
+    class _Repo:
+        async def papers_by_pmids(self, pmids):
+            return {pmid: {"pmid": pmid} for pmid in pmids if pmid == "1"}
+
+        async def upsert_papers(self, rows):
+            stored.append(rows)
+
+    corpus = PubMedCorpus()
+    corpus.build([])
+    service = PubMedService.__new__(PubMedService)
+    service.ncbi, service.repo, service.corpus = _NCBI(), _Repo(), corpus
+
+    result = asyncio.run(service.harvest('"Ziziphus"[MeSH Terms] AND hasabstract', per_term=3))
+    assert result == {"found": 3, "stored": 2}
+    assert fetched == [["7", "8"]]
+    assert [row["pmid"] for row in stored[0]] == ["7", "8"]
+    assert corpus.get_stats()["documents"] == 2
+    # 수집한 검색식은 웜 (MeSH 구 일치 없이도 로컬 응답), 처음 보는 검색식은 구 일치 필요
+    assert corpus.get_stats()["warm_queries"] == 1
+    assert len(corpus.lookup('"Ziziphus"[MeSH Terms] AND hasabstract', 2)) == 2
+    assert corpus.lookup('"Ziziphus"[MeSH Terms]', 1) is None
+
+
+def test_corpus_queries():
+    tables = {
+        "modern_to_mesh_map": [{"mesh_term": "Dyspepsia"}, {"mesh_term": None}],
+        "ingredient_pubmed_map": [
+            {"ingredient_name_en": "Ziziphus jujuba", "mesh_term": "Ziziphus", "bioactive_compound": None},
+            {"ingredient_name_en": "Ziziphus jujuba", "mesh_term": None, "bioactive_compound": "Spinosin"},
+        ],
+    }
+    original = pubmed_corpus.fetch_all_rows
+    pubmed_corpus.fetch_all_rows = lambda db, table, *args, **kwargs: tables[table]
+    try:
+        queries = corpus_queries(None)
+    finally:
+        pubmed_corpus.fetch_all_rows = original
+    assert queries == [
+        '"Dyspepsia"[MeSH Terms] AND hasabstract',
+        '"Ziziphus"[MeSH Terms] AND hasabstract',
+        '"Ziziphus jujuba"[Title/Abstract] AND hasabstract',
+        '"Spinosin"[Title/Abstract] AND hasabstract',
+    ]
+
+
+if __name__ == "__main__":
+    test_parse_query()
+    test_bm25_ranking_and_cold()
+    test_loose_tokens_stay_cold()
+    test_live_additions_capped()
+    test_search_speed()
+    test_service_serves_warm_queries_locally()
+    test_first_load_off_event_loop()
+    test_harvest_skips_stored_pmids()
+    test_corpus_queries()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+PubMed efetch XML 스트리밍 파서 테스트
+- 제목(하위 태그 포함) / 저널 / 연도(MedlineDate) / 구조화 초록 / MeSH / DOI 추출
+- CommentsCorrections 의 다른 PMID 에 영향받지 않음
+- 처리한 기사 요소 해제
+- PubMedService._parse_xml_response: PMID 순서 유지, 200건 fixture
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.pubmed_parser import iter_pubmed_articles, parse_pubmed_articles
+from app.services.pubmed_service import PubMedService
+from scripts.benchmark_pubmed_parser import build_fixture, legacy_parse
+
+XML = """<?xml version="1.0" ?>
+<PubmedArticleSet>
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID Version="1">111</PMID>
+    <Article>
+      <Journal><JournalIssue><PubDate><MedlineDate>2019 Nov-Dec</MedlineDate></PubDate></JournalIssue>
+        <Title>Phytotherapy Research</Title></Journal>
+      <ArticleTitle>Effect of <i>Zingiber officinale</i> on nausea</ArticleTitle>
+      <ELocationID EIdType="doi" ValidYN="Y">10.1002/ptr.111</ELocationID>
+      <Abstract>
+        <AbstractText Label="BACKGROUND">Ginger is used.</AbstractText>
+        <AbstractText Label="RESULTS">Nausea <b>decreased</b>.</AbstractText>
+      </Abstract>
+      <PublicationTypeList><PublicationType>Review</PublicationType></PublicationTypeList>
+    </Article>
+    <MeshHeadingList>
+      <MeshHeading><DescriptorName>Zingiber officinale</DescriptorName><QualifierName>chemistry</QualifierName></MeshHeading>
+      <MeshHeading><DescriptorName>Nausea</DescriptorName></MeshHeading>
+    </MeshHeadingList>
+    <CommentsCorrectionsList><CommentsCorrections><PMID>222</PMID></CommentsCorrections></CommentsCorrectionsList>
+  </MedlineCitation>
+</PubmedArticle>
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID Version="1">222</PMID>
+    <Article>
+      <Journal><JournalIssue><PubDate><Year>2021</Year></PubDate></JournalIssue><Title>Nutrients</Title></Journal>
+      <ArticleTitle>Radish and digestion</ArticleTitle>
+    </Article>
+  </MedlineCitation>
+  <PubmedData><ArticleIdList><ArticleId IdType="doi">10.3390/nu222</ArticleId></ArticleIdList></PubmedData>
+</PubmedArticle>
+</PubmedArticleSet>"""
+
+
+def test_extracts_fields():
+    print("=" * 70)
+    print("[TEST] PubMed parser - fields")
+    print("=" * 70)
+    articles = parse_pubmed_articles(XML)
+    first, second = articles["111"], articles["222"]
+    print(f"[111] {first}")
+
+    assert list(articles) == ["111", "222"]
+    assert first.title == "Effect of Zingiber officinale on nausea"
+    assert first.journal == "Phytotherapy Research" and first.pub_year == 2019
+    assert first.abstract_sections == [("BACKGROUND", "Ginger is used."), ("RESULTS", "Nausea decreased.")]
+    assert first.abstract == "BACKGROUND: Ginger is used. RESULTS: Nausea decreased."
+    assert first.mesh_terms == ["Zingiber officinale", "Nausea"]
+    assert first.publication_types == ["Review"] and first.doi == "10.1002/ptr.111"
+
+    # CommentsCorrections 에 등장한 222 는 자기 기사 값으로 추출
+    assert second.title == "Radish and digestion" and second.pub_year == 2021
+    assert second.abstract == "" and second.doi == "10.3390/nu222"
+
+
+def test_releases_processed_articles():
+    """기사를 하나 꺼낼 때마다 앞선 기사 요소가 비워짐"""
+    print("\n[TEST] PubMed parser - memory")
+    xml, _ = build_fixture(20)
+    import xml.etree.ElementTree as ET
+    original = ET.iterparse
+    roots = []
+
+    def _tracking(source, events=None):
+        for event, elem in original(source, events=events):
+            if event == "start" and not roots:
+                roots.append(elem)
+            yield event, elem
+
+    ET.iterparse = _tracking
+    try:
+        for article in iter_pubmed_articles(xml):
+            assert len(roots[0]) == 0
+    finally:
+        ET.iterparse = original
+
+
+def test_service_parse_order_and_fixture():
+    """검색 결과 PMID 순서 유지, 응답에 없는 PMID 제외, 기존 파서와 같은 기본 필드"""
+    print("\n[TEST] PubMed parser - service")
+    service = PubMedService.__new__(PubMedService)
+
+    papers = service._parse_xml_response(XML, ["222", "999", "111"])
+    assert [p.pmid for p in papers] == ["222", "111"]
+    assert papers[1].mesh_terms == ["Zingiber officinale", "Nausea"]
+
+    xml, pmids = build_fixture(200)
+    papers = service._parse_xml_response(xml.encode("utf-8"), pmids)
+    legacy = legacy_parse(xml, pmids)
+    print(f"[fixture] {len(papers)}건")
+    assert [p.pmid for p in papers] == pmids
+    for paper, old in zip(papers, legacy):
+        assert paper.title == old["title"][:200]
+        assert paper.journal == old["journal"]
+        assert paper.doi == f"10.1000/bench.{paper.pmid}" and len(paper.mesh_terms) == 8
+    # 기존 파서는 MedlineDate 연도를 놓쳐 2024 로 채움
+    assert papers[0].pub_year == 2000 and legacy[0]["pub_year"] != 2000
+
+
+if __name__ == "__main__":
+    test_extracts_fields()
+    test_releases_processed_articles()
+    test_service_parse_order_and_fixture()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+마스터 테이블 조회 캐시 테스트
+- 테이블 + projection + 필터 단위 read-through / 테이블별 hit·miss
+- data_versions 버전 변경 시 해당 테이블만 폐기
+- 쓰기 시 즉시 폐기 / 캐시 대상 아닌 테이블은 그대로 통과
+- .not_ 같은 속성 체인도 래퍼를 거쳐 캐시 키에 포함
+- 비동기 클라이언트 경로 / StepByStepAnalysisService.step2_search 재조회 시 DB 왕복 없음
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database.supabase_client import QueryCache, MASTER_TABLES
+from database.repositories import SymptomRepository
+
+
+class _FakeQuery:
+    """필터 호출을 무시하고 테이블 데이터를 돌려주는 PostgREST 쿼리 대역"""
+
+    def __init__(self, client, table, is_async=False):
+        self.client = client
+        self.table = table
+        self.is_async = is_async
+        self.write = False
+
+    def _chain(self, *args, **kwargs):
+        return self
+
+    select = eq = in_ = or_ = is_ = limit = order = _chain
+
+    @property
+    def not_(self):
+        # postgrest-py 처럼 다음 필터를 부정하는 빌더를 속성으로 반환
+        return self
+
+    def insert(self, *args, **kwargs):
+        self.write = True
+        return self
+
+    def _result(self):
+        self.client.queries.append(self.table)
+        if self.table == "data_versions" and self.client.versions is None:
+            raise RuntimeError("relation data_versions does not exist")
+        if self.table == "data_versions":
+            rows = [{"name": k, "version": v} for k, v in self.client.versions.items()]
+        else:
+            rows = self.client.data.get(self.table, [])
+        return type("Result", (), {"data": [dict(r) for r in rows], "count": None})()
+
+    def execute(self):
+        return self._result()
+
+
+class _AsyncFakeQuery(_FakeQuery):
+    async def execute(self):
+        await asyncio.sleep(0)
+        return self._result()
+
+
+class _FakeClient:
+    def __init__(self, data, versions=None, is_async=False):
+        self.data = data
+        self.versions = versions
+        self.is_async = is_async
+        self.queries = []
+
+    def table(self, name):
+        return (_AsyncFakeQuery if self.is_async else _FakeQuery)(self, name)
+
+
+DATA = {
+    "disease_master": [{"id": 1, "modern_name_ko": "두통"}],
+    "catalog_drugs": [{"id": 7, "name_ko": "타이레놀"}],
+    "interaction_facts": [{"id": 3}],
+}
+
+
+def _disease_query(cache, client, keyword):
+    return cache.wrap(client, "disease_master").select("*").or_(
+        f"modern_name_ko.ilike.%{keyword}%"
+    ).limit(5).execute()
+
+
+def test_read_through_and_stats():
+    """같은 테이블·필터·projection 은 한 번만 조회, 반환값 수정이 캐시에 영향 없음"""
+    print("=" * 70)
+    print("[TEST] Query cache - read-through")
+    print("=" * 70)
+    client = _FakeClient(DATA, versions={"disease_master": 1})
+    cache = QueryCache()
+
+    first = _disease_query(cache, client, "두통")
+    first.data[0]["modern_name_ko"] = "변경됨"
+    second = _disease_query(cache, client, "두통")
+    _disease_query(cache, client, "편두통")
+    cache.wrap(client, "disease_master").select("id").or_("modern_name_ko.ilike.%두통%").limit(5).execute()
+
+    stats = cache.get_stats()["tables"]["disease_master"]
+    print(f"[queries] {client.queries} / [stats] {stats}")
+    assert second.data == [{"id": 1, "modern_name_ko": "두통"}]
+    assert client.queries == ["data_versions", "disease_master", "disease_master", "disease_master"]
+    assert stats["hits"] == 1 and stats["misses"] == 3 and stats["entries"] == 3
+    assert set(cache.get_stats()["tables"]) == set(MASTER_TABLES)
+
+
+def test_version_bump_invalidates_table():
+    """버전이 바뀐 테이블 항목만 폐기, 행이 처음 생긴 테이블도 폐기"""
+    print("\n[TEST] Query cache - version stamps")
+    client = _FakeClient(DATA, versions={"disease_master": 1})
+    cache = QueryCache(version_check_seconds=0)
+
+    _disease_query(cache, client, "두통")
+    cache.wrap(client, "catalog_drugs").select("*").eq("id", 7).execute()
+    _disease_query(cache, client, "두통")
+    assert client.queries.count("disease_master") == 1
+
+    client.versions = {"disease_master": 2, "catalog_drugs": 1}   # 시드 재적재 + catalog_drugs 첫 변경
+    _disease_query(cache, client, "두통")
+    cache.wrap(client, "catalog_drugs").select("*").eq("id", 7).execute()
+    assert client.queries.count("disease_master") == 2
+    assert client.queries.count("catalog_drugs") == 2
+    assert cache.get_stats()["tables"]["disease_master"]["version"] == 2
+
+    # data_versions 를 읽을 수 없으면 기존 항목 유지 (TTL 로만 갱신)
+    client.versions = None
+    _disease_query(cache, client, "두통")
+    assert client.queries.count("disease_master") == 2
+
+
+def test_writes_and_passthrough():
+    """캐시 테이블 쓰기는 즉시 폐기, 캐시 대상 아닌 테이블은 매번 조회"""
+    print("\n[TEST] Query cache - writes / passthrough")
+    client = _FakeClient(DATA, versions={})
+    cache = QueryCache()
+
+    _disease_query(cache, client, "두통")
+    cache.wrap(client, "disease_master").insert({"modern_name_ko": "새 증상"}).execute()
+    _disease_query(cache, client, "두통")
+    assert client.queries.count("disease_master") == 3
+
+    for _ in range(2):
+        cache.wrap(client, "interaction_facts").select("*").execute()
+    assert client.queries.count("interaction_facts") == 2
+
+
+def test_attribute_chain_cached():
+    """.not_ 속성을 거친 체인도 캐시되고, 부정 없는 같은 필터와 키가 다름"""
+    print("\n[TEST] Query cache - attribute chains")
+    client = _FakeClient(DATA, versions={"disease_master": 1})
+    cache = QueryCache()
+
+    def _negated():
+        return cache.wrap(client, "disease_master").select("*").not_.is_("name_en", "null").execute()
+
+    _negated()
+    _negated()
+    cache.wrap(client, "disease_master").select("*").is_("name_en", "null").execute()
+    print(f"[queries] {client.queries}")
+    assert client.queries == ["data_versions", "disease_master", "disease_master"]
+    assert cache.get_stats()["tables"]["disease_master"]["hits"] == 1
+
+
+def test_async_repository_uses_cache():
+    """비동기 저장소 조회도 같은 캐시 사용"""
+    print("\n[TEST] Query cache - async repository")
+    client = _FakeClient(DATA, versions={}, is_async=True)
+    original = QueryCache._shared
+    try:
+        QueryCache._shared = QueryCache()
+        repo = SymptomRepository(client=client)
+
+        async def _run():
+            a = await repo.search_diseases("두통", ("modern_name_ko",))
+            b = await repo.search_diseases("두통", ("modern_name_ko",))
+            return a, b
+
+        a, b = asyncio.run(_run())
+        stats = QueryCache._shared.get_stats()["tables"]["disease_master"]
+    finally:
+        QueryCache._shared = original
+
+    assert a == b == DATA["disease_master"]
+    assert client.queries.count("disease_master") == 1
+    assert stats["hits"] == 1
+
+
+def test_step2_search_cached():
+    """step2_search 는 비동기 저장소로 조회, 두 번째 호출은 DB 왕복 없음"""
+    print("\n[TEST] Query cache - step2_search")
+    from app.services.analysis_step_service import StepByStepAnalysisService
+    from database.repositories import DrugRepository
+
+    client = _FakeClient({
+        "disease_master": [{"id": 1, "modern_name_ko": "두통", "description": ""}],
+        "catalog_drugs": [{"id": 7, "name_ko": "타이레놀", "name_en": "Tylenol"}],
+    }, versions={}, is_async=True)
+    service = StepByStepAnalysisService.__new__(StepByStepAnalysisService)
+    service._sessions = {}
+    service.analyze_service = type("Analyze", (), {
+        "symptom_repo": SymptomRepository(client=client),
+        "drug_repo": DrugRepository(client=client),
+    })()
+
+    original = QueryCache._shared
+    try:
+        QueryCache._shared = QueryCache()
+        first = asyncio.run(service.step2_search("s1", ["두통"]))
+        queries = len(client.queries)
+        second = asyncio.run(service.step2_search("s1", ["두통"]))
+    finally:
+        QueryCache._shared = original
+
+    print(f"[queries] first={queries} second={len(client.queries) - queries}")
+    assert first == second
+    assert first["candidates"]["tkm_symptoms"][0]["name"] == "두통"
+    assert first["candidates"]["modern_drugs"][0]["name"] == "타이레놀 (Tylenol)"
+    assert len(client.queries) == queries
+
+
+if __name__ == "__main__":
+    test_read_through_and_stats()
+    test_version_bump_invalidates_table()
+    test_writes_and_passthrough()
+    test_attribute_chain_cached()
+    test_async_repository_uses_cache()
+    test_step2_search_cached()
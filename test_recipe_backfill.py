@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+레시피 백필 큐 테스트
+- 레시피 없는 증상도 생성을 기다리지 않고 즉시 응답
+- symptom_id 단위 중복 제거 / 실패 시 재시도 대기
+- 생성 후 다음 요청에서 레시피 포함
+- 배치 모드 묶음 생성 1회 호출
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.recipe_backfill import RecipeBackfillQueue, recipe_less_symptoms
+from app.services.analyze_service import AnalyzeService, Recipe
+from app.utils.symptom_snapshot import SymptomDataSnapshot
+from app.utils.disease_index import DiseaseIndex
+from app.utils.interaction_graph import InteractionGraph
+
+GENERATION_DELAY = 0.3
+
+
+def _wait_until(predicate, timeout: float = 3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_analyze_returns_without_waiting_for_recipes():
+    """레시피 생성(0.3초)을 기다리지 않고 식재료로 응답, 생성 후 다음 요청에 레시피 포함"""
+    print("=" * 70)
+    print("[TEST] Recipe backfill - analyze path")
+    print("=" * 70)
+    calls = []
+    snapshot = SymptomDataSnapshot()
+    snapshot.build(
+        [{"symptom_id": 1, "rep_code": "F01", "direction": "recommend", "rationale_ko": "안신",
+          "priority": 90, "evidence_level": "traditional"}],
+        [{"rep_code": "F01", "modern_name": "대추"}], [], [], version=1,
+    )
+    index = DiseaseIndex()
+    index.build([{"id": 1, "modern_name_ko": "불면증", "disease_read": "불면"}], mapped_ids={1})
+
+    async def _generate(symptom_id, symptom_name):
+        calls.append(symptom_id)
+        await asyncio.sleep(GENERATION_DELAY)
+        snapshot.add_recipes(symptom_id, [{
+            "recipe_id": 10, "title": "대추차", "description": "", "tags": [],
+            "meal_slot": "tea", "priority": 80, "rationale_ko": "",
+        }])
+        return [Recipe(10, "대추차", "", "tea", 80, "", [])]
+
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    service._generate_and_save_recipes = _generate
+
+    originals = (SymptomDataSnapshot._shared, DiseaseIndex._shared, InteractionGraph._shared, RecipeBackfillQueue._shared)
+    try:
+        SymptomDataSnapshot._shared = snapshot
+        DiseaseIndex._shared = index
+        InteractionGraph._shared = InteractionGraph()
+        InteractionGraph._shared.build([])
+        RecipeBackfillQueue._shared = RecipeBackfillQueue()
+
+        start = time.perf_counter()
+        first = asyncio.run(service.analyze_symptom("불면증"))
+        second = asyncio.run(service.analyze_symptom("불면증"))   # 생성 중 → 중복 예약 없음
+        elapsed = time.perf_counter() - start
+        assert _wait_until(lambda: RecipeBackfillQueue._shared.pending == 0)
+        third = asyncio.run(service.analyze_symptom("불면증"))
+        stats = RecipeBackfillQueue._shared.get_stats()
+    finally:
+        SymptomDataSnapshot._shared, DiseaseIndex._shared, InteractionGraph._shared, RecipeBackfillQueue._shared = originals
+
+    print(f"[elapsed] {elapsed:.3f}s / [stats] {stats}")
+    assert elapsed < GENERATION_DELAY
+    assert [i.modern_name for i in first.ingredients] == ["대추"] and first.recipes == []
+    assert second.recipes == []
+    assert [r.title for r in third.recipes] == ["대추차"]
+    assert calls == [1]
+    assert stats["generated"] == 1 and stats["deduplicated"] == 1
+
+
+def test_failed_symptom_retry_cooldown():
+    """실패한 증상은 retry_after_seconds 동안 다시 예약하지 않음"""
+    print("\n[TEST] Recipe backfill - retry cooldown")
+    calls = []
+
+    async def _fail(symptom_id, symptom_name):
+        calls.append(symptom_id)
+        return []
+
+    queue = RecipeBackfillQueue(retry_after_seconds=60)
+    assert queue.submit(5, "두통", _fail)
+    assert _wait_until(lambda: queue.pending == 0)
+    assert not queue.submit(5, "두통", _fail)
+
+    queue.retry_after_seconds = 0
+    assert queue.submit(5, "두통", _fail)
+    assert _wait_until(lambda: len(calls) == 2)
+
+
+def test_batch_mode_single_generation_call():
+    """배치 모드: 묶음 생성 함수 1회 호출, 진행 중인 증상은 건너뜀, 실패 증상은 재시도 대기"""
+    print("\n[TEST] Recipe backfill - batch")
+    calls = []
+
+    async def _generate_batch(symptoms):
+        calls.append([sid for sid, _ in symptoms])
+        return {sid: [sid] for sid, _ in symptoms if sid != 3}
+
+    queue = RecipeBackfillQueue(retry_after_seconds=60)
+    queue._inflight.add(4)   # 요청 경로에서 이미 생성 중
+    result = asyncio.run(queue.run_batch([(i, f"증상{i}") for i in range(1, 7)], _generate_batch))
+
+    print(f"[result] {result} / calls={calls}")
+    assert result == {"generated": 4, "failed": 1, "skipped": 1}
+    assert calls == [[1, 2, 3, 5, 6]]
+    assert queue.pending == 1 and not queue._claim(3)
+
+    async def _raise(symptoms):
+        raise RuntimeError("LLM 오류")
+
+    result = asyncio.run(RecipeBackfillQueue().run_batch([(7, "증상7")], _raise))
+    assert result == {"generated": 0, "failed": 1, "skipped": 0}
+
+
+def test_recipe_less_symptoms():
+    """레시피 매핑이 없는 증상만 (기본: 식재료 매핑 있는 증상)"""
+    print("\n[TEST] Recipe backfill - targets")
+    tables = {
+        "disease_master": [{"id": 1, "modern_name_ko": "불면증"}, {"id": 2, "modern_name_ko": "두통"},
+                           {"id": 3, "modern_name_ko": None, "disease_read": "냉증"}],
+        "symptom_recipe_map": [{"symptom_id": 1}],
+        "symptom_ingredient_map": [{"symptom_id": 1}, {"symptom_id": 2}],
+    }
+
+    class _Query:
+        def __init__(self, name):
+            self.name = name
+
+        def select(self, *args):
+            return self
+
+        order = range = select
+
+        def execute(self):
+            return type("Result", (), {"data": tables[self.name]})()
+
+    db = type("DB", (), {"table": lambda self, name: _Query(name)})()
+    assert recipe_less_symptoms(db) == [(2, "두통")]
+    assert recipe_less_symptoms(db, only_mapped=False) == [(2, "두통"), (3, "냉증")]
+
+
+if __name__ == "__main__":
+    test_analyze_returns_without_waiting_for_recipes()
+    test_failed_symptom_retry_cooldown()
+    test_batch_mode_single_generation_call()
+    test_recipe_less_symptoms()
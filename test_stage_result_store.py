@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+단계 결과 저장소 테스트
+- 약물 목록 정규화 키 / TTL
+- on-demand 섹션이 스트리밍 결과를 재사용
+- 약물정보 단계는 순서가 바뀐 목록의 앞쪽 대상 약물로 재조합 (대상이 빠져 있으면 재조회)
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.stage_result_store import StageResultStore
+from app.services.prescription_service import (
+    PrescriptionService, DrugEvidence, STAGE_ANALYSIS, STAGE_EVIDENCE,
+)
+
+
+def test_canonical_key_and_ttl():
+    """순서·중복과 무관하게 같은 키, TTL 지나면 만료"""
+    print("=" * 70)
+    print("[TEST] Stage result store")
+    print("=" * 70)
+    store = StageResultStore(ttl_seconds=0.2)
+    store.put(["넥세라정", "아세로낙정"], "dur", ["경고"])
+
+    assert store.get(["아세로낙정", " 넥세라정", "넥세라정"], "dur") == ["경고"]
+    assert store.get(["아세로낙정"], "dur") is None
+    assert store.get(["넥세라정", "아세로낙정"], "evidence") is None
+
+    time.sleep(0.3)
+    assert store.get(["넥세라정", "아세로낙정"], "dur") is None
+    print(f"[stats] {store.get_stats()}")
+
+
+class _FakeAnalysis:
+    symptom_summary = "위장 보호"
+    matched_symptom_name = "소화불량"
+    source = "database"
+    ingredients = []
+    recipes = []
+    cautions = []
+
+
+def test_sections_reuse_stored_stages():
+    """저장된 단계는 다시 실행하지 않고, 없는 단계만 실행"""
+    print("\n[TEST] fetch_optional_sections - memoized stages")
+    service = PrescriptionService.__new__(PrescriptionService)
+    service.stage_store = StageResultStore()
+    service.sim_pre_service = None
+    calls = []
+
+    async def fake_tkm(drug_list, symptom_text):
+        calls.append("analysis")
+        return _FakeAnalysis(), None
+
+    async def fake_evidence(drug_list, limit=3):
+        calls.append("evidence")
+        return DrugEvidence()
+
+    service._run_tkm_analysis = fake_tkm
+    service._collect_drug_evidence = fake_evidence
+
+    drugs = ["아세로낙정", "넥세라정"]
+    service.stage_store.put(drugs, STAGE_ANALYSIS, (_FakeAnalysis(), None))
+
+    result = asyncio.run(service.fetch_optional_sections(drugs, {"4", "5"}))
+    print(f"[calls] {calls} / [sections] {list(result)}")
+    assert calls == []
+    assert result["lifestyleGuide"]["symptomTokens"] == ["소화불량"]
+
+    result = asyncio.run(service.fetch_optional_sections(drugs, {"3"}))
+    assert calls == ["evidence"]
+    assert "academicEvidence" in result
+    assert service.stage_store.get(drugs, STAGE_EVIDENCE) is not None
+
+
+def test_evidence_reuse_follows_drug_order():
+    """같은 약물 집합이라도 약물정보는 이번 목록 앞쪽 3개 기준"""
+    print("\n[TEST] fetch_optional_sections - evidence order")
+    service = PrescriptionService.__new__(PrescriptionService)
+    service.stage_store = StageResultStore()
+    service.sim_pre_service = None
+    collected = []
+
+    async def fake_evidence(drug_list, limit=3):
+        collected.append(list(drug_list[:limit]))
+        evidence = DrugEvidence()
+        for drug in drug_list[:limit]:
+            evidence.add(drug, {"name": drug, "efficacy": "", "sideEffects": ""}, [])
+        return evidence
+
+    service._collect_drug_evidence = fake_evidence
+
+    first = asyncio.run(service.fetch_optional_sections(["A", "B", "C", "D"], {"2"}))
+    assert [d["name"] for d in first["drugDetails"]] == ["A", "B", "C"]
+
+    # 대상(C, B, A)이 모두 저장됨 → 재사용, 이번 순서로
+    reordered = asyncio.run(service.fetch_optional_sections(["C", "B", "A", "D"], {"2"}))
+    assert [d["name"] for d in reordered["drugDetails"]] == ["C", "B", "A"]
+    assert collected == [["A", "B", "C"]]
+
+    # 대상 D 는 조회된 적 없음 → 재조회
+    shifted = asyncio.run(service.fetch_optional_sections(["D", "A", "B", "C"], {"2"}))
+    print(f"[collected] {collected}")
+    assert [d["name"] for d in shifted["drugDetails"]] == ["D", "A", "B"]
+    assert collected == [["A", "B", "C"], ["D", "A", "B"]]
+
+
+if __name__ == "__main__":
+    test_canonical_key_and_ttl()
+    test_sections_reuse_stored_stages()
+    test_evidence_reuse_follows_drug_order()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+증상 → 식재료/레시피 스냅샷 테스트
+- 조인 결과 / priority 순서 / limit
+- AI 생성 레시피 즉시 반영
+- AnalyzeService DB 경로가 스냅샷만 사용, 최초 로드는 이벤트 루프 밖 스레드에서
+"""
+import sys
+import asyncio
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.utils.symptom_snapshot import SymptomDataSnapshot
+from app.services.analyze_service import AnalyzeService
+
+INGREDIENT_MAPS = [
+    {"symptom_id": 1, "rep_code": "F01", "direction": "recommend", "rationale_ko": "안신", "priority": 50, "evidence_level": "traditional"},
+    {"symptom_id": 1, "rep_code": "F02", "direction": "recommend", "rationale_ko": "보기", "priority": 90, "evidence_level": "traditional"},
+    {"symptom_id": 1, "rep_code": "F03", "direction": "avoid", "rationale_ko": "각성", "priority": 70, "evidence_level": "clinical"},
+    {"symptom_id": 1, "rep_code": "F04", "direction": "good", "rationale_ko": "이완", "priority": 10, "evidence_level": "empirical"},
+    {"symptom_id": 2, "rep_code": "F01", "direction": "recommend", "rationale_ko": "소화", "priority": 80, "evidence_level": "traditional"},
+]
+FOODS = [
+    {"rep_code": "F01", "modern_name": "대추"},
+    {"rep_code": "F02", "modern_name": "인삼"},
+    {"rep_code": "F03", "modern_name": "커피"},
+]
+RECIPE_MAPS = [
+    {"symptom_id": 1, "recipe_id": 10, "meal_slot": "tea", "priority": 60, "rationale_ko": "숙면"},
+]
+RECIPES = [{"id": 10, "title": "대추차", "description": "따뜻한 차", "tags": ["차"]}]
+
+
+def _snapshot() -> SymptomDataSnapshot:
+    snapshot = SymptomDataSnapshot()
+    snapshot.build(INGREDIENT_MAPS, FOODS, RECIPE_MAPS, RECIPES, version=3)
+    return snapshot
+
+
+def test_snapshot_join_and_order():
+    """foods_master 이름 조인 + priority 내림차순 상위 3개"""
+    print("=" * 70)
+    print("[TEST] Symptom snapshot")
+    print("=" * 70)
+    snapshot = _snapshot()
+    ingredients = snapshot.ingredients(1, limit=3)
+    print(f"[ingredients] {[i['modern_name'] for i in ingredients]}")
+    assert [i["modern_name"] for i in ingredients] == ["인삼", "커피", "대추"]
+    assert snapshot.ingredients(99) == []
+    # foods_master 에 없는 코드는 rep_code 그대로
+    assert snapshot.ingredients(1, limit=10)[-1]["modern_name"] == "F04"
+
+    recipes = snapshot.recipes(1)
+    assert recipes[0]["title"] == "대추차"
+    assert snapshot.version == 3
+
+
+def test_add_recipes_visible_immediately():
+    """생성한 레시피는 재로드 없이 조회"""
+    print("\n[TEST] Symptom snapshot - add_recipes")
+    snapshot = _snapshot()
+    snapshot.add_recipes(2, [{
+        "recipe_id": 11, "title": "생강차", "description": "", "tags": [],
+        "meal_slot": "tea", "priority": 80, "rationale_ko": "",
+    }])
+    assert [r["title"] for r in snapshot.recipes(2)] == ["생강차"]
+
+
+def test_analyze_service_uses_snapshot():
+    """스냅샷이 있으면 DB 왕복 없이 Ingredient/Recipe 구성"""
+    print("\n[TEST] Symptom snapshot - AnalyzeService")
+
+    class _NoDB:
+        def table(self, name):
+            raise AssertionError(f"DB 조회 발생: {name}")
+
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = _NoDB()
+    original = SymptomDataSnapshot._shared
+    try:
+        SymptomDataSnapshot._shared = _snapshot()
+        ingredients = asyncio.run(service._get_ingredients_from_db(1))
+        recipes = asyncio.run(service._get_recipes_from_db(1))
+    finally:
+        SymptomDataSnapshot._shared = original
+
+    print(f"[ingredients] {[i.modern_name for i in ingredients]} / [recipes] {[r.title for r in recipes]}")
+    assert ingredients[0].modern_name == "인삼" and ingredients[0].priority == 90
+    assert recipes[0].id == 10 and recipes[0].meal_slot == "tea"
+
+
+def test_first_load_off_event_loop():
+    """스냅샷 미로드 상태의 첫 요청은 네 테이블 전체 로드를 워커 스레드에서"""
+    print("\n[TEST] Symptom snapshot - first load in thread")
+    threads = []
+    snapshot = SymptomDataSnapshot()
+
+    def _load(db):
+        threads.append(threading.current_thread())
+        snapshot.build(INGREDIENT_MAPS, FOODS, RECIPE_MAPS, RECIPES, version=3)
+
+    snapshot.load = _load
+    service = AnalyzeService.__new__(AnalyzeService)
+    service.db = None
+    original = SymptomDataSnapshot._shared
+    try:
+        SymptomDataSnapshot._shared = snapshot
+        ingredients = asyncio.run(service._get_ingredients_from_db(1))
+        recipes = asyncio.run(service._get_recipes_from_db(1))
+    finally:
+        SymptomDataSnapshot._shared = original
+
+    assert ingredients[0].modern_name == "인삼" and recipes[0].title == "대추차"
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+if __name__ == "__main__":
+    test_snapshot_join_and_order()
+    test_add_recipes_visible_immediately()
+    test_analyze_service_uses_snapshot()
+    test_first_load_off_event_loop()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+한→영 검색어 번역 계층 테스트
+- 사전: foods_master(이름·한자명·별칭) / catalog_drugs / drug_database.json(제품명·별칭), 띄어쓴 검색어 조합
+- 사전에 없는 검색어: drug_translation 조회 1회 → 나머지는 LLM 묶음 호출 1회 → 결과 일괄 저장
+- 동시 요청의 미번역 검색어를 한 번에 처리, 재번역은 DB / LLM 호출 없음
+- LLM 미설정·실패 시 단건 번역, 모두 실패하면 원문 유지 (결과는 저장하지 않음)
+- PubMedService.translate_to_english 가 번역 계층을 사용
+"""
+import sys
+import json
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.pubmed_service import PubMedService
+from app.utils.term_translator import TermTranslator
+
+FOOD_ROWS = [
+    {"rep_code": "F001", "rep_name": "大棗", "modern_name": "대추", "name_en": "Jujube, Red Date",
+     "aliases": ["대조", "홍대추", "Red Date"]},
+    {"rep_code": "F002", "rep_name": "蘿蔔", "modern_name": "무", "name_en": "Radish", "aliases": None},
+    {"rep_code": "F003", "rep_name": "未詳", "modern_name": "미상", "name_en": None, "aliases": []},
+]
+DRUG_ROWS = [
+    {"id": 1, "name": "아스피린", "generic_name": "Aspirin"},
+    {"id": 2, "name_ko": "메트포르민", "name_en": "Metformin"},
+    {"id": 3, "name": "한글성분명", "generic_name": "한글"},
+]
+
+
+class _Repo:
+    """drug_translation 메모리 대역"""
+
+    def __init__(self, rows: dict = None):
+        self.rows = dict(rows or {})
+        self.lookups: list[list[str]] = []
+        self.saved: list[list[dict]] = []
+
+    async def get_translations(self, names):
+        self.lookups.append(list(names))
+        return {name: self.rows[name] for name in names if name in self.rows}
+
+    async def save_translations(self, rows):
+        self.saved.append(rows)
+        self.rows.update({row["korean_name"]: row["english_name"] for row in rows})
+
+
+def _llm(answers: dict, prompts: list):
+    async def _call(prompt: str) -> str:
+        prompts.append(prompt)
+        results = []
+        for line in prompt.splitlines():
+            if line.startswith("- id="):
+                item_id, term = line[len("- id="):].split(": ", 1)
+                if term in answers:
+                    results.append({"id": item_id, "en": answers[term]})
+        return json.dumps({"results": results})
+    return _call
+
+
+def _translator() -> TermTranslator:
+    translator = TermTranslator()
+    translator.build(FOOD_ROWS, DRUG_ROWS)
+    return translator
+
+
+def test_dictionary_sources():
+    print("=" * 70)
+    print("[TEST] Term translator - dictionary")
+    print("=" * 70)
+    translator = _translator()
+    print(f"[stats] {translator.get_stats()}")
+
+    assert translator.lookup("대추") == "Jujube"
+    assert translator.lookup("大棗") == translator.lookup("홍대추") == "Jujube"
+    assert translator.lookup("무") == "Radish" and translator.lookup("미상") is None
+    assert translator.lookup("아스피린") == "Aspirin" and translator.lookup("메트포르민") == "Metformin"
+    assert translator.lookup("한글성분명") is None
+    # drug_database.json: 제품명 / 원래 이름(괄호 제외) / 별칭
+    assert translator.lookup("아세로낙정") == translator.lookup("아세로낙") == "Aceclofenac"
+    assert translator.lookup("타이레놀") == "Tylenol"
+    # 띄어쓴 검색어, 영문 검색어
+    assert translator.lookup(" 대추   무 ") == "Jujube Radish"
+    assert translator.lookup("대추 모르는말") is None
+    assert translator.lookup("ginger nausea") == "ginger nausea"
+
+
+def test_batches_misses_and_caches():
+    print("\n[TEST] Term translator - batch")
+    translator = _translator()
+    repo = _Repo({"두통": "Headache"})
+    prompts: list[str] = []
+    llm = _llm({"메스꺼움": "Nausea", "소화불량": "Dyspepsia"}, prompts)
+
+    async def _run():
+        first = await asyncio.gather(
+            translator.translate(["대추", "두통"], repo=repo, llm=llm),
+            translator.translate(["메스꺼움"], repo=repo, llm=llm),
+            translator.translate(["소화불량", "메스꺼움"], repo=repo, llm=llm),
+        )
+        again = await translator.translate(["두통", "메스꺼움", "소화불량"], repo=repo, llm=llm)
+        return first, again
+
+    (a, b, c), again = asyncio.run(_run())
+    print(f"[lookups] {repo.lookups} / [stats] {translator.get_stats()}")
+    assert a == {"대추": "Jujube", "두통": "Headache"}
+    assert b == {"메스꺼움": "Nausea"} and c == {"소화불량": "Dyspepsia", "메스꺼움": "Nausea"}
+    # 사전에 없는 검색어는 DB 조회 1회 + LLM 호출 1회, 새 번역만 한 번에 저장
+    assert repo.lookups == [["두통", "메스꺼움", "소화불량"]]
+    assert len(prompts) == 1
+    assert [sorted(row["korean_name"] for row in rows) for rows in repo.saved] == [["메스꺼움", "소화불량"]]
+    assert {row["source"] for row in repo.saved[0]} == {"gemini"}
+    # 재번역은 호출 없음
+    assert again == {"두통": "Headache", "메스꺼움": "Nausea", "소화불량": "Dyspepsia"}
+    assert len(repo.lookups) == 1 and len(prompts) == 1
+
+
+def test_fallback_and_untranslated():
+    print("\n[TEST] Term translator - fallback")
+    translator = _translator()
+    repo = _Repo()
+    calls: list[str] = []
+
+    async def _fallback(term):
+        calls.append(term)
+        return ("Insomnia", "mymemory") if term == "불면" else None
+
+    async def _failing_llm(prompt):
+        raise RuntimeError("quota")
+
+    async def _run():
+        first = await translator.translate(["불면", "알수없음"], repo=repo, llm=_failing_llm, fallback=_fallback)
+        second = await translator.translate(["불면", "알수없음"], repo=repo, fallback=_fallback)
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first == second == {"불면": "Insomnia", "알수없음": "알수없음"}
+    assert repo.saved == [[{"korean_name": "불면", "english_name": "Insomnia", "source": "mymemory"}]]
+    # 번역 실패한 검색어만 다시 시도
+    assert calls == ["불면", "알수없음", "알수없음"]
+
+
+def test_pubmed_service_uses_translator():
+    print("\n[TEST] Term translator - PubMedService")
+    prompts: list[str] = []
+    service = PubMedService.__new__(PubMedService)
+    service.db = None
+    service.repo = _Repo()
+    service.translator = _translator()
+    service.translate_llm = _llm({"역류성 식도염": "Gastroesophageal Reflux"}, prompts)
+
+    async def _no_single(term):
+        raise AssertionError(f"단건 번역 호출: {term}")
+
+    service._translate_single = _no_single
+
+    async def _run():
+        return (
+            await service.translate_to_english("생강"),
+            await service.translate_terms(["역류성 식도염", "대추"]),
+            await service.translate_to_english("역류성 식도염"),
+        )
+
+    ginger, many, again = asyncio.run(_run())
+    assert ginger == "Ginger"
+    assert many == {"역류성 식도염": "Gastroesophageal Reflux", "대추": "Jujube"}
+    assert again == "Gastroesophageal Reflux" and len(prompts) == 1
+
+
+def test_first_load_off_event_loop():
+    """사전이 아직 없으면 translate_terms 의 최초 로드는 워커 스레드에서"""
+    print("\n[TEST] Term translator - first load in thread")
+    import threading
+    service = PubMedService.__new__(PubMedService)
+    service.db = None
+    service.repo = _Repo()
+    service.translator = TermTranslator()
+    service.translate_llm = _llm({}, [])
+    load_threads = []
+
+    def _load(db):
+        load_threads.append(threading.current_thread())
+        service.translator.build(FOOD_ROWS, DRUG_ROWS)
+
+    service.translator.load = _load
+    result = asyncio.run(service.translate_terms(["생강"]))
+    assert result == {"생강": "Ginger"}
+    assert service.translator.is_ready
+    assert len(load_threads) == 1 and load_threads[0] is not threading.main_thread()
+
+    asyncio.run(service.translate_terms(["생강"]))
+    assert len(load_threads) == 1
+
+
+if __name__ == "__main__":
+    test_dictionary_sources()
+    test_batches_misses_and_caches()
+    test_fallback_and_untranslated()
+    test_pubmed_service_uses_translator()
+    test_first_load_off_event_loop()
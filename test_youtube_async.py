@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 YouTube 근거 조회 테스트
+- 여러 식재료의 youtube_cache 조회는 in_ 쿼리 1회 (만료 캐시 제외, 히트 행 접근 시각 일괄 갱신)
+- 캐시 미스 식재료만 API 호출, 동시에 실행 (첫 검색어 결과 없으면 다음 검색어)
+- 증상 매핑 영상이 있으면 1회 조회로 모든 식재료에 사용
+- HealthStackAPI._fetch_evidence_parallel: PubMed 검색과 YouTube 조회가 동시에 진행
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.services.healthstack_api import HealthStackAPI
+from app.services.pubmed_service import PubMedPaper
+from app.services.youtube_service import YouTubeService, _query_hash
+
+
+def _row(query: str, video_id: str, hours_ago: float = 1) -> dict:
+    return {
+        "query_hash": _query_hash(query),
+        "query": query,
+        "created_at": (datetime.now() - timedelta(hours=hours_ago)).isoformat(),
+        "response_json": {"videos": [{"video_id": video_id, "title": f"Cached {video_id}", "channel": "C",
+                                      "thumbnail_url": "", "url": f"https://youtu.be/{video_id}"}]},
+    }
+
+
+class _Repo:
+    """YouTubeRepository 대역 (호출 기록)"""
+
+    def __init__(self, rows: list[dict], mapped: dict = None):
+        self.rows = {row["query_hash"]: row for row in rows}
+        self.mapped = mapped
+        self.calls: list[tuple] = []
+
+    async def symptom_video(self, symptom_id):
+        self.calls.append(("symptom_video", symptom_id))
+        return self.mapped
+
+    async def get_caches(self, query_hashes):
+        self.calls.append(("get_caches", len(query_hashes)))
+        return {h: self.rows[h] for h in query_hashes if h in self.rows}
+
+    async def touch_caches(self, query_hashes, accessed_at):
+        self.calls.append(("touch_caches", len(query_hashes)))
+
+    async def upsert_cache(self, row):
+        self.calls.append(("upsert_cache", row["query"]))
+
+
+class _YouTubeAPI:
+    """YouTube Data API 대역 (검색어별 영상, 동시 요청 수 기록)"""
+
+    def __init__(self, results: dict, delay: float = 0.05):
+        self.results = results
+        self.delay = delay
+        self.queries: list[str] = []
+        self.active = self.peak = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        query = request.url.params["q"]
+        self.queries.append(query)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        items = [{"id": {"videoId": vid}, "snippet": {"title": f"Live {vid}", "channelTitle": "C"}}
+                 for vid in self.results.get(query, [])]
+        return httpx.Response(200, json={"items": items})
+
+
+def _service(repo: _Repo, api: _YouTubeAPI) -> YouTubeService:
+    service = YouTubeService.__new__(YouTubeService)
+    service.api_key = "test"
+    service.repo = repo
+    client = httpx.AsyncClient(transport=httpx.MockTransport(api.handler))
+    service._client = lambda: client
+    return service
+
+
+def test_batched_cache_and_concurrent_misses():
+    print("=" * 70)
+    print("[TEST] YouTube async - batched cache")
+    print("=" * 70)
+    repo = _Repo([_row("무 요리", "radish"), _row("생강 요리", "stale", hours_ago=30)])
+    api = _YouTubeAPI({"생강 요리": ["ginger"], "대추 효능": ["jujube"]})
+    service = _service(repo, api)
+
+    videos = asyncio.run(service.videos_for_ingredients(["무", "생강", "대추", "무"]))
+    print(f"[calls] {repo.calls} / [api] {api.queries} peak={api.peak}")
+
+    assert {name: v.video_id if v else None for name, v in videos.items()} == {
+        "무": "radish", "생강": "ginger", "대추": "jujube"
+    }
+    # 모든 검색어(3개 식재료 x 2) 캐시는 한 번에, 히트 1건만 접근 시각 갱신
+    assert repo.calls[:2] == [("get_caches", 6), ("touch_caches", 1)]
+    assert [c for c in repo.calls if c[0] == "get_caches"] == [("get_caches", 6)]
+    # 만료 캐시·미스만 API, 식재료끼리 동시 호출
+    assert sorted(api.queries) == ["대추 요리", "대추 효능", "생강 요리"]
+    assert api.peak >= 2
+    assert sorted(c[1] for c in repo.calls if c[0] == "upsert_cache") == ["대추 효능", "생강 요리"]
+
+
+def test_mapped_video_shared():
+    print("\n[TEST] YouTube async - symptom mapped video")
+    repo = _Repo([], mapped={"video_id": "mapped", "title": "Mapped", "channel": "C"})
+    api = _YouTubeAPI({})
+    videos = asyncio.run(_service(repo, api).videos_for_ingredients(["무", "생강"], symptom_id=7))
+    assert [v.video_id for v in videos.values()] == ["mapped", "mapped"]
+    assert [c for c in repo.calls if c[0] == "symptom_video"] == [("symptom_video", 7)]
+    assert api.queries == []
+
+
+def test_healthstack_fetches_pubmed_and_youtube_concurrently():
+    print("\n[TEST] YouTube async - HealthStackAPI evidence")
+
+    class _Ingredient:
+        def __init__(self, name):
+            self.rep_code, self.modern_name = f"R-{name}", name
+            self.rationale_ko, self.direction, self.evidence_level = "", "recommend", "B"
+
+    class _PubMed:
+        async def search_papers(self, query, max_results=1):
+            await asyncio.sleep(0.1)
+            return [PubMedPaper("1", query, "Abstract", "J", 2020, "https://x/1")]
+
+    api = _YouTubeAPI({f"{name} 요리": [name] for name in ["무", "생강", "대추"]}, delay=0.1)
+    service = HealthStackAPI.__new__(HealthStackAPI)
+    service.pubmed_service = _PubMed()
+    service.youtube_service = _service(_Repo([]), api)
+
+    started = time.perf_counter()
+    results = asyncio.run(service._fetch_evidence_parallel([_Ingredient(n) for n in ["무", "생강", "대추"]], None))
+    elapsed = time.perf_counter() - started
+    print(f"[elapsed] {elapsed:.2f}s")
+
+    assert [r.youtube_video["video_id"] for r in results] == ["무", "생강", "대추"]
+    assert [r.pubmed_papers[0]["title"] for r in results] == [f"{n} health benefit" for n in ["무", "생강", "대추"]]
+    # 직렬이면 PubMed 0.3s + YouTube 0.3s
+    assert elapsed < 0.3
+
+
+if __name__ == "__main__":
+    test_batched_cache_and_concurrent_misses()
+    test_mapped_video_shared()
+    test_healthstack_fetches_pubmed_and_youtube_concurrently()